@@ -1,12 +1,8 @@
-import uuid
-
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, Header
 from fastapi import HTTPException, status
-from fastapi import BackgroundTasks
-import asyncio
-from app.service.cafe_detail import crawl_all_cafes
-from app.service.cafe_detail import cafe_detail_job
-from app.core.redis_client import get_redis
+from app.core.job_queue import enqueue_job
+from app.core.redis_client import get_async_redis
 
 router = APIRouter()
 
@@ -15,22 +11,14 @@ router = APIRouter()
     summary="모든 카페 상세 정보 및 리뷰 크롤링",
     description="저장된 모든 cafe_id를 기반으로 카카오맵에서 각 카페의 상세 정보와 리뷰 데이터를 크롤링하고, 이를 DB에 저장합니다."
 )
-async def crawl_all_cafe_details(background_tasks: BackgroundTasks):
+async def crawl_all_cafe_details(
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="같은 키로 다시 요청하면 처음 만든 작업의 job_id를 반환"),
+):
     """
-    저장된 모든 cafe_id에 대해 상세 정보 및 리뷰를 크롤링하고 DB에 저장합니다.
+    저장된 모든 cafe_id에 대해 상세 정보 및 리뷰를 크롤링하고 DB에 저장하는 작업을 작업 실행기 큐에 넣습니다.
+    이미 대기 중이거나 실행 중인 상세 크롤링 작업이 있으면 새 작업을 만들지 않고 그 작업의 job_id를 반환합니다.
     """
-    job_id = str(uuid.uuid4())
-    redis = get_redis()
-    redis.hset(
-        f"cafe_detail_job:{job_id}",
-        mapping={
-            "status": "in_progress",
-            "progress": "0",
-            "stage": "",
-            "error": ""
-        }
-    )
-    background_tasks.add_task(cafe_detail_job, job_id)
+    job_id = await enqueue_job("cafe_detail", idempotency=idempotency_key)
     return {"job_id": job_id}
 
 @router.get(
@@ -39,8 +27,8 @@ async def crawl_all_cafe_details(background_tasks: BackgroundTasks):
     description="주어진 job_id에 해당하는 카페 상세 크롤링 진행 상태를 조회합니다."
 )
 async def get_crawl_all_status(job_id: str):
-    redis = get_redis()
-    data = redis.hgetall(f"cafe_detail_job:{job_id}")
+    redis = get_async_redis()
+    data = await redis.hgetall(f"cafe_detail_job:{job_id}")
     if not data:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
     return {
@@ -49,27 +37,3 @@ async def get_crawl_all_status(job_id: str):
         "stage": data.get("stage", ""),
         "error": data.get("error", ""),
     }
-
-async def cafe_detail_job(job_id: str):
-    """
-    Background task to perform detailed crawling and update job status in Redis.
-    """
-    redis = get_redis()
-
-    def update_progress_callback(progress: int, stage: str = ""):
-        redis.hset(
-            f"cafe_detail_job:{job_id}",
-            mapping={"progress": str(progress), "stage": stage}
-        )
-
-    try:
-        await cafe_detail_job_inner(job_id, update_progress_callback)
-        redis.hset(f"cafe_detail_job:{job_id}", mapping={"status": "completed"})
-    except Exception as e:
-        redis.hset(f"cafe_detail_job:{job_id}", mapping={
-            "status": "failed",
-            "error": str(e),
-        })
-
-async def cafe_detail_job_inner(job_id: str, update_progress_callback: callable):
-    await asyncio.to_thread(crawl_all_cafes, job_id, update_progress_callback)
\ No newline at end of file
@@ -1,8 +1,7 @@
-from fastapi import APIRouter, BackgroundTasks, HTTPException, status
-import uuid
-import asyncio
-from app.service.cafe_search import run_grid_crawling
-from app.core.redis_client import get_redis
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, status
+from app.core.job_queue import enqueue_job
+from app.core.redis_client import get_async_redis
 
 router = APIRouter()
 
@@ -12,40 +11,16 @@ router = APIRouter()
     summary="제주 지역 카페 ID 수집 작업 시작",
     description="200m 격자 단위로 나눈 제주도 좌표 데이터를 기반으로 카카오 API를 호출하여 주변 카페 ID를 수집하고 이를 DB에 저장하는 작업을 비동기로 시작합니다."
 )
-async def cafe_search(background_tasks: BackgroundTasks):
+async def cafe_search(
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="같은 키로 다시 요청하면 처음 만든 작업의 job_id를 반환"),
+):
     """
-    고정된 CSV(grid rects) 기반으로 전체 제주 지역 카페 ID를 수집하여 DB에 저장하는 작업을 비동기로 시작합니다.
+    고정된 CSV(grid rects) 기반으로 전체 제주 지역 카페 ID를 수집하여 DB에 저장하는 작업을 작업 실행기 큐에 넣습니다.
+    이미 대기 중이거나 실행 중인 카페 ID 수집 작업이 있으면 새 작업을 만들지 않고 그 작업의 job_id를 반환합니다.
     """
-    job_id = str(uuid.uuid4())
-    redis = get_redis()
-    redis.hset(f"cafe_search_job:{job_id}", mapping={
-        "status": "in_progress",
-        "progress": "0",
-        "stage": "",
-        "error": "",
-    })
-    background_tasks.add_task(cafe_search_job, job_id)
+    job_id = await enqueue_job("cafe_search", idempotency=idempotency_key)
     return {"job_id": job_id}
 
-async def cafe_search_job(job_id: str):
-    """
-    Background task to perform grid crawling and update job status in Redis.
-    """
-    redis = get_redis()
-    def update_progress_callback(progress: int, stage: str = ""):
-        redis.hset(f"cafe_search_job:{job_id}", mapping={
-            "progress": str(progress),
-            "stage": stage,
-        })
-    try:
-        await asyncio.to_thread(run_grid_crawling, job_id, update_progress_callback)
-        redis.hset(f"cafe_search_job:{job_id}", mapping={"status": "completed"})
-    except Exception as e:
-        redis.hset(f"cafe_search_job:{job_id}", mapping={
-            "status": "failed",
-            "error": str(e),
-        })
-
 
 @router.get(
     "/search/{job_id}",
@@ -53,8 +28,8 @@ async def cafe_search_job(job_id: str):
     description="비동기로 실행 중인 제주 지역 카페 ID 수집 작업의 상태, 진행률, 에러 정보를 조회합니다."
 )
 async def get_cafe_search_job_status(job_id: str):
-    redis = get_redis()
-    data = redis.hgetall(f"cafe_search_job:{job_id}")
+    redis = get_async_redis()
+    data = await redis.hgetall(f"cafe_search_job:{job_id}")
     if not data:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
     return {
@@ -62,4 +37,4 @@ async def get_cafe_search_job_status(job_id: str):
         "progress": data.get("progress", ""),
         "stage": data.get("stage", ""),
         "error": data.get("error", ""),
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,91 @@
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, Header, HTTPException, Query, status
+from app.core.job_queue import enqueue_job
+from app.core.redis_client import get_async_redis
+from app.service.cafe_index import cached_response, get_cafe_index, with_cafe_info
+from app.service.cafe_similarity import get_similarity_index
+
+router = APIRouter()
+
+
+@router.get(
+    "/nearby",
+    summary="주변 카페 조회",
+    description="위경도(lat, lon)에서 반경(radius, m) 이내의 카페를 가까운 순으로 조회합니다. "
+                "keyword를 주면 대표 키워드에 keyword가 포함된 카페만 조회합니다. 메모리 공간 인덱스와 Redis 응답 캐시로 응답합니다."
+)
+async def get_nearby_cafes(
+    lat: float = Query(..., ge=-90, le=90, description="위도"),
+    lon: float = Query(..., ge=-180, le=180, description="경도"),
+    radius: float = Query(1000, gt=0, le=20000, description="검색 반경(m)"),
+    keyword: str = Query(None, min_length=1, max_length=50, description="대표 키워드 필터"),
+    limit: int = Query(50, ge=1, le=200, description="최대 카페 수"),
+):
+    params = {"lat": round(lat, 6), "lon": round(lon, 6), "radius": radius, "keyword": keyword, "limit": limit}
+
+    def compute(index):
+        cafes = index.nearby(params["lat"], params["lon"], radius, keyword, limit)
+        return {"count": len(cafes), "version": index.version, "cafes": cafes}
+
+    return await cached_response(get_async_redis(), "nearby", params, compute)
+
+
+@router.get(
+    "/recommend",
+    summary="키워드로 카페 추천",
+    description="키워드들(keyword를 여러 번 지정)을 IDF 가중 벡터로 만들어 카페 키워드 프로필과의 코사인 유사도가 높은 순으로 조회합니다. "
+                "메모리 추천 스냅샷으로 응답합니다."
+)
+async def recommend_cafes(
+    keyword: List[str] = Query(..., min_length=1, description="추천 기준 키워드"),
+    limit: int = Query(20, ge=1, le=200, description="최대 카페 수"),
+):
+    index = await asyncio.to_thread(get_similarity_index)
+    cafes = with_cafe_info(await asyncio.to_thread(get_cafe_index), index.query(keyword, limit))
+    return {"count": len(cafes), "version": index.version, "cafes": cafes}
+
+
+@router.post(
+    "/similarities",
+    summary="유사 카페 재계산",
+    description="모든 카페의 키워드 프로필로 유사 카페 top-K를 다시 계산해 저장하는 작업을 등록합니다. "
+                "키워드 분석 작업도 끝날 때 같은 계산을 수행합니다."
+)
+async def rebuild_similarities(
+    top_k: int = Query(20, ge=1, le=100, description="카페마다 저장할 유사 카페 수"),
+    embedding_weight: float = Query(0.0, ge=0, le=1, description="키워드 임베딩 중심 유사도를 섞는 비율"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="같은 키로 다시 요청하면 처음 만든 작업의 job_id를 반환"),
+):
+    job_id = await enqueue_job("cafe_similarity", {"top_k": top_k, "embedding_weight": embedding_weight},
+                               idempotency=idempotency_key)
+    return {"job_id": job_id}
+
+
+@router.get(
+    "/{cafe_id}/similar",
+    summary="유사 카페 조회",
+    description="키워드 프로필이 비슷한 카페를 유사도 순으로 조회합니다. 미리 계산한 top-K를 메모리에서 응답합니다."
+)
+async def get_similar_cafes(cafe_id: int, limit: int = Query(10, ge=1, le=100, description="최대 카페 수")):
+    index = await asyncio.to_thread(get_similarity_index)
+    similar = index.similar_cafes(cafe_id, limit)
+    if similar is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cafe not found")
+    cafes = with_cafe_info(await asyncio.to_thread(get_cafe_index), similar)
+    return {"count": len(cafes), "version": index.version, "cafes": cafes}
+
+
+@router.get(
+    "/{cafe_id}",
+    summary="카페 상세 조회",
+    description="카페 기본 정보와 대표 키워드를 조회합니다."
+)
+async def get_cafe(cafe_id: int):
+    def compute(index):
+        return index.get(cafe_id)
+
+    cafe = await cached_response(get_async_redis(), "cafe", {"id": cafe_id}, compute)
+    if cafe is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cafe not found")
+    return cafe
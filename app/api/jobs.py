@@ -0,0 +1,77 @@
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from app.core.job_queue import cancel_job, get_job, job_events, queue_stats
+
+router = APIRouter()
+
+
+def sse_message(event_id, data):
+    # SSE 메시지 형식: 스트림 이벤트는 id를 붙여 재연결 시 Last-Event-ID로 이어 받을 수 있게 함
+    lines = [f"id: {event_id}"] if event_id else []
+    event = "status" if "status" in data else "progress"
+    lines += [f"event: {event}", f"data: {json.dumps(data, ensure_ascii=False)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+async def sse_stream(job_id, last_event_id):
+    async for event_id, data in job_events(job_id, last_event_id):
+        # 새 이벤트 없이 대기 시간이 지나면 연결 유지용 주석을 보냄
+        yield ": keep-alive\n\n" if data is None else sse_message(event_id, data)
+
+
+@router.get(
+    "/",
+    summary="작업 큐 현황 조회",
+    description="작업 종류별 대기 중인 작업 수와 실행 중인 작업 수를 조회합니다."
+)
+async def get_queue_stats():
+    return await queue_stats()
+
+
+@router.get(
+    "/{job_id}",
+    summary="작업 상태 조회",
+    description="작업 종류와 관계없이 job_id로 작업의 상태, 진행률, 실행기, 하트비트 정보를 조회합니다."
+)
+async def get_job_status(job_id: str):
+    job = await get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+@router.get(
+    "/{job_id}/events",
+    summary="작업 진행 상황 스트리밍",
+    description="SSE(text/event-stream)로 작업의 현재 상태를 보낸 뒤 진행률, 단계, 처리량(초당 처리 단위), ETA(초)와 상태 변경을 "
+                "작업이 끝날 때까지 전달합니다. 재연결 시 Last-Event-ID 헤더를 보내면 놓친 이벤트부터 이어서 받습니다."
+)
+async def stream_job_status(
+    job_id: str,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    if await get_job(job_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return StreamingResponse(
+        sse_stream(job_id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.delete(
+    "/{job_id}",
+    summary="작업 취소",
+    description="대기 중인 작업은 바로 취소하고, 실행 중인 작업은 다음 진행률 보고 시점에 중단되도록 취소를 요청합니다."
+)
+async def delete_job(job_id: str):
+    result = await cancel_job(job_id)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    if result in ("completed", "failed"):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job already {result}")
+    return {"job_id": job_id, "status": result}
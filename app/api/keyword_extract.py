@@ -1,11 +1,13 @@
-from uuid import uuid4
-from app.core.redis_client import get_redis
+import asyncio
+from typing import Literal, Optional
+from app.core.job_queue import enqueue_job
+from app.core.redis_client import get_async_redis
+from app.core.model_registry import DEFAULT_MODEL_NAME, get_model, loaded_models
+from app.service.cafe_index import get_cafe_index, with_cafe_info
+from app.service.cafe_similarity import get_similarity_index
+from app.service.keyword_index import get_keyword_index
 from fastapi import HTTPException, status
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-
-from app.service.keyword_clustering import cluster_keywords_per_cafe
-from app.service.keyword_extractor import extract_all_keywords
-from app.service.keyword_extract_job import extract_and_cluster_job
+from fastapi import APIRouter, Header, HTTPException, Query
 
 router = APIRouter()
 
@@ -14,25 +16,67 @@ router = APIRouter()
     summary="모든 카페 리뷰 키워드 추출 및 클러스터링",
     description="모든 카페의 리뷰 데이터를 분석하여 키워드를 추출하고, 이를 클러스터링하여 대표 키워드를 도출합니다."
 )
-async def extract_keywords(background_tasks: BackgroundTasks):
-    job_id = str(uuid4())
-    redis = get_redis()
-    redis.hset(
-        f"keyword_extract_job:{job_id}",
-        mapping={"status": "in_progress", "progress": "0", "stage": "", "error": ""}
-    )
-    background_tasks.add_task(extract_and_cluster_job, job_id)
+async def extract_keywords(
+    workers: int = Query(1, ge=1, le=64, description="형태소 분석·클러스터링에 사용할 프로세스 수"),
+    mode: Literal["full", "incremental"] = Query("full", description="full: 전체 재추출, incremental: 새 리뷰만 추출"),
+    dedup: Literal["off", "cafe", "global"] = Query("off", description="추출 전 중복 리뷰 판정 범위 (off: 판정하지 않음)"),
+    cluster: Literal["cafe", "global"] = Query("cafe", description="cafe: 카페별 클러스터링, global: 전역 어휘를 한 번 클러스터링"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="같은 키로 다시 요청하면 처음 만든 작업의 job_id를 반환"),
+):
+    # 모드와 관계없이 같은 키워드·클러스터 테이블을 다시 쓰므로 작업 종류 전체에 락 하나를 사용
+    job_id = await enqueue_job("keyword_extract", {
+        "workers": workers,
+        "incremental": mode == "incremental",
+        "dedup": dedup,
+        "cluster_mode": cluster,
+    }, idempotency=idempotency_key)
     return {"job_id": job_id}
 
 
+@router.post(
+    "/models/warmup",
+    summary="임베딩 모델 미리 로딩",
+    description="키워드 클러스터링에 사용하는 임베딩 모델을 미리 로딩하여 첫 작업의 모델 로딩 시간을 없앱니다."
+)
+async def warmup_models():
+    await asyncio.to_thread(get_model, DEFAULT_MODEL_NAME)
+    return {"loaded_models": loaded_models()}
+
+
+@router.get(
+    "/search",
+    summary="의미 기반 키워드·카페 검색",
+    description="검색어(예: 조용한, 바다 보이는)를 한 번 임베딩해 키워드 벡터 인덱스에서 가까운 키워드를 찾고, "
+                "그 키워드들의 빈도에 유사도를 곱한 점수로 카페를 순위 매겨 반환합니다."
+)
+async def search_keywords(
+    q: str = Query(..., min_length=1, max_length=100, description="검색어"),
+    keywords: int = Query(20, ge=1, le=100, description="찾을 최대 키워드 수"),
+    limit: int = Query(20, ge=1, le=200, description="최대 카페 수"),
+):
+    index = await asyncio.to_thread(get_keyword_index)
+    if index is None:
+        return {"query": q, "keywords": [], "cafes": []}
+    model = await asyncio.to_thread(get_model, DEFAULT_MODEL_NAME)
+    query_vector = (await asyncio.to_thread(model.encode, [q]))[0]
+    matches = index.search(query_vector, keywords)
+    similarity = await asyncio.to_thread(get_similarity_index)
+    cafes = with_cafe_info(await asyncio.to_thread(get_cafe_index), similarity.rank_by_keyword_counts(matches, limit))
+    return {
+        "query": q,
+        "keywords": [{"keyword": keyword, "score": score} for keyword, score in matches],
+        "cafes": cafes,
+    }
+
+
 @router.get(
     "/{job_id}",
     summary="키워드 추출 상태 조회",
     description="주어진 job_id에 해당하는 키워드 추출 및 클러스터링 작업의 상태를 조회합니다."
 )
 async def get_extract_status(job_id: str):
-    redis = get_redis()
-    data = redis.hgetall(f"keyword_extract_job:{job_id}")
+    redis = get_async_redis()
+    data = await redis.hgetall(f"keyword_extract_job:{job_id}")
     if not data:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
     return {
@@ -40,4 +84,6 @@ async def get_extract_status(job_id: str):
         "progress": data.get("progress", ""),
         "stage": data.get("stage", ""),
         "error": data.get("error", ""),
+        "dedup_removed": data.get("dedup_removed", ""),
+        "similarities": data.get("similarities", ""),
     }
\ No newline at end of file
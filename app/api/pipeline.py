@@ -0,0 +1,44 @@
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query, status
+from app.core.job_queue import enqueue_job
+from app.core.redis_client import get_async_redis
+
+router = APIRouter()
+
+
+@router.post(
+    "/",
+    summary="카페 검색·크롤링·키워드 분석 스트리밍 파이프라인 실행",
+    description="격자 검색으로 발견한 카페를 바로 상세 크롤링하고, 크롤링이 끝난 카페를 곧바로 키워드 추출·클러스터링하는 작업을 "
+                "하나의 job_id로 시작합니다. 단계 사이 큐가 가득 차면 앞 단계가 기다리며, 결과는 카페 단위로 바로 반영됩니다."
+)
+async def start_pipeline(
+    crawl_workers: int = Query(10, ge=1, le=32, description="상세 크롤링 스레드 수"),
+    queue_size: int = Query(20, ge=1, le=1000, description="단계 사이 큐 크기"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="같은 키로 다시 요청하면 처음 만든 작업의 job_id를 반환"),
+):
+    job_id = await enqueue_job("pipeline", {"crawl_workers": crawl_workers, "queue_size": queue_size},
+                               idempotency=idempotency_key)
+    return {"job_id": job_id}
+
+
+@router.get(
+    "/{job_id}",
+    summary="파이프라인 작업 상태 조회",
+    description="주어진 job_id에 해당하는 스트리밍 파이프라인 작업의 상태와, 완료 시 단계별 처리 결과를 조회합니다."
+)
+async def get_pipeline_status(job_id: str):
+    redis = get_async_redis()
+    data = await redis.hgetall(f"pipeline_job:{job_id}")
+    if not data:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return {
+        "status": data.get("status", ""),
+        "progress": data.get("progress", ""),
+        "stage": data.get("stage", ""),
+        "error": data.get("error", ""),
+        "crawled_cafes": data.get("crawled_cafes", ""),
+        "analyzed_cafes": data.get("analyzed_cafes", ""),
+        "first_result_seconds": data.get("first_result_seconds", ""),
+        "elapsed_seconds": data.get("elapsed_seconds", ""),
+    }
@@ -0,0 +1,39 @@
+import asyncio
+from typing import Literal, Optional
+from fastapi import APIRouter, Header, Query
+from app.core.job_queue import enqueue_job
+from app.service.review_search import search_reviews
+
+router = APIRouter()
+
+
+@router.get(
+    "/search",
+    summary="리뷰 전문 검색",
+    description="검색어 문장을 Kiwi로 형태소 분석해 리뷰 역색인에서 BM25 점수 순으로 리뷰를 검색합니다. "
+                "cafe_id를 주면 그 카페의 리뷰만 검색합니다."
+)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="검색어"),
+    cafe_id: Optional[int] = Query(None, description="검색할 카페 ID (없으면 전체 카페)"),
+    limit: int = Query(20, ge=1, le=100, description="최대 리뷰 수"),
+):
+    result = await asyncio.to_thread(search_reviews, q, cafe_id, limit)
+    return {"query": q, "count": len(result["reviews"]), **result}
+
+
+@router.post(
+    "/index",
+    summary="리뷰 검색 색인 구축",
+    description="리뷰 역색인을 전체 구축하거나(full) 마지막으로 색인한 리뷰 이후의 새 리뷰만 덧붙이는(incremental) 작업을 등록합니다. "
+                "색인한 리뷰가 지워졌거나 리뷰 테이블이 교체되었으면 incremental도 전체 재구축으로 전환합니다. "
+                "elasticsearch=true이면 색인하는 리뷰를 Elasticsearch에도 bulk로 보냅니다. 키워드 분석 작업도 끝날 때 증분 색인을 수행합니다."
+)
+async def build_index(
+    mode: Literal["full", "incremental"] = Query("incremental", description="full: 전체 재구축, incremental: 새 리뷰만 색인"),
+    elasticsearch: bool = Query(False, description="Elasticsearch로도 색인할지 여부"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="같은 키로 다시 요청하면 처음 만든 작업의 job_id를 반환"),
+):
+    job_id = await enqueue_job("review_index", {"incremental": mode == "incremental", "elasticsearch": elasticsearch},
+                               idempotency=idempotency_key)
+    return {"job_id": job_id}
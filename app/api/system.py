@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+
+from app.core.db import pool_stats
+from app.core.redis_client import redis_pool_stats
+
+router = APIRouter()
+
+
+@router.get(
+    "/pools",
+    summary="연결 풀 상태 조회",
+    description="MySQL 연결 풀과 Redis 연결 풀의 사용률, 대기 횟수·시간 통계를 조회합니다."
+)
+async def get_pool_stats():
+    return {"mysql": pool_stats(), "redis": redis_pool_stats()}
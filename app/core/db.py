@@ -1,14 +1,33 @@
-"""이 파일은 데이터베이스 연결을 설정하는 기능을 제공합니다."""
+"""
+이 파일은 데이터베이스 연결을 설정하는 기능을 제공합니다.
+연결은 스레드 안전한 크기 제한 풀에서 빌려 쓰며, get_connection()이 반환한 연결의 close()는
+실제로 연결을 끊지 않고 풀에 반납합니다. 반납 시 트랜잭션을 롤백해 다음 사용자에게 깨끗한 연결을 넘깁니다.
+"""
 
 import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
 import pymysql
 from pymysql.cursors import DictCursor
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def get_connection():
-    """데이터베이스에 연결을 생성하여 반환합니다."""
+# 풀 최대 연결 수 (크롤러 스레드 10개 + 작업·API 여유분)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 16))
+# 연결을 빌릴 때 최대 대기 시간(초)
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+# 연결 최대 수명(초): 지나면 반납·대여 시 닫고 새로 연결 (MySQL wait_timeout보다 짧게)
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", 1800))
+# 이 시간(초) 이상 쉬었던 연결은 빌려주기 전에 ping으로 상태 확인
+DB_POOL_PING_INTERVAL = float(os.getenv("DB_POOL_PING_INTERVAL", 30))
+
+
+def connect():
+    """풀을 거치지 않고 데이터베이스에 새 연결을 생성하여 반환합니다."""
     return pymysql.connect(
         host=os.getenv("DB_HOST", "localhost"),
         port=int(os.getenv("DB_PORT", 3306)),
@@ -17,4 +36,205 @@ def get_connection():
         db=os.getenv("DB_NAME"),
         charset="utf8mb4",
         cursorclass=DictCursor
-    )
\ No newline at end of file
+    )
+
+
+class PooledConnection:
+    """
+    풀에서 빌린 PyMySQL 연결의 대리 객체입니다.
+    cursor/commit/rollback 등은 원래 연결에 그대로 위임하고, close()는 풀에 반납합니다.
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._closed = False
+
+    def __getattr__(self, name):
+        if self.__dict__.get("_closed", True):
+            raise pymysql.err.InterfaceError(0, "풀에 반납된 연결입니다")
+        return getattr(self._raw, name)
+
+    def __del__(self):
+        # close() 없이 버려진 연결도 풀 크기를 잡아먹지 않도록 반납
+        if not self.__dict__.get("_closed", True):
+            self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._pool.release(self._raw, self._created_at)
+
+
+class ConnectionPool:
+    """
+    스레드 안전한 크기 제한 MySQL 연결 풀입니다.
+    유휴 연결은 LIFO로 재사용하고, 모두 사용 중이면 timeout초까지 기다린 뒤 TimeoutError를 발생시킵니다.
+    """
+
+    def __init__(self, connect_fn=connect, max_size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                 max_lifetime=DB_POOL_MAX_LIFETIME, ping_interval=DB_POOL_PING_INTERVAL):
+        self._connect = connect_fn
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.ping_interval = ping_interval
+        self._idle = deque()  # (연결, 생성 시각, 반납 시각)
+        self._size = 0
+        self._condition = threading.Condition()
+        self._stats = {"checkouts": 0, "waits": 0, "timeouts": 0, "created": 0, "discarded": 0,
+                       "total_wait_ms": 0.0, "max_wait_ms": 0.0}
+
+    def _expired(self, created_at, now):
+        return self.max_lifetime and now - created_at > self.max_lifetime
+
+    def _discard(self, raw):
+        # 연결을 닫고 풀 크기에서 제외 (condition 잠금 밖에서 호출)
+        try:
+            raw.close()
+        except Exception:
+            pass
+        with self._condition:
+            self._size -= 1
+            self._stats["discarded"] += 1
+            self._condition.notify()
+
+    def acquire(self):
+        """연결을 빌려 PooledConnection으로 반환합니다."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+        while True:
+            with self._condition:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise TimeoutError(f"DB 연결 풀 대기 시간 초과 ({self.timeout}초, 최대 {self.max_size}개)")
+                    waited = True
+                    self._condition.wait(remaining)
+                if self._idle:
+                    raw, created_at, released_at = self._idle.pop()
+                else:
+                    raw, created_at, released_at = None, None, None
+                    self._size += 1
+            if raw is None:
+                try:
+                    raw = self._connect()
+                except Exception:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+                created_at = time.monotonic()
+                with self._condition:
+                    self._stats["created"] += 1
+                break
+            # 수명이 지났거나 오래 쉰 연결이 끊겼으면 버리고 다시 시도
+            now = time.monotonic()
+            if self._expired(created_at, now):
+                self._discard(raw)
+                continue
+            if now - released_at >= self.ping_interval:
+                try:
+                    raw.ping(reconnect=False)
+                except Exception:
+                    self._discard(raw)
+                    continue
+            break
+
+        wait_ms = (time.monotonic() - start) * 1000
+        with self._condition:
+            self._stats["checkouts"] += 1
+            if waited:
+                self._stats["waits"] += 1
+            self._stats["total_wait_ms"] += wait_ms
+            self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], wait_ms)
+        return PooledConnection(self, raw, created_at)
+
+    def release(self, raw, created_at):
+        """연결을 롤백해 풀에 돌려놓습니다. 롤백에 실패하거나 수명이 지난 연결은 닫습니다."""
+        try:
+            raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+        if self._expired(created_at, time.monotonic()):
+            self._discard(raw)
+            return
+        with self._condition:
+            self._idle.append((raw, created_at, time.monotonic()))
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self):
+        """with 블록 동안 연결을 빌리고 블록이 끝나면 반납합니다."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def close_idle(self):
+        """유휴 연결을 모두 닫습니다."""
+        with self._condition:
+            idle = list(self._idle)
+            self._idle.clear()
+        for raw, _, _ in idle:
+            self._discard(raw)
+
+    def stats(self):
+        """풀 사용률과 대기 시간 통계를 반환합니다."""
+        with self._condition:
+            stats = dict(self._stats)
+            idle = len(self._idle)
+            size = self._size
+        stats.update({
+            "max_size": self.max_size,
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "utilization": round((size - idle) / self.max_size, 3) if self.max_size else 0.0,
+            "avg_wait_ms": round(stats["total_wait_ms"] / stats["checkouts"], 3) if stats["checkouts"] else 0.0,
+        })
+        stats["total_wait_ms"] = round(stats["total_wait_ms"], 3)
+        stats["max_wait_ms"] = round(stats["max_wait_ms"], 3)
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """프로세스 전역 연결 풀을 반환합니다 (처음 호출 시 생성)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def get_connection():
+    """연결 풀에서 데이터베이스 연결을 빌려 반환합니다. close()를 호출하면 풀에 반납됩니다."""
+    return get_pool().acquire()
+
+
+@contextmanager
+def pooled_connection():
+    """with 블록 동안 풀에서 연결을 빌려 쓰고 반납합니다."""
+    with get_pool().connection() as conn:
+        yield conn
+
+
+def pool_stats():
+    """DB 연결 풀 통계를 반환합니다."""
+    return get_pool().stats()
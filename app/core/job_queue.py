@@ -0,0 +1,306 @@
+"""
+이 파일은 무거운 작업(카페 검색, 상세 크롤링, 키워드 추출·클러스터링)을 Redis 큐로 작업 실행기 프로세스에 넘기는 기능을 제공합니다.
+API 프로세스는 작업을 큐에 넣고 상태만 조회하며, 실제 실행은 app.service.job_runner 프로세스가 맡습니다.
+
+Redis 키:
+    <작업 종류>_job:<job_id>   작업 상태 해시 (status, progress, stage, error, ...)
+    jobs:registry              job_id → 작업 종류
+    jobs:queue:<작업 종류>     대기 중인 작업 (LPUSH로 넣고 실행기가 BRPOP으로 꺼냄)
+    jobs:running               실행 중인 job_id 집합 (하트비트 끊긴 작업 탐지용)
+    jobs:lock:<작업 종류>[:<범위>]     작업 종류(또는 파라미터 범위)별 단일 실행 락, 값은 락을 가진 job_id
+    jobs:exclusive:<묶음>      같은 테이블을 쓰는 작업 종류 묶음의 실행 락, 값은 실행 중인 job_id
+    jobs:idempotency:<작업 종류>:<키>  Idempotency-Key 헤더 → job_id
+    jobs:events:<job_id>       진행률·상태 변경 이벤트 스트림 (SSE 엔드포인트가 XREAD로 구독)
+
+작업 상태: queued → in_progress → completed | failed | cancelled
+
+같은 락 범위의 작업은 한 번에 하나만 큐에 들어갑니다. 락이 잡혀 있는 동안 들어온 중복 요청은
+새 작업을 만들지 않고 락을 가진 작업의 job_id를 돌려받습니다. 락은 JOB_LOCK_LEASE초 임대로 잡히고
+실행기가 하트비트마다 임대를 연장하며, 작업이 끝나면 해제됩니다. 실행기가 죽어 해제되지 못한 락은
+임대가 끝나거나 고아 작업 표시로 작업이 failed가 되면 다음 요청이 가져갑니다.
+
+JOB_EXCLUSIVE_GROUPS의 묶음에 속한 작업 종류는 서로 다른 종류라도 한 번에 하나만 실행됩니다.
+(파이프라인이 라이브 테이블에 쓰는 동안 상세 크롤링·키워드 분석이 섀도 테이블 교체로 그 결과를 덮어쓰지 않도록)
+실행기는 묶음 락이 비어 있을 때만 그 묶음의 큐에서 작업을 꺼내며, 꺼내기와 락 획득은 Lua 스크립트 하나로 함께 일어납니다.
+(다른 작업이 실행 중이면 작업은 큐에 그대로 남고, 대기하는 동안 단일 실행 락은 실행기 하트비트가 연장)
+"""
+
+import hashlib
+import json
+import os
+import time
+from uuid import uuid4
+
+from app.core.redis_client import get_async_redis, get_stream_redis
+
+# 작업 종류별 상태 해시 키 접두사 (기존 상태 조회 API와 같은 키를 사용)
+JOB_TYPES = {
+    "cafe_search": "cafe_search_job",
+    "cafe_detail": "cafe_detail_job",
+    "keyword_extract": "keyword_extract_job",
+    "pipeline": "pipeline_job",
+    "cafe_similarity": "cafe_similarity_job",
+    "review_index": "review_index_job",
+}
+# 같은 테이블을 라이브로 쓰거나 섀도 테이블로 통째로 교체하는 작업 종류 묶음 (묶음 안에서는 한 번에 한 작업만 실행)
+JOB_EXCLUSIVE_GROUPS = {
+    "cafe_data": ("cafe_detail", "keyword_extract", "pipeline", "cafe_similarity", "review_index"),
+}
+REGISTRY_KEY = "jobs:registry"
+RUNNING_KEY = "jobs:running"
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+# 단일 실행 락 임대 시간(초): 대기 중·실행 중에는 실행기 하트비트마다 연장
+JOB_LOCK_LEASE = int(os.getenv("JOB_LOCK_LEASE", 600))
+# Idempotency-Key 보관 시간(초)
+JOB_IDEMPOTENCY_TTL = int(os.getenv("JOB_IDEMPOTENCY_TTL", 86400))
+# 작업 이벤트 스트림의 최대 길이(근사)와 보관 시간(초)
+JOB_EVENTS_MAXLEN = int(os.getenv("JOB_EVENTS_MAXLEN", 1000))
+JOB_EVENTS_TTL = int(os.getenv("JOB_EVENTS_TTL", 86400))
+
+# 락 값이 주인 job_id와 같을 때만 지우거나 임대를 연장하는 Lua 스크립트
+# (GET 후 DEL/EXPIRE를 따로 보내면 그 사이에 임대가 끝나 다른 작업이 잡은 락을 건드릴 수 있음)
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+RENEW_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# 묶음 락이 비어 있으면 큐에서 작업 하나를 꺼내고 같은 스크립트 안에서 그 job_id로 묶음 락을 잡는 Lua 스크립트
+# (꺼낸 뒤 락을 확인하면 락이 잡혀 있을 때 작업을 큐에 되돌려야 하고, 그 사이에 실행기가 죽으면 작업이 사라짐)
+POP_EXCLUSIVE_JOB_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return false
+end
+local message = redis.call('RPOP', KEYS[1])
+if not message then
+    return false
+end
+redis.call('SET', KEYS[2], cjson.decode(message)['job_id'], 'PX', ARGV[1])
+return message
+"""
+
+
+class JobCancelled(Exception):
+    """취소 요청을 받은 작업이 진행률 보고 시점에 중단될 때 발생합니다."""
+
+
+def queue_key(job_type):
+    return f"jobs:queue:{job_type}"
+
+
+def job_key(job_type, job_id):
+    return f"{JOB_TYPES[job_type]}:{job_id}"
+
+
+def now_iso():
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime())
+
+
+def lock_key(job_type, params=None, lock_params=()):
+    # lock_params에 적힌 파라미터 값이 같은 작업끼리만 락을 공유 (비어 있으면 작업 종류 전체가 하나의 범위)
+    scope = {name: (params or {}).get(name) for name in lock_params}
+    if not scope:
+        return f"jobs:lock:{job_type}"
+    digest = hashlib.sha1(json.dumps(scope, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+    return f"jobs:lock:{job_type}:{digest}"
+
+
+def exclusive_lock_key(job_type):
+    # 작업 종류가 속한 실행 묶음의 락 키 (묶음에 속하지 않으면 None)
+    for group, job_types in JOB_EXCLUSIVE_GROUPS.items():
+        if job_type in job_types:
+            return f"jobs:exclusive:{group}"
+    return None
+
+
+def idempotency_key(job_type, key):
+    return f"jobs:idempotency:{job_type}:{key}"
+
+
+def events_key(job_id):
+    return f"jobs:events:{job_id}"
+
+
+def publish_job_event(pipe, job_type, job_id, fields):
+    # 상태 해시 갱신과 이벤트 스트림 추가를 파이프라인에 함께 넣음 (실행은 호출한 쪽에서)
+    pipe.hset(job_key(job_type, job_id), mapping=fields)
+    pipe.xadd(events_key(job_id), fields, maxlen=JOB_EVENTS_MAXLEN, approximate=True)
+    pipe.expire(events_key(job_id), JOB_EVENTS_TTL)
+
+
+async def acquire_job_lock(redis, lock, job_id):
+    """
+    락을 job_id로 잡아 보고, 락을 가진 job_id를 반환합니다 (반환값이 job_id이면 획득 성공).
+    락을 가진 작업이 이미 끝났다면 해제되지 못한 락으로 보고 지운 뒤 한 번 더 시도합니다.
+    (확인한 작업이 아직 락을 가진 경우에만 지우므로, 그 사이에 다른 요청이 잡은 락은 남음)
+    """
+    holder = None
+    for _ in range(2):
+        if await redis.set(lock, job_id, nx=True, ex=JOB_LOCK_LEASE):
+            return job_id
+        holder = await redis.get(lock)
+        if holder is None:
+            # 확인하는 사이에 임대가 끝남
+            continue
+        holder_type = await redis.hget(REGISTRY_KEY, holder)
+        if holder_type in JOB_TYPES and await redis.hget(job_key(holder_type, holder), "status") in FINISHED_STATUSES:
+            await redis.eval(RELEASE_LOCK_SCRIPT, 1, lock, holder)
+            continue
+        return holder
+    return holder
+
+
+def renew_job_lock(redis, lock, job_id):
+    """실행기(동기 Redis)에서 job_id가 가진 락의 임대를 연장합니다. 락을 잃었으면 False를 반환합니다."""
+    return bool(redis.eval(RENEW_LOCK_SCRIPT, 1, lock, job_id, JOB_LOCK_LEASE * 1000))
+
+
+def release_job_lock(redis, lock, job_id):
+    """실행기(동기 Redis)에서 job_id가 가진 락을 해제합니다. 다른 작업이 가져간 락은 건드리지 않습니다."""
+    redis.eval(RELEASE_LOCK_SCRIPT, 1, lock, job_id)
+
+
+def pop_exclusive_job(redis, job_type):
+    """
+    실행기(동기 Redis)에서 묶음에 속한 작업 종류의 큐에서 작업 메시지 하나를 꺼내면서 묶음 락을 그 job_id로 잡습니다.
+    묶음의 다른 작업이 실행 중이거나 큐가 비어 있으면 아무것도 꺼내지 않고 None을 반환합니다.
+    임대 연장과 해제는 renew_job_lock·release_job_lock을 씁니다.
+    """
+    return redis.eval(POP_EXCLUSIVE_JOB_SCRIPT, 2, queue_key(job_type), exclusive_lock_key(job_type), JOB_LOCK_LEASE * 1000)
+
+
+async def enqueue_job(job_type, params=None, redis=None, idempotency=None, lock_params=()):
+    """
+    작업 상태를 queued로 만들고 작업 종류별 큐에 넣은 뒤 job_id를 반환합니다.
+    같은 락 범위(작업 종류, lock_params 값)의 작업이 대기 중이거나 실행 중이면 새 작업을 만들지 않고 그 작업의 job_id를,
+    같은 Idempotency-Key(idempotency)로 이미 요청된 작업이 있으면 그 작업의 job_id를 반환합니다.
+    """
+    redis = redis or get_async_redis()
+    job_id = str(uuid4())
+    params = params or {}
+
+    idem = idempotency_key(job_type, idempotency) if idempotency else None
+    if idem and not await redis.set(idem, job_id, nx=True, ex=JOB_IDEMPOTENCY_TTL):
+        existing = await redis.get(idem)
+        if existing:
+            return existing
+
+    lock = lock_key(job_type, params, lock_params)
+    holder = await acquire_job_lock(redis, lock, job_id)
+    if holder != job_id:
+        if idem:
+            await redis.set(idem, holder, ex=JOB_IDEMPOTENCY_TTL)
+        print(f"🔁 중복 작업 요청: {job_type} 작업 {holder}이(가) 이미 대기 중이거나 실행 중입니다")
+        return holder
+
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hset(job_key(job_type, job_id), mapping={
+            "type": job_type,
+            "status": "queued",
+            "progress": "0",
+            "stage": "",
+            "error": "",
+            "params": json.dumps(params, ensure_ascii=False),
+            "lock": lock,
+            "created_at": now_iso(),
+        })
+        pipe.hset(REGISTRY_KEY, job_id, job_type)
+        pipe.lpush(queue_key(job_type), json.dumps({"job_id": job_id, "params": params}, ensure_ascii=False))
+        await pipe.execute()
+    return job_id
+
+
+async def get_job(job_id, redis=None):
+    """작업 상태 해시에 job_id를 더해 반환합니다. 없는 작업이면 None을 반환합니다."""
+    redis = redis or get_async_redis()
+    job_type = await redis.hget(REGISTRY_KEY, job_id)
+    if not job_type:
+        return None
+    data = await redis.hgetall(job_key(job_type, job_id))
+    return {"job_id": job_id, **data} if data else None
+
+
+async def cancel_job(job_id, redis=None):
+    """
+    작업 취소를 요청하고 요청 후 상태를 반환합니다. 없는 작업이면 None을 반환합니다.
+    대기 중인 작업은 큐에서 빼고 바로 cancelled로 바꾸며,
+    실행 중인 작업은 cancel_requested를 표시해 실행기가 다음 진행률 보고 시점에 중단하게 합니다.
+    """
+    redis = redis or get_async_redis()
+    job_type = await redis.hget(REGISTRY_KEY, job_id)
+    if not job_type:
+        return None
+    key = job_key(job_type, job_id)
+    status = await redis.hget(key, "status")
+    if status in FINISHED_STATUSES:
+        return status
+    if status == "queued":
+        # 큐에서 해당 작업 메시지를 찾아 제거 (실행기가 이미 꺼냈다면 아래 표시로 취소됨)
+        for message in await redis.lrange(queue_key(job_type), 0, -1):
+            if json.loads(message)["job_id"] == job_id:
+                if await redis.lrem(queue_key(job_type), 1, message):
+                    async with redis.pipeline(transaction=False) as pipe:
+                        publish_job_event(pipe, job_type, job_id, {"status": "cancelled", "finished_at": now_iso()})
+                        await pipe.execute()
+                    lock = await redis.hget(key, "lock")
+                    if lock:
+                        await redis.eval(RELEASE_LOCK_SCRIPT, 1, lock, job_id)
+                    return "cancelled"
+    await redis.hset(key, "cancel_requested", "1")
+    return "cancelling"
+
+
+async def queue_stats(redis=None):
+    """작업 종류별 대기 작업 수와 실행 중인 작업 수를 반환합니다."""
+    redis = redis or get_async_redis()
+    stats = {job_type: {"queued": await redis.llen(queue_key(job_type)), "running": 0} for job_type in JOB_TYPES}
+    for job_id in await redis.smembers(RUNNING_KEY):
+        job_type = await redis.hget(REGISTRY_KEY, job_id)
+        if job_type in stats:
+            stats[job_type]["running"] += 1
+    return stats
+
+
+async def job_events(job_id, last_event_id=None, redis=None, block_ms=15000):
+    """
+    작업 이벤트를 (이벤트 id, 필드 dict) 순서로 내보내는 비동기 제너레이터입니다.
+    last_event_id가 없으면 먼저 현재 상태 해시를 (None, 상태)로 내보낸 뒤 그 이후 이벤트를 이어서 내보내고,
+    있으면(SSE 재연결) 그 id 이후 이벤트부터 내보냅니다. block_ms 동안 새 이벤트가 없으면 (None, None)을 내보내며,
+    작업이 끝난 상태가 되면 종료합니다. 대기하는 동안 연결 하나를 잡고 있으므로 기본값은 SSE 구독 전용 풀입니다.
+    """
+    redis = redis or get_stream_redis()
+    stream = events_key(job_id)
+    last_id = last_event_id
+    if last_id is None:
+        # 스냅샷보다 먼저 마지막 이벤트 id를 읽어 두어 그 사이의 이벤트를 놓치지 않음
+        latest = await redis.xrevrange(stream, count=1)
+        last_id = latest[0][0] if latest else "0-0"
+        job = await get_job(job_id, redis)
+        if job is None:
+            return
+        yield None, job
+        if job.get("status") in FINISHED_STATUSES:
+            return
+    while True:
+        items = await redis.xread({stream: last_id}, block=block_ms, count=100)
+        if not items:
+            # 스트림이 만료됐거나 이벤트 없이 끝난 작업은 상태 해시로 확인
+            job = await get_job(job_id, redis)
+            if job is None or job.get("status") in FINISHED_STATUSES:
+                if job is not None:
+                    yield None, job
+                return
+            yield None, None
+            continue
+        for event_id, fields in items[0][1]:
+            last_id = event_id
+            yield event_id, fields
+            if fields.get("status") in FINISHED_STATUSES:
+                return
@@ -0,0 +1,143 @@
+"""
+이 파일은 sql/migrations의 버전별 스키마 마이그레이션을 순서대로 적용하는 기능을 제공합니다.
+sql/init.sql을 기준 스키마로 보고, 그 위에 V<번호>__<설명>.sql 파일을 번호순으로 한 번씩 적용하며
+적용 이력은 schema_migrations 테이블에 기록합니다.
+sql/migrations/optional의 파일은 이름을 지정했을 때만 적용합니다 (예: kakao_reviews 파티셔닝).
+
+실행:
+    python -m app.core.migrations                 # 대기 중인 마이그레이션 적용
+    python -m app.core.migrations --status        # 적용 현황 출력
+    python -m app.core.migrations --optional partition_kakao_reviews
+"""
+
+import argparse
+import hashlib
+import os
+import re
+
+from app.core.db import get_connection
+
+# 실행 위치와 무관하게 저장소 루트의 sql/migrations를 사용 (MIGRATIONS_DIR로 바꿀 수 있음)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MIGRATIONS_DIR = os.getenv("MIGRATIONS_DIR", os.path.join(PROJECT_ROOT, "sql", "migrations"))
+OPTIONAL_DIR = "optional"
+MIGRATION_FILE_PATTERN = re.compile(r"^V(\d+)__(\w+)\.sql$")
+
+CREATE_HISTORY_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version VARCHAR(64) PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        checksum CHAR(40) NOT NULL,
+        applied_at DATETIME(6) DEFAULT CURRENT_TIMESTAMP(6)
+    )
+"""
+
+
+class Migration:
+    """마이그레이션 파일 하나 (version은 정렬·이력 키, 선택 마이그레이션은 파일 이름을 그대로 사용)"""
+
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+        with open(path, encoding="utf-8") as f:
+            self.sql = f.read()
+        self.checksum = hashlib.sha1(self.sql.encode("utf-8")).hexdigest()
+
+    def statements(self):
+        return split_statements(self.sql)
+
+
+def split_statements(sql):
+    """SQL 스크립트를 주석을 제외한 문장 리스트로 나눕니다 (문장은 줄 끝의 ;로 끝남)."""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [statement.strip() for statement in re.split(r";\s*(?:\n|$)", "\n".join(lines)) if statement.strip()]
+
+
+def discover_migrations(directory=MIGRATIONS_DIR):
+    """V<번호>__<설명>.sql 마이그레이션을 번호순으로 반환합니다."""
+    migrations = []
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if match:
+            migrations.append(Migration(f"{int(match.group(1)):04d}", match.group(2), os.path.join(directory, filename)))
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"마이그레이션 번호가 중복되었습니다: {versions}")
+    return migrations
+
+
+def optional_migration(name, directory=MIGRATIONS_DIR):
+    """sql/migrations/optional/<name>.sql 마이그레이션을 반환합니다."""
+    path = os.path.join(directory, OPTIONAL_DIR, f"{name}.sql")
+    if not os.path.exists(path):
+        raise ValueError(f"선택 마이그레이션이 없습니다: {name}")
+    return Migration(f"optional:{name}", name, path)
+
+
+def applied_migrations(cursor):
+    """적용된 마이그레이션의 {version: checksum}을 반환합니다."""
+    cursor.execute(CREATE_HISTORY_TABLE)
+    cursor.execute("SELECT version, checksum FROM schema_migrations")
+    return {row["version"]: row["checksum"] for row in cursor.fetchall()}
+
+
+def apply_migrations(conn=None, optional=(), directory=MIGRATIONS_DIR):
+    """
+    아직 적용되지 않은 마이그레이션을 번호순으로 적용하고, 적용한 마이그레이션 version 리스트를 반환합니다.
+    optional로 이름을 넘긴 선택 마이그레이션은 번호 마이그레이션 뒤에 적용합니다.
+    MySQL의 DDL은 트랜잭션으로 묶이지 않으므로 파일마다 적용 직후 이력을 기록합니다.
+    """
+    own_connection = conn is None
+    conn = conn or get_connection()
+    migrations = discover_migrations(directory) + [optional_migration(name, directory) for name in optional]
+    applied = []
+    try:
+        with conn.cursor() as cursor:
+            history = applied_migrations(cursor)
+            for migration in migrations:
+                if migration.version in history:
+                    if history[migration.version] != migration.checksum:
+                        print(f"⚠️ 이미 적용된 마이그레이션 파일이 변경되었습니다: {migration.version} {migration.name}")
+                    continue
+                print(f"▶️ 마이그레이션 적용: {migration.version} {migration.name}")
+                for statement in migration.statements():
+                    cursor.execute(statement)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                    (migration.version, migration.name, migration.checksum)
+                )
+                conn.commit()
+                applied.append(migration.version)
+    finally:
+        if own_connection:
+            conn.close()
+    print(f"✅ 마이그레이션 {len(applied)}개 적용 완료")
+    return applied
+
+
+def migration_status(conn=None, directory=MIGRATIONS_DIR):
+    """번호 마이그레이션별 (version, name, 적용 여부) 리스트를 반환합니다."""
+    own_connection = conn is None
+    conn = conn or get_connection()
+    try:
+        with conn.cursor() as cursor:
+            history = applied_migrations(cursor)
+        conn.commit()
+    finally:
+        if own_connection:
+            conn.close()
+    return [(migration.version, migration.name, migration.version in history) for migration in discover_migrations(directory)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--status", action="store_true", help="적용 현황만 출력")
+    parser.add_argument("--optional", nargs="*", default=[], help="함께 적용할 선택 마이그레이션 이름")
+    args = parser.parse_args()
+    if args.status:
+        for version, name, done in migration_status():
+            print(f"{'✅' if done else '⏳'} {version} {name}")
+    else:
+        apply_migrations(optional=args.optional)
@@ -0,0 +1,56 @@
+"""
+이 파일은 문장 임베딩 모델을 프로세스 전체에서 공유하는 지연 로딩 레지스트리를 제공합니다.
+모델은 처음 요청될 때 한 번만 로딩되며, 이후 작업과 스레드는 같은 인스턴스를 재사용합니다.
+torch, transformers 등 무거운 의존성은 로딩 시점에만 import하므로 API 서버 시작 시간에 영향을 주지 않습니다.
+추론 백엔드는 EMBEDDING_BACKEND 환경변수로 고릅니다.
+- torch: sentence-transformers (PyTorch)
+- onnx: ONNX로 내보내 동적 int8 양자화한 모델을 onnxruntime CPU로 실행
+"""
+
+import os
+import threading
+
+DEFAULT_MODEL_NAME = os.getenv("KEYWORD_MODEL_NAME", "snunlp/KR-SBERT-V40K-klueNLI-augSTS")
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+BACKENDS = ("torch", "onnx")
+
+_models = {}
+_lock = threading.Lock()
+
+
+def model_key(model_name=DEFAULT_MODEL_NAME, backend=EMBEDDING_BACKEND):
+    """
+    모델과 백엔드 조합의 식별자를 반환합니다.
+    백엔드마다 임베딩 값이 조금씩 다르므로 임베딩 저장소도 이 식별자로 구분합니다.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"지원하지 않는 임베딩 백엔드입니다: {backend}")
+    return model_name if backend == "torch" else f"{model_name}@{backend}"
+
+
+def _load_model(model_name, backend):
+    if backend == "onnx":
+        from app.core.onnx_encoder import load_onnx_encoder
+        return load_onnx_encoder(model_name)
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def get_model(model_name=DEFAULT_MODEL_NAME, backend=EMBEDDING_BACKEND):
+    """
+    모델 이름과 백엔드에 해당하는 인코더(encode 메서드를 가진 객체)를 반환합니다.
+    아직 로딩되지 않았다면 잠금을 잡고 한 번만 로딩합니다.
+    """
+    key = model_key(model_name, backend)
+    model = _models.get(key)
+    if model is not None:
+        return model
+    with _lock:
+        if key not in _models:
+            _models[key] = _load_model(model_name, backend)
+        return _models[key]
+
+
+def loaded_models():
+    """현재 프로세스에 로딩된 모델 식별자 목록을 반환합니다."""
+    return list(_models.keys())
@@ -0,0 +1,167 @@
+"""
+이 파일은 문장 임베딩 모델을 ONNX로 내보내고 동적 int8 양자화하여 CPU에서 추론하는 인코더를 제공합니다.
+GPU가 없는 배치 서버에서 PyTorch 대신 onnxruntime으로 키워드 임베딩을 계산할 때 사용합니다.
+입력은 길이순으로 정렬한 뒤 큰 배치로 패딩하여 추론하고, 결과는 원래 순서로 되돌립니다.
+
+내보내기:
+    python -m app.core.onnx_encoder snunlp/KR-SBERT-V40K-klueNLI-augSTS
+"""
+
+import json
+import os
+import re
+import sys
+
+import numpy as np
+
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "data/onnx")
+ONNX_BATCH_SIZE = int(os.getenv("ONNX_BATCH_SIZE", 256))
+ONNX_NUM_THREADS = int(os.getenv("ONNX_NUM_THREADS", 0))
+MAX_SEQ_LENGTH = 64
+
+
+def onnx_model_dir(model_name, root=ONNX_MODEL_DIR):
+    """모델 이름에 해당하는 ONNX 내보내기 디렉터리 경로를 반환합니다."""
+    return os.path.join(root, re.sub(r"[^0-9A-Za-z._-]+", "__", model_name))
+
+
+def _pooling_mode(pooling):
+    # sentence-transformers 버전에 따라 풀링 방식을 읽는 방법이 다름
+    if hasattr(pooling, "get_pooling_mode_str"):
+        return pooling.get_pooling_mode_str()
+    return pooling.pooling_mode
+
+
+def export_onnx_model(model_name, output_dir=None, quantize=True):
+    """
+    SentenceTransformer 모델의 트랜스포머 본체를 ONNX로 내보내고, 선택적으로 동적 int8 양자화합니다.
+    토크나이저와 풀링 설정도 같은 디렉터리에 저장합니다.
+
+    반환값:
+        내보낸 디렉터리 경로 (str)
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    output_dir = output_dir or onnx_model_dir(model_name)
+    os.makedirs(output_dir, exist_ok=True)
+
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0]
+    pooling = st_model[1]
+    auto_model = transformer.auto_model.eval()
+    tokenizer = transformer.tokenizer
+    tokenizer.save_pretrained(output_dir)
+
+    sample = tokenizer(["오션뷰 카페", "디저트"], padding=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    class _Encoder(torch.nn.Module):
+        # 입력 이름을 키워드 인자로 넘겨 transformers 버전별 forward 인자 순서 차이를 피함
+        def __init__(self):
+            super().__init__()
+            self.model = auto_model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            _Encoder().eval(),
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17,
+            dynamo=False,
+        )
+
+    model_file = "model.onnx"
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(fp32_path, os.path.join(output_dir, "model.int8.onnx"), weight_type=QuantType.QInt8)
+        model_file = "model.int8.onnx"
+
+    with open(os.path.join(output_dir, "encoder.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "model_name": model_name,
+            "model_file": model_file,
+            "input_names": input_names,
+            "pooling": _pooling_mode(pooling),
+            "max_seq_length": min(transformer.max_seq_length or MAX_SEQ_LENGTH, MAX_SEQ_LENGTH),
+        }, f, ensure_ascii=False)
+    return output_dir
+
+
+class OnnxSentenceEncoder:
+    """
+    export_onnx_model로 내보낸 모델을 onnxruntime CPU 세션으로 실행하는 인코더입니다.
+    SentenceTransformer.encode와 같은 형태로 호출할 수 있습니다.
+    """
+
+    def __init__(self, model_dir, num_threads=ONNX_NUM_THREADS):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        with open(os.path.join(model_dir, "encoder.json"), encoding="utf-8") as f:
+            self.config = json.load(f)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, self.config["model_file"]),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+
+    def _pool(self, hidden, attention_mask):
+        # SentenceTransformer 풀링 설정(mean 또는 cls)과 같은 방식으로 문장 벡터 계산
+        if self.config["pooling"] == "cls":
+            return hidden[:, 0]
+        mask = attention_mask[..., None].astype(hidden.dtype)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(self, sentences, batch_size=ONNX_BATCH_SIZE, show_progress_bar=False, **kwargs):
+        """문장 리스트를 (문장 수, 차원) float32 배열로 인코딩합니다."""
+        sentences = list(sentences)
+        if not sentences:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        # 길이순으로 정렬해 배치 내 패딩을 최소화
+        order = np.argsort([len(sentence) for sentence in sentences], kind="stable")
+        outputs = [None] * len(sentences)
+        for start in range(0, len(order), batch_size):
+            batch_index = order[start:start + batch_size]
+            encoded = self.tokenizer(
+                [sentences[i] for i in batch_index],
+                padding=True,
+                truncation=True,
+                max_length=self.config["max_seq_length"],
+                return_tensors="np",
+            )
+            feeds = {name: encoded[name].astype(np.int64) for name in self.config["input_names"]}
+            hidden = self.session.run(["last_hidden_state"], feeds)[0]
+            pooled = self._pool(hidden, encoded["attention_mask"])
+            for row, i in enumerate(batch_index):
+                outputs[i] = pooled[row]
+        return np.vstack(outputs).astype(np.float32)
+
+
+def load_onnx_encoder(model_name):
+    """모델의 ONNX 내보내기본을 불러옵니다. 아직 내보내지 않았다면 먼저 내보냅니다."""
+    model_dir = onnx_model_dir(model_name)
+    if not os.path.exists(os.path.join(model_dir, "encoder.json")):
+        export_onnx_model(model_name, model_dir)
+    return OnnxSentenceEncoder(model_dir)
+
+
+if __name__ == "__main__":
+    from app.core.model_registry import DEFAULT_MODEL_NAME
+    print(export_onnx_model(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_MODEL_NAME))
@@ -0,0 +1,38 @@
+"""이 파일은 작업 풀에서 스트림 데이터를 병렬 처리하기 위한 공용 유틸을 제공합니다."""
+
+from collections import deque
+from concurrent.futures import Future
+
+
+def completed_future(result):
+    """이미 계산된 결과를 담은 Future를 반환합니다. (풀에 제출하지 않는 작업을 같은 흐름으로 다룰 때 사용)"""
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def ordered_results(submissions, max_in_flight):
+    """
+    (context, future) 스트림을 받아 입력 순서대로 (context, 결과)를 반환합니다.
+    아직 끝나지 않은 작업이 max_in_flight개가 되면 다음 입력을 소비하지 않으므로,
+    submissions를 지연 생성기로 넘기면 제출되는 작업 수가 제한됩니다.
+    """
+    pending = deque()
+    for context, future in submissions:
+        pending.append((context, future))
+        if len(pending) >= max_in_flight:
+            context, future = pending.popleft()
+            yield context, future.result()
+    while pending:
+        context, future = pending.popleft()
+        yield context, future.result()
+
+
+def bounded_map(executor, fn, iterable, max_in_flight):
+    """
+    executor.map과 같이 입력 순서대로 결과를 반환하되,
+    동시에 제출된 작업 수를 max_in_flight개로 제한하여 입력 스트림을 조금씩 소비합니다.
+    """
+    submissions = ((None, executor.submit(fn, item)) for item in iterable)
+    for _, result in ordered_results(submissions, max_in_flight):
+        yield result
@@ -1,15 +1,102 @@
 # app/core/redis_client.py
 
 import redis
+import redis.asyncio as aioredis
 import os
 
 # 실제 Redis 호스트/포트/DB 번호에 맞게 수정하세요.
 REDIS_HOST = os.getenv("REDIS_HOST", "redis")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
-_redis = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=0, decode_responses=True)
+# 연결 풀 최대 연결 수 (동기: 작업 스레드의 진행률 갱신, 비동기: API 엔드포인트)
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 32))
+# 풀이 가득 찼을 때 연결을 기다리는 최대 시간(초)
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", 5))
+# SSE 구독 전용 비동기 풀 최대 연결 수 (동시에 열 수 있는 작업 이벤트 스트림 수)
+REDIS_STREAM_MAX_CONNECTIONS = int(os.getenv("REDIS_STREAM_MAX_CONNECTIONS", 256))
+
+_pool = redis.BlockingConnectionPool(
+    host=REDIS_HOST, port=REDIS_PORT, db=0, decode_responses=True,
+    max_connections=REDIS_MAX_CONNECTIONS, timeout=REDIS_POOL_TIMEOUT,
+)
+_redis = redis.Redis(connection_pool=_pool)
+# 비동기 풀은 이벤트 루프에 묶이므로 처음 사용할 때 생성
+_async_pool = None
+_async_redis = None
+_stream_pool = None
+_stream_redis = None
 
 def get_redis():
     """
     Redis client 객체를 반환합니다.
+    작업 스레드(asyncio.to_thread로 실행되는 서비스 코드)에서 사용하는 동기 클라이언트입니다.
+    """
+    return _redis
+
+def get_async_redis():
+    """
+    async def 엔드포인트에서 사용하는 비동기 Redis client 객체를 반환합니다.
+    모든 요청이 하나의 연결 풀을 공유하므로 이벤트 루프를 막지 않고 연결을 재사용합니다.
+    """
+    global _async_pool, _async_redis
+    if _async_redis is None:
+        _async_pool = aioredis.BlockingConnectionPool(
+            host=REDIS_HOST, port=REDIS_PORT, db=0, decode_responses=True,
+            max_connections=REDIS_MAX_CONNECTIONS, timeout=REDIS_POOL_TIMEOUT,
+        )
+        _async_redis = aioredis.Redis(connection_pool=_async_pool)
+    return _async_redis
+
+def get_stream_redis():
+    """
+    작업 이벤트 SSE 구독(XREAD BLOCK)에 사용하는 비동기 Redis client 객체를 반환합니다.
+    구독 하나가 대기하는 동안 연결 하나를 계속 잡고 있으므로, 엔드포인트용 공유 풀과 분리된 전용 풀을 사용합니다.
+    (SSE 클라이언트가 많아져도 다른 API 요청이 연결을 기다리지 않음)
     """
-    return _redis
\ No newline at end of file
+    global _stream_pool, _stream_redis
+    if _stream_redis is None:
+        _stream_pool = aioredis.BlockingConnectionPool(
+            host=REDIS_HOST, port=REDIS_PORT, db=0, decode_responses=True,
+            max_connections=REDIS_STREAM_MAX_CONNECTIONS, timeout=REDIS_POOL_TIMEOUT,
+        )
+        _stream_redis = aioredis.Redis(connection_pool=_stream_pool)
+    return _stream_redis
+
+async def close_async_redis():
+    """비동기 Redis 연결 풀(엔드포인트용, SSE 구독용)을 닫습니다 (앱 종료 시)."""
+    global _async_pool, _async_redis, _stream_pool, _stream_redis
+    if _async_redis is not None:
+        await _async_redis.aclose()
+        await _async_pool.disconnect()
+        _async_pool = None
+        _async_redis = None
+    if _stream_redis is not None:
+        await _stream_redis.aclose()
+        await _stream_pool.disconnect()
+        _stream_pool = None
+        _stream_redis = None
+
+def _pool_stats(pool):
+    # redis-py 연결 풀의 사용 중/유휴 연결 수 (공개 API가 없어 내부 필드를 읽음)
+    if hasattr(pool, "_available_connections"):
+        # 비동기 풀: 유휴 연결 리스트와 사용 중 연결 집합
+        idle = len(pool._available_connections)
+        in_use = len(pool._in_use_connections)
+    else:
+        # 동기 BlockingConnectionPool: 생성된 연결 리스트와, 유휴 연결(빈 슬롯은 None)을 담은 큐
+        idle = sum(1 for connection in list(pool.pool.queue) if connection is not None)
+        in_use = len(pool._connections) - idle
+    return {
+        "max_size": pool.max_connections,
+        "in_use": in_use,
+        "idle": idle,
+        "utilization": round(in_use / pool.max_connections, 3),
+    }
+
+def redis_pool_stats():
+    """동기·비동기·SSE 구독용 Redis 연결 풀 통계를 반환합니다."""
+    stats = {"sync": _pool_stats(_pool)}
+    if _async_pool is not None:
+        stats["async"] = _pool_stats(_async_pool)
+    if _stream_pool is not None:
+        stats["stream"] = _pool_stats(_stream_pool)
+    return stats
@@ -0,0 +1,175 @@
+"""
+이 파일은 파생 테이블을 섀도 테이블에 새로 만든 뒤 RENAME TABLE 한 번으로 교체하는 기능을 제공합니다.
+재구축 중에도 조회 쪽은 이전 세대의 완성된 테이블을 계속 읽고, 교체는 여러 테이블을 묶어 원자적으로 일어납니다.
+교체된 이전 세대는 <테이블>__old1, <테이블>__old2 ... 로 SHADOW_KEEP_GENERATIONS개까지 남겨 빠르게 되돌릴 수 있습니다.
+
+사용 예:
+    with shadow_rebuild(conn, ("extracted_keywords", "keyword_extract_watermarks")) as tables:
+        cursor.execute(f"INSERT INTO {tables['extracted_keywords']} ...")
+"""
+
+import os
+import re
+import time
+from contextlib import contextmanager
+
+SHADOW_SUFFIX = "__shadow"
+OLD_SUFFIX = "__old"
+SHADOW_KEEP_GENERATIONS = int(os.getenv("SHADOW_KEEP_GENERATIONS", 2))
+
+
+def shadow_name(table):
+    return f"{table}{SHADOW_SUFFIX}"
+
+
+def old_name(table, generation):
+    return f"{table}{OLD_SUFFIX}{generation}"
+
+
+def _existing_tables(cursor, names):
+    # 현재 스키마에 존재하는 테이블 이름 집합
+    if not names:
+        return set()
+    placeholders = ", ".join(["%s"] * len(names))
+    cursor.execute(
+        f"SELECT TABLE_NAME AS name FROM information_schema.TABLES "
+        f"WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ({placeholders})",
+        list(names)
+    )
+    return {row["name"] for row in cursor.fetchall()}
+
+
+def _drop_tables(cursor, names):
+    # 이전 세대·섀도 테이블끼리 외래 키로 얽혀 있을 수 있으므로 외래 키 검사를 끄고 삭제
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    try:
+        for name in names:
+            cursor.execute(f"DROP TABLE IF EXISTS {name}")
+    finally:
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+
+
+def _foreign_keys(cursor, table):
+    # 테이블의 외래 키를 {제약 이름: (컬럼 리스트, 참조 테이블, 참조 컬럼 리스트)}로 조회
+    cursor.execute(
+        "SELECT CONSTRAINT_NAME AS name, COLUMN_NAME AS col, "
+        "REFERENCED_TABLE_NAME AS ref_table, REFERENCED_COLUMN_NAME AS ref_col "
+        "FROM information_schema.KEY_COLUMN_USAGE "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND REFERENCED_TABLE_NAME IS NOT NULL "
+        "ORDER BY CONSTRAINT_NAME, ORDINAL_POSITION",
+        (table,)
+    )
+    foreign_keys = {}
+    for row in cursor.fetchall():
+        columns, ref_table, ref_columns = foreign_keys.setdefault(row["name"], ([], row["ref_table"], []))
+        columns.append(row["col"])
+        ref_columns.append(row["ref_col"])
+    return foreign_keys
+
+
+def create_shadow_tables(cursor, tables):
+    """
+    각 테이블과 같은 구조의 빈 섀도 테이블을 만들고 {테이블: 섀도 테이블} dict를 반환합니다.
+    CREATE TABLE ... LIKE는 외래 키를 복사하지 않으므로 외래 키는 따로 추가하며,
+    같은 묶음 안의 테이블을 참조하는 외래 키는 그 테이블의 섀도를 참조하게 하여 교체 후에도 새 세대끼리 연결되게 합니다.
+    """
+    generation = int(time.time())
+    shadows = {table: shadow_name(table) for table in tables}
+    # 이전 실행이 남긴 섀도 테이블은 버리고 새로 생성 (AUTO_INCREMENT는 1부터 시작)
+    _drop_tables(cursor, shadows.values())
+    for table, shadow in shadows.items():
+        cursor.execute(f"CREATE TABLE {shadow} LIKE {table}")
+
+    for table, shadow in shadows.items():
+        for name, (columns, ref_table, ref_columns) in _foreign_keys(cursor, table).items():
+            # 제약 이름은 스키마 안에서 유일해야 하므로 세대 번호를 붙임
+            constraint = f"{re.sub(r'__g[0-9]+$', '', name)[:48]}__g{generation}"
+            cursor.execute(
+                f"ALTER TABLE {shadow} ADD CONSTRAINT {constraint} FOREIGN KEY ({', '.join(columns)}) "
+                f"REFERENCES {shadows.get(ref_table, ref_table)} ({', '.join(ref_columns)})"
+            )
+    return shadows
+
+
+def publish_shadow_tables(cursor, tables, keep=SHADOW_KEEP_GENERATIONS):
+    """
+    섀도 테이블을 라이브 테이블로 교체합니다.
+    가장 오래된 세대를 지운 뒤, 세대 이동과 교체를 RENAME TABLE 문 하나로 원자적으로 수행합니다.
+    """
+    renames = []
+    candidates = [old_name(table, generation) for table in tables for generation in range(1, keep + 1)]
+    existing = _existing_tables(cursor, candidates)
+    if keep > 0:
+        _drop_tables(cursor, [old_name(table, keep) for table in tables])
+    for table in tables:
+        if keep > 0:
+            for generation in range(keep - 1, 0, -1):
+                if old_name(table, generation) in existing:
+                    renames.append((old_name(table, generation), old_name(table, generation + 1)))
+            renames.append((table, old_name(table, 1)))
+        else:
+            renames.append((table, f"{table}__retired"))
+        renames.append((shadow_name(table), table))
+
+    cursor.execute("RENAME TABLE " + ", ".join(f"{src} TO {dst}" for src, dst in renames))
+    if keep <= 0:
+        _drop_tables(cursor, [f"{table}__retired" for table in tables])
+
+
+def drop_shadow_tables(cursor, tables):
+    """실패한 재구축의 섀도 테이블을 삭제합니다."""
+    _drop_tables(cursor, [shadow_name(table) for table in tables])
+
+
+def discard_shadow_tables(conn, tables):
+    """
+    실패한 재구축의 트랜잭션을 롤백하고 섀도 테이블을 삭제합니다.
+    예외 처리 중에 호출하므로, 연결이 끊긴 경우처럼 정리까지 실패하면 경고만 출력해 원래 예외를 가리지 않습니다.
+    """
+    try:
+        conn.rollback()
+        if tables:
+            with conn.cursor() as cursor:
+                drop_shadow_tables(cursor, tables)
+    except Exception as e:
+        print(f"⚠️ 섀도 테이블 정리 실패 ({', '.join(tables) or '롤백'}): {e}")
+
+
+def restore_previous_generation(cursor, tables, keep=SHADOW_KEEP_GENERATIONS):
+    """
+    직전 세대(<테이블>__old1)를 다시 라이브로 되돌립니다.
+    현재 라이브 테이블은 섀도 자리로 옮겨 두며, 모든 테이블을 RENAME TABLE 문 하나로 교체합니다.
+    """
+    candidates = [old_name(table, generation) for table in tables for generation in range(1, keep + 1)]
+    existing = _existing_tables(cursor, candidates)
+    missing = [table for table in tables if old_name(table, 1) not in existing]
+    if missing:
+        raise ValueError(f"되돌릴 이전 세대가 없습니다: {', '.join(missing)}")
+
+    drop_shadow_tables(cursor, tables)
+    renames = []
+    for table in tables:
+        renames.append((table, shadow_name(table)))
+        renames.append((old_name(table, 1), table))
+        for generation in range(2, keep + 1):
+            if old_name(table, generation) in existing:
+                renames.append((old_name(table, generation), old_name(table, generation - 1)))
+    cursor.execute("RENAME TABLE " + ", ".join(f"{src} TO {dst}" for src, dst in renames))
+
+
+@contextmanager
+def shadow_rebuild(conn, tables):
+    """
+    tables를 섀도 테이블에 새로 만드는 구간을 감싸는 컨텍스트 매니저입니다.
+    {테이블: 섀도 테이블} dict를 넘겨주고, 블록이 정상 종료되면 커밋 후 교체하며 예외가 나면 섀도 테이블을 버립니다.
+    """
+    with conn.cursor() as cursor:
+        shadows = create_shadow_tables(cursor, tables)
+    try:
+        yield shadows
+        conn.commit()
+        with conn.cursor() as cursor:
+            publish_shadow_tables(cursor, tables)
+    except Exception:
+        discard_shadow_tables(conn, tables)
+        raise
@@ -3,20 +3,49 @@ FastAPI 앱의 진입점.
 라우터들을 등록하고 서버를 실행합니다.
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
-from app.api import cafe_search, cafe_detail, keyword_extract
+from app.api import cafe_search, cafe_detail, cafes, jobs, keyword_extract, pipeline, reviews, system
+from app.core.db import get_pool
+from app.core.redis_client import close_async_redis, get_async_redis
+from app.service.cafe_index import watch_cafe_data_version
+from app.service.cafe_similarity import refresh_similarity_index
+from app.service.keyword_index import refresh_keyword_index
+from app.service.review_search import refresh_review_index
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 카페 공간 인덱스·추천 스냅샷·키워드 벡터 인덱스·리뷰 검색 색인 생성 및 데이터 버전 변경 감시
+    index_watcher = asyncio.create_task(watch_cafe_data_version(
+        get_async_redis(), on_change=(refresh_similarity_index, refresh_keyword_index, refresh_review_index)
+    ))
+    yield
+    index_watcher.cancel()
+    # 종료 시 공유 연결 풀 정리
+    await close_async_redis()
+    get_pool().close_idle()
+
 
 app = FastAPI(
     title="카페 감수광 크롤링 API",
     description="카카오맵 기반의 카페 검색/상세/키워드 분석 API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # 라우터 등록
 app.include_router(cafe_search.router, prefix="/api/v1/cafe", tags=["Cafe Search"])
 app.include_router(cafe_detail.router, prefix="/api/v1/cafe", tags=["Cafe Detail"])
 app.include_router(keyword_extract.router, prefix="/api/v1/keywords", tags=["Keyword Extract"])
+app.include_router(cafes.router, prefix="/api/v1/cafes", tags=["Cafes"])
+app.include_router(reviews.router, prefix="/api/v1/reviews", tags=["Reviews"])
+app.include_router(pipeline.router, prefix="/api/v1/pipeline", tags=["Pipeline"])
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["Jobs"])
+app.include_router(system.router, prefix="/api/v1/system", tags=["System"])
 
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
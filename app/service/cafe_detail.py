@@ -17,16 +17,39 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from app.core.db import get_connection
 from app.core.redis_client import get_redis
+from app.core.shadow_tables import create_shadow_tables, discard_shadow_tables, publish_shadow_tables
 
 DEFAULT_WAIT = 5
 SHORT_WAIT = 3
-
-def crawl_and_save_single_cafe(cafe_id):
+# 전체 크롤링 시 섀도 테이블로 새로 만들어 교체하는 테이블
+# (카페 데이터가 새로 수집되므로 대표 키워드와 클러스터링 지문도 빈 테이블로 함께 교체)
+# 새 kakao_reviews는 리뷰 id가 1부터 다시 매겨지므로, 리뷰 id를 가리키는 키워드 추출 워터마크와
+# 그 워터마크까지 집계한 extracted_keywords도 빈 테이블로 함께 교체 (다음 증분 추출이 처음부터 집계)
+CRAWL_TABLES = (
+    "cafes", "menus", "kakao_reviews", "keywords", "cluster_fingerprints",
+    "extracted_keywords", "keyword_extract_watermarks",
+)
+# 카페 단위로 다시 크롤링할 때(replace) 그 카페의 행을 지우는 테이블
+# (리뷰를 새 id로 다시 넣으므로 워터마크와 그 워터마크까지 집계한 키워드도 함께 삭제)
+CAFE_REPLACE_TABLES = ("menus", "kakao_reviews", "extracted_keywords", "keyword_extract_watermarks")
+
+
+def clear_cafe_rows(cursor, cafe_id, tables=None):
+    """카페의 메뉴·리뷰와 리뷰 id에 묶인 키워드 추출 결과·워터마크를 삭제합니다. (커밋은 호출한 쪽에서)"""
+    tables = tables or {}
+    for table in CAFE_REPLACE_TABLES:
+        cursor.execute(f"DELETE FROM {tables.get(table, table)} WHERE cafe_id = %s", (cafe_id,))
+
+def crawl_and_save_single_cafe(cafe_id, tables=None, replace=False):
     """
     단일 카페 ID를 받아 카카오맵에서 상세 정보를 크롤링하고,
     수집한 데이터를 데이터베이스에 저장합니다.
+    tables로 {테이블: 실제로 쓸 테이블} 매핑을 넘기면 그 테이블(섀도 테이블)에 저장합니다.
+    replace가 True이면 카페의 기존 메뉴·리뷰(와 리뷰 id에 묶인 키워드 추출 결과·워터마크)를 같은 트랜잭션에서 지우고
+    새로 저장합니다. (라이브 테이블에 카페 단위로 다시 쓸 때)
     크롤링 실패 시 False를 반환합니다.
     """
+    tables = tables or {}
     options = Options()
     options.add_argument("--headless")
     options.add_argument("--no-sandbox")
@@ -37,6 +60,7 @@ def crawl_and_save_single_cafe(cafe_id):
     options.binary_location = "/usr/bin/chromium"
     service = ChromeService(executable_path="/usr/bin/chromedriver")
     driver = webdriver.Chrome(service=service, options=options)
+    conn = None
     try:
         url = f"https://place.map.kakao.com/{cafe_id}"
         driver.get(url)
@@ -184,13 +208,15 @@ def crawl_and_save_single_cafe(cafe_id):
         lat = loc_result["y"] if loc_result else None
 
         # 카페 정보 DB에 저장 (중복 시 업데이트)
-        cursor.execute("""
-            INSERT INTO cafes (id, title, address, open_time, rate, rate_count, image_url, zipcode, phone_number, lat, lon)
+        cursor.execute(f"""
+            INSERT INTO {tables.get("cafes", "cafes")} (id, title, address, open_time, rate, rate_count, image_url, zipcode, phone_number, lat, lon)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             ON DUPLICATE KEY UPDATE title=VALUES(title), address=VALUES(address), open_time=VALUES(open_time), rate=VALUES(rate),
             rate_count=VALUES(rate_count), image_url=VALUES(image_url), zipcode=VALUES(zipcode),
             phone_number=VALUES(phone_number), lat=VALUES(lat), lon=VALUES(lon)
         """, (cafe_id, name, address, open_time, rating, review_count, image_url, zipcode, phone, lat, lon))
+        if replace:
+            clear_cafe_rows(cursor, cafe_id, tables)
 
         # 후기 탭 클릭 및 후기 정보 수집
         try:
@@ -227,8 +253,8 @@ def crawl_and_save_single_cafe(cafe_id):
                             content = content[:-len(suffix)].strip()
                 except:
                     continue
-                cursor.execute("""
-                    INSERT INTO kakao_reviews (cafe_id, content, rating)
+                cursor.execute(f"""
+                    INSERT INTO {tables.get("kakao_reviews", "kakao_reviews")} (cafe_id, content, rating)
                     VALUES (%s, %s, %s)
                 """, (cafe_id, content, star))
             except:
@@ -236,8 +262,8 @@ def crawl_and_save_single_cafe(cafe_id):
 
         # 메뉴 정보 DB에 저장
         for m in menus:
-            cursor.execute("""
-                INSERT INTO menus (cafe_id, name, price, menu_image_url)
+            cursor.execute(f"""
+                INSERT INTO {tables.get("menus", "menus")} (cafe_id, name, price, menu_image_url)
                 VALUES (%s, %s, %s, %s)
             """, m)
 
@@ -252,6 +278,9 @@ def crawl_and_save_single_cafe(cafe_id):
 
     except Exception as e:
         print(f"❌ cafeId:{cafe_id} 처리 중 오류: {e}")
+        # 저장 도중 실패하면 연결을 풀에 반납 (반납 시 롤백)
+        if conn is not None:
+            conn.close()
         driver.quit()
         return False
 
@@ -261,18 +290,13 @@ def crawl_all_cafes(job_id: str, update_progress_callback):
     데이터베이스에 저장된 모든 카페 ID를 조회하여,
     각 카페의 상세 정보를 크롤링하고 저장합니다.
     실패한 카페 ID는 재시도하며 최종 결과를 반환합니다.
+    크롤링 결과는 섀도 테이블에 저장했다가 끝나면 라이브 테이블과 한 번에 교체하므로,
+    크롤링 중에도 조회 API는 이전 데이터를 그대로 읽습니다.
     """
-    # 기존 데이터 삭제 및 초기화
+    # 빈 섀도 테이블 생성 (기존 데이터는 교체 전까지 유지)
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM kakao_reviews")
-    cursor.execute("DELETE FROM menus")
-    cursor.execute("DELETE FROM keywords")
-    cursor.execute("DELETE FROM cafes")
-    cursor.execute("ALTER TABLE kakao_reviews AUTO_INCREMENT = 1")
-    cursor.execute("ALTER TABLE menus AUTO_INCREMENT = 1")
-    cursor.execute("ALTER TABLE keywords AUTO_INCREMENT = 1")
-    cursor.execute("ALTER TABLE cafes AUTO_INCREMENT = 1")
+    tables = create_shadow_tables(cursor, CRAWL_TABLES)
     conn.commit()
 
     start_time = time.time()
@@ -283,6 +307,31 @@ def crawl_all_cafes(job_id: str, update_progress_callback):
     cursor.close()
     conn.close()
 
+    try:
+        result = _crawl_cafe_ids(cafe_ids, tables, update_progress_callback, start_time)
+    except Exception:
+        # 정리 실패는 경고만 남기고 원래 예외를 그대로 전파
+        try:
+            conn = get_connection()
+        except Exception as e:
+            print(f"⚠️ 섀도 테이블 정리용 DB 연결 실패: {e}")
+        else:
+            discard_shadow_tables(conn, CRAWL_TABLES)
+            conn.close()
+        raise
+
+    # 섀도 테이블을 라이브 테이블과 원자적으로 교체
+    conn = get_connection()
+    with conn.cursor() as cursor:
+        publish_shadow_tables(cursor, CRAWL_TABLES)
+    conn.close()
+
+    update_progress_callback(100, "completed")
+    return result
+
+
+def _crawl_cafe_ids(cafe_ids, tables, update_progress_callback, start_time):
+    # 카페 ID 목록을 병렬로 크롤링해 tables에 저장하고, 실패한 항목은 한 번 재시도
     total_ids = len(cafe_ids)
     processed_count = 0
 
@@ -291,9 +340,10 @@ def crawl_all_cafes(job_id: str, update_progress_callback):
     saved_count = 0
     failed_ids = []
 
-    # 병렬로 크롤링 수행
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {executor.submit(crawl_and_save_single_cafe, cafe_id): cafe_id for cafe_id in cafe_ids}
+    # 병렬로 크롤링 수행 (작업 취소 등으로 중단되면 아직 시작하지 않은 카페는 건너뜀)
+    executor = ThreadPoolExecutor(max_workers=10)
+    try:
+        futures = {executor.submit(crawl_and_save_single_cafe, cafe_id, tables): cafe_id for cafe_id in cafe_ids}
         for future in as_completed(futures):
             cafe_id = futures[future]
             result = future.result()
@@ -304,12 +354,15 @@ def crawl_all_cafes(job_id: str, update_progress_callback):
                 saved_count += 1
             else:
                 failed_ids.append(cafe_id)
+    finally:
+        executor.shutdown(cancel_futures=True)
 
     # 실패한 항목 재시도
     if failed_ids:
         print(f"🔁 {len(failed_ids)}개 항목 재시도 중...")
-        with ThreadPoolExecutor(max_workers=5) as retry_executor:
-            retry_futures = {retry_executor.submit(crawl_and_save_single_cafe, cafe_id): cafe_id for cafe_id in failed_ids}
+        retry_executor = ThreadPoolExecutor(max_workers=5)
+        try:
+            retry_futures = {retry_executor.submit(crawl_and_save_single_cafe, cafe_id, tables): cafe_id for cafe_id in failed_ids}
             for future in as_completed(retry_futures):
                 cafe_id = retry_futures[future]
                 result = future.result()
@@ -319,6 +372,8 @@ def crawl_all_cafes(job_id: str, update_progress_callback):
                 if result:
                     saved_count += 1
                     failed_ids.remove(cafe_id)
+        finally:
+            retry_executor.shutdown(cancel_futures=True)
 
     elapsed_time = time.time() - start_time
     print(f"⏱ 크롤링 완료 - 소요 시간: {elapsed_time:.2f}초")
@@ -327,7 +382,6 @@ def crawl_all_cafes(job_id: str, update_progress_callback):
         print("❌ 실패한 카페 ID 목록:")
         print(", ".join(map(str, failed_ids)))
 
-    update_progress_callback(100, "completed")
     return {"crawled_cafes": saved_count, "failed_ids": failed_ids}
 
 
@@ -0,0 +1,272 @@
+"""
+이 모듈은 cafes 테이블과 대표 키워드(keywords)를 메모리에 올린 공간 인덱스를 제공합니다.
+위경도를 CAFE_INDEX_CELL_DEG 크기의 격자 칸으로 해시해 두고, 반경 검색은 반경을 덮는 칸의 카페만 거리 계산합니다.
+인덱스는 읽기 전용 스냅샷이며, 다시 만들 때는 새 스냅샷을 모두 만든 뒤 참조만 바꾸므로 조회 중인 요청에 영향이 없습니다.
+
+카페 데이터를 바꾸는 작업(상세 크롤링, 키워드 분석, 파이프라인)이 끝나면 작업 실행기가 Redis의 데이터 버전을 올리고,
+API 프로세스는 버전이 바뀐 것을 확인하면 인덱스를 다시 만듭니다. 응답 캐시 키에는 인덱스 버전이 들어가므로
+버전이 바뀌면 이전 캐시는 더 이상 읽히지 않으며, 인덱스를 교체한 뒤 이전 버전의 캐시 키를 지웁니다.
+"""
+
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from app.core.db import get_connection
+
+# 카페 데이터 버전 (작업 실행기가 INCR, API 프로세스가 폴링)
+CAFE_DATA_VERSION_KEY = "cafes:data_version"
+CAFE_CACHE_PREFIX = "cafes:cache"
+# 격자 칸 크기(도): 0.01도 ≈ 위도 1.1km
+CAFE_INDEX_CELL_DEG = float(os.getenv("CAFE_INDEX_CELL_DEG", 0.01))
+# 응답 캐시 보관 시간(초)과 데이터 버전 확인 주기(초)
+CAFE_CACHE_TTL = int(os.getenv("CAFE_CACHE_TTL", 300))
+CAFE_INDEX_POLL_INTERVAL = float(os.getenv("CAFE_INDEX_POLL_INTERVAL", 5))
+# 응답에 포함할 카페별 대표 키워드 수
+CAFE_KEYWORDS_LIMIT = 10
+# 카페 데이터를 바꾸는 작업 종류 (끝나면 데이터 버전을 올림)
+CAFE_DATA_JOBS = ("cafe_detail", "keyword_extract", "pipeline", "cafe_similarity", "review_index")
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEG_LAT = 111320.0
+
+CAFES_QUERY = """
+    SELECT id, title, address, lat, lon, rate, rate_count, image_url, phone_number, open_time
+    FROM cafes
+    WHERE lat IS NOT NULL AND lon IS NOT NULL
+"""
+KEYWORDS_QUERY = "SELECT cafe_id, keyword, count FROM keywords ORDER BY cafe_id, count DESC, keyword"
+
+
+def _float(value):
+    return float(value) if value is not None else None
+
+
+def haversine_m(lat, lon, lats, lons):
+    """기준점 (lat, lon)에서 좌표 배열 (lats, lons)까지의 대원 거리(m)를 배열로 반환합니다."""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class CafeIndex:
+    """
+    카페 좌표의 격자 해시 인덱스와 카페 정보(대표 키워드 포함)를 담은 읽기 전용 스냅샷입니다.
+
+    Args:
+        cafes (list[dict]): id, lat, lon을 포함한 카페 정보 (keywords: 대표 키워드 리스트)
+        version (int): 인덱스를 만든 시점의 카페 데이터 버전
+    """
+
+    def __init__(self, cafes, version=0, cell_deg=CAFE_INDEX_CELL_DEG):
+        self.version = version
+        self.cell_deg = cell_deg
+        self.built_at = time.time()
+        self.cafes = cafes
+        self.by_id = {cafe["id"]: cafe for cafe in cafes}
+        self.lats = np.array([cafe["lat"] for cafe in cafes], dtype=np.float64)
+        self.lons = np.array([cafe["lon"] for cafe in cafes], dtype=np.float64)
+        cells = defaultdict(list)
+        for position, (lat, lon) in enumerate(zip(self.lats, self.lons)):
+            cells[self.cell(lat, lon)].append(position)
+        self.cells = {key: np.array(positions, dtype=np.int64) for key, positions in cells.items()}
+
+    def __len__(self):
+        return len(self.cafes)
+
+    def cell(self, lat, lon):
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def candidates(self, lat, lon, radius_m):
+        # 반경을 덮는 위경도 사각형에 걸친 격자 칸의 카페 위치들
+        dlat = radius_m / METERS_PER_DEG_LAT
+        dlon = radius_m / (METERS_PER_DEG_LAT * max(math.cos(math.radians(lat)), 1e-6))
+        min_i, min_j = self.cell(lat - dlat, lon - dlon)
+        max_i, max_j = self.cell(lat + dlat, lon + dlon)
+        found = [
+            self.cells[(i, j)]
+            for i in range(min_i, max_i + 1)
+            for j in range(min_j, max_j + 1)
+            if (i, j) in self.cells
+        ]
+        return np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+
+    def nearby(self, lat, lon, radius_m, keyword=None, limit=50):
+        """
+        (lat, lon)에서 radius_m 이내의 카페를 가까운 순으로 최대 limit개 반환합니다.
+        keyword를 주면 대표 키워드 중 하나에 keyword가 포함된 카페만 반환합니다.
+
+        반환값:
+            distance_m이 추가된 카페 정보 dict 리스트
+        """
+        positions = self.candidates(lat, lon, radius_m)
+        if not len(positions):
+            return []
+        distances = haversine_m(lat, lon, self.lats[positions], self.lons[positions])
+        inside = distances <= radius_m
+        positions, distances = positions[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        results = []
+        for index in order:
+            cafe = self.cafes[positions[index]]
+            if keyword and not any(keyword in kw for kw in cafe["keywords"]):
+                continue
+            results.append({**cafe, "distance_m": round(float(distances[index]), 1)})
+            if len(results) >= limit:
+                break
+        return results
+
+    def get(self, cafe_id):
+        return self.by_id.get(cafe_id)
+
+
+def load_cafes(conn=None):
+    """cafes 테이블과 대표 키워드를 읽어 카페 정보 dict 리스트로 반환합니다. (대표 키워드는 count 내림차순)"""
+    conn = conn or get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(CAFES_QUERY)
+            cafes = [
+                {
+                    "id": row["id"],
+                    "title": row["title"],
+                    "address": row["address"],
+                    "lat": float(row["lat"]),
+                    "lon": float(row["lon"]),
+                    "rate": _float(row["rate"]),
+                    "rate_count": row["rate_count"],
+                    "image_url": row["image_url"],
+                    "phone_number": row["phone_number"],
+                    "open_time": row["open_time"],
+                    "keywords": [],
+                }
+                for row in cursor.fetchall()
+            ]
+            by_id = {cafe["id"]: cafe for cafe in cafes}
+            cursor.execute(KEYWORDS_QUERY)
+            for row in cursor.fetchall():
+                cafe = by_id.get(row["cafe_id"])
+                if cafe is not None and len(cafe["keywords"]) < CAFE_KEYWORDS_LIMIT:
+                    cafe["keywords"].append(row["keyword"])
+        return cafes
+    finally:
+        conn.close()
+
+
+def with_cafe_info(index, results):
+    """카페 ID가 담긴 결과(id, score 등)에 인덱스의 카페 정보를 붙입니다. (좌표가 없어 인덱스에 없는 카페는 결과 그대로)"""
+    return [{**(index.get(result["id"]) or {}), **result} for result in results]
+
+
+def build_cafe_index(version=0, conn=None):
+    start = time.perf_counter()
+    index = CafeIndex(load_cafes(conn), version)
+    print(f"✅ 카페 공간 인덱스 생성 완료 - 카페 {len(index)}개, 격자 칸 {len(index.cells)}개, "
+          f"버전 {version}, {time.perf_counter() - start:.2f}초")
+    return index
+
+
+# 프로세스마다 하나의 인덱스 스냅샷 (교체는 참조 대입 한 번이라 조회 중인 요청은 이전 스냅샷을 끝까지 사용)
+_index = None
+_build_lock = threading.Lock()
+
+
+def get_cafe_index():
+    """현재 인덱스 스냅샷을 반환합니다. 아직 없으면 버전 0으로 만듭니다."""
+    global _index
+    if _index is None:
+        with _build_lock:
+            if _index is None:
+                _index = build_cafe_index()
+    return _index
+
+
+def refresh_cafe_index(version):
+    """새 인덱스를 만든 뒤 현재 스냅샷을 교체합니다."""
+    global _index
+    with _build_lock:
+        _index = build_cafe_index(version)
+    return _index
+
+
+def bump_cafe_data_version(redis):
+    """카페 데이터가 바뀌었음을 알립니다. (작업 실행기에서 동기 Redis로 호출)"""
+    return redis.incr(CAFE_DATA_VERSION_KEY)
+
+
+def cache_key(version, name, params):
+    # 인덱스 버전이 들어간 응답 캐시 키 (버전이 바뀌면 이전 캐시는 읽히지 않음)
+    return f"{CAFE_CACHE_PREFIX}:v{version}:{name}:{json.dumps(params, sort_keys=True, ensure_ascii=False)}"
+
+
+async def cached_response(redis, name, params, compute):
+    """
+    인덱스 버전별 Redis 응답 캐시를 확인하고, 없으면 compute(index)로 만든 응답을 CAFE_CACHE_TTL 동안 캐시합니다.
+    Redis 오류는 캐시를 건너뛰고 인덱스에서 바로 응답합니다.
+    """
+    # 인덱스가 아직 없으면 이벤트 루프를 막지 않도록 스레드에서 생성
+    index = _index if _index is not None else await asyncio.to_thread(get_cafe_index)
+    key = cache_key(index.version, name, params)
+    try:
+        cached = await redis.get(key)
+    except Exception as e:
+        print(f"⚠️ 카페 응답 캐시 조회 실패: {e}")
+        return compute(index)
+    if cached is not None:
+        return json.loads(cached)
+    response = compute(index)
+    try:
+        await redis.set(key, json.dumps(response, ensure_ascii=False), ex=CAFE_CACHE_TTL)
+    except Exception as e:
+        print(f"⚠️ 카페 응답 캐시 저장 실패: {e}")
+    return response
+
+
+async def invalidate_cafe_cache(redis, version=None):
+    """
+    응답 캐시를 명시적으로 비웁니다. version을 주면 그 버전의 캐시만, 없으면 모든 버전의 캐시를 지웁니다.
+
+    반환값:
+        삭제한 키 수
+    """
+    pattern = f"{CAFE_CACHE_PREFIX}:v{version}:*" if version is not None else f"{CAFE_CACHE_PREFIX}:*"
+    deleted = 0
+    batch = []
+    async for key in redis.scan_iter(match=pattern, count=500):
+        batch.append(key)
+        if len(batch) >= 500:
+            deleted += await redis.delete(*batch)
+            batch = []
+    if batch:
+        deleted += await redis.delete(*batch)
+    return deleted
+
+
+async def watch_cafe_data_version(redis, interval=CAFE_INDEX_POLL_INTERVAL, on_change=()):
+    """
+    API 프로세스의 백그라운드 태스크: 카페 데이터 버전을 주기적으로 확인해 바뀌면 인덱스를 다시 만들고,
+    이전 버전의 응답 캐시를 지웁니다. 인덱스 생성은 이벤트 루프를 막지 않도록 스레드에서 수행합니다.
+    on_change의 함수들도 새 버전을 인자로 같은 스레드 방식으로 호출합니다. (같은 데이터로 만드는 다른 스냅샷 갱신)
+    """
+    while True:
+        try:
+            version = int(await redis.get(CAFE_DATA_VERSION_KEY) or 0)
+            current = _index
+            if current is None or current.version != version:
+                await asyncio.to_thread(refresh_cafe_index, version)
+                for refresh in on_change:
+                    await asyncio.to_thread(refresh, version)
+                if current is not None:
+                    await invalidate_cafe_cache(redis, current.version)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ 카페 공간 인덱스 갱신 실패: {e}")
+        await asyncio.sleep(interval)
@@ -13,6 +13,9 @@ from urllib3.util import Retry
 import os
 from app.core.db import get_connection
 
+# 200m 격자로 나눈 제주도 검색 영역 (min_lat, min_lng, max_lat, max_lng)
+GRID_RECTS_PATH = "data/map/grid_jeju_rects_200m_filtered.csv"
+
 
 def create_session():
     """
@@ -199,7 +202,7 @@ def run_grid_crawling(job_id: str, update_progress_callback):
     conn.commit()
     conn.close()
 
-    grid_rects = pd.read_csv("data/map/grid_jeju_rects_200m_filtered.csv")
+    grid_rects = pd.read_csv(GRID_RECTS_PATH)
     print(f"총 검색할 사각형 영역 수: {len(grid_rects)}")
 
     total_steps = len(grid_rects)
@@ -0,0 +1,360 @@
+"""
+이 모듈은 카페별 키워드 빈도로 카페 × 키워드 희소 행렬(CSR)을 만들고, 카페 간 유사도로 추천을 제공하는 기능을 제공합니다.
+키워드는 정수 어휘 ID로 한 번만 저장하고(interning), 빈도는 sublinear TF-IDF로 가중한 뒤 행마다 L2 정규화합니다.
+CAFE_SIMILARITY_EMBEDDING_WEIGHT가 0보다 크면 카페별 키워드 임베딩 중심(TF-IDF 가중 평균)의 코사인 유사도를 그 비율만큼 섞습니다.
+
+유사 카페 top-K는 작업 실행기에서 카페 묶음마다 희소 행렬 곱 한 번으로 계산해 cafe_similarities에 섀도 테이블로 교체 저장하고,
+API 프로세스는 그 결과와 TF-IDF 행렬을 메모리 스냅샷으로 올려 유사 카페 조회와 키워드 질의를 DB 없이 응답합니다.
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+from pymysql.cursors import SSDictCursor
+
+from app.core.db import get_connection
+from app.core.model_registry import model_key
+from app.core.shadow_tables import shadow_rebuild
+from app.service.embedding_store import get_embedding_store
+
+# 카페마다 저장할 유사 카페 수
+CAFE_SIMILARITY_TOP_K = int(os.getenv("CAFE_SIMILARITY_TOP_K", 20))
+# 키워드 임베딩 중심 유사도를 섞는 비율 (0이면 TF-IDF 코사인 유사도만 사용)
+CAFE_SIMILARITY_EMBEDDING_WEIGHT = float(os.getenv("CAFE_SIMILARITY_EMBEDDING_WEIGHT", 0.0))
+# 한 번의 행렬 곱으로 유사도를 계산할 카페 수 (묶음 × 전체 카페 수의 밀집 행렬을 만듦)
+SIMILARITY_BATCH_SIZE = 1024
+# 이 비율 이상의 카페에 나오는 흔한 키워드는 밀집 행렬 곱으로 계산 (밀집 열은 최대 DENSE_KEYWORD_MAX_COLUMNS개)
+DENSE_KEYWORD_MIN_DF = 0.02
+DENSE_KEYWORD_MAX_COLUMNS = 2048
+WRITE_BATCH_ROWS = 1000
+SIMILARITY_TABLES = ("cafe_similarities",)
+
+PROFILE_QUERY = "SELECT cafe_id, keyword, count FROM extracted_keywords ORDER BY cafe_id"
+SIMILARITIES_QUERY = "SELECT cafe_id, similar_cafe_id, score FROM cafe_similarities ORDER BY cafe_id, similar_rank"
+
+
+class KeywordProfiles:
+    """
+    카페 × 키워드 빈도 CSR 행렬과 정수 어휘 ID를 담습니다.
+
+    Args:
+        cafe_ids (np.ndarray): 행 순서의 카페 ID
+        vocabulary (list[str]): 어휘 ID 순서의 키워드
+        counts (scipy.sparse.csr_matrix): 카페 × 키워드 빈도
+    """
+
+    def __init__(self, cafe_ids, vocabulary, counts):
+        self.cafe_ids = cafe_ids
+        self.vocabulary = vocabulary
+        self.keyword_ids = {keyword: keyword_id for keyword_id, keyword in enumerate(vocabulary)}
+        self.counts = counts
+
+    def __len__(self):
+        return len(self.cafe_ids)
+
+
+def build_keyword_profiles(rows):
+    """
+    cafe_id 순으로 정렬된 (cafe_id, keyword, count) 행을 스트리밍으로 읽어 CSR 빈도 행렬을 만듭니다.
+    같은 카페의 같은 키워드가 여러 번 나오면 빈도를 합칩니다.
+    """
+    # scipy는 API 프로세스 import 시간을 늘리므로 스냅샷·유사도를 만들 때만 로딩
+    from scipy import sparse
+
+    keyword_ids = {}
+    cafe_ids, indptr, indices, data = [], [0], [], []
+    for cafe_id, keyword, count in rows:
+        if not cafe_ids or cafe_ids[-1] != cafe_id:
+            if cafe_ids:
+                indptr.append(len(indices))
+            cafe_ids.append(cafe_id)
+        indices.append(keyword_ids.setdefault(keyword, len(keyword_ids)))
+        data.append(count)
+    if cafe_ids:
+        indptr.append(len(indices))
+    counts = sparse.csr_matrix(
+        (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(cafe_ids), len(keyword_ids)),
+    )
+    counts.sum_duplicates()
+    return KeywordProfiles(np.asarray(cafe_ids, dtype=np.int64), list(keyword_ids), counts)
+
+
+def load_keyword_profiles(conn=None):
+    """extracted_keywords를 서버 측 커서로 스트리밍하여 카페별 키워드 프로필을 만듭니다."""
+    conn = conn or get_connection()
+    try:
+        with conn.cursor(SSDictCursor) as cursor:
+            cursor.execute(PROFILE_QUERY)
+            return build_keyword_profiles((row["cafe_id"], row["keyword"], row["count"]) for row in cursor)
+    finally:
+        conn.close()
+
+
+def fit_tfidf(counts):
+    """
+    빈도 행렬에 sublinear TF-IDF 가중과 행별 L2 정규화를 적용하고 (가중 행렬, 키워드별 IDF 배열)을 반환합니다.
+    sklearn TfidfTransformer(sublinear_tf=True, smooth_idf=True)와 같은 식을 CSR 배열에 numpy로 직접 계산합니다.
+    (tf = 1 + ln(빈도), idf = ln((1 + 카페 수) / (1 + 키워드가 나온 카페 수)) + 1)
+    """
+    n, vocabulary_size = counts.shape
+    if not n:
+        return counts.astype(np.float32), np.zeros(vocabulary_size, dtype=np.float32)
+    weights = counts.astype(np.float32).tocsr()
+    weights.sum_duplicates()
+    weights.eliminate_zeros()
+    df = np.bincount(weights.indices, minlength=vocabulary_size)
+    idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+    weights.data = (np.log(weights.data) + 1) * idf[weights.indices]
+    rows = np.repeat(np.arange(n), np.diff(weights.indptr))
+    norms = np.sqrt(np.bincount(rows, weights=weights.data.astype(np.float64) ** 2, minlength=n)).astype(np.float32)
+    weights.data /= np.clip(norms, 1e-12, None)[rows]
+    return weights, idf
+
+
+def cafe_centroids(weights, vocabulary, store):
+    """
+    카페마다 키워드 임베딩의 TF-IDF 가중 평균을 L2 정규화해 반환합니다. (희소 × 밀집 행렬 곱 한 번)
+    임베딩 저장소에 없는 키워드는 0 벡터로 취급합니다.
+    """
+    rows = store.lookup(vocabulary)
+    embeddings = np.zeros((len(vocabulary), store.dim or 0), dtype=np.float32)
+    found = rows >= 0
+    if found.any():
+        embeddings[found] = store.vectors(rows[found])
+    centroids = np.asarray(weights @ embeddings, dtype=np.float32)
+    norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+    return centroids / np.clip(norms, 1e-12, None)
+
+
+def split_frequent_keywords(weights, min_df_ratio=DENSE_KEYWORD_MIN_DF, max_columns=DENSE_KEYWORD_MAX_COLUMNS):
+    """
+    카페 비율 min_df_ratio 이상에 나오는 흔한 키워드 열(최대 max_columns개)을 밀집 행렬로, 나머지를 CSR 행렬로 나눕니다.
+    흔한 키워드끼리의 곱은 거의 모든 카페 쌍에 값을 만들어 희소 곱셈이 느리므로 BLAS 밀집 곱으로 계산합니다.
+
+    반환값:
+        (dense, rare): (카페 수, 흔한 키워드 수) 밀집 배열과 (카페 수, 나머지 키워드 수) CSR 행렬
+    """
+    n, vocabulary_size = weights.shape
+    df = np.bincount(weights.indices, minlength=vocabulary_size)
+    frequent = np.flatnonzero(df >= max(min_df_ratio * n, 2))
+    if len(frequent) > max_columns:
+        frequent = frequent[np.argsort(-df[frequent], kind="stable")[:max_columns]]
+    is_rare = np.ones(vocabulary_size, dtype=bool)
+    is_rare[frequent] = False
+    columns = weights.tocsc()
+    return columns[:, frequent].toarray(), columns[:, np.flatnonzero(is_rare)].tocsr()
+
+
+def top_k_similar(weights, k=CAFE_SIMILARITY_TOP_K, centroids=None, embedding_weight=0.0,
+                  batch_size=SIMILARITY_BATCH_SIZE, min_df_ratio=DENSE_KEYWORD_MIN_DF):
+    """
+    모든 카페에 대해 자기 자신을 뺀 유사도 상위 k개 카페의 행 위치와 점수를 계산합니다.
+    카페 batch_size개씩 전체 카페와의 유사도를 행렬 곱(흔한 키워드는 밀집, 나머지는 희소)으로 구하고,
+    argpartition으로 상위 k개만 골라 정렬합니다.
+
+    반환값:
+        (neighbors, scores): (카페 수, k) 크기의 행 위치(int64)와 유사도(float32) 배열 (점수 내림차순)
+    """
+    n = weights.shape[0]
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.zeros((n, 0), dtype=np.int64), np.zeros((n, 0), dtype=np.float32)
+
+    dense, rare = split_frequent_keywords(weights, min_df_ratio)
+    rare_transposed = rare.T.tocsr()
+    neighbors = np.empty((n, k), dtype=np.int64)
+    scores = np.empty((n, k), dtype=np.float32)
+    for start in range(0, n, batch_size):
+        end = min(start + batch_size, n)
+        similarity = dense[start:end] @ dense.T
+        similarity += (rare[start:end] @ rare_transposed).toarray()
+        if centroids is not None and embedding_weight > 0:
+            similarity = (1 - embedding_weight) * similarity + embedding_weight * (centroids[start:end] @ centroids.T)
+        rows = np.arange(end - start)
+        similarity[rows, rows + start] = -np.inf
+        top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(similarity, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        neighbors[start:end] = np.take_along_axis(top, order, axis=1)
+        scores[start:end] = np.take_along_axis(top_scores, order, axis=1)
+    return neighbors, scores
+
+
+def similarity_rows(cafe_ids, neighbors, scores):
+    # (cafe_id, similar_rank, similar_cafe_id, score) 저장 행 (공통 키워드가 없는 점수 0 이하는 제외)
+    rows = []
+    for position, cafe_id in enumerate(cafe_ids):
+        rank = 0
+        for neighbor, score in zip(neighbors[position], scores[position]):
+            if score <= 0:
+                break
+            rank += 1
+            rows.append((int(cafe_id), rank, int(cafe_ids[neighbor]), round(float(score), 6)))
+    return rows
+
+
+def save_cafe_similarities(conn, rows):
+    """유사 카페 행을 섀도 테이블에 쓰고 cafe_similarities와 교체합니다."""
+    with shadow_rebuild(conn, SIMILARITY_TABLES) as tables:
+        with conn.cursor() as cursor:
+            for start in range(0, len(rows), WRITE_BATCH_ROWS):
+                cursor.executemany(
+                    f"INSERT INTO {tables['cafe_similarities']} (cafe_id, similar_rank, similar_cafe_id, score) "
+                    "VALUES (%s, %s, %s, %s)",
+                    rows[start:start + WRITE_BATCH_ROWS]
+                )
+
+
+def rebuild_cafe_similarities(update_progress_callback=None, top_k=CAFE_SIMILARITY_TOP_K,
+                              embedding_weight=CAFE_SIMILARITY_EMBEDDING_WEIGHT):
+    """
+    모든 카페의 유사 카페 top-K를 다시 계산해 cafe_similarities를 교체합니다.
+
+    Args:
+        update_progress_callback (callable): 진행 상황 업데이트 콜백 함수
+        top_k (int): 카페마다 저장할 유사 카페 수
+        embedding_weight (float): 키워드 임베딩 중심 유사도를 섞는 비율 (0이면 사용하지 않음)
+
+    Returns:
+        dict: 카페 수, 어휘 수, 저장한 유사 카페 행 수, 소요 시간(초)
+    """
+    start_time = time.time()
+    profiles = load_keyword_profiles()
+    weights, _ = fit_tfidf(profiles.counts)
+    print(f"✅ 카페 키워드 프로필 생성 완료 - 카페 {len(profiles)}개, 어휘 {len(profiles.vocabulary)}개, "
+          f"비영 원소 {weights.nnz}개")
+    if update_progress_callback:
+        update_progress_callback(30, "similarity_profiles")
+
+    centroids = None
+    if embedding_weight > 0:
+        centroids = cafe_centroids(weights, profiles.vocabulary, get_embedding_store(model_key()))
+
+    neighbors, scores = top_k_similar(weights, top_k, centroids, embedding_weight)
+    rows = similarity_rows(profiles.cafe_ids, neighbors, scores)
+    if update_progress_callback:
+        update_progress_callback(70, "similarity_top_k")
+
+    save_cafe_similarities(get_connection(), rows)
+    elapsed = round(time.time() - start_time, 2)
+    print(f"✅ 유사 카페 저장 완료 - {len(rows)}행, 소요 시간: {elapsed}초")
+    if update_progress_callback:
+        update_progress_callback(100, "completed")
+    return {"cafes": len(profiles), "vocabulary": len(profiles.vocabulary), "similarities": len(rows),
+            "elapsed_seconds": elapsed}
+
+
+class SimilarityIndex:
+    """
+    API 프로세스에서 추천 요청에 응답하는 읽기 전용 스냅샷입니다.
+    저장된 유사 카페 top-K와, 키워드 질의용 TF-IDF 행렬·빈도 행렬(열 단위 조회를 위해 CSC)을 담습니다.
+
+    Args:
+        profiles (KeywordProfiles): 카페별 키워드 프로필
+        similar (dict[int, list[tuple[int, float]]]): 카페 ID → 점수 내림차순 (유사 카페 ID, 점수)
+        version (int): 스냅샷을 만든 시점의 카페 데이터 버전
+    """
+
+    def __init__(self, profiles, similar, version=0):
+        self.version = version
+        self.built_at = time.time()
+        self.cafe_ids = profiles.cafe_ids
+        self.profiled = set(profiles.cafe_ids.tolist())
+        self.keyword_ids = profiles.keyword_ids
+        weights, self.idf = fit_tfidf(profiles.counts)
+        self.weights = weights.tocsc()
+        self.counts = profiles.counts.tocsc()
+        self.similar = similar
+
+    def __len__(self):
+        return len(self.cafe_ids)
+
+    def similar_cafes(self, cafe_id, limit=CAFE_SIMILARITY_TOP_K):
+        """저장된 유사 카페를 점수 내림차순으로 최대 limit개 반환합니다. 키워드 프로필도 저장된 결과도 없는 카페는 None입니다."""
+        similar = self.similar.get(cafe_id)
+        if similar is None:
+            return [] if cafe_id in self.profiled else None
+        return [{"id": similar_id, "score": score} for similar_id, score in similar[:limit]]
+
+    def query(self, keywords, limit=20):
+        """
+        키워드 묶음을 IDF 가중 단위 벡터로 만들어 모든 카페와의 코사인 유사도를 계산하고 상위 limit개를 반환합니다.
+        어휘에 없는 키워드는 무시합니다.
+        """
+        keyword_ids = sorted({self.keyword_ids[keyword] for keyword in keywords if keyword in self.keyword_ids})
+        if not keyword_ids:
+            return []
+        query = self.idf[keyword_ids]
+        query = query / np.linalg.norm(query)
+        return self.top_cafes(np.asarray(self.weights[:, keyword_ids] @ query).ravel(), limit)
+
+    def rank_by_keyword_counts(self, keyword_scores, limit=20):
+        """
+        (keyword, 가중치) 쌍으로 카페마다 Σ 가중치 × 키워드 빈도를 계산해 상위 limit개를 반환합니다.
+        (의미 기반 키워드 검색 결과의 유사도를 가중치로 사용) 어휘에 없는 키워드는 무시합니다.
+        """
+        weights = {}
+        for keyword, weight in keyword_scores:
+            if keyword in self.keyword_ids:
+                weights[self.keyword_ids[keyword]] = weight
+        if not weights:
+            return []
+        keyword_ids = sorted(weights)
+        query = np.array([weights[keyword_id] for keyword_id in keyword_ids], dtype=np.float32)
+        return self.top_cafes(np.asarray(self.counts[:, keyword_ids] @ query).ravel(), limit)
+
+    def top_cafes(self, scores, limit):
+        # 카페별 점수 배열에서 0보다 큰 상위 limit개를 점수 내림차순 (id, score) 리스트로 변환
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [{"id": int(self.cafe_ids[position]), "score": round(float(scores[position]), 6)} for position in order]
+
+
+def load_similarities(conn=None):
+    """cafe_similarities를 카페 ID → [(유사 카페 ID, 점수), ...] dict로 읽습니다."""
+    conn = conn or get_connection()
+    try:
+        similar = {}
+        with conn.cursor(SSDictCursor) as cursor:
+            cursor.execute(SIMILARITIES_QUERY)
+            for row in cursor:
+                similar.setdefault(row["cafe_id"], []).append((row["similar_cafe_id"], float(row["score"])))
+        return similar
+    finally:
+        conn.close()
+
+
+def build_similarity_index(version=0):
+    start = time.perf_counter()
+    index = SimilarityIndex(load_keyword_profiles(), load_similarities(), version)
+    print(f"✅ 카페 추천 인덱스 생성 완료 - 카페 {len(index)}개, 어휘 {len(index.keyword_ids)}개, "
+          f"버전 {version}, {time.perf_counter() - start:.2f}초")
+    return index
+
+
+# 프로세스마다 하나의 추천 스냅샷 (교체는 참조 대입 한 번)
+_index = None
+_build_lock = threading.Lock()
+
+
+def get_similarity_index():
+    """현재 추천 스냅샷을 반환합니다. 아직 없으면 버전 0으로 만듭니다."""
+    global _index
+    if _index is None:
+        with _build_lock:
+            if _index is None:
+                _index = build_similarity_index()
+    return _index
+
+
+def refresh_similarity_index(version):
+    """새 추천 스냅샷을 만든 뒤 현재 스냅샷을 교체합니다."""
+    global _index
+    with _build_lock:
+        _index = build_similarity_index(version)
+    return _index
@@ -0,0 +1,148 @@
+"""
+이 모듈은 키워드 임베딩을 모델별로 한 번만 계산해 디스크에 보관하는 전역 임베딩 저장소를 제공합니다.
+저장소는 키워드 행 순서대로 벡터를 이어 붙인 바이너리 행렬(vectors.bin)과
+키워드 → 행 번호 인덱스(index.json)로 구성되며, 행렬은 메모리 맵으로 열어 필요한 행만 읽습니다.
+처음 보는 키워드만 큰 배치로 인코딩하여 뒤에 덧붙이므로, 실행마다 드는 임베딩 비용은 어휘 증가분에 비례합니다.
+인덱스의 generation은 저장소를 처음 만들 때 정한 임의 값으로, 저장소를 지우고 다시 만들면 바뀝니다.
+(저장소 행 번호를 기준으로 만든 파생 파일이 이전 저장소의 것인지 확인하는 데 사용)
+"""
+
+import fcntl
+import json
+import os
+import re
+from contextlib import contextmanager
+from uuid import uuid4
+
+import numpy as np
+
+EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR", "data/embeddings")
+EMBEDDING_STORE_DTYPE = os.getenv("EMBEDDING_STORE_DTYPE", "float32")
+ENCODE_BATCH_SIZE = 1024
+
+_stores = {}
+
+
+class KeywordEmbeddingStore:
+    """모델 하나에 대한 키워드 임베딩 저장소입니다."""
+
+    def __init__(self, model_name, root=EMBEDDING_STORE_DIR, dtype=EMBEDDING_STORE_DTYPE):
+        self.model_name = model_name
+        self.directory = os.path.join(root, re.sub(r"[^0-9A-Za-z._-]+", "__", model_name))
+        self.dtype = np.dtype(dtype)
+        self.dim = None
+        self.generation = None
+        self.keywords = []
+        self.rows = {}
+        self._matrix = None
+        self._load_index()
+
+    @property
+    def vectors_path(self):
+        return os.path.join(self.directory, "vectors.bin")
+
+    @property
+    def index_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def _load_index(self):
+        # 디스크의 인덱스를 읽어 키워드 → 행 번호 매핑을 구성
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, encoding="utf-8") as f:
+            index = json.load(f)
+        self.dim = index["dim"]
+        self.generation = index.get("generation")
+        self.dtype = np.dtype(index["dtype"])
+        self.keywords = index["keywords"]
+        self.rows = {keyword: row for row, keyword in enumerate(self.keywords)}
+        self._matrix = None
+
+    @contextmanager
+    def locked(self):
+        """
+        저장소 파일 잠금을 잡고 디스크의 최신 인덱스를 다시 읽은 뒤 저장소를 내줍니다.
+        잠금을 잡은 동안에는 다른 작업이 키워드를 덧붙이지 않으므로, 저장소 행 번호를 기준으로 하는
+        파생 파일(IVF 인덱스 등)도 이 안에서 갱신하면 저장소와 어긋나지 않습니다.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._load_index()
+                yield self
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @property
+    def matrix(self):
+        """저장된 전체 임베딩 행렬(읽기 전용 메모리 맵)을 반환합니다."""
+        if self._matrix is None and self.keywords:
+            self._matrix = np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(len(self.keywords), self.dim))
+        return self._matrix
+
+    def lookup(self, keywords):
+        """키워드들의 행 번호 배열을 반환합니다. 저장소에 없는 키워드는 -1입니다."""
+        return np.fromiter((self.rows.get(keyword, -1) for keyword in keywords), dtype=np.int64, count=len(keywords))
+
+    def vectors(self, rows):
+        """행 번호 배열에 해당하는 임베딩을 메모리 맵에서 모아 float32 배열로 반환합니다."""
+        return np.asarray(self.matrix[rows], dtype=np.float32)
+
+    def ensure(self, keywords, encode, batch_size=ENCODE_BATCH_SIZE):
+        """
+        저장소에 없는 키워드만 batch_size 단위로 인코딩하여 덧붙입니다.
+
+        Args:
+            keywords (Iterable[str]): 임베딩이 필요한 키워드
+            encode (callable): 키워드 리스트를 받아 임베딩 배열을 반환하는 함수
+            batch_size (int): 한 번에 인코딩할 키워드 수
+
+        반환값:
+            새로 인코딩한 키워드 수 (int)
+        """
+        missing = sorted({keyword for keyword in keywords if keyword not in self.rows})
+        if not missing:
+            return 0
+
+        with self.locked():
+            # 다른 작업이 그사이 추가한 키워드는 다시 인코딩하지 않음
+            missing = [keyword for keyword in missing if keyword not in self.rows]
+            if not missing:
+                return 0
+
+            for start in range(0, len(missing), batch_size):
+                batch = missing[start:start + batch_size]
+                embeddings = np.asarray(encode(batch), dtype=self.dtype)
+                self._append(batch, embeddings)
+        return len(missing)
+
+    def _append(self, batch, embeddings):
+        # 벡터를 먼저 덧붙인 뒤 인덱스를 원자적으로 교체 (중단 시 인덱스에 없는 꼬리 벡터는 잘라냄)
+        if self.dim is None:
+            self.dim = int(embeddings.shape[1])
+        if self.generation is None:
+            self.generation = uuid4().hex
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(len(self.keywords) * self.dim * self.dtype.itemsize)
+            f.write(np.ascontiguousarray(embeddings).tobytes())
+
+        for keyword in batch:
+            self.rows[keyword] = len(self.keywords)
+            self.keywords.append(keyword)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model": self.model_name, "dim": self.dim, "dtype": self.dtype.name, "generation": self.generation,
+                       "keywords": self.keywords}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+        self._matrix = None
+
+
+def get_embedding_store(model_name):
+    """프로세스 안에서 모델별 임베딩 저장소를 하나씩 공유하여 반환합니다."""
+    if model_name not in _stores:
+        _stores[model_name] = KeywordEmbeddingStore(model_name)
+    return _stores[model_name]
@@ -0,0 +1,360 @@
+"""
+이 모듈은 Redis 큐(app.core.job_queue)에 쌓인 작업을 API 서버와 분리된 프로세스에서 실행하는 작업 실행기입니다.
+작업 종류별 동시 실행 수를 제한하고, 실행 중인 작업에 하트비트를 기록하며,
+다른 실행기가 죽어 하트비트가 끊긴 작업은 failed로 표시합니다.
+작업의 단일 실행 락과 묶음 실행 락은 하트비트마다 임대를 연장하고, 작업이 끝나거나 고아 작업으로 표시되면 해제합니다.
+묶음에 속한 작업 종류의 큐는 묶음 실행 락이 비어 있을 때만 꺼내므로, 다른 작업이 실행 중이면 작업은 큐에서 기다리며
+그동안 단일 실행 락 임대도 하트비트마다 연장됩니다.
+취소 요청(DELETE /api/v1/jobs/{job_id})은 작업이 진행률을 보고하는 시점에 JobCancelled로 작업을 중단시킵니다.
+진행률 보고는 프로세스 안에서 합쳐 PROGRESS_FLUSH_INTERVAL마다 한 번만 Redis에 파이프라인으로 기록하고,
+같은 내용을 작업 이벤트 스트림(jobs:events:<job_id>)에 추가해 SSE 엔드포인트로 전달합니다.
+
+실행:
+    python -m app.service.job_runner
+"""
+
+import json
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from uuid import uuid4
+
+from app.core.job_queue import (
+    FINISHED_STATUSES,
+    JOB_TYPES,
+    REGISTRY_KEY,
+    RUNNING_KEY,
+    JobCancelled,
+    exclusive_lock_key,
+    job_key,
+    now_iso,
+    pop_exclusive_job,
+    publish_job_event,
+    queue_key,
+    release_job_lock,
+    renew_job_lock,
+)
+from app.core.redis_client import get_redis
+from app.service.cafe_index import CAFE_DATA_JOBS, bump_cafe_data_version
+
+# 작업 종류별 동시 실행 수 (예: JOB_CONCURRENCY_CAFE_DETAIL=1)
+DEFAULT_CONCURRENCY = {"cafe_search": 1, "cafe_detail": 1, "keyword_extract": 1, "pipeline": 1, "cafe_similarity": 1,
+                       "review_index": 1}
+# 하트비트 기록 주기(초)와, 하트비트가 이 시간 이상 끊긴 작업을 고아 작업으로 보는 기준(초)
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", 10))
+JOB_ORPHAN_TIMEOUT = float(os.getenv("JOB_ORPHAN_TIMEOUT", 60))
+# 진행률을 Redis에 기록하는 최소 간격(초): 그 사이의 보고는 마지막 값만 남기고, 기록할 때 취소 요청도 함께 확인
+PROGRESS_FLUSH_INTERVAL = float(os.getenv("PROGRESS_FLUSH_INTERVAL", 1.0))
+QUEUE_POLL_TIMEOUT = 1
+
+
+def job_concurrency(job_type):
+    return int(os.getenv(f"JOB_CONCURRENCY_{job_type.upper()}", DEFAULT_CONCURRENCY.get(job_type, 1)))
+
+
+def _run_cafe_search(job_id, params, update_progress_callback):
+    from app.service.cafe_search import run_grid_crawling
+    return run_grid_crawling(job_id, update_progress_callback)
+
+
+def _run_cafe_detail(job_id, params, update_progress_callback):
+    from app.service.cafe_detail import crawl_all_cafes
+    return crawl_all_cafes(job_id, update_progress_callback)
+
+
+def _run_keyword_extract(job_id, params, update_progress_callback):
+    from app.service.keyword_extract_job import run_extract_and_cluster
+    return run_extract_and_cluster(job_id, update_progress_callback, **params)
+
+
+def _run_pipeline(job_id, params, update_progress_callback):
+    from app.service.pipeline import run_pipeline
+    return run_pipeline(job_id, update_progress_callback, **params)
+
+
+def _run_cafe_similarity(job_id, params, update_progress_callback):
+    from app.service.cafe_similarity import rebuild_cafe_similarities
+    return rebuild_cafe_similarities(update_progress_callback, **params)
+
+
+def _run_review_index(job_id, params, update_progress_callback):
+    from app.service.review_search import ElasticsearchSink, build_review_index
+    sink = ElasticsearchSink() if params.get("elasticsearch") else None
+    return build_review_index(update_progress_callback, params.get("incremental", False), sink)
+
+
+# 작업 종류 → 실행 함수 (job_id, params, update_progress_callback) -> 결과 dict
+JOB_TARGETS = {
+    "cafe_search": _run_cafe_search,
+    "cafe_detail": _run_cafe_detail,
+    "keyword_extract": _run_keyword_extract,
+    "pipeline": _run_pipeline,
+    "cafe_similarity": _run_cafe_similarity,
+    "review_index": _run_review_index,
+}
+
+
+def result_fields(result):
+    # 결과 dict를 상태 해시 필드로 변환 (문자열·숫자는 그대로, 나머지는 JSON)
+    fields = {}
+    for name, value in (result or {}).items():
+        fields[name] = str(value) if isinstance(value, (str, int, float)) else json.dumps(value, ensure_ascii=False)
+    return fields
+
+
+class ProgressReporter:
+    """
+    작업 하나의 진행률 보고를 합쳐서 기록합니다.
+    update는 마지막 값만 기억하다가 flush_interval이 지났거나 100%에 도달하면 상태 해시 갱신, 이벤트 스트림 추가,
+    취소 요청 확인을 한 번의 파이프라인으로 보냅니다. 처리량(throughput)은 직전 기록 이후 초당 보고 횟수(격자·카페 등 처리 단위),
+    ETA는 지금까지의 진행 속도로 추정한 남은 시간(초)입니다.
+    """
+
+    def __init__(self, redis, job_type, job_id, flush_interval=None, clock=time.monotonic):
+        self.redis = redis
+        self.job_type = job_type
+        self.job_id = job_id
+        self.flush_interval = PROGRESS_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.clock = clock
+        self.started = clock()
+        self.last_flush = None
+        self.pending = None
+        self.updates = 0
+        self.flushed_updates = 0
+        self.flushes = 0
+        self.cancel_requested = False
+
+    def update(self, progress, stage=""):
+        self.pending = (progress, stage)
+        self.updates += 1
+        now = self.clock()
+        if self.last_flush is None or now - self.last_flush >= self.flush_interval or progress >= 100:
+            self.flush(now)
+
+    def flush(self, now=None):
+        if self.pending is None:
+            return
+        now = self.clock() if now is None else now
+        progress, stage = self.pending
+        window = now - (self.started if self.last_flush is None else self.last_flush)
+        throughput = (self.updates - self.flushed_updates) / window if window > 0 else 0.0
+        elapsed = now - self.started
+        eta = elapsed * (100 - progress) / progress if 0 < progress < 100 else (0 if progress >= 100 else None)
+        fields = {
+            "progress": str(progress),
+            "stage": stage,
+            "throughput": f"{throughput:.2f}",
+            "eta": "" if eta is None else f"{eta:.0f}",
+            "updated_at": now_iso(),
+        }
+        pipe = self.redis.pipeline(transaction=False)
+        publish_job_event(pipe, self.job_type, self.job_id, fields)
+        pipe.hget(job_key(self.job_type, self.job_id), "cancel_requested")
+        self.cancel_requested = pipe.execute()[-1] == "1"
+        self.last_flush = now
+        self.flushed_updates = self.updates
+        self.flushes += 1
+        self.pending = None
+
+    def publish(self, fields):
+        # 상태 변경(시작·완료·실패·취소)은 합치지 않고 바로 기록 (남은 진행률을 먼저 기록)
+        self.flush()
+        pipe = self.redis.pipeline(transaction=False)
+        publish_job_event(pipe, self.job_type, self.job_id, fields)
+        pipe.execute()
+
+
+class JobRunner:
+    """
+    작업 큐를 소비하는 실행기입니다. 작업 하나는 실행기 프로세스 안의 스레드 하나에서 실행되며,
+    작업 종류별 실행 중 작업 수가 동시 실행 수에 도달하면 그 종류의 큐는 읽지 않습니다.
+    """
+
+    def __init__(self, redis=None, targets=None, concurrency=None, runner_id=None):
+        self.redis = redis or get_redis()
+        self.targets = targets or JOB_TARGETS
+        self.concurrency = concurrency or {job_type: job_concurrency(job_type) for job_type in self.targets}
+        self.runner_id = runner_id or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.running = {}  # job_id -> (작업 종류, 스레드)
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.cancel_all = threading.Event()
+
+    def running_count(self, job_type):
+        with self.lock:
+            return sum(1 for running_type, _ in self.running.values() if running_type == job_type)
+
+    def progress_callback(self, reporter):
+        # 진행률을 reporter로 합쳐 기록하고, 취소 요청이 확인되면 JobCancelled로 작업을 중단
+        def update_progress_callback(progress: int, stage: str = ""):
+            reporter.update(progress, stage)
+            if self.cancel_all.is_set() or reporter.cancel_requested:
+                raise JobCancelled(reporter.job_id)
+        return update_progress_callback
+
+    def run_job(self, job_type, job_id, params):
+        """작업 하나를 실행하고 결과에 따라 상태를 completed / failed / cancelled로 기록합니다."""
+        key = job_key(job_type, job_id)
+        reporter = ProgressReporter(self.redis, job_type, job_id)
+        started = False
+        try:
+            state = self.redis.hmget(key, "status", "cancel_requested")
+            if state[0] in FINISHED_STATUSES or state[1] == "1":
+                # 큐에서 꺼내기 직전에 취소된 작업
+                reporter.publish({"status": "cancelled", "finished_at": now_iso()})
+                return
+            reporter.publish({
+                "status": "in_progress", "runner": self.runner_id,
+                "started_at": now_iso(), "heartbeat": str(time.time()),
+            })
+            self.redis.sadd(RUNNING_KEY, job_id)
+            self.renew_lock(key, job_id, job_type)
+            started = True
+            print(f"▶️ 작업 시작: {job_type} {job_id}")
+            result = self.targets[job_type](job_id, params, self.progress_callback(reporter))
+            reporter.publish({"status": "completed", "finished_at": now_iso(), **result_fields(result)})
+            print(f"✅ 작업 완료: {job_type} {job_id} (진행률 보고 {reporter.updates}회, Redis 기록 {reporter.flushes}회)")
+        except JobCancelled:
+            reporter.publish({"status": "cancelled", "finished_at": now_iso()})
+            print(f"⏹ 작업 취소: {job_type} {job_id}")
+        except Exception as e:
+            traceback.print_exc()
+            reporter.publish({"status": "failed", "error": str(e), "finished_at": now_iso()})
+        finally:
+            if started and job_type in CAFE_DATA_JOBS:
+                # 카페 데이터가 바뀌었을 수 있으므로 API 프로세스의 공간 인덱스와 응답 캐시를 갱신하게 함
+                # (파이프라인은 라이브 테이블에 카페 단위로 쓰므로 실패·취소되어도 갱신)
+                bump_cafe_data_version(self.redis)
+            self.redis.srem(RUNNING_KEY, job_id)
+            self.release_locks(job_type, key, job_id)
+            with self.lock:
+                self.running.pop(job_id, None)
+
+    def renew_lock(self, key, job_id, job_type=None):
+        # 단일 실행 락과 묶음 실행 락 임대 연장 (락 없이 큐에 들어간 작업이면 무시)
+        locks = [self.redis.hget(key, "lock"), exclusive_lock_key(job_type)]
+        for lock in filter(None, locks):
+            if not renew_job_lock(self.redis, lock, job_id):
+                print(f"⚠️ 작업 락을 잃었습니다: {job_id} ({lock})")
+
+    def release_locks(self, job_type, key, job_id):
+        # 작업이 가진 단일 실행 락과 묶음 실행 락 해제 (다른 작업이 가진 락은 그대로 둠)
+        locks = [self.redis.hget(key, "lock"), exclusive_lock_key(job_type)]
+        for lock in filter(None, locks):
+            release_job_lock(self.redis, lock, job_id)
+
+    def start_job(self, job_type, message):
+        """큐에서 꺼낸 작업을 스레드로 시작합니다."""
+        payload = json.loads(message)
+        job_id = payload["job_id"]
+        thread = threading.Thread(target=self.run_job, args=(job_type, job_id, payload.get("params", {})),
+                                  name=f"job-{job_type}-{job_id[:8]}", daemon=True)
+        with self.lock:
+            self.running[job_id] = (job_type, thread)
+        thread.start()
+
+    def heartbeat(self):
+        """
+        실행 중인 작업의 하트비트와 락 임대, 대기 중인 작업의 단일 실행 락 임대를 갱신하고,
+        하트비트가 끊긴 다른 실행기의 작업을 failed로 표시합니다.
+        """
+        now = time.time()
+        with self.lock:
+            own = dict(self.running)
+        for job_id, (job_type, _) in own.items():
+            key = job_key(job_type, job_id)
+            self.redis.hset(key, "heartbeat", str(now))
+            self.renew_lock(key, job_id, job_type)
+        self.renew_queued_locks()
+        return self.mark_orphaned_jobs(now, own)
+
+    def renew_queued_locks(self):
+        # 묶음 락이나 동시 실행 수에 막혀 큐에서 기다리는 작업의 단일 실행 락 임대 연장
+        # (대기가 JOB_LOCK_LEASE보다 길어져도 같은 요청이 중복 작업으로 다시 들어오지 않도록)
+        for job_type in self.targets:
+            for message in self.redis.lrange(queue_key(job_type), 0, -1):
+                job_id = json.loads(message)["job_id"]
+                lock = self.redis.hget(job_key(job_type, job_id), "lock")
+                if lock:
+                    renew_job_lock(self.redis, lock, job_id)
+
+    def mark_orphaned_jobs(self, now=None, own=()):
+        now = now or time.time()
+        orphaned = []
+        for job_id in self.redis.smembers(RUNNING_KEY):
+            if job_id in own:
+                continue
+            job_type = self.redis.hget(REGISTRY_KEY, job_id)
+            if job_type not in JOB_TYPES:
+                self.redis.srem(RUNNING_KEY, job_id)
+                continue
+            key = job_key(job_type, job_id)
+            heartbeat = self.redis.hget(key, "heartbeat")
+            if heartbeat and now - float(heartbeat) < JOB_ORPHAN_TIMEOUT:
+                continue
+            ProgressReporter(self.redis, job_type, job_id).publish({
+                "status": "failed",
+                "error": f"작업 실행기 응답 없음 (하트비트 {JOB_ORPHAN_TIMEOUT:.0f}초 이상 끊김)",
+                "finished_at": now_iso(),
+            })
+            self.redis.srem(RUNNING_KEY, job_id)
+            self.release_locks(job_type, key, job_id)
+            orphaned.append(job_id)
+            print(f"⚠️ 고아 작업 표시: {job_type} {job_id}")
+        return orphaned
+
+    def poll_once(self):
+        """
+        동시 실행 여유가 있는 종류의 큐에서 작업 하나를 꺼내 시작합니다. 꺼낸 작업이 없으면 False를 반환합니다.
+        묶음에 속한 종류는 묶음 락이 비어 있을 때만 락과 함께 꺼내고(기다리지 않음), 나머지 종류는 BRPOP으로 기다립니다.
+        """
+        job_types = [job_type for job_type in self.targets if self.running_count(job_type) < self.concurrency[job_type]]
+        for job_type in job_types:
+            if exclusive_lock_key(job_type) is None:
+                continue
+            message = pop_exclusive_job(self.redis, job_type)
+            if message:
+                self.start_job(job_type, message)
+                return True
+        queues = [queue_key(job_type) for job_type in job_types if exclusive_lock_key(job_type) is None]
+        if not queues:
+            time.sleep(QUEUE_POLL_TIMEOUT)
+            return False
+        item = self.redis.brpop(queues, timeout=QUEUE_POLL_TIMEOUT)
+        if not item:
+            return False
+        queue, message = item
+        self.start_job(queue.rsplit(":", 1)[1], message)
+        return True
+
+    def stop(self, *args):
+        # 첫 신호: 새 작업을 받지 않고 실행 중인 작업이 끝나기를 기다림, 두 번째 신호: 실행 중인 작업도 취소
+        if self.stopping.is_set():
+            print("⏹ 실행 중인 작업 취소 요청")
+            self.cancel_all.set()
+        else:
+            print("⏸ 종료 요청: 새 작업을 받지 않고 실행 중인 작업을 기다립니다")
+            self.stopping.set()
+
+    def run(self):
+        print(f"✅ 작업 실행기 시작 ({self.runner_id}, 동시 실행 수: {self.concurrency})")
+        last_heartbeat = 0.0
+        while not self.stopping.is_set() or self.running:
+            if time.monotonic() - last_heartbeat >= JOB_HEARTBEAT_INTERVAL:
+                last_heartbeat = time.monotonic()
+                self.heartbeat()
+            if self.stopping.is_set():
+                time.sleep(0.5)
+            else:
+                self.poll_once()
+        print("✅ 작업 실행기 종료")
+
+
+if __name__ == "__main__":
+    runner = JobRunner()
+    signal.signal(signal.SIGTERM, runner.stop)
+    signal.signal(signal.SIGINT, runner.stop)
+    runner.run()
@@ -1,38 +1,101 @@
 """
 이 모듈은 카페별로 키워드를 클러스터링하고, 각 클러스터에서 대표 키워드를 추출하여 데이터베이스에 저장하는 기능을 제공합니다.
+클러스터링 방식은 두 가지입니다.
+- cafe: 카페마다 그 카페의 키워드만으로 HDBSCAN을 실행
+- global: 전체 고유 키워드 어휘를 한 번 클러스터링해 keyword_clusters에 저장하고, 카페별 결과는 그 배정에서 도출
 """
 
 from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from multiprocessing import shared_memory
 from hdbscan import HDBSCAN
+from pymysql.cursors import SSDictCursor
 from app.core.db import get_connection
-from sentence_transformers import SentenceTransformer
+from app.core.model_registry import DEFAULT_MODEL_NAME, get_model, model_key
+from app.core.parallel import completed_future, ordered_results
+from app.core.shadow_tables import create_shadow_tables, discard_shadow_tables, publish_shadow_tables
+from app.service.embedding_store import get_embedding_store
+import hashlib
+import multiprocessing
+import os
 import numpy as np
+from sklearn.decomposition import PCA
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_distances
+from sklearn.random_projection import SparseRandomProjection
 
 
-def reset_cluster_tables():
-    # 클러스터링 결과 저장 테이블 초기화
-    conn = get_connection()
-    with conn.cursor() as cursor:
-        cursor.execute("DELETE FROM clustered_keywords")
-        cursor.execute("ALTER TABLE clustered_keywords AUTO_INCREMENT = 1")
-    conn.commit()
-    conn.close()
+MODEL_NAME = DEFAULT_MODEL_NAME
+SHARE_CHUNK_ROWS = 4096
 
+# HDBSCAN 전 차원 축소 방식 (none: 축소하지 않음, pca: 전역 어휘로 학습한 PCA, random: 희소 랜덤 투영)
+CLUSTER_REDUCTION = os.getenv("CLUSTER_REDUCTION", "none")
+# 축소 차원 (hdbscan은 60차원 이하에서 KD-트리 기반 Borůvka 알고리즘을 사용)
+CLUSTER_REDUCED_DIM = int(os.getenv("CLUSTER_REDUCED_DIM", 48))
+PCA_FIT_SAMPLE = 50000
+# global 모드에서 새 키워드를 가장 가까운 클러스터에 배정할 최소 코사인 유사도 (미만이면 노이즈)
+GLOBAL_ASSIGN_MIN_SIMILARITY = float(os.getenv("GLOBAL_ASSIGN_MIN_SIMILARITY", 0.6))
+ASSIGNMENT_BATCH_SIZE = 1000
+# 클러스터링 결과를 이 카페 수만큼 모아 한 트랜잭션으로 저장
+WRITE_FLUSH_CAFES = int(os.getenv("CLUSTER_WRITE_FLUSH_CAFES", 200))
+WRITE_BATCH_ROWS = 1000
+# 클러스터링 결과 테이블 (전체 재클러스터링 시 섀도 테이블로 새로 만들어 한 번에 교체)
+CLUSTER_RESULT_TABLES = ("clustered_keywords", "keywords", "cluster_fingerprints")
 
-def fetch_keywords_grouped_by_cafe():
-    # 데이터베이스에서 카페별 키워드(extracted_keywords) 조회
+# 프로세스 풀 워커 상태 (공유 메모리 임베딩 행렬, TF-IDF 점수 배열)
+_worker_state = {}
+
+
+def fetch_keywords_grouped_by_cafe(with_counts=False):
+    # 데이터베이스에서 카페별 키워드(extracted_keywords)를 서버 측 커서로 스트리밍하며
+    # (cafe_id, 키워드 리스트)를 카페 단위로 하나씩 반환 (with_counts이면 (cafe_id, 키워드 리스트, 빈도 리스트))
     conn = get_connection()
+    try:
+        with conn.cursor(SSDictCursor) as cursor:
+            cursor.execute("SELECT cafe_id, keyword, count FROM extracted_keywords ORDER BY cafe_id")
+            for cafe_id, rows in groupby(cursor, key=lambda row: row['cafe_id']):
+                rows = list(rows)
+                if with_counts:
+                    yield cafe_id, [row['keyword'] for row in rows], [row['count'] for row in rows]
+                else:
+                    yield cafe_id, [row['keyword'] for row in rows]
+    finally:
+        conn.close()
+
+
+def cafe_fingerprint(keywords, counts, config=""):
+    """
+    카페의 (키워드, 빈도) 집합과 클러스터링 설정으로 순서와 무관한 SHA-1 지문을 만듭니다.
+    지문이 같으면 이전 실행의 클러스터링 결과를 그대로 재사용할 수 있습니다.
+    """
+    digest = hashlib.sha1(config.encode("utf-8"))
+    for keyword, count in sorted(zip(keywords, counts)):
+        digest.update(f"\n{keyword}\t{count}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def clustering_config(min_cluster_size):
+    # 지문에 포함할 클러스터링 설정 (모델·차원 축소·최소 클러스터 크기가 바뀌면 모든 카페를 다시 클러스터링)
+    return f"{model_key(MODEL_NAME)}|{CLUSTER_REDUCTION}|{CLUSTER_REDUCED_DIM}|{min_cluster_size}"
+
+
+def load_cluster_fingerprints(conn):
+    # 마지막으로 클러스터링 결과를 저장한 시점의 카페별 지문 조회
     with conn.cursor() as cursor:
-        cursor.execute("SELECT cafe_id, keyword FROM extracted_keywords")
-        results = cursor.fetchall()
-    conn.close()
+        cursor.execute("SELECT cafe_id, fingerprint FROM cluster_fingerprints")
+        return {row["cafe_id"]: row["fingerprint"] for row in cursor.fetchall()}
 
-    cafe_keywords = defaultdict(list)
-    for row in results:
-        cafe_keywords[row['cafe_id']].append(row['keyword'])
-    return cafe_keywords
+
+def delete_cluster_results(conn, cafe_ids):
+    # 키워드가 사라진 카페의 기존 결과와 지문 삭제
+    cafe_ids = list(cafe_ids)
+    with conn.cursor() as cursor:
+        for start in range(0, len(cafe_ids), WRITE_BATCH_ROWS):
+            batch = cafe_ids[start:start + WRITE_BATCH_ROWS]
+            placeholders = ", ".join(["%s"] * len(batch))
+            for table in ("clustered_keywords", "keywords", "cluster_fingerprints"):
+                cursor.execute(f"DELETE FROM {table} WHERE cafe_id IN ({placeholders})", batch)
+    conn.commit()
 
 
 def embed_keywords(keywords, model):
@@ -40,134 +103,676 @@ def embed_keywords(keywords, model):
     return model.encode(keywords, show_progress_bar=True)
 
 
-def save_clustered_keywords(cafe_id, cluster_labels, keywords):
-    # 각 (cluster_id, keyword) 쌍의 빈도 계산 및 저장
-    pair_counts = Counter()
-    for keyword, label in zip(keywords, cluster_labels):
-        if label == -1:
-            continue  # 노이즈는 건너뜀
-        pair_counts[(label, keyword)] += 1
+def ensure_keyword_embeddings(store, vocabulary):
+    # 전역 임베딩 저장소에 없는 키워드만 인코딩 (새 키워드가 없으면 모델도 로딩하지 않음)
+    def encode(batch):
+        # 모델은 레지스트리에서 프로세스당 한 번만 로딩되어 작업 간에 공유됨
+        return embed_keywords(batch, get_model(MODEL_NAME))
 
-    conn = get_connection()
-    with conn.cursor() as cursor:
-        for (label, keyword), count in pair_counts.items():
-            cursor.execute(
-                "INSERT INTO clustered_keywords (cafe_id, cluster_id, keyword, count) VALUES (%s, %s, %s, %s)",
-                (cafe_id, label, keyword, count)
-            )
-        conn.commit()
-    conn.close()
+    added = store.ensure(vocabulary, encode)
+    print(f"✅ 임베딩 준비 완료 - 신규 {added}개 / 전체 {len(store)}개")
 
 
-def extract_representative_keywords(cafe_id, cluster_labels, keywords, embeddings, tfidf_scores_per_cafe):
-    # 클러스터별 대표 키워드 추출
-    cluster_to_keywords = defaultdict(list)
-    cluster_to_vectors = defaultdict(list)
-
-    for keyword, label, vector in zip(keywords, cluster_labels, embeddings):
+def clustered_keyword_rows(cafe_id, cluster_labels, keywords):
+    # 각 (cluster_id, keyword) 쌍의 빈도를 clustered_keywords 행으로 변환 (노이즈는 제외)
+    pair_counts = Counter()
+    for keyword, label in zip(keywords, cluster_labels):
         if label == -1:
-            continue
-        cluster_to_keywords[label].append(keyword)
-        cluster_to_vectors[label].append(vector)
-
-    representative_data = []
-    for cluster_id, vectors in cluster_to_vectors.items():
-        center = np.mean(vectors, axis=0).reshape(1, -1)
-        distances = cosine_distances(vectors, center).flatten()
-
-        # 해당 클러스터 내 키워드들의 TF-IDF 점수 가져오기
-        cluster_keywords = cluster_to_keywords[cluster_id]
-        cluster_tfidf = np.array([tfidf_scores_per_cafe.get(kw, 0) for kw in cluster_keywords])
-
-        # 거리와 TF-IDF 점수를 [0, 1] 범위로 정규화
-        if len(distances) > 1 and distances.max() != distances.min():
-            norm_distances = (distances - distances.min()) / (distances.max() - distances.min())
-        else:
-            norm_distances = np.zeros_like(distances)
-        if len(cluster_tfidf) > 1 and cluster_tfidf.max() != cluster_tfidf.min():
-            norm_tfidf = (cluster_tfidf - cluster_tfidf.min()) / (cluster_tfidf.max() - cluster_tfidf.min())
-        else:
-            norm_tfidf = np.zeros_like(cluster_tfidf)
-
-        combined_score = 0.5 * norm_tfidf + 0.5 * (1 - norm_distances)
-        max_index = np.argmax(combined_score)
-        representative_keyword = cluster_keywords[max_index]
-        count = len(cluster_keywords)
-        representative_data.append((cafe_id, cluster_id, representative_keyword, count))
-
-    return representative_data
-
-
-def save_cluster_summary(representative_data, cafe_id, cluster_labels, keywords):
-    # 각 (cafe_id, cluster_id)별 키워드 등장 횟수 계산
+            continue  # 노이즈는 건너뜀
+        pair_counts[(int(label), keyword)] += 1
+    return [(cafe_id, label, keyword, count) for (label, keyword), count in pair_counts.items()]
+
+
+def keyword_tfidf_scores(tfidf_vectorizer, keywords):
+    """키워드마다 키워드 내 모든 토큰의 TF-IDF 점수 합을 한 번의 희소 행렬 연산으로 계산해 배열로 반환합니다."""
+    if not len(keywords):
+        return np.zeros(0, dtype=np.float64)
+    return np.asarray(tfidf_vectorizer.transform(keywords).sum(axis=1), dtype=np.float64).ravel()
+
+
+def _segment_min_max(values, segments, num_segments):
+    # 세그먼트(클러스터)별 최솟값·최댓값
+    minimum = np.full(num_segments, np.inf)
+    maximum = np.full(num_segments, -np.inf)
+    np.minimum.at(minimum, segments, values)
+    np.maximum.at(maximum, segments, values)
+    return minimum, maximum
+
+
+def _segment_normalize(values, segments, num_segments, tolerance=0.0):
+    # 세그먼트별로 [0, 1] 범위로 정규화 (값의 폭이 tolerance 이하인 세그먼트는 0)
+    minimum, maximum = _segment_min_max(values, segments, num_segments)
+    spread = (maximum - minimum)[segments]
+    varied = spread > tolerance
+    normalized = np.zeros_like(values)
+    normalized[varied] = (values[varied] - minimum[segments][varied]) / spread[varied]
+    return normalized
+
+
+def _segment_representatives(segments, num_segments, vectors, tfidf_scores):
+    """
+    세그먼트(클러스터)별 대표 키워드 위치를 고릅니다.
+    세그먼트 중심과의 코사인 거리를 라벨 인덱스 기반 누적 연산으로 한 번에 계산하고,
+    (정규화 TF-IDF + 1 - 정규화 거리) 점수가 가장 높은 위치를 세그먼트별 argmax로 고릅니다.
+
+    반환값:
+        (세그먼트별 대표 위치 배열, 세그먼트별 키워드 수 배열) 튜플
+    """
+    # 세그먼트 중심 = 소속 벡터 합 / 개수
+    vectors = np.asarray(vectors, dtype=np.float64)
+    sizes = np.bincount(segments, minlength=num_segments)
+    centers = np.zeros((num_segments, vectors.shape[1]))
+    np.add.at(centers, segments, vectors)
+    centers /= sizes[:, None]
+
+    # 각 키워드와 소속 세그먼트 중심 사이의 코사인 거리
+    vector_norms = np.linalg.norm(vectors, axis=1)
+    center_norms = np.linalg.norm(centers, axis=1)[segments]
+    similarity = np.einsum("ij,ij->i", vectors, centers[segments]) / np.clip(vector_norms * center_norms, 1e-12, None)
+    distances = np.clip(1 - similarity, 0, 2)
+
+    # 거리와 TF-IDF 점수를 세그먼트별 [0, 1] 범위로 정규화
+    # (정규화된 임베딩에서는 두 키워드 클러스터의 거리가 이론상 같으므로 부동소수점 오차 수준의 차이는 동점으로 봄)
+    norm_distances = _segment_normalize(distances, segments, num_segments, tolerance=1e-6)
+    norm_tfidf = _segment_normalize(np.asarray(tfidf_scores, dtype=np.float64), segments, num_segments)
+    combined_score = 0.5 * norm_tfidf + 0.5 * (1 - norm_distances)
+
+    # 세그먼트별 argmax: (세그먼트, -점수, 위치) 순 정렬 후 세그먼트마다 첫 항목 (동점이면 먼저 나온 키워드)
+    order = np.lexsort((np.arange(len(segments)), -combined_score, segments))
+    best = order[np.searchsorted(segments[order], np.arange(num_segments))]
+    return best, sizes
+
+
+def extract_representative_keywords(cafe_id, cluster_labels, keywords, embeddings, tfidf_scores):
+    """
+    클러스터별 대표 키워드를 추출합니다.
+    클러스터를 처음 등장한 순서로 세그먼트 번호를 매기고 _segment_representatives로 한 번에 고릅니다.
+
+    Args:
+        tfidf_scores (np.ndarray): keywords와 같은 순서의 키워드별 TF-IDF 점수
+
+    반환값:
+        (cafe_id, cluster_id, 대표 키워드, 클러스터 키워드 수) 리스트 (클러스터가 처음 등장한 순서)
+    """
+    cluster_labels = np.asarray(cluster_labels)
+    members = np.flatnonzero(cluster_labels != -1)
+    if not len(members):
+        return []
+
+    # 클러스터를 처음 등장한 순서로 번호 매김
+    cluster_ids, first_index, inverse = np.unique(cluster_labels[members], return_index=True, return_inverse=True)
+    appearance = np.argsort(first_index, kind="stable")
+    rank = np.empty_like(appearance)
+    rank[appearance] = np.arange(len(appearance))
+    segments = rank[inverse]
+    cluster_ids = cluster_ids[appearance]
+
+    best, counts = _segment_representatives(segments, len(cluster_ids), np.asarray(embeddings)[members],
+                                            np.asarray(tfidf_scores)[members])
+    return [
+        (cafe_id, cluster_id, keywords[members[index]], int(count))
+        for cluster_id, index, count in zip(cluster_ids, best, counts)
+    ]
+
+
+def cafe_cluster_frame_rows(cafe_ids, keywords, cluster_labels, embeddings, tfidf_scores):
+    """
+    여러 카페의 (cafe_id, keyword, cluster) 프레임에서 clustered_keywords와 keywords 행을 한 번에 도출합니다.
+    노이즈를 뺀 프레임을 (cafe_id, cluster, 위치) 순으로 정렬해 (cafe_id, cluster)가 바뀌는 위치를 세그먼트 경계로 삼고,
+    대표 키워드와 클러스터 키워드 수는 _segment_representatives로 카페 루프 없이 계산합니다.
+    count 열은 카페별 모드와 같은 의미입니다. (clustered_keywords: (클러스터, 키워드) 쌍의 등장 수, keywords: 클러스터 키워드 수)
+
+    Args:
+        cafe_ids, keywords, cluster_labels: 프레임의 열 (같은 길이, 행 하나가 카페의 키워드 하나)
+        embeddings (np.ndarray): 프레임 행 순서의 정규화된 키워드 임베딩
+        tfidf_scores (np.ndarray): 프레임 행 순서의 키워드별 TF-IDF 점수
+
+    반환값:
+        ((cafe_id, cluster_id, keyword, count) 리스트, (cafe_id, 대표 키워드, 클러스터 키워드 수) 리스트) 튜플
+    """
+    cafe_ids = np.asarray(cafe_ids)
+    cluster_labels = np.asarray(cluster_labels)
+    members = np.flatnonzero(cluster_labels != -1)
+    if not len(members):
+        return [], []
+
+    order = members[np.lexsort((members, cluster_labels[members], cafe_ids[members]))]
+    sorted_cafes = cafe_ids[order]
+    sorted_labels = cluster_labels[order]
+    boundary = np.r_[True, (sorted_cafes[1:] != sorted_cafes[:-1]) | (sorted_labels[1:] != sorted_labels[:-1])]
+    starts = np.flatnonzero(boundary)
+    segments = np.cumsum(boundary) - 1
+    best, sizes = _segment_representatives(segments, len(starts), np.asarray(embeddings)[order],
+                                           np.asarray(tfidf_scores)[order])
+
+    # 카페 안의 키워드는 고유(uq_cafe_keyword_extract)하므로 (클러스터, 키워드) 쌍은 한 번씩 등장
+    clustered_rows = [
+        (int(cafe_id), int(label), keywords[index], 1)
+        for cafe_id, label, index in zip(sorted_cafes, sorted_labels, order)
+    ]
+    summary_rows = [
+        (int(sorted_cafes[start]), keywords[order[index]], int(size))
+        for start, index, size in zip(starts, best, sizes)
+    ]
+    return clustered_rows, summary_rows
+
+
+def cluster_summary_rows(representative_data, cafe_id, cluster_labels, keywords):
+    # 각 (cafe_id, cluster_id)별 키워드 등장 횟수를 세어 대표 키워드의 keywords 행으로 변환
     cluster_keyword_count = defaultdict(int)
     for kw, label in zip(keywords, cluster_labels):
         if label != -1:
             cluster_keyword_count[(cafe_id, label)] += 1
+    return [
+        (cafe_id, rep_keyword, cluster_keyword_count[(cafe_id, cluster_id)])
+        for cafe_id, cluster_id, rep_keyword, _ in representative_data
+    ]
+
+
+class ClusterResultWriter:
+    """
+    클러스터링 결과(clustered_keywords, keywords)를 연결 하나로 모아 쓰는 버퍼 writer입니다.
+    카페별 행을 메모리에 모았다가 flush_every개 카페마다 다중 행 INSERT로 쓰고 한 트랜잭션으로 커밋합니다.
+    rebuild()를 호출하면 빈 섀도 테이블에 쓰고, 정상 종료 시 라이브 테이블과 교체합니다.
+    """
+
+    def __init__(self, conn=None, flush_every=WRITE_FLUSH_CAFES):
+        self.conn = conn or get_connection()
+        self.flush_every = flush_every
+        self.tables = {table: table for table in CLUSTER_RESULT_TABLES}
+        self.shadow = False
+        self.clustered_rows = []
+        self.summary_rows = []
+        self.fingerprint_rows = []
+        self.replace_ids = []
+        self.pending_cafes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.flush()
+                if self.shadow:
+                    # 모든 결과가 커밋된 섀도 테이블을 라이브 테이블과 원자적으로 교체
+                    with self.conn.cursor() as cursor:
+                        publish_shadow_tables(cursor, CLUSTER_RESULT_TABLES)
+            elif self.shadow:
+                discard_shadow_tables(self.conn, CLUSTER_RESULT_TABLES)
+        finally:
+            self.conn.close()
+
+    def rebuild(self):
+        """
+        결과를 빈 섀도 테이블에 쓰도록 전환합니다.
+        재클러스터링이 끝날 때까지 조회 쪽은 이전 결과를 그대로 읽습니다.
+        """
+        with self.conn.cursor() as cursor:
+            self.tables = create_shadow_tables(cursor, CLUSTER_RESULT_TABLES)
+        self.shadow = True
+
+    def add(self, cafe_id, cluster_labels, keywords, representative_data, fingerprint=None, replace=False):
+        """
+        카페 하나의 클러스터링 결과를 버퍼에 추가하고, 카페가 flush_every개 모이면 저장합니다.
+        fingerprint를 넘기면 결과와 같은 트랜잭션에서 카페 지문도 저장합니다.
+        replace가 True이면 저장하는 트랜잭션에서 카페의 기존 결과를 먼저 지웁니다.
+        """
+        if replace:
+            self.replace_ids.append(cafe_id)
+        self.clustered_rows.extend(clustered_keyword_rows(cafe_id, cluster_labels, keywords))
+        self.summary_rows.extend(cluster_summary_rows(representative_data, cafe_id, cluster_labels, keywords))
+        if fingerprint is not None:
+            self.fingerprint_rows.append((cafe_id, fingerprint))
+        self.pending_cafes += 1
+        if self.pending_cafes >= self.flush_every:
+            self.flush()
+
+    def add_rows(self, clustered_rows, summary_rows, cafes):
+        """
+        이미 도출한 여러 카페의 clustered_keywords·keywords 행을 버퍼에 추가합니다. (전역 클러스터링용)
+        cafes는 행이 포함하는 카페 수로, flush_every 계산에 쓰입니다.
+        """
+        self.clustered_rows.extend(clustered_rows)
+        self.summary_rows.extend(summary_rows)
+        self.pending_cafes += cafes
+        if self.pending_cafes >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """버퍼에 모인 행을 다중 행 INSERT로 저장하고 커밋합니다."""
+        if not self.pending_cafes:
+            return
+        try:
+            with self.conn.cursor() as cursor:
+                for start in range(0, len(self.replace_ids), WRITE_BATCH_ROWS):
+                    batch = self.replace_ids[start:start + WRITE_BATCH_ROWS]
+                    placeholders = ", ".join(["%s"] * len(batch))
+                    for table in CLUSTER_RESULT_TABLES:
+                        cursor.execute(f"DELETE FROM {self.tables[table]} WHERE cafe_id IN ({placeholders})", batch)
+                for start in range(0, len(self.clustered_rows), WRITE_BATCH_ROWS):
+                    cursor.executemany(
+                        f"INSERT INTO {self.tables['clustered_keywords']} (cafe_id, cluster_id, keyword, count) "
+                        "VALUES (%s, %s, %s, %s)",
+                        self.clustered_rows[start:start + WRITE_BATCH_ROWS]
+                    )
+                for start in range(0, len(self.summary_rows), WRITE_BATCH_ROWS):
+                    # 이전 실행의 대표 키워드가 남아 있으면 개수만 갱신
+                    cursor.executemany(
+                        f"INSERT INTO {self.tables['keywords']} (cafe_id, keyword, count) VALUES (%s, %s, %s) "
+                        "ON DUPLICATE KEY UPDATE count = VALUES(count)",
+                        self.summary_rows[start:start + WRITE_BATCH_ROWS]
+                    )
+                for start in range(0, len(self.fingerprint_rows), WRITE_BATCH_ROWS):
+                    cursor.executemany(
+                        f"INSERT INTO {self.tables['cluster_fingerprints']} (cafe_id, fingerprint) VALUES (%s, %s) "
+                        "ON DUPLICATE KEY UPDATE fingerprint = VALUES(fingerprint)",
+                        self.fingerprint_rows[start:start + WRITE_BATCH_ROWS]
+                    )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self.clustered_rows = []
+            self.summary_rows = []
+            self.fingerprint_rows = []
+            self.replace_ids = []
+            self.pending_cafes = 0
+
+
+def fit_embedding_reducer(store, vocabulary, method=CLUSTER_REDUCTION, dim=CLUSTER_REDUCED_DIM):
+    """
+    클러스터링 대상 어휘 전체에 대해 차원 축소기를 한 번 학습합니다.
+    PCA는 어휘가 많으면 PCA_FIT_SAMPLE개를 표본으로 학습하고, 랜덤 투영은 차원 수만으로 투영 행렬을 만듭니다.
+
+    반환값:
+        transform 메서드를 가진 축소기, 축소하지 않으면 None
+    """
+    if method == "none" or not vocabulary or (store.dim is not None and dim >= store.dim):
+        return None
+    if method not in ("pca", "random"):
+        raise ValueError(f"지원하지 않는 차원 축소 방식입니다: {method}")
+
+    rows = store.lookup(sorted(vocabulary))
+    if len(rows) > PCA_FIT_SAMPLE:
+        rows = np.sort(np.random.RandomState(0).choice(rows, PCA_FIT_SAMPLE, replace=False))
+    sample = normalize_embeddings(store.vectors(rows))
+    if method == "pca":
+        reducer = PCA(n_components=min(dim, *sample.shape), random_state=0)
+    else:
+        reducer = SparseRandomProjection(n_components=dim, random_state=0)
+    reducer.fit(sample)
+    print(f"✅ 차원 축소기 학습 완료 - {method}, {sample.shape[1]} → {reducer.n_components_}차원")
+    return reducer
+
+
+def normalize_embeddings(embeddings):
+    # L2 정규화: 단위 벡터끼리의 유클리드 거리는 코사인 거리와 단조 관계
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return (embeddings / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
+def project_embeddings(embeddings, reducer=None):
+    """임베딩을 L2 정규화하고, 축소기가 있으면 축소한 뒤 다시 정규화합니다."""
+    embeddings = normalize_embeddings(embeddings)
+    if reducer is None:
+        return embeddings
+    return normalize_embeddings(reducer.transform(embeddings))
+
+
+def cluster_cafe(cafe_id, keywords, embeddings, tfidf_scores, min_cluster_size=2, core_dist_n_jobs=4):
+    """
+    한 카페의 키워드를 HDBSCAN으로 클러스터링하고 클러스터별 대표 키워드를 고릅니다.
+    DB에 접근하지 않으므로 프로세스 풀 워커에서도 그대로 실행할 수 있습니다.
+
+    반환값:
+        (클러스터 라벨 배열, 대표 키워드 리스트) 튜플
+    """
+    clusterer = HDBSCAN(min_cluster_size=min_cluster_size, min_samples=1, cluster_selection_epsilon=0.1,
+                        core_dist_n_jobs=core_dist_n_jobs)
+    cluster_labels = clusterer.fit_predict(embeddings)
+    representative_data = extract_representative_keywords(cafe_id, cluster_labels, keywords, embeddings, tfidf_scores)
+    return cluster_labels, representative_data
+
+
+def _try_cluster_cafe(*args, **kwargs):
+    # 카페 하나의 실패가 전체 작업을 멈추지 않도록 예외를 (결과, 오류 메시지) 형태로 돌려줌
+    try:
+        return cluster_cafe(*args, **kwargs), None
+    except Exception as e:
+        return None, str(e)
+
+
+def share_vocabulary_embeddings(store, keywords, reducer=None):
+    """
+    클러스터링 대상 어휘의 임베딩을 keywords 순서대로 정규화·축소하여 공유 메모리 블록 하나에 복사합니다.
+    워커는 카페마다 임베딩을 pickle로 받지 않고 행 번호만 받아 이 블록에서 직접 읽습니다.
+
+    반환값:
+        (SharedMemory, 행렬 shape) 튜플
+    """
+    store_rows = store.lookup(keywords)
+    dim = reducer.n_components_ if reducer is not None else store.dim
+    shape = (len(keywords), dim)
+    shm = shared_memory.SharedMemory(create=True, size=max(shape[0] * shape[1] * 4, 1))
+    matrix = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+    for start in range(0, len(keywords), SHARE_CHUNK_ROWS):
+        chunk = store.vectors(store_rows[start:start + SHARE_CHUNK_ROWS])
+        matrix[start:start + SHARE_CHUNK_ROWS] = project_embeddings(chunk, reducer)
+    del matrix
+    return shm, shape
+
+
+def _init_worker(shm_name, shape, tfidf_scores, min_cluster_size):
+    # 워커마다 공유 메모리에 한 번만 연결하고 어휘 행 순서의 TF-IDF 점수 배열을 보관
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_state.update(
+        shm=shm,
+        embeddings=np.ndarray(shape, dtype=np.float32, buffer=shm.buf),
+        tfidf_scores=tfidf_scores,
+        min_cluster_size=min_cluster_size,
+    )
+
+
+def _cluster_cafe_task(cafe_id, keywords, rows):
+    # 프로세스 풀 워커에서 실행: 공유 행렬에서 카페 키워드의 임베딩을 모아 클러스터링
+    # (워커 여러 개가 코어를 나눠 쓰므로 HDBSCAN 내부 병렬화는 끔)
+    embeddings = _worker_state["embeddings"][rows]
+    return _try_cluster_cafe(cafe_id, keywords, embeddings, _worker_state["tfidf_scores"][rows],
+                             _worker_state["min_cluster_size"], core_dist_n_jobs=1)
+
+
+def cluster_keywords_per_cafe(update_progress_callback=None, min_cluster_size=2, workers=1, force=False):
+    # 카페별 키워드 클러스터링 메인 함수
+    # workers > 1이면 카페별 클러스터링을 프로세스 풀에 나눠 맡기고, 결과 저장과 진행률 보고는 현재 프로세스가 입력 순서대로 수행
+    # 키워드·빈도 지문이 마지막 실행과 같은 카페는 기존 결과를 유지하고 건너뜀 (force이면 전체를 다시 클러스터링)
+    # 전체 재클러스터링은 섀도 테이블에 새로 만든 뒤 교체하므로, 작업 중에도 이전 결과가 조회됨
+    print(f"✅ 클러스터링 시작 (workers={workers})")
+    writer = ClusterResultWriter()
+    stored_fingerprints = {} if force else load_cluster_fingerprints(writer.conn)
+
+    # 1차 스트리밍: 모든 키워드로 TF-IDF 벡터라이저 학습, 카페 수 집계, 카페별 지문 계산 및 클러스터링 대상 어휘 수집
+    total_cafes = 0
+    vocabulary = set()
+    changed_vocabulary = set()
+    fingerprints = {}
+    config = clustering_config(min_cluster_size)
+
+    def stream_all_keywords():
+        nonlocal total_cafes
+        for cafe_id, keywords, counts in fetch_keywords_grouped_by_cafe(with_counts=True):
+            total_cafes += 1
+            fingerprints[cafe_id] = cafe_fingerprint(keywords, counts, config)
+            if len(keywords) > 2:
+                vocabulary.update(keywords)
+                if stored_fingerprints.get(cafe_id) != fingerprints[cafe_id]:
+                    changed_vocabulary.update(keywords)
+            yield from keywords
+
+    tfidf_vectorizer = TfidfVectorizer()
+    tfidf_vectorizer.fit(stream_all_keywords())
 
+    # 더 이상 키워드가 없는 카페의 기존 결과만 바로 삭제
+    # (지문이 바뀐 카페는 새 결과를 저장하는 트랜잭션에서 교체하므로, 작업 중에도 이전 결과가 조회됨)
+    removed_cafes = [cafe_id for cafe_id in stored_fingerprints if cafe_id not in fingerprints]
+    delete_cluster_results(writer.conn, removed_cafes)
+    unchanged_cafes = sum(fingerprints.get(cafe_id) == fingerprint for cafe_id, fingerprint in stored_fingerprints.items())
+    print(f"✅ 키워드 수집 완료 - 카페 수: {total_cafes}, 변경 없는 카페: {unchanged_cafes}")
+
+    # 차원 축소기는 전체 어휘로 학습하고, 임베딩·TF-IDF 점수는 다시 클러스터링할 카페의 어휘만 준비
+    store = get_embedding_store(model_key(MODEL_NAME))
+    ensure_keyword_embeddings(store, vocabulary)
+    reducer = fit_embedding_reducer(store, vocabulary)
+
+    # 어휘 행 순서의 키워드별 TF-IDF 점수를 한 번에 계산
+    vocabulary_keywords = sorted(changed_vocabulary)
+    vocabulary_rows = {keyword: row for row, keyword in enumerate(vocabulary_keywords)}
+    tfidf_scores = keyword_tfidf_scores(tfidf_vectorizer, vocabulary_keywords)
+
+    processed_cafes = 0
+    shm = None
+    executor = None
+    with writer:
+        if not stored_fingerprints:
+            writer.rebuild()
+            print("✅ 섀도 테이블 생성 완료")
+        try:
+            if workers > 1 and vocabulary_keywords:
+                shm, shape = share_vocabulary_embeddings(store, vocabulary_keywords, reducer)
+                executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(shm.name, shape, tfidf_scores, min_cluster_size),
+                )
+
+            def submit_cafe(cafe_id, keywords):
+                if len(keywords) <= 2:
+                    return completed_future(None)
+                if stored_fingerprints.get(cafe_id) == fingerprints.get(cafe_id):
+                    return completed_future("unchanged")
+                print(f"▶️ {cafe_id}: {len(keywords)}개 키워드 클러스터링 중")
+                rows = np.fromiter((vocabulary_rows[kw] for kw in keywords), dtype=np.int64, count=len(keywords))
+                if executor is not None:
+                    return executor.submit(_cluster_cafe_task, cafe_id, keywords, rows)
+                # 전역 저장소에서 행 번호로 임베딩을 모은 뒤 정규화·축소
+                embeddings = project_embeddings(store.vectors(store.lookup(keywords)), reducer)
+                return completed_future(_try_cluster_cafe(cafe_id, keywords, embeddings, tfidf_scores[rows], min_cluster_size))
+
+            # 2차 스트리밍: 카페 단위로 클러스터링 (진행 중인 카페 수를 제한해 메모리 사용량을 일정하게 유지)
+            submissions = (((cafe_id, keywords), submit_cafe(cafe_id, keywords))
+                           for cafe_id, keywords in fetch_keywords_grouped_by_cafe())
+            for (cafe_id, keywords), result in ordered_results(submissions, max_in_flight=max(workers, 1) * 2):
+                processed_cafes += 1
+                if result is None:
+                    print(f"⚠️ {cafe_id}: 키워드 수 부족")
+                    if cafe_id in stored_fingerprints:
+                        # 키워드가 줄어든 카페는 이전 결과를 지움
+                        writer.add(cafe_id, [], [], [], replace=True)
+                elif result == "unchanged":
+                    pass
+                elif result[1]:
+                    # 이전 결과와 지문은 그대로 두어 다음 실행에서 다시 시도
+                    print(f"❌ {cafe_id} 처리 중 오류 발생: {result[1]}")
+                else:
+                    cluster_labels, representative_data = result[0]
+                    # 저장은 writer가 카페를 모아 한꺼번에 수행 (저장 실패는 작업 실패로 전파)
+                    # 이전 결과는 새 결과를 저장하는 트랜잭션에서 함께 지움
+                    writer.add(cafe_id, cluster_labels, keywords, representative_data, fingerprints.get(cafe_id),
+                               replace=cafe_id in stored_fingerprints)
+                    print(f"✅ {cafe_id}: 클러스터링 완료")
+
+                if update_progress_callback:
+                    percent = 50 + int(processed_cafes / max(total_cafes, 1) * 50)
+                    update_progress_callback(percent, f"clustering_cafe_{processed_cafes}")
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+    if update_progress_callback:
+        update_progress_callback(100, "clustering_completed")
+
+
+def cluster_and_save_cafe(writer, store, cafe_id, keywords, counts, min_cluster_size=2):
+    """
+    카페 하나의 키워드를 바로 클러스터링해 writer로 그 카페의 기존 결과를 교체합니다. (스트리밍 파이프라인용)
+    전체 어휘가 아직 모이지 않은 상태이므로 차원 축소 없이 클러스터링하고, TF-IDF 벡터라이저는 카페 키워드로 학습합니다.
+    그래서 전체 어휘의 IDF를 쓰는 일반 클러스터링과 대표 키워드가 다를 수 있으므로, 지문 설정에 항상 stream| 표시를 붙여
+    다음 일반 클러스터링 실행에서 다시 클러스터링되게 합니다.
+
+    반환값:
+        오류 메시지 (성공하면 None)
+    """
+    if len(keywords) <= 2:
+        writer.add(cafe_id, [], [], [], replace=True)
+        return None
+    config = f"stream|{clustering_config(min_cluster_size)}"
+    try:
+        ensure_keyword_embeddings(store, keywords)
+        embeddings = project_embeddings(store.vectors(store.lookup(keywords)))
+        tfidf_scores = keyword_tfidf_scores(TfidfVectorizer().fit(keywords), keywords)
+        cluster_labels, representative_data = cluster_cafe(cafe_id, keywords, embeddings, tfidf_scores, min_cluster_size)
+    except Exception as e:
+        return str(e)
+    writer.add(cafe_id, cluster_labels, keywords, representative_data,
+               cafe_fingerprint(keywords, counts, config), replace=True)
+    return None
+
+
+def load_keyword_clusters(model):
+    # 저장된 전역 키워드 → 클러스터 배정 조회
     conn = get_connection()
     with conn.cursor() as cursor:
-        for cafe_id, cluster_id, rep_keyword, _ in representative_data:
-            total_count = cluster_keyword_count[(cafe_id, cluster_id)]
-            # Insert only into keywords table, removing use of cluster_id
-            cursor.execute(
-                "INSERT INTO keywords (cafe_id, keyword, count) VALUES (%s, %s, %s)",
-                (cafe_id, rep_keyword, total_count)
-            )
-        conn.commit()
+        cursor.execute("SELECT keyword, cluster_id FROM keyword_clusters WHERE model = %s", (model,))
+        rows = cursor.fetchall()
     conn.close()
+    return {row["keyword"]: row["cluster_id"] for row in rows}
 
 
-def cluster_keywords_per_cafe(update_progress_callback=None, min_cluster_size=2):
-    # 카페별 키워드 클러스터링 메인 함수
-    print("✅ 클러스터링 시작")
-    reset_cluster_tables()
-    print("✅ 테이블 리셋 완료")
-
-    model = SentenceTransformer("snunlp/KR-SBERT-V40K-klueNLI-augSTS")
-    print("✅ 모델 로딩 완료")
+def save_keyword_clusters(model, assignments, replace=False):
+    # 전역 키워드 → 클러스터 배정 저장 (replace이면 기존 배정을 지우고 새로 저장)
+    conn = get_connection()
+    with conn.cursor() as cursor:
+        if replace:
+            cursor.execute("DELETE FROM keyword_clusters WHERE model = %s", (model,))
+        rows = [(model, keyword, int(cluster_id)) for keyword, cluster_id in assignments.items()]
+        for start in range(0, len(rows), ASSIGNMENT_BATCH_SIZE):
+            cursor.executemany(
+                "INSERT INTO keyword_clusters (model, keyword, cluster_id) VALUES (%s, %s, %s) "
+                "ON DUPLICATE KEY UPDATE cluster_id = VALUES(cluster_id)",
+                rows[start:start + ASSIGNMENT_BATCH_SIZE]
+            )
+    conn.commit()
+    conn.close()
 
-    cafe_keywords_map = fetch_keywords_grouped_by_cafe()
-    print(f"✅ 키워드 수집 완료 - 카페 수: {len(cafe_keywords_map)}")
 
-    total_cafes = len(cafe_keywords_map)
-    processed_cafes = 0
+def assign_to_nearest_cluster(embeddings, labels, new_embeddings, min_similarity=GLOBAL_ASSIGN_MIN_SIMILARITY):
+    """
+    기존 배정(embeddings, labels)으로 클러스터 중심을 계산하고, 새 키워드를 가장 가까운 중심의 클러스터에 배정합니다.
+    입력 임베딩은 L2 정규화되어 있어야 하며, 가장 가까운 중심과의 코사인 유사도가 min_similarity 미만이면 -1(노이즈)입니다.
+
+    반환값:
+        새 키워드별 클러스터 id 배열 (np.ndarray)
+    """
+    labels = np.asarray(labels)
+    clustered = labels != -1
+    if not clustered.any() or len(new_embeddings) == 0:
+        return np.full(len(new_embeddings), -1, dtype=np.int64)
+
+    # 클러스터별 중심 = 소속 벡터 합 / 개수 (정규화하여 내적이 코사인 유사도가 되게 함)
+    cluster_ids, inverse = np.unique(labels[clustered], return_inverse=True)
+    centroids = np.zeros((len(cluster_ids), embeddings.shape[1]), dtype=np.float64)
+    np.add.at(centroids, inverse, embeddings[clustered])
+    centroids = normalize_embeddings(centroids)
+
+    similarities = new_embeddings @ centroids.T
+    nearest = similarities.argmax(axis=1)
+    best = similarities[np.arange(len(nearest)), nearest]
+    return np.where(best >= min_similarity, cluster_ids[nearest], -1)
+
+
+def cluster_vocabulary(store, vocabulary, reducer=None, min_cluster_size=2, recluster=False):
+    """
+    전역 키워드 어휘를 클러스터링하여 keyword → cluster_id 배정을 반환합니다.
+    저장된 배정이 있고 recluster가 False이면 새 키워드만 가장 가까운 클러스터에 배정하고,
+    그렇지 않으면 어휘 전체로 HDBSCAN을 한 번 실행합니다. 비용은 카페 수가 아니라 어휘 크기에 비례합니다.
+
+    반환값:
+        (키워드 리스트, 정규화·축소된 임베딩 행렬, 클러스터 id 배열) 튜플
+    """
+    model = store.model_name
+    keywords = sorted(vocabulary)
+    embeddings = np.zeros((0, 0), dtype=np.float32)
+    if keywords:
+        rows = store.lookup(keywords)
+        embeddings = np.vstack([
+            project_embeddings(store.vectors(rows[start:start + SHARE_CHUNK_ROWS]), reducer)
+            for start in range(0, len(keywords), SHARE_CHUNK_ROWS)
+        ])
+
+    known = {} if recluster else load_keyword_clusters(model)
+    if not known:
+        labels = np.full(len(keywords), -1, dtype=np.int64)
+        if len(keywords) > 2:
+            clusterer = HDBSCAN(min_cluster_size=min_cluster_size, min_samples=1, cluster_selection_epsilon=0.1)
+            labels = clusterer.fit_predict(embeddings).astype(np.int64)
+        save_keyword_clusters(model, dict(zip(keywords, labels)), replace=True)
+        print(f"✅ 전역 어휘 클러스터링 완료 - 키워드 {len(keywords)}개, 클러스터 {len(set(labels) - {-1})}개")
+        return keywords, embeddings, labels
+
+    labels = np.array([known.get(kw, -1) for kw in keywords], dtype=np.int64)
+    is_new = np.array([kw not in known for kw in keywords], dtype=bool)
+    if is_new.any():
+        labels[is_new] = assign_to_nearest_cluster(embeddings[~is_new], labels[~is_new], embeddings[is_new])
+        save_keyword_clusters(model, {kw: label for kw, label, new in zip(keywords, labels, is_new) if new})
+    print(f"✅ 새 키워드 {int(is_new.sum())}개를 기존 클러스터에 배정")
+    return keywords, embeddings, labels
+
+
+def cluster_keywords_global(update_progress_callback=None, min_cluster_size=2, recluster=False):
+    # 전역 어휘 클러스터링 모드 메인 함수
+    # 어휘를 한 번 클러스터링(또는 새 키워드만 배정)한 뒤, 카페별 결과는 키워드 → 클러스터 조회로 도출
+    print("✅ 전역 클러스터링 시작")
+    writer = ClusterResultWriter()
+
+    total_cafes = 0
+    vocabulary = set()
+
+    def stream_all_keywords():
+        nonlocal total_cafes
+        for _, keywords in fetch_keywords_grouped_by_cafe():
+            total_cafes += 1
+            if len(keywords) > 2:
+                vocabulary.update(keywords)
+            yield from keywords
 
-    # 모든 키워드를 수집하여 TF-IDF 벡터라이저 학습
-    all_keywords = []
-    for keywords in cafe_keywords_map.values():
-        all_keywords.extend(keywords)
     tfidf_vectorizer = TfidfVectorizer()
-    tfidf_vectorizer.fit(all_keywords)
+    tfidf_vectorizer.fit(stream_all_keywords())
+    print(f"✅ 키워드 수집 완료 - 카페 수: {total_cafes}, 어휘 수: {len(vocabulary)}")
+
+    store = get_embedding_store(model_key(MODEL_NAME))
+    ensure_keyword_embeddings(store, vocabulary)
+    reducer = fit_embedding_reducer(store, vocabulary)
+    vocabulary_keywords, embeddings, labels = cluster_vocabulary(store, vocabulary, reducer, min_cluster_size, recluster)
+    vocabulary_rows = {keyword: row for row, keyword in enumerate(vocabulary_keywords)}
+    tfidf_scores = keyword_tfidf_scores(tfidf_vectorizer, vocabulary_keywords)
+    if update_progress_callback:
+        update_progress_callback(75, "vocabulary_clustered")
 
-    for cafe_id, keywords in cafe_keywords_map.items():
-        try:
-            print(f"▶️ {cafe_id}: {len(keywords)}개 키워드 클러스터링 중")
+    # 카페별 결과는 WRITE_FLUSH_CAFES개 카페의 (cafe_id, keyword, cluster) 프레임마다 한 번에 도출
+    processed_cafes = 0
+    frame_cafes, frame_keywords, frame_cafe_count = [], [], 0
+
+    def flush_frame():
+        nonlocal frame_cafes, frame_keywords, frame_cafe_count
+        if frame_keywords:
+            rows = np.fromiter((vocabulary_rows[kw] for kw in frame_keywords), dtype=np.int64, count=len(frame_keywords))
+            clustered_rows, summary_rows = cafe_cluster_frame_rows(
+                frame_cafes, frame_keywords, labels[rows], embeddings[rows], tfidf_scores[rows])
+            writer.add_rows(clustered_rows, summary_rows, frame_cafe_count)
+        frame_cafes, frame_keywords, frame_cafe_count = [], [], 0
+
+    with writer:
+        # 카페별 결과는 섀도 테이블에 새로 만든 뒤 교체
+        writer.rebuild()
+        for cafe_id, keywords in fetch_keywords_grouped_by_cafe():
+            processed_cafes += 1
             if len(keywords) <= 2:
                 print(f"⚠️ {cafe_id}: 키워드 수 부족")
-                continue
-            embeddings = embed_keywords(keywords, model)
-            clusterer = HDBSCAN(min_cluster_size=min_cluster_size, min_samples=1, cluster_selection_epsilon=0.1)
-            cluster_labels = clusterer.fit_predict(embeddings)
-
-            # 해당 카페 키워드에 대한 TF-IDF 점수 계산
-            tfidf_scores_per_cafe = {}
-            tfidf_matrix = tfidf_vectorizer.transform(keywords)
-            for idx, kw in enumerate(keywords):
-                # 키워드 내 모든 토큰의 TF-IDF 점수 합산
-                tfidf_scores_per_cafe[kw] = tfidf_matrix[idx].sum()
-
-            save_clustered_keywords(cafe_id, cluster_labels, keywords)
-            representative_data = extract_representative_keywords(cafe_id, cluster_labels, keywords, embeddings, tfidf_scores_per_cafe)
-            save_cluster_summary(representative_data, cafe_id, cluster_labels, keywords)
-            print(f"✅ {cafe_id}: 클러스터링 완료")
-
-            processed_cafes += 1
-            if update_progress_callback:
-                percent = 50 + int(processed_cafes / total_cafes * 50)
-                update_progress_callback(percent, f"clustering_cafe_{processed_cafes}")
-        except Exception as e:
-            print(f"❌ {cafe_id} 처리 중 오류 발생: {str(e)}")
+            else:
+                frame_cafes.extend([cafe_id] * len(keywords))
+                frame_keywords.extend(keywords)
+                frame_cafe_count += 1
+            if frame_cafe_count >= WRITE_FLUSH_CAFES:
+                flush_frame()
+                if update_progress_callback:
+                    percent = 75 + int(processed_cafes / max(total_cafes, 1) * 25)
+                    update_progress_callback(percent, f"clustering_cafe_{processed_cafes}")
+        flush_frame()
 
     if update_progress_callback:
-        update_progress_callback(100, "clustering_completed")
\ No newline at end of file
+        update_progress_callback(100, "clustering_completed")
@@ -1,35 +1,49 @@
 # app/service/keyword_extract_job.py
 
-import asyncio
-import traceback
-from app.core.redis_client import get_redis
-from app.service.keyword_extractor import extract_all_keywords
-from app.service.keyword_clustering import cluster_keywords_per_cafe
-
-async def extract_and_cluster_job(job_id: str):
+def run_extract_and_cluster(job_id: str, update_progress_callback, workers: int = 1, incremental: bool = False,
+                            dedup: str = "off", cluster_mode: str = "cafe"):
     """
-    백그라운드 작업: 키워드 추출 및 클러스터링을 수행하며, Redis에 진행률·상태를 업데이트합니다.
+    작업 실행기에서 실행하는 키워드 추출 및 클러스터링 작업입니다. 진행률은 update_progress_callback으로 보고합니다.
+    workers는 형태소 분석과 카페별 클러스터링에 사용할 프로세스 수이고,
+    incremental이 True이면 마지막 실행 이후 새로 수집된 리뷰만 추출합니다.
+    dedup이 "cafe" 또는 "global"이면 추출 전에 카페 내(또는 카페 간) 중복 리뷰를 다시 판정합니다.
+    cluster_mode가 "global"이면 카페별 HDBSCAN 대신 전역 어휘를 한 번 클러스터링하며,
+    증분 실행에서는 기존 배정을 유지하고 새 키워드만 가장 가까운 클러스터에 배정합니다.
+    마지막으로 새 키워드를 키워드 벡터 인덱스에 추가하고, 바뀐 키워드로 카페 추천용 유사 카페 top-K를 다시 계산하며,
+    추출 중 캐시된 형태소 분석 결과로 새 리뷰를 리뷰 검색 색인에 추가합니다.
+
+    반환값:
+        작업 상태에 기록할 결과 dict (저장한 유사 카페 행 수 similarities, 중복 판정 시 dedup_removed 포함)
     """
-    redis = get_redis()
-    def update_progress_callback(progress: int, stage: str = ""):
-        redis.hset(f"keyword_extract_job:{job_id}", mapping={
-            "progress": str(progress),
-            "stage": stage,
-        })
-
-    try:
-        # 1) 전체 키워드 추출 (blocking 함수라 to_thread 사용)
-        await asyncio.to_thread(extract_all_keywords, update_progress_callback)
-
-        # 2) 클러스터링 수행 (blocking 함수라 to_thread 사용)
-        await asyncio.to_thread(cluster_keywords_per_cafe, update_progress_callback)
-
-        # 완료 시 상태 갱신
-        redis.hset(f"keyword_extract_job:{job_id}", mapping={"status": "completed"})
-    except Exception as e:
-        traceback.print_exc()
-        # 실패 시 상태 및 에러 메시지 갱신
-        redis.hset(f"keyword_extract_job:{job_id}", mapping={
-            "status": "failed",
-            "error": str(e),
-        })
\ No newline at end of file
+    # 분석 모듈(kiwipiepy, hdbscan, scikit-learn 등)은 작업 실행 시점에 import
+    from app.service.keyword_extractor import extract_all_keywords
+    from app.service.review_dedup import detect_duplicate_reviews
+    from app.service.keyword_clustering import cluster_keywords_global, cluster_keywords_per_cafe
+    from app.service.cafe_similarity import rebuild_cafe_similarities
+    from app.service.keyword_index import update_keyword_index
+    from app.service.review_search import build_review_index
+
+    result = {}
+    # 0) 중복 리뷰 판정 (선택)
+    if dedup != "off":
+        dedup_result = detect_duplicate_reviews(update_progress_callback, dedup == "global")
+        result["dedup_removed"] = dedup_result["removed"]
+
+    # 1) 전체 키워드 추출
+    extract_all_keywords(update_progress_callback, workers, incremental)
+
+    # 2) 클러스터링 수행
+    if cluster_mode == "global":
+        cluster_keywords_global(update_progress_callback, 2, not incremental)
+    else:
+        cluster_keywords_per_cafe(update_progress_callback, 2, workers)
+
+    # 3) 새로 임베딩한 키워드를 키워드 벡터 인덱스에 추가
+    update_keyword_index()
+
+    # 4) 바뀐 키워드 프로필로 유사 카페 top-K 갱신
+    result["similarities"] = rebuild_cafe_similarities()["similarities"]
+
+    # 5) 캐시된 형태소 분석 결과로 새 리뷰를 리뷰 검색 색인에 추가
+    build_review_index(incremental=True)
+    return result
@@ -1,149 +1,518 @@
 from kiwipiepy import Kiwi
-from keybert import KeyBERT
 from app.core.db import get_connection
+from app.core.parallel import completed_future, ordered_results
+from app.core.shadow_tables import create_shadow_tables, discard_shadow_tables, publish_shadow_tables
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from pymysql.cursors import SSDictCursor
+import hashlib
+import json
+import multiprocessing
+import unicodedata
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-from sentence_transformers import SentenceTransformer
-korean_model = SentenceTransformer("snunlp/KR-SBERT-V40K-klueNLI-augSTS")
-# model = KeyBERT(model=korean_model)
-
 """
 이 모듈은 카페 리뷰에서 의미 있는 키워드를 추출하여 extracted_keywords 테이블에 저장하는 기능을 제공합니다.
-Kiwi 형태소 분석기와 KeyBERT, SBERT 모델을 활용하여 리뷰 내용에서 중요한 단어들을 선별하고,
+Kiwi 형태소 분석기를 활용하여 리뷰 내용에서 중요한 단어들을 선별하고,
 각 카페별로 키워드 빈도를 집계하여 관리합니다.
+형태소 분석은 카페 단위 샤드로 나누어 프로세스 풀에서 병렬로 수행할 수 있습니다.
+분석 결과 토큰은 정규화된 리뷰 내용의 해시를 키로 review_token_cache 테이블에 보관되어,
+이후 실행에서는 처음 보는 리뷰만 분석하고 나머지는 캐시된 토큰에 필터만 다시 적용합니다.
 """
 
-def extract_all_keywords(update_progress_callback=None):
+# 한 샤드(프로세스 풀 작업 단위)에 담을 카페 수
+CAFES_PER_SHARD = 20
+
+STOPWORDS = frozenset({
+    # 일반 동사/보조동사
+    "가다", "오다", "되다", "하다", "있다", "없다", "보다", "보이다", "보여주다",
+    "들다", "나다", "타다", "계시다", "살다", "사다", "받다", "내다", "주다",
+    "오르다", "내리다", "열다", "닫다", "나오다", "들어가다", "들어오다", "지나다", "끝나다",
+    "드리다", "드시다", "올리다", "내려가다", "가지다", "갖다", "넣다", "빠지다",
+    "찍다", "쓰다", "따르다", "버리다", "사용하다", "걸다", "놓다",
+
+    # 너무 일반적인 추상 명사
+    "사람", "일", "것", "때", "거", "좀", "뭔가", "누구", "다른", "다시", "항상", "그냥",
+    "서비스", "사진", "위치", "가게", "문제", "기본", "직원", "고객", "테이블",
+    "가격", "매장", "제품", "카페",
+
+    # 감탄사 및 의미 없는 표현
+    "아", "야", "음", "어", "응", "헐", "흠", "헉", "ㅋㅋ", "ㅎㅎ", "ㅠㅠ", "ㅜㅜ",
+
+    # 기타 노이즈
+    "진짜", "완전", "정말", "너무", "많이", "약간", "좀", "계속", "또", "많다", "조금", "되게", "대박",
+
+    # 일반 형용사/감정 표현 필터
+    "좋다", "괜찮다", "그렇다",
+
+    # 비속어/욕설
+    "씨발", "ㅅㅂ", "ㅄ", "병신", "ㅂㅅ", "좆", "ㅈㄹ", "미친", "개새끼", "꺼져", "닥쳐",
+    "씹", "지랄", "애미", "놈", "년", "좇", "염병", "후레자식", "상놈", "쌍놈", "쌍년",
+    "새끼", "개같", "개소리", "개빡", "돌았", "ㅉㅉ", "ㅈ같", "fuck", "shit", "asshole", "bitch"
+})
+
+NOUN_TAGS = frozenset({"NNG", "NNP"})
+
+# 캐시 조회 시 IN 절 하나에 담을 해시 수
+CACHE_LOOKUP_CHUNK = 500
+# 전체 추출 시 섀도 테이블로 새로 만들어 교체하는 테이블
+EXTRACT_TABLES = ("extracted_keywords", "keyword_extract_watermarks")
+
+# 워커 프로세스마다 하나씩 생성되는 Kiwi 인스턴스
+_worker_kiwi = None
+
+
+def normalize_content(content):
+    """리뷰 내용을 NFC 정규화하고 공백을 하나로 합쳐 캐시 키 계산에 사용할 형태로 만듭니다."""
+    return " ".join(unicodedata.normalize("NFC", content).split())
+
+
+def content_hash(normalized_content):
+    """정규화된 리뷰 내용의 SHA-1 해시(16진수 40자)를 반환합니다."""
+    return hashlib.sha1(normalized_content.encode("utf-8")).hexdigest()
+
+
+def filter_tokens(tokens):
+    """
+    형태소 분석 결과 (form, tag, lemma) 목록에서 의미 있는 단어만 선별하여 키워드 집합으로 반환합니다.
+    명사(NNG, NNP)는 형태 그대로, 형용사/동사(VA, VV)는 원형(lemma)으로 수집합니다.
+    """
+    extracted_words = set()
+    for form, tag, lemma in tokens:
+        if form in STOPWORDS:
+            continue
+        if len(form) < 2:
+            continue
+        if tag in NOUN_TAGS:
+            extracted_words.add(form)
+        elif tag.startswith("VA") or tag.startswith("VV"):
+            if lemma in STOPWORDS:
+                continue
+            if len(lemma) < 2:
+                continue
+            extracted_words.add(lemma)
+    return extracted_words
+
+
+def analyze_texts(kiwi, texts):
+    """
+    Kiwi 배치 분석으로 여러 리뷰를 한 번에 분석하여 리뷰별 (form, tag, lemma) 토큰 목록을 반환합니다.
+    결과는 입력 순서와 같습니다.
+    """
+    return [
+        [(token.form, token.tag, token.lemma) for token in result[0][0]]
+        for result in kiwi.analyze(texts)
+    ]
+
+
+def encode_tokens(tokens):
+    """토큰 목록을 캐시 저장용 JSON 문자열로 변환합니다. 원형이 형태와 같으면 생략합니다."""
+    compact = [[form, tag] if form == lemma else [form, tag, lemma] for form, tag, lemma in tokens]
+    return json.dumps(compact, ensure_ascii=False, separators=(",", ":"))
+
+
+def decode_tokens(data):
+    """encode_tokens로 저장한 JSON 문자열을 (form, tag, lemma) 목록으로 복원합니다."""
+    return [(item[0], item[1], item[2] if len(item) > 2 else item[0]) for item in json.loads(data)]
+
+
+def load_cached_tokens(cursor, hashes):
+    """review_token_cache 테이블에서 주어진 해시들의 토큰 목록을 조회해 {해시: 토큰 목록}으로 반환합니다."""
+    hashes = list(hashes)
+    cached = {}
+    for start in range(0, len(hashes), CACHE_LOOKUP_CHUNK):
+        chunk = hashes[start:start + CACHE_LOOKUP_CHUNK]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(
+            f"SELECT content_hash, tokens FROM review_token_cache WHERE content_hash IN ({placeholders})",
+            chunk
+        )
+        for row in cursor.fetchall():
+            cached[row["content_hash"]] = decode_tokens(row["tokens"])
+    return cached
+
+
+def save_cached_tokens(cursor, analyzed):
+    """새로 분석한 {해시: 토큰 목록}을 review_token_cache 테이블에 저장합니다."""
+    if not analyzed:
+        return
+    cursor.executemany(
+        "INSERT IGNORE INTO review_token_cache (content_hash, tokens) VALUES (%s, %s)",
+        [(digest, encode_tokens(tokens)) for digest, tokens in analyzed.items()]
+    )
+
+
+def load_review_duplicates(cursor, cafe_ids):
+    """
+    review_duplicates에서 카페들의 중복 표시를 조회해 {cafe_id: {내용 해시: 첫 리뷰를 남길지 여부}}로 반환합니다.
+    카페 안에서 같은 내용이 반복된 경우(카페 내 중복이면서 duplicate_of가 자기 해시)만 첫 리뷰를 남깁니다.
+    """
+    cafe_ids = list(cafe_ids)
+    duplicates = {}
+    for start in range(0, len(cafe_ids), CACHE_LOOKUP_CHUNK):
+        chunk = cafe_ids[start:start + CACHE_LOOKUP_CHUNK]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(
+            f"SELECT cafe_id, content_hash, duplicate_of, scope FROM review_duplicates WHERE cafe_id IN ({placeholders})",
+            chunk
+        )
+        for row in cursor.fetchall():
+            keep_first = row["scope"] == "cafe" and row["duplicate_of"] == row["content_hash"]
+            duplicates.setdefault(row["cafe_id"], {})[row["content_hash"]] = keep_first
+    return duplicates
+
+
+# 워터마크 이하(이미 집계한) 카페 리뷰 조회
+COUNTED_REVIEWS_QUERY = """
+    SELECT r.content
+    FROM kakao_reviews r
+    JOIN keyword_extract_watermarks w ON w.cafe_id = r.cafe_id
+    WHERE r.cafe_id = %s AND r.id <= w.last_review_id
+"""
+
+
+def counted_hashes(cursor, cafe_id):
+    """카페의 워터마크 이하 리뷰, 즉 이전 추출에서 이미 집계한 리뷰들의 내용 해시 집합을 반환합니다."""
+    cursor.execute(COUNTED_REVIEWS_QUERY, (cafe_id,))
+    return {
+        content_hash(normalized)
+        for normalized in (normalize_content(row["content"]) for row in cursor.fetchall() if row["content"])
+        if normalized
+    }
+
+
+def prepare_shard(cursor, shard, incremental=False):
+    """
+    샤드의 리뷰마다 정규화 해시를 계산하고 캐시를 조회합니다.
+    review_duplicates에 중복으로 기록된 내용의 리뷰는 여기서 제외합니다.
+    incremental이 True이면 샤드에는 워터마크 이후의 리뷰만 있으므로, 카페 안에서 반복된 내용의 첫 리뷰가
+    워터마크 이하에 있어 이미 집계되었으면 새로 들어온 반복도 제외합니다.
+
+    반환값:
+        (cafe_hashes, cached, misses)
+        - cafe_hashes: [(cafe_id, [리뷰 해시, ...]), ...]
+        - cached: 캐시에 있던 {해시: 토큰 목록}
+        - misses: 분석이 필요한 [(해시, 정규화된 내용), ...] (샤드 내 중복 제거)
+    """
+    cafe_hashes = []
+    texts_by_hash = {}
+    duplicates = load_review_duplicates(cursor, [cafe_id for cafe_id, _, _ in shard])
+    for cafe_id, contents, _ in shard:
+        flagged = duplicates.get(cafe_id, {})
+        kept = set()
+        counted = None
+        hashes = []
+        for content in contents:
+            if not content:
+                # 리뷰 내용이 없으면 건너뜀
+                continue
+            normalized = normalize_content(content)
+            if not normalized:
+                continue
+            digest = content_hash(normalized)
+            if digest in flagged:
+                # 중복 리뷰는 건너뜀 (카페 안에서 같은 내용이 반복된 경우는 첫 리뷰만 집계)
+                if not flagged[digest] or digest in kept:
+                    continue
+                kept.add(digest)
+                if incremental:
+                    # 첫 리뷰가 이전 추출에서 집계되었는지 확인 (반복된 내용이 새로 들어온 카페만 조회)
+                    if counted is None:
+                        counted = counted_hashes(cursor, cafe_id)
+                    if digest in counted:
+                        continue
+            texts_by_hash[digest] = normalized
+            hashes.append(digest)
+        cafe_hashes.append((cafe_id, hashes))
+
+    cached = load_cached_tokens(cursor, texts_by_hash.keys())
+    misses = [(digest, text) for digest, text in texts_by_hash.items() if digest not in cached]
+    return cafe_hashes, cached, misses
+
+
+def count_shard_keywords(cafe_hashes, tokens_by_hash):
+    """리뷰별 토큰 목록에 필터를 적용하여 카페별 키워드 Counter(키워드 → 등장 리뷰 수)를 반환합니다."""
+    counters = {}
+    for cafe_id, hashes in cafe_hashes:
+        counter = counters.setdefault(cafe_id, Counter())
+        for digest in hashes:
+            counter.update(filter_tokens(tokens_by_hash[digest]))
+    return counters
+
+
+def _init_worker():
+    global _worker_kiwi
+    _worker_kiwi = Kiwi()
+
+
+def _analyze_texts(texts):
+    # 프로세스 풀 워커에서 실행: 워커 전용 Kiwi 인스턴스로 리뷰 묶음을 분석
+    return analyze_texts(_worker_kiwi, texts)
+
+
+# review_duplicates에 중복으로 기록된 리뷰는 prepare_shard에서 내용 해시로 걸러 키워드 집계에서 제외
+FULL_REVIEWS_QUERY = """
+    SELECT r.id, r.cafe_id, r.content
+    FROM kakao_reviews r
+    ORDER BY r.cafe_id, r.id
+"""
+
+# 워터마크(카페별 마지막 처리 리뷰 id) 이후의 리뷰만 조회
+INCREMENTAL_REVIEWS_QUERY = """
+    SELECT r.id, r.cafe_id, r.content
+    FROM kakao_reviews r
+    LEFT JOIN keyword_extract_watermarks w ON w.cafe_id = r.cafe_id
+    WHERE r.id > COALESCE(w.last_review_id, 0)
+    ORDER BY r.cafe_id, r.id
+"""
+
+INCREMENTAL_CAFE_COUNT_QUERY = """
+    SELECT COUNT(DISTINCT r.cafe_id) AS total
+    FROM kakao_reviews r
+    LEFT JOIN keyword_extract_watermarks w ON w.cafe_id = r.cafe_id
+    WHERE r.id > COALESCE(w.last_review_id, 0)
+"""
+
+
+def iter_reviews_grouped_by_cafe(incremental=False):
+    """
+    kakao_reviews 테이블을 cafe_id 순으로 한 번만 읽으며
+    (cafe_id, 리뷰 내용 리스트, 마지막 리뷰 id)를 하나씩 반환하는 제너레이터입니다.
+    서버 측 커서(SSDictCursor)를 사용하므로 전체 결과를 메모리에 올리지 않습니다.
+    incremental이 True이면 카페별 워터마크 이후의 리뷰만 조회합니다.
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor(SSDictCursor) as cursor:
+            cursor.execute(INCREMENTAL_REVIEWS_QUERY if incremental else FULL_REVIEWS_QUERY)
+            for cafe_id, rows in groupby(cursor, key=lambda row: row["cafe_id"]):
+                rows = list(rows)
+                yield cafe_id, [row["content"] for row in rows], rows[-1]["id"]
+    finally:
+        conn.close()
+
+
+def iter_review_shards(cafe_reviews, cafes_per_shard=CAFES_PER_SHARD):
+    """(cafe_id, 리뷰 내용 리스트, 마지막 리뷰 id) 스트림을 샤드 단위로 묶어 반환하는 제너레이터입니다."""
+    shard = []
+    for cafe_id, contents, last_review_id in cafe_reviews:
+        logger.info(f"카페 ID {cafe_id} 처리 중 - 리뷰 {len(contents)}건")
+        shard.append((cafe_id, contents, last_review_id))
+        if len(shard) >= cafes_per_shard:
+            yield shard
+            shard = []
+    if shard:
+        yield shard
+
+
+def save_watermark(cursor, cafe_id, last_review_id, review_count, table="keyword_extract_watermarks"):
+    """카페의 마지막 처리 리뷰 id와 지금까지 처리한 리뷰 수를 keyword_extract_watermarks 테이블에 기록합니다."""
+    cursor.execute(f"""
+        INSERT INTO {table} (cafe_id, last_review_id, review_count) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE last_review_id = VALUES(last_review_id), review_count = review_count + VALUES(review_count)
+    """, (cafe_id, last_review_id, review_count))
+
+
+def reset_keyword_counts(cursor, cafe_ids):
+    """카페들의 extracted_keywords와 워터마크를 삭제해 다음 증분 추출에서 처음부터 다시 집계되게 합니다. (커밋은 호출한 쪽에서)"""
+    cafe_ids = list(cafe_ids)
+    if not cafe_ids:
+        return
+    placeholders = ", ".join(["%s"] * len(cafe_ids))
+    cursor.execute(f"DELETE FROM extracted_keywords WHERE cafe_id IN ({placeholders})", cafe_ids)
+    cursor.execute(f"DELETE FROM keyword_extract_watermarks WHERE cafe_id IN ({placeholders})", cafe_ids)
+
+
+def reconcile_keyword_watermarks():
+    """
+    워터마크 이하 구간의 리뷰 수가 기록과 달라진 카페(리뷰 삭제 등)를 찾아 해당 카페의 extracted_keywords와 워터마크를 삭제합니다.
+    중복 판정이 바뀐 카페는 중복 판정 작업이 같은 방식으로 삭제합니다. (review_dedup.detect_duplicate_reviews)
+    삭제된 카페는 다음 증분 추출에서 처음부터 다시 집계됩니다. (형태소 분석은 캐시를 재사용)
+    리뷰 id가 다시 매겨지는 재크롤링은 리뷰 수만으로 알아챌 수 없으므로, 전체 크롤링은 워터마크를 빈 테이블로 교체하고
+    카페 단위 재크롤링은 그 카페의 워터마크를 지웁니다. (cafe_detail.CRAWL_TABLES, clear_cafe_rows)
+
+    반환값:
+        재집계 대상이 된 카페 수 (int)
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT w.cafe_id
+                FROM keyword_extract_watermarks w
+                LEFT JOIN kakao_reviews r ON r.cafe_id = w.cafe_id AND r.id <= w.last_review_id
+                GROUP BY w.cafe_id, w.review_count
+                HAVING COUNT(r.id) <> w.review_count
+            """)
+            stale_ids = [row["cafe_id"] for row in cursor.fetchall()]
+            reset_keyword_counts(cursor, stale_ids)
+        conn.commit()
+        logger.info(f"워터마크 재조정 - 재집계 대상 카페 {len(stale_ids)}개")
+        return len(stale_ids)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def save_keyword_counts(cursor, cafe_id, counter, table="extracted_keywords"):
+    """카페 하나의 키워드 빈도를 extracted_keywords 테이블에 다중 행으로 반영합니다."""
+    if not counter:
+        return
+    cursor.executemany(f"""
+        INSERT INTO {table} (cafe_id, keyword, count) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE count = count + VALUES(count)
+    """, [(cafe_id, keyword, count) for keyword, count in counter.items()])
+
+
+CAFE_REVIEWS_QUERY = """
+    SELECT r.id, r.content
+    FROM kakao_reviews r
+    WHERE r.cafe_id = %s
+    ORDER BY r.id
+"""
+
+
+def extract_cafe_keywords(cursor, cafe_id, kiwi):
+    """
+    카페 하나의 (중복 제외) 리뷰 전체에서 키워드를 추출해 그 카페의 extracted_keywords와 워터마크를 새로 씁니다.
+    형태소 분석은 review_token_cache를 재사용하며, 커밋은 호출한 쪽에서 합니다. (스트리밍 파이프라인용)
+
+    반환값:
+        키워드 → 등장 리뷰 수 Counter
+    """
+    cursor.execute(CAFE_REVIEWS_QUERY, (cafe_id,))
+    rows = cursor.fetchall()
+    contents = [row["content"] for row in rows]
+    cafe_hashes, cached, misses = prepare_shard(cursor, [(cafe_id, contents, None)])
+    token_lists = analyze_texts(kiwi, [text for _, text in misses]) if misses else []
+    analyzed = {digest: tokens for (digest, _), tokens in zip(misses, token_lists)}
+    save_cached_tokens(cursor, analyzed)
+    counter = count_shard_keywords(cafe_hashes, {**cached, **analyzed})[cafe_id]
+
+    cursor.execute("DELETE FROM extracted_keywords WHERE cafe_id = %s", (cafe_id,))
+    cursor.execute("DELETE FROM keyword_extract_watermarks WHERE cafe_id = %s", (cafe_id,))
+    save_keyword_counts(cursor, cafe_id, counter)
+    if rows:
+        save_watermark(cursor, cafe_id, rows[-1]["id"], len(rows))
+    return counter
+
+
+def extract_all_keywords(update_progress_callback=None, workers=1, incremental=False):
     """
     모든 카페의 리뷰 데이터를 분석하여 키워드를 추출하고 데이터베이스에 저장하는 함수입니다.
 
     주요 기능:
-    1. 기존 extracted_keywords 테이블의 데이터를 삭제하고 AUTO_INCREMENT를 초기화합니다.
-    2. cafes 테이블에서 모든 카페 정보를 조회합니다.
-    3. 각 카페별로 kakao_reviews 테이블에서 리뷰 내용을 가져와 형태소 분석을 수행합니다.
-    4. 불용어 및 의미 없는 단어를 필터링하여 키워드를 선별합니다.
-    5. 선별된 키워드의 빈도를 extracted_keywords 테이블에 갱신하거나 신규 삽입합니다.
+    1. 전체 모드: extracted_keywords와 워터마크를 빈 섀도 테이블에 새로 만들고, 끝나면 한 번에 교체합니다.
+       증분 모드: 워터마크를 재조정한 뒤, 카페별 워터마크 이후의 새 리뷰만 대상으로 삼습니다.
+    2. kakao_reviews 테이블을 cafe_id 순으로 스트리밍하며 카페 단위로 리뷰를 묶습니다.
+    3. 카페들을 샤드로 묶고, review_token_cache에 없는 리뷰 내용만 배치 형태소 분석하여 캐시에 저장합니다.
+       workers가 2 이상이면 워커마다 Kiwi 인스턴스를 하나씩 둔 프로세스 풀에서 병렬로 분석합니다.
+    4. 캐시된 토큰과 새 토큰에 불용어 및 의미 없는 단어 필터를 적용하여 키워드를 선별합니다.
+    5. 샤드별 키워드 Counter를 extracted_keywords 테이블의 기존 count에 합산하고 카페별 워터마크를 갱신합니다.
     6. 처리 진행 상황을 로깅하며, 오류 발생 시 롤백 처리합니다.
 
+    Args:
+        update_progress_callback (callable): 진행 상황 업데이트 콜백 함수
+        workers (int): 형태소 분석 프로세스 수 (1이면 현재 프로세스에서 분석)
+        incremental (bool): True이면 새 리뷰만 분석하여 기존 키워드 빈도에 더함
+
     반환값:
         처리한 카페 수 (int)
     """
+    if incremental:
+        # 리뷰가 삭제·교체된 카페는 워터마크를 지워 처음부터 다시 집계
+        reconcile_keyword_watermarks()
+
     conn = get_connection()
+    executor = None
+    tables = {table: table for table in EXTRACT_TABLES}
     try:
         with conn.cursor() as cursor:
-            # 기존 키워드 삭제 및 AUTO_INCREMENT 초기화
-            cursor.execute("DELETE FROM extracted_keywords")
-            cursor.execute("ALTER TABLE extracted_keywords AUTO_INCREMENT = 1")
-
-            # 모든 카페 ID 조회
-            cursor.execute("SELECT id FROM cafes")
-            cafes = cursor.fetchall()
-            logger.info(f"{len(cafes)}개의 카페에 대해 키워드 추출을 시작합니다.")
-            total_cafes = len(cafes)
+            if incremental:
+                cursor.execute(INCREMENTAL_CAFE_COUNT_QUERY)
+            else:
+                # 키워드·워터마크는 섀도 테이블에 새로 만들어, 추출이 끝날 때까지 조회 쪽은 이전 결과를 계속 읽음
+                tables = create_shadow_tables(cursor, EXTRACT_TABLES)
+                # 리뷰가 있는 카페 수 조회 (진행률 계산용)
+                cursor.execute("SELECT COUNT(DISTINCT cafe_id) AS total FROM kakao_reviews")
+            total_cafes = cursor.fetchone()["total"]
+            mode = "증분" if incremental else "전체"
+            logger.info(f"{total_cafes}개의 카페에 대해 키워드 {mode} 추출을 시작합니다. (workers={workers})")
             processed_cafes = 0
 
-            count_total = 0
-            # Kiwi 형태소 분석기 초기화
-            kiwi = Kiwi()
+            # 리뷰 조회는 별도 연결의 서버 측 커서로 스트리밍하고, 캐시 조회와 쓰기는 현재 연결에서 수행
+            shards = iter_review_shards(iter_reviews_grouped_by_cafe(incremental))
+            if workers > 1:
+                # 워커마다 Kiwi를 한 번만 초기화하는 프로세스 풀
+                executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            kiwi = None
 
-            for cafe in cafes:
-                cafe_id = cafe["id"]
-                # 해당 카페의 모든 리뷰 내용 조회
-                cursor.execute("SELECT content FROM kakao_reviews WHERE cafe_id = %s", (cafe_id,))
-                reviews = cursor.fetchall()
-                logger.info(f"카페 ID {cafe_id} 처리 중 - 리뷰 {len(reviews)}건")
+            def submit_analysis(misses):
+                # 캐시에 없는 리뷰만 분석 (모두 캐시에 있으면 Kiwi를 띄우지 않음)
+                nonlocal kiwi
+                texts = [text for _, text in misses]
+                if not texts:
+                    return completed_future([])
+                if executor is not None:
+                    return executor.submit(_analyze_texts, texts)
+                if kiwi is None:
+                    # Kiwi 형태소 분석기 초기화
+                    kiwi = Kiwi()
+                return completed_future(analyze_texts(kiwi, texts))
 
-                for review in reviews:
-                    if not review["content"]:
-                        # 리뷰 내용이 없으면 건너뜀
-                        continue
+            def iter_submitted_shards():
+                for shard in shards:
+                    marks = [(cafe_id, last_review_id, len(contents)) for cafe_id, contents, last_review_id in shard]
+                    cafe_hashes, cached, misses = prepare_shard(cursor, shard, incremental)
+                    yield (marks, cafe_hashes, cached, misses), submit_analysis(misses)
+
+            # 진행 중인 샤드 수를 제한해 메모리 사용량을 일정하게 유지
+            analyzed_shards = ordered_results(iter_submitted_shards(), max_in_flight=max(workers, 1) * 2)
+            cache_hits = 0
+            cache_misses = 0
+            for (marks, cafe_hashes, cached, misses), token_lists in analyzed_shards:
+                analyzed = {digest: tokens for (digest, _), tokens in zip(misses, token_lists)}
+                save_cached_tokens(cursor, analyzed)
+                cache_hits += len(cached)
+                cache_misses += len(analyzed)
+
+                # 캐시된 토큰과 새로 분석한 토큰에 필터를 적용해 카페별로 저장 (중복 키워드는 count에 합산)
+                counters = count_shard_keywords(cafe_hashes, {**cached, **analyzed})
+                for cafe_id, last_review_id, review_count in marks:
+                    save_keyword_counts(cursor, cafe_id, counters[cafe_id], tables["extracted_keywords"])
+                    save_watermark(cursor, cafe_id, last_review_id, review_count, tables["keyword_extract_watermarks"])
 
-                    # 리뷰 내용을 형태소 분석하여 토큰 추출
-                    tokens = kiwi.analyze(review["content"])[0][0]
-
-                    extracted_words = set()
-                    stopwords = {
-                        # 일반 동사/보조동사
-                        "가다", "오다", "되다", "하다", "있다", "없다", "보다", "보이다", "보여주다",
-                        "들다", "나다", "타다", "계시다", "살다", "사다", "받다", "내다", "주다",
-                        "오르다", "내리다", "열다", "닫다", "나오다", "들어가다", "들어오다", "지나다", "끝나다",
-                        "드리다", "드시다", "올리다", "내려가다", "가지다", "갖다", "넣다", "빠지다",
-                        "찍다", "쓰다", "따르다", "버리다", "사용하다", "걸다", "놓다",
-
-                        # 너무 일반적인 추상 명사
-                        "사람", "일", "것", "때", "거", "좀", "뭔가", "누구", "다른", "다시", "항상", "그냥",
-                        "서비스", "사진", "위치", "가게", "문제", "기본", "직원", "고객", "테이블",
-                        "가격", "매장", "제품", "카페",
-
-                        # 감탄사 및 의미 없는 표현
-                        "아", "야", "음", "어", "응", "헐", "흠", "헉", "ㅋㅋ", "ㅎㅎ", "ㅠㅠ", "ㅜㅜ",
-
-                        # 기타 노이즈
-                        "진짜", "완전", "정말", "너무", "많이", "약간", "좀", "계속", "또", "많다", "조금", "되게", "대박",
-
-                        # 일반 형용사/감정 표현 필터
-                        "좋다", "괜찮다", "그렇다",
-
-                        # 비속어/욕설
-                        "씨발", "ㅅㅂ", "ㅄ", "병신", "ㅂㅅ", "좆", "ㅈㄹ", "미친", "개새끼", "꺼져", "닥쳐",
-                        "씹", "지랄", "애미", "놈", "년", "좇", "염병", "후레자식", "상놈", "쌍놈", "쌍년",
-                        "새끼", "개같", "개소리", "개빡", "돌았", "ㅉㅉ", "ㅈ같", "fuck", "shit", "asshole", "bitch"
-                    }
-
-                    # 형태소 분석 결과에서 의미 있는 단어만 선별
-                    for token in tokens:
-                        if token.form in stopwords:
-                            continue
-                        if len(token.form) < 2:
-                            continue
-                        # 명사(NNG, NNP) 또는 형용사/동사(VA, VV)인 경우 처리
-                        if token.tag in {'NNG', 'NNP'}:
-                            extracted_words.add(token.form)
-                        elif token.tag.startswith("VA") or token.tag.startswith("VV"):
-                            if token.lemma in stopwords:
-                                continue
-                            if len(token.lemma) < 2:
-                                continue
-                            extracted_words.add(token.lemma)
-
-                    # 추출된 키워드별로 데이터베이스에 존재 여부 확인 후 갱신 또는 삽입
-                    for keyword in extracted_words:
-                        if keyword in stopwords:
-                            continue
-                        cursor.execute("""
-                            SELECT count FROM extracted_keywords WHERE cafe_id = %s AND keyword = %s
-                        """, (cafe_id, keyword))
-                        existing = cursor.fetchone()
-
-                        if existing:
-                            # 이미 존재하면 count 증가
-                            cursor.execute("""
-                                UPDATE extracted_keywords SET count = count + 1 WHERE cafe_id = %s AND keyword = %s
-                            """, (cafe_id, keyword))
-                        else:
-                            # 새 키워드면 삽입
-                            cursor.execute("""
-                                INSERT INTO extracted_keywords (cafe_id, keyword, count) VALUES (%s, %s, 1)
-                            """, (cafe_id, keyword))
-
-                processed_cafes += 1
-                if update_progress_callback:
-                    percent = int(processed_cafes / total_cafes * 50)
-                    update_progress_callback(percent, f"extracting_cafe_{processed_cafes}")
-                count_total += 1
+                    processed_cafes += 1
+                    if update_progress_callback:
+                        percent = int(processed_cafes / total_cafes * 50)
+                        update_progress_callback(percent, f"extracting_cafe_{processed_cafes}")
 
+            logger.info(f"형태소 분석 캐시 - 재사용 {cache_hits}건, 신규 분석 {cache_misses}건")
+            conn.commit()
+            if not incremental:
+                # 섀도 테이블을 라이브 테이블과 원자적으로 교체
+                publish_shadow_tables(cursor, EXTRACT_TABLES)
             if update_progress_callback:
                 update_progress_callback(50, "extraction_completed")
-            conn.commit()
-            logger.info(f"{count_total}개의 카페에 대해 키워드 추출을 완료했습니다.")
-            return count_total
+            logger.info(f"{processed_cafes}개의 카페에 대해 키워드 추출을 완료했습니다.")
+            return processed_cafes
 
     except Exception as e:
-        conn.rollback()
         logger.error(f"키워드 추출 중 오류 발생: {e}", exc_info=True)
+        # 정리 실패는 경고만 남기고 원래 예외를 그대로 전파
+        discard_shadow_tables(conn, () if incremental else EXTRACT_TABLES)
         raise
     finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
         conn.close()
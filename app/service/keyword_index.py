@@ -0,0 +1,241 @@
+"""
+이 모듈은 키워드 임베딩 저장소 위에 IVF(inverted file) 근사 최근접 이웃 인덱스를 만들어 의미 기반 키워드 검색을 제공합니다.
+저장소 벡터를 k-means 중심(리스트) nlist개로 나누어 두고, 질의는 가까운 중심 nprobe개의 리스트에 속한 키워드만
+메모리 맵 행렬에서 읽어 코사인 유사도를 계산합니다.
+
+인덱스 파일은 임베딩 저장소 디렉터리에 함께 두며(ivf_centroids.npy, ivf_assignments.npy, ivf_meta.json),
+시작 시 메모리 맵으로 엽니다. 저장소에 새 키워드가 덧붙으면 가장 가까운 중심에 배정만 추가하고,
+학습 이후 추가된 키워드가 많아지면(KEYWORD_INDEX_RETRAIN_RATIO) 중심을 다시 학습합니다.
+ivf_meta.json에는 인덱스를 만든 저장소의 모델과 generation을 기록해, 저장소가 다시 만들어졌으면 인덱스를 버리고 새로 학습합니다.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+from app.core.model_registry import model_key
+from app.service.embedding_store import KeywordEmbeddingStore, get_embedding_store
+
+# 질의마다 탐색할 리스트 수
+KEYWORD_INDEX_NPROBE = int(os.getenv("KEYWORD_INDEX_NPROBE", 8))
+# 학습 이후 추가된 키워드가 학습한 키워드 수의 이 비율을 넘으면 중심을 다시 학습
+KEYWORD_INDEX_RETRAIN_RATIO = float(os.getenv("KEYWORD_INDEX_RETRAIN_RATIO", 0.5))
+# 검색 결과에 포함할 최소 코사인 유사도
+KEYWORD_SEARCH_MIN_SIMILARITY = float(os.getenv("KEYWORD_SEARCH_MIN_SIMILARITY", 0.5))
+KMEANS_FIT_SAMPLE = 50000
+ASSIGN_BATCH_ROWS = 4096
+
+
+def normalize_rows(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
+def default_nlist(rows):
+    # 리스트 수는 키워드 수의 제곱근의 2배 (리스트당 평균 키워드 수도 제곱근 수준)
+    return max(1, min(rows, int(2 * math.sqrt(rows))))
+
+
+class KeywordIVFIndex:
+    """
+    임베딩 저장소 하나에 대한 IVF 인덱스입니다.
+
+    Args:
+        store (KeywordEmbeddingStore): 벡터를 읽을 임베딩 저장소
+        centroids (np.ndarray): (nlist, dim) L2 정규화된 중심
+        assignments (np.ndarray): 저장소 행 순서의 리스트 번호 (인덱싱한 행 수만큼)
+        trained_rows (int): 중심을 학습할 때의 저장소 행 수
+    """
+
+    def __init__(self, store, centroids, assignments, trained_rows):
+        self.store = store
+        self.centroids = centroids
+        self.assignments = assignments
+        self.trained_rows = trained_rows
+        self._build_lists()
+
+    def _build_lists(self):
+        # 리스트 번호순으로 정렬한 행 번호와 리스트별 시작 위치 (리스트 안의 행은 오름차순이라 메모리 맵을 순서대로 읽음)
+        self.order = np.argsort(self.assignments, kind="stable")
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(self.assignments, minlength=len(self.centroids)))])
+
+    def __len__(self):
+        return len(self.assignments)
+
+    @property
+    def nlist(self):
+        return len(self.centroids)
+
+    def assign(self, rows):
+        """저장소 행들을 가장 가까운 중심에 배정한 리스트 번호 배열을 반환합니다."""
+        labels = np.empty(len(rows), dtype=np.int32)
+        for start in range(0, len(rows), ASSIGN_BATCH_ROWS):
+            vectors = normalize_rows(self.store.vectors(rows[start:start + ASSIGN_BATCH_ROWS]))
+            labels[start:start + ASSIGN_BATCH_ROWS] = np.argmax(vectors @ self.centroids.T, axis=1)
+        return labels
+
+    def add_missing(self):
+        """
+        저장소에 인덱스 이후 덧붙은 키워드를 가장 가까운 중심에 배정해 추가합니다.
+
+        반환값:
+            추가한 키워드 수 (int)
+        """
+        rows = np.arange(len(self), len(self.store), dtype=np.int64)
+        if not len(rows):
+            return 0
+        self.assignments = np.concatenate([self.assignments, self.assign(rows)])
+        self._build_lists()
+        return len(rows)
+
+    def needs_retrain(self):
+        return len(self.store) - self.trained_rows > KEYWORD_INDEX_RETRAIN_RATIO * self.trained_rows
+
+    def search(self, query_vector, k=20, nprobe=KEYWORD_INDEX_NPROBE, min_similarity=KEYWORD_SEARCH_MIN_SIMILARITY):
+        """
+        질의 벡터와 가까운 키워드를 코사인 유사도 내림차순으로 최대 k개 반환합니다.
+
+        반환값:
+            (keyword, 유사도) 튜플 리스트
+        """
+        query = normalize_rows(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))[0]
+        probe = np.argsort(-(self.centroids @ query), kind="stable")[:nprobe]
+        candidates = np.concatenate([self.order[self.offsets[label]:self.offsets[label + 1]] for label in probe])
+        if not len(candidates):
+            return []
+        candidates = np.sort(candidates)
+        similarities = normalize_rows(self.store.vectors(candidates)) @ query
+        top = np.flatnonzero(similarities >= min_similarity)
+        if len(top) > k:
+            top = top[np.argpartition(-similarities[top], k - 1)[:k]]
+        top = top[np.argsort(-similarities[top], kind="stable")]
+        return [(self.store.keywords[candidates[i]], round(float(similarities[i]), 6)) for i in top]
+
+    def save(self):
+        """중심과 배정을 저장소 디렉터리에 원자적으로 교체 저장합니다."""
+        paths = index_paths(self.store)
+        for name, array in (("centroids", self.centroids), ("assignments", self.assignments)):
+            tmp_path = paths[name] + ".tmp.npy"
+            np.save(tmp_path, np.ascontiguousarray(array))
+            os.replace(tmp_path, paths[name])
+        tmp_path = paths["meta"] + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model": self.store.model_name, "generation": self.store.generation, "dim": self.store.dim,
+                       "nlist": self.nlist, "rows": len(self), "trained_rows": self.trained_rows}, f)
+        os.replace(tmp_path, paths["meta"])
+
+
+def index_paths(store):
+    return {
+        "centroids": os.path.join(store.directory, "ivf_centroids.npy"),
+        "assignments": os.path.join(store.directory, "ivf_assignments.npy"),
+        "meta": os.path.join(store.directory, "ivf_meta.json"),
+    }
+
+
+def load_keyword_index(store):
+    """
+    디스크의 IVF 인덱스를 메모리 맵으로 엽니다.
+    인덱스가 없거나, 다른 저장소(모델·generation·차원이 다름)로 만들었거나, 저장소보다 크면 None을 반환합니다.
+    """
+    paths = index_paths(store)
+    if not all(os.path.exists(path) for path in paths.values()):
+        return None
+    with open(paths["meta"], encoding="utf-8") as f:
+        meta = json.load(f)
+    if (meta.get("model", store.model_name), meta.get("generation"), meta.get("dim", store.dim)) != \
+            (store.model_name, store.generation, store.dim):
+        return None
+    assignments = np.load(paths["assignments"], mmap_mode="r")
+    if len(assignments) > len(store):
+        return None
+    return KeywordIVFIndex(store, np.load(paths["centroids"], mmap_mode="r"), assignments, meta["trained_rows"])
+
+
+def train_keyword_index(store, nlist=None, seed=0):
+    """
+    저장소 벡터(최대 KMEANS_FIT_SAMPLE개 표본)로 k-means 중심을 학습하고 모든 키워드를 배정한 인덱스를 만듭니다.
+    """
+    # sklearn은 API 프로세스 import 시간을 늘리므로 학습할 때만 로딩
+    from sklearn.cluster import MiniBatchKMeans
+
+    rows = len(store)
+    nlist = min(nlist or default_nlist(rows), rows)
+    rng = np.random.RandomState(seed)
+    sample = np.sort(rng.choice(rows, KMEANS_FIT_SAMPLE, replace=False)) if rows > KMEANS_FIT_SAMPLE else np.arange(rows)
+    kmeans = MiniBatchKMeans(n_clusters=nlist, random_state=seed, n_init=1, batch_size=4096)
+    kmeans.fit(normalize_rows(store.vectors(sample)))
+    index = KeywordIVFIndex(store, normalize_rows(kmeans.cluster_centers_), np.zeros(0, dtype=np.int32), rows)
+    index.add_missing()
+    return index
+
+
+def update_keyword_index(store=None):
+    """
+    작업 실행기에서 저장소에 맞춰 IVF 인덱스를 갱신해 저장합니다.
+    인덱스가 없거나(다른 generation의 저장소로 만든 인덱스 포함) 학습 이후 추가된 키워드가 많으면 다시 학습하고,
+    아니면 새 키워드만 배정해 추가합니다. 갱신하는 동안 저장소 잠금을 잡아 다른 작업이 키워드를 덧붙이지 못하게 합니다.
+
+    반환값:
+        dict: 인덱스 키워드 수, 리스트 수, 재학습 여부
+    """
+    store = store or get_embedding_store(model_key())
+    if not len(store):
+        return {"rows": 0, "nlist": 0, "retrained": False}
+    start = time.perf_counter()
+    with store.locked():
+        index = load_keyword_index(store)
+        retrained = index is None or index.needs_retrain()
+        if retrained:
+            index = train_keyword_index(store)
+        else:
+            index.add_missing()
+        index.save()
+    print(f"✅ 키워드 벡터 인덱스 갱신 완료 - 키워드 {len(index)}개, 리스트 {index.nlist}개, "
+          f"재학습 {retrained}, {time.perf_counter() - start:.2f}초")
+    return {"rows": len(index), "nlist": index.nlist, "retrained": retrained}
+
+
+def open_keyword_index():
+    """
+    API 프로세스용: 디스크의 저장소와 인덱스를 새로 열고, 인덱스 이후 덧붙은 키워드는 메모리에서만 배정합니다.
+    저장된 인덱스가 없으면 메모리에서 학습합니다. 저장소가 비어 있으면 None을 반환합니다.
+    """
+    store = KeywordEmbeddingStore(model_key())
+    if not len(store):
+        return None
+    index = load_keyword_index(store)
+    if index is None:
+        return train_keyword_index(store)
+    index.add_missing()
+    return index
+
+
+# 프로세스마다 하나의 인덱스 (교체는 참조 대입 한 번)
+_index = None
+_loaded = False
+_load_lock = threading.Lock()
+
+
+def get_keyword_index():
+    """현재 키워드 벡터 인덱스를 반환합니다. 아직 열지 않았으면 디스크에서 엽니다. (저장소가 비어 있으면 None)"""
+    global _index, _loaded
+    if not _loaded:
+        with _load_lock:
+            if not _loaded:
+                _index = open_keyword_index()
+                _loaded = True
+    return _index
+
+
+def refresh_keyword_index(version=None):
+    """저장소와 인덱스를 다시 열어 현재 인덱스를 교체합니다. (카페 데이터 버전이 바뀔 때 호출)"""
+    global _index, _loaded
+    with _load_lock:
+        _index = open_keyword_index()
+        _loaded = True
+    return _index
@@ -0,0 +1,252 @@
+"""
+이 모듈은 카페 검색 → 상세 크롤링 → 키워드 추출·클러스터링을 한 작업 안에서 겹쳐 실행하는 스트리밍 파이프라인을 제공합니다.
+격자 검색에서 새로 발견한 카페는 바로 상세 크롤링 큐에 들어가고, 크롤링이 끝난 카페의 리뷰는 곧바로
+그 카페의 키워드 추출과 클러스터링으로 이어집니다.
+단계 사이는 크기가 제한된 큐로 연결되어, 뒤 단계가 밀리면 앞 단계(크롤링, 카카오 API 호출)도 자리가 날 때까지 기다립니다.
+결과는 카페 단위로 라이브 테이블에 바로 교체 저장되므로, 전체 작업이 끝나기 전에도 먼저 처리된 카페의 결과를 조회할 수 있습니다.
+
+단계:
+    discover  (스레드 1개)       격자 검색 → cafe_ids 저장 → 크롤링 큐
+    crawl     (스레드 crawl_workers개)  상세 크롤링(카페별 메뉴·리뷰 교체) → 분석 큐
+    analyze   (작업 스레드)       카페 키워드 추출 → 카페 클러스터링 → 진행률 보고
+"""
+
+import os
+import queue
+import threading
+import time
+import traceback
+
+import pandas as pd
+from kiwipiepy import Kiwi
+
+from app.core.db import get_connection
+from app.core.model_registry import model_key
+from app.service.cafe_detail import crawl_and_save_single_cafe
+from app.service.cafe_search import GRID_RECTS_PATH, create_session, save_cafe_ids, search_cafes
+from app.service.embedding_store import get_embedding_store
+from app.service.keyword_clustering import MODEL_NAME, ClusterResultWriter, cluster_and_save_cafe
+from app.service.keyword_extractor import extract_cafe_keywords
+
+# 상세 크롤링 스레드 수와 단계 사이 큐 크기
+PIPELINE_CRAWL_WORKERS = int(os.getenv("PIPELINE_CRAWL_WORKERS", 10))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 20))
+# 큐가 비었거나 가득 찼을 때 중단 여부를 확인하는 간격(초)
+QUEUE_WAIT = 0.5
+
+_DONE = object()
+
+
+class PipelineStopped(Exception):
+    """다른 단계의 실패나 작업 취소로 파이프라인이 멈췄을 때 단계 스레드를 빠져나가기 위해 사용합니다."""
+
+
+class StreamingPipeline:
+    """
+    격자 검색, 상세 크롤링, 키워드 분석 단계를 제한된 큐로 연결해 동시에 실행합니다.
+    한 단계에서 오류가 나면 stop 이벤트로 모든 단계를 멈추고, 분석 단계(run을 호출한 스레드)에서 그 오류를 다시 발생시킵니다.
+    """
+
+    def __init__(self, grid_rects, api_key, crawl_workers=PIPELINE_CRAWL_WORKERS, queue_size=PIPELINE_QUEUE_SIZE,
+                 min_cluster_size=2):
+        self.grid_rects = grid_rects
+        self.api_key = api_key
+        self.crawl_workers = crawl_workers
+        self.min_cluster_size = min_cluster_size
+        self.crawl_queue = queue.Queue(maxsize=queue_size)
+        self.analysis_queue = queue.Queue(maxsize=queue_size)
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.errors = []
+        self.crawlers_left = crawl_workers
+        self.failed_ids = []
+        self.stats = {"grid_done": 0, "discovered": 0, "crawled": 0, "crawl_failed": 0, "analyzed": 0, "analysis_failed": 0}
+        self.first_result_seconds = None
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.stats[name] += amount
+
+    def put(self, target, item):
+        # 큐가 가득 차 있으면 자리가 날 때까지 기다림 (뒤 단계가 밀리면 앞 단계도 멈추는 역압)
+        while not self.stop.is_set():
+            try:
+                target.put(item, timeout=QUEUE_WAIT)
+                return
+            except queue.Full:
+                continue
+        raise PipelineStopped()
+
+    def get(self, source):
+        while not self.stop.is_set():
+            try:
+                return source.get(timeout=QUEUE_WAIT)
+            except queue.Empty:
+                continue
+        raise PipelineStopped()
+
+    def run_stage(self, stage, *args):
+        # 단계 스레드 실행: 오류는 기록하고 모든 단계를 멈춤
+        try:
+            stage(*args)
+        except PipelineStopped:
+            pass
+        except Exception as e:
+            traceback.print_exc()
+            self.errors.append(e)
+            self.stop.set()
+
+    def discover(self):
+        """격자마다 카페를 검색해 cafe_ids에 저장하고, 처음 발견한 카페를 크롤링 큐에 넣습니다."""
+        session = create_session()
+        seen = set()
+        for _, row in self.grid_rects.iterrows():
+            min_lat, min_lng = row["min_lat"], row["min_lng"]
+            max_lat, max_lng = row["max_lat"], row["max_lng"]
+            grid_key = f"{min_lat:.6f},{min_lng:.6f},{max_lat:.6f},{max_lng:.6f}"
+            cafe_data = search_cafes(min_lat, min_lng, max_lat, max_lng, self.api_key, session)
+            save_cafe_ids(grid_key, cafe_data)
+            for cafe in cafe_data:
+                if cafe["cafe_id"] in seen:
+                    continue
+                seen.add(cafe["cafe_id"])
+                self.count("discovered")
+                self.put(self.crawl_queue, cafe["cafe_id"])
+            self.count("grid_done")
+        for _ in range(self.crawl_workers):
+            self.put(self.crawl_queue, _DONE)
+
+    def crawl(self):
+        """크롤링 큐의 카페를 상세 크롤링해 메뉴·리뷰를 교체 저장하고, 성공한 카페를 분석 큐에 넣습니다."""
+        try:
+            while True:
+                cafe_id = self.get(self.crawl_queue)
+                if cafe_id is _DONE:
+                    break
+                # 실패한 카페는 한 번 바로 재시도
+                if crawl_and_save_single_cafe(cafe_id, replace=True) or crawl_and_save_single_cafe(cafe_id, replace=True):
+                    self.count("crawled")
+                    self.put(self.analysis_queue, cafe_id)
+                else:
+                    self.count("crawl_failed")
+                    with self.lock:
+                        self.failed_ids.append(cafe_id)
+        finally:
+            with self.lock:
+                self.crawlers_left -= 1
+                last = self.crawlers_left == 0
+            if last and not self.stop.is_set():
+                self.put(self.analysis_queue, _DONE)
+
+    def report(self, update_progress_callback):
+        # 세 단계의 진행 정도를 평균해 전체 진행률로 보고 (발견한 카페 수는 검색이 끝날 때까지 늘어남)
+        with self.lock:
+            stats = dict(self.stats)
+        discovered = max(stats["discovered"], 1)
+        fractions = (
+            stats["grid_done"] / max(len(self.grid_rects), 1),
+            (stats["crawled"] + stats["crawl_failed"]) / discovered,
+            (stats["analyzed"] + stats["analysis_failed"]) / discovered,
+        )
+        percent = min(int(sum(fractions) / len(fractions) * 100), 99)
+        update_progress_callback(percent, f"pipeline_grid_{stats['grid_done']}_crawled_{stats['crawled']}_analyzed_{stats['analyzed']}")
+
+    def analyze(self, update_progress_callback, start_time):
+        """분석 큐의 카페마다 키워드를 추출하고 바로 클러스터링해 결과를 교체 저장합니다."""
+        kiwi = Kiwi()
+        store = get_embedding_store(model_key(MODEL_NAME))
+        conn = get_connection()
+        try:
+            # 카페 하나가 끝날 때마다 커밋해 결과가 바로 조회되도록 함
+            with ClusterResultWriter(flush_every=1) as writer:
+                while True:
+                    if self.errors:
+                        raise self.errors[0]
+                    try:
+                        cafe_id = self.analysis_queue.get(timeout=QUEUE_WAIT)
+                    except queue.Empty:
+                        # 분석할 카페가 없어도 진행률을 보고해 취소 요청을 확인
+                        self.report(update_progress_callback)
+                        continue
+                    if cafe_id is _DONE:
+                        break
+
+                    with conn.cursor() as cursor:
+                        counter = extract_cafe_keywords(cursor, cafe_id, kiwi)
+                    conn.commit()
+                    keywords = list(counter)
+                    error = cluster_and_save_cafe(writer, store, cafe_id, keywords, [counter[kw] for kw in keywords],
+                                                  self.min_cluster_size)
+                    if error:
+                        print(f"❌ {cafe_id} 처리 중 오류 발생: {error}")
+                        self.count("analysis_failed")
+                    else:
+                        print(f"✅ {cafe_id}: 키워드 {len(keywords)}개 추출·클러스터링 완료")
+                        self.count("analyzed")
+                        if self.first_result_seconds is None:
+                            self.first_result_seconds = round(time.time() - start_time, 2)
+                            print(f"⏱ 첫 카페 결과까지 {self.first_result_seconds}초")
+                    self.report(update_progress_callback)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def run(self, update_progress_callback):
+        start_time = time.time()
+        threads = [threading.Thread(target=self.run_stage, args=(self.discover,), name="pipeline-discover", daemon=True)]
+        threads += [
+            threading.Thread(target=self.run_stage, args=(self.crawl,), name=f"pipeline-crawl-{i}", daemon=True)
+            for i in range(self.crawl_workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            self.analyze(update_progress_callback, start_time)
+        finally:
+            # 분석 단계가 끝나거나 실패·취소되면 나머지 단계도 멈춤
+            self.stop.set()
+        for thread in threads:
+            thread.join()
+        if self.errors:
+            raise self.errors[0]
+
+        elapsed = round(time.time() - start_time, 2)
+        print(f"⏱ 파이프라인 완료 - 소요 시간: {elapsed}초, {self.stats}")
+        return {
+            "saved": self.stats["discovered"],
+            "crawled_cafes": self.stats["crawled"],
+            "analyzed_cafes": self.stats["analyzed"],
+            "failed_ids": self.failed_ids,
+            "first_result_seconds": self.first_result_seconds if self.first_result_seconds is not None else "",
+            "elapsed_seconds": elapsed,
+        }
+
+
+def run_pipeline(job_id: str, update_progress_callback, crawl_workers: int = PIPELINE_CRAWL_WORKERS,
+                 queue_size: int = PIPELINE_QUEUE_SIZE):
+    """
+    격자 검색부터 카페별 클러스터링까지를 하나의 작업(job_id)으로 겹쳐 실행합니다.
+    기존 배치 작업과 달리 테이블을 비우거나 섀도 테이블로 교체하지 않고, 카페 단위로 라이브 테이블의 결과를 교체합니다.
+    중복 리뷰 판정은 하지 않으며, 이미 review_duplicates에 기록된 중복 리뷰만 키워드 집계에서 제외합니다.
+
+    Args:
+        job_id (str): 작업 식별자
+        update_progress_callback (callable): 진행 상황 업데이트 콜백 함수
+        crawl_workers (int): 상세 크롤링 스레드 수
+        queue_size (int): 단계 사이 큐 크기
+
+    Returns:
+        dict: 발견·크롤링·분석한 카페 수, 실패한 카페 ID, 첫 결과까지 걸린 시간과 전체 소요 시간(초)
+    """
+    api_key = os.getenv("KAKAO_API_KEY", "")
+    if not api_key:
+        raise EnvironmentError("KAKAO_API_KEY 환경변수가 설정되지 않았습니다.")
+
+    grid_rects = pd.read_csv(GRID_RECTS_PATH)
+    print(f"✅ 스트리밍 파이프라인 시작 - 격자 {len(grid_rects)}개, 크롤링 스레드 {crawl_workers}개, 큐 크기 {queue_size}")
+    pipeline = StreamingPipeline(grid_rects, api_key, crawl_workers, queue_size)
+    result = pipeline.run(update_progress_callback)
+    update_progress_callback(100, "completed")
+    return result
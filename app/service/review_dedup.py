@@ -0,0 +1,296 @@
+"""
+이 모듈은 키워드 추출 전에 복사·템플릿 리뷰(이벤트 리뷰, 여러 지점에 같은 글을 올린 리뷰 등)를 찾아
+review_duplicates 테이블에 기록하는 기능을 제공합니다.
+정규화한 리뷰 내용을 문자 n-gram으로 나누어 MinHash 서명을 만들고, LSH 밴드 버킷으로 후보를 찾은 뒤
+서명 유사도가 임계값 이상이면 먼저 등장한 리뷰의 중복으로 표시합니다.
+kakao_reviews는 cafe_id 순으로 스트리밍하므로 카페 내 중복 탐지는 한 카페 분량의 메모리만 사용하고,
+카페 간 중복 탐지는 모든 카페의 밴드 버킷과 서명을 임시 파일의 SQLite 테이블(DiskLshIndex)에 두어
+리뷰 수와 관계없이 SQLite 페이지 캐시(REVIEW_DEDUP_CACHE_MB)만큼의 메모리만 사용합니다.
+
+중복 표시는 리뷰 id가 아니라 (cafe_id, 정규화한 내용의 해시)로 저장합니다. 리뷰 id는 재크롤링(섀도 테이블 교체,
+카페 단위 교체)마다 새로 매겨지지만 내용 해시는 review_token_cache와 같은 값이라 리뷰를 다시 넣어도 그대로 맞습니다.
+카페 안에서 같은 내용이 반복된 리뷰는 duplicate_of가 자기 해시인 행 하나로 기록되고, 키워드 추출은 그 첫 리뷰만 집계합니다.
+"""
+
+import logging
+import os
+import sqlite3
+import tempfile
+import zlib
+
+import numpy as np
+from collections import Counter
+from itertools import groupby
+from pymysql.cursors import SSDictCursor
+
+from app.core.db import get_connection
+from app.service.keyword_extractor import content_hash, normalize_content, reset_keyword_counts
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 3
+NUM_PERM = 64
+BANDS = 8
+ROWS_PER_BAND = NUM_PERM // BANDS
+SIMILARITY_THRESHOLD = 0.8
+# 이보다 짧은 리뷰("맛있어요", "좋아요" 등)는 우연히 같은 경우가 많아 중복 판정에서 제외
+MIN_DEDUP_LENGTH = 20
+INSERT_BATCH_SIZE = 1000
+# 카페 간 중복 탐지용 SQLite 인덱스의 페이지 캐시 크기(MB)
+REVIEW_DEDUP_CACHE_MB = int(os.getenv("REVIEW_DEDUP_CACHE_MB", 64))
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(20240601)
+_PERM_A = _rng.randint(1, _MERSENNE_PRIME, size=NUM_PERM, dtype=np.int64)
+_PERM_B = _rng.randint(0, _MERSENNE_PRIME, size=NUM_PERM, dtype=np.int64)
+
+
+def shingle_hashes(text, size=SHINGLE_SIZE):
+    """정규화된 텍스트의 문자 n-gram 집합을 CRC32 해시 배열로 반환합니다."""
+    if len(text) <= size:
+        shingles = {text}
+    else:
+        shingles = {text[i:i + size] for i in range(len(text) - size + 1)}
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.int64, count=len(shingles))
+
+
+def minhash_signature(text):
+    """정규화된 텍스트의 MinHash 서명(NUM_PERM개의 최솟값)을 반환합니다."""
+    hashes = shingle_hashes(text) % _MERSENNE_PRIME
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def signature_similarity(sig_a, sig_b):
+    """두 MinHash 서명이 일치하는 비율(자카드 유사도 추정치)을 반환합니다."""
+    return float(np.mean(sig_a == sig_b))
+
+
+def band_keys(signature):
+    """서명을 BANDS개의 밴드로 나눈 버킷 키(밴드 번호 1바이트 + 밴드 값) 리스트를 반환합니다."""
+    return [
+        bytes([band]) + signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes()
+        for band in range(BANDS)
+    ]
+
+
+class LshIndex:
+    """
+    MinHash 서명을 BANDS개의 밴드로 나누어 버킷에 담는 LSH 인덱스입니다.
+    같은 버킷에 걸린 후보 중 서명 유사도가 임계값 이상인 첫 리뷰를 원본으로 간주합니다.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.buckets = {}
+        self.signatures = {}
+
+    def find(self, signature):
+        """유사한 원본 리뷰가 있으면 (원본 내용 해시, 유사도)를, 없으면 None을 반환합니다."""
+        checked = set()
+        for key in band_keys(signature):
+            for candidate in self.buckets.get(key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                similarity = signature_similarity(signature, self.signatures[candidate])
+                if similarity >= self.threshold:
+                    return candidate, similarity
+        return None
+
+    def add(self, digest, signature):
+        """원본 리뷰의 내용 해시와 서명을 인덱스에 추가합니다."""
+        self.signatures[digest] = signature
+        for key in band_keys(signature):
+            self.buckets.setdefault(key, []).append(digest)
+
+
+class DiskLshIndex:
+    """
+    LshIndex와 같은 방식으로 후보를 찾되, 밴드 버킷과 서명을 임시 파일의 SQLite 테이블에 두는 LSH 인덱스입니다.
+    카페 간 중복 탐지처럼 전체 리뷰를 담아야 하는 인덱스에 사용하며, 메모리에는 페이지 캐시만 올라갑니다.
+    사용이 끝나면 close()로 임시 파일을 삭제합니다.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, cache_mb=REVIEW_DEDUP_CACHE_MB):
+        self.threshold = threshold
+        self._directory = tempfile.TemporaryDirectory(prefix="review_lsh_")
+        self.db = sqlite3.connect(os.path.join(self._directory.name, "lsh.db"))
+        # 임시 인덱스라 저널·동기화 없이 쓰고, 페이지 캐시 크기로 메모리 사용량을 제한
+        self.db.execute("PRAGMA journal_mode = OFF")
+        self.db.execute("PRAGMA synchronous = OFF")
+        self.db.execute(f"PRAGMA cache_size = -{cache_mb * 1024}")
+        self.db.execute("CREATE TABLE signatures (digest TEXT PRIMARY KEY, signature BLOB NOT NULL)")
+        self.db.execute("CREATE TABLE bands (bucket BLOB NOT NULL, digest TEXT NOT NULL)")
+        self.db.execute("CREATE INDEX idx_bands_bucket ON bands (bucket)")
+        self._placeholders = ", ".join(["?"] * BANDS)
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def find(self, signature):
+        """유사한 원본 리뷰가 있으면 (원본 내용 해시, 유사도)를, 없으면 None을 반환합니다. (먼저 추가된 후보부터 비교)"""
+        # 버킷 인덱스로 후보를 찾고 서명은 기본 키로 읽음 (여러 밴드에 걸린 후보는 한 번만 비교)
+        rows = self.db.execute(
+            f"SELECT b.digest, s.signature FROM bands b JOIN signatures s ON s.digest = b.digest "
+            f"WHERE b.bucket IN ({self._placeholders}) ORDER BY s.rowid",
+            band_keys(signature)
+        )
+        checked = set()
+        for digest, blob in rows:
+            if digest in checked:
+                continue
+            checked.add(digest)
+            similarity = signature_similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+            if similarity >= self.threshold:
+                return digest, similarity
+        return None
+
+    def add(self, digest, signature):
+        """원본 리뷰의 내용 해시와 서명을 인덱스에 추가합니다."""
+        if self.db.execute("INSERT OR IGNORE INTO signatures (digest, signature) VALUES (?, ?)",
+                           (digest, signature.tobytes())).rowcount:
+            self.db.executemany("INSERT INTO bands (bucket, digest) VALUES (?, ?)",
+                                [(key, digest) for key in band_keys(signature)])
+
+    def flush(self):
+        # 쌓인 쓰기를 파일로 내보내 페이지 캐시를 비움 (카페 단위로 호출)
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+        self._directory.cleanup()
+
+
+def iter_reviews_grouped_by_cafe():
+    # kakao_reviews를 cafe_id, id 순으로 스트리밍하며 카페 단위로 (cafe_id, 리뷰 행 리스트) 반환
+    conn = get_connection()
+    try:
+        with conn.cursor(SSDictCursor) as cursor:
+            cursor.execute("SELECT id, cafe_id, content FROM kakao_reviews ORDER BY cafe_id, id")
+            for cafe_id, rows in groupby(cursor, key=lambda row: row["cafe_id"]):
+                yield cafe_id, list(rows)
+    finally:
+        conn.close()
+
+
+def find_duplicates(cafe_reviews, cross_cafe=False):
+    """
+    (cafe_id, 리뷰 행 리스트) 스트림에서 중복 리뷰를 찾아
+    (cafe_id, content_hash, duplicate_of, similarity, scope, skipped) 튜플을 하나씩 반환하는 제너레이터입니다.
+    카페 안에서 먼저 비교하고, cross_cafe가 True이면 다른 카페의 원본 리뷰와도 비교합니다.
+    (카페 간 비교용 인덱스는 디스크에 두므로 메모리는 카페 하나 분량과 페이지 캐시만 사용)
+    같은 카페의 같은 내용 해시는 한 번만 반환하며, skipped는 그 내용의 리뷰 중 키워드 집계에서 빠지는 리뷰 수입니다.
+    (같은 내용이 반복된 경우 첫 리뷰는 집계하므로 반복 횟수 - 1)
+    """
+    global_index = DiskLshIndex() if cross_cafe else None
+    try:
+        yield from _find_duplicates(cafe_reviews, global_index)
+    finally:
+        if global_index is not None:
+            global_index.close()
+
+
+def _find_duplicates(cafe_reviews, global_index):
+    for cafe_id, rows in cafe_reviews:
+        reviews = []
+        for row in rows:
+            if not row["content"]:
+                continue
+            text = normalize_content(row["content"])
+            if len(text) >= MIN_DEDUP_LENGTH:
+                reviews.append((content_hash(text), text))
+        # 같은 내용의 리뷰 수 (중복 표시 한 행이 제외하는 리뷰 수 계산용)
+        copies = Counter(digest for digest, _ in reviews)
+
+        cafe_index = LshIndex()
+        flagged = set()
+        for digest, text in reviews:
+            if digest in flagged:
+                continue
+            signature = minhash_signature(text)
+
+            match = cafe_index.find(signature)
+            if match:
+                flagged.add(digest)
+                # 자기 해시를 가리키는 행(같은 내용의 반복)은 첫 리뷰가 이미 집계되었으므로 나머지만 제외
+                skipped = copies[digest] - 1 if match[0] == digest else copies[digest]
+                yield cafe_id, digest, match[0], match[1], "cafe", skipped
+                continue
+            if global_index is not None:
+                match = global_index.find(signature)
+                if match:
+                    flagged.add(digest)
+                    yield cafe_id, digest, match[0], match[1], "global", copies[digest]
+                    continue
+                global_index.add(digest, signature)
+            cafe_index.add(digest, signature)
+        if global_index is not None:
+            global_index.flush()
+
+
+def duplicate_checksums(cursor):
+    # 카페별 중복 표시의 (행 수, 체크섬) - 판정 전후를 비교해 중복 표시가 바뀐 카페를 찾음
+    cursor.execute(
+        "SELECT cafe_id, COUNT(*) AS flagged, BIT_XOR(CRC32(CONCAT(content_hash, duplicate_of, scope))) AS checksum "
+        "FROM review_duplicates GROUP BY cafe_id"
+    )
+    return {row["cafe_id"]: (row["flagged"], row["checksum"]) for row in cursor.fetchall()}
+
+
+def detect_duplicate_reviews(update_progress_callback=None, cross_cafe=False):
+    """
+    kakao_reviews 전체를 스트리밍하며 중복 리뷰를 찾아 review_duplicates 테이블을 다시 채웁니다.
+    키워드 추출은 review_duplicates에 기록된 리뷰를 건너뛰며, 중복 표시가 바뀐 카페는 extracted_keywords와 워터마크를
+    지워 다음 증분 추출에서 처음부터 다시 집계되게 합니다.
+
+    Args:
+        update_progress_callback (callable): 진행 상황 업데이트 콜백 함수
+        cross_cafe (bool): 다른 카페의 리뷰와도 중복 여부를 비교할지 여부
+
+    반환값:
+        dict: 카페 내/카페 간 중복으로 키워드 집계에서 제외되는 리뷰 수
+              (같은 내용이 반복된 경우 집계하는 첫 리뷰는 빼고, 나머지 반복은 모두 셈)
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            before = duplicate_checksums(cursor)
+            cursor.execute("DELETE FROM review_duplicates")
+
+            removed = {"cafe": 0, "global": 0}
+            batch = []
+            for row in find_duplicates(iter_reviews_grouped_by_cafe(), cross_cafe):
+                removed[row[4]] += row[5]
+                batch.append(row[:5])
+                if len(batch) >= INSERT_BATCH_SIZE:
+                    save_duplicates(cursor, batch)
+                    batch = []
+            save_duplicates(cursor, batch)
+
+            after = duplicate_checksums(cursor)
+            changed = [cafe_id for cafe_id in before.keys() | after.keys() if before.get(cafe_id) != after.get(cafe_id)]
+            reset_keyword_counts(cursor, changed)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    total_removed = removed["cafe"] + removed["global"]
+    logger.info(f"중복 리뷰 제외 - 카페 내 {removed['cafe']}건, 카페 간 {removed['global']}건, "
+                f"중복 표시가 바뀐 카페 {len(changed)}개")
+    if update_progress_callback:
+        update_progress_callback(0, f"dedup_removed_{total_removed}")
+    return {"within_cafe": removed["cafe"], "cross_cafe": removed["global"], "removed": total_removed}
+
+
+def save_duplicates(cursor, rows):
+    # 중복 리뷰 표시를 다중 행으로 저장
+    if not rows:
+        return
+    cursor.executemany(
+        "INSERT INTO review_duplicates (cafe_id, content_hash, duplicate_of, similarity, scope) VALUES (%s, %s, %s, %s, %s)",
+        rows
+    )
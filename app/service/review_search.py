@@ -0,0 +1,685 @@
+"""
+이 모듈은 Kiwi 형태소 분석 결과로 리뷰 역색인을 만들어 BM25 전문 검색을 제공합니다.
+리뷰마다 명사는 형태 그대로, 형용사·동사는 원형(lemma)으로 검색어(term)를 뽑고, 형태소 분석 결과는
+키워드 추출과 같은 review_token_cache를 사용하므로 이미 추출한 리뷰는 다시 분석하지 않습니다.
+
+색인은 세그먼트 단위로 디스크(REVIEW_INDEX_DIR)에 저장합니다. 세그먼트마다
+- 검색어별 posting list: (리뷰 id 간격, 검색어 빈도) 쌍을 가변 길이 정수(varint)로 압축해 한 버퍼에 이어 붙임
+- 문서 표: 리뷰 id 순의 cafe_id와 리뷰 길이(검색어 수)
+를 .npy로 두고 메모리 맵으로 엽니다. 전체 구축은 세그먼트 하나를 새로 만들고, 증분 갱신은 색인한 마지막 리뷰 id 이후의
+리뷰만 새 세그먼트로 덧붙이며, 세그먼트가 REVIEW_INDEX_MAX_SEGMENTS개를 넘으면 하나로 병합합니다.
+매니페스트에는 색인한 kakao_reviews 테이블의 생성 시각과 watermark 이하 리뷰 수를 기록합니다. 크롤링이 테이블을
+섀도 교체해 리뷰 id가 다시 매겨졌거나, 카페 단위 교체·삭제로 이미 색인한 리뷰가 바뀌었으면 증분 갱신 대신 전체 재구축합니다.
+색인 디렉터리는 파일 잠금으로 한 번에 하나의 구축만 쓰게 합니다.
+
+ElasticsearchSink를 넘기면 색인하는 리뷰를 같은 검색어와 함께 Elasticsearch _bulk API로도 보냅니다.
+"""
+
+import fcntl
+import json
+import math
+import os
+import shutil
+import threading
+import time
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+
+import numpy as np
+import requests
+from pymysql.cursors import SSDictCursor
+
+from app.core.db import get_connection
+
+REVIEW_INDEX_DIR = os.getenv("REVIEW_INDEX_DIR", "data/review_index")
+# 증분 갱신으로 쌓인 세그먼트가 이 수를 넘으면 하나로 병합
+REVIEW_INDEX_MAX_SEGMENTS = int(os.getenv("REVIEW_INDEX_MAX_SEGMENTS", 4))
+# 리뷰를 읽어 캐시 조회·형태소 분석을 한 번에 처리하는 단위
+REVIEW_INDEX_CHUNK = 2000
+BM25_K1 = 1.2
+BM25_B = 0.75
+MANIFEST_NAME = "manifest.json"
+
+REVIEW_SEARCH_ES_URL = os.getenv("REVIEW_SEARCH_ES_URL", "http://localhost:9200")
+REVIEW_SEARCH_ES_INDEX = os.getenv("REVIEW_SEARCH_ES_INDEX", "kakao_reviews")
+ES_BULK_DOCS = 1000
+
+REVIEWS_QUERY = "SELECT id, cafe_id, content FROM kakao_reviews WHERE id > %s ORDER BY id"
+REVIEW_COUNT_QUERY = "SELECT COUNT(*) AS total FROM kakao_reviews WHERE id > %s"
+INDEXED_COUNT_QUERY = "SELECT COUNT(*) AS total FROM kakao_reviews WHERE id <= %s"
+# 섀도 교체(RENAME)로 바뀐 테이블은 생성 시각이 다르므로 색인한 테이블의 세대로 사용
+REVIEW_TABLE_CREATED_QUERY = """
+    SELECT CREATE_TIME AS created FROM information_schema.tables
+    WHERE table_schema = DATABASE() AND table_name = 'kakao_reviews'
+"""
+
+
+def review_terms(tokens):
+    """
+    형태소 분석 결과 (form, tag, lemma) 목록에서 검색어별 등장 횟수를 Counter로 반환합니다.
+    키워드 추출(filter_tokens)과 같은 규칙으로 명사는 형태, 형용사·동사는 원형을 사용하고 불용어와 한 글자는 제외합니다.
+    """
+    from app.service.keyword_extractor import NOUN_TAGS, STOPWORDS
+
+    terms = Counter()
+    for form, tag, lemma in tokens:
+        if form in STOPWORDS or len(form) < 2:
+            continue
+        if tag in NOUN_TAGS:
+            terms[form] += 1
+        elif (tag.startswith("VA") or tag.startswith("VV")) and lemma not in STOPWORDS and len(lemma) >= 2:
+            terms[lemma] += 1
+    return terms
+
+
+def varint_sizes(values):
+    # 각 값을 7비트씩 나눠 저장할 때 필요한 바이트 수
+    sizes = np.ones(len(values), dtype=np.int64)
+    for shift in range(7, 63, 7):
+        more = values >= (1 << shift)
+        if not more.any():
+            break
+        sizes += more
+    return sizes
+
+
+def encode_varints(values):
+    """음이 아닌 정수 배열을 가변 길이 정수(하위 7비트부터, 이어지는 바이트는 최상위 비트 1) 바이트 배열로 압축합니다."""
+    values = np.asarray(values, dtype=np.int64)
+    sizes = varint_sizes(values)
+    ends = np.cumsum(sizes)
+    starts = ends - sizes
+    out = np.empty(int(ends[-1]) if len(values) else 0, dtype=np.uint8)
+    for k in range(int(sizes.max()) if len(values) else 0):
+        mask = sizes > k
+        byte = (values[mask] >> (7 * k)) & 0x7F
+        out[starts[mask] + k] = byte | ((sizes[mask] - 1 > k) << 7)
+    return out
+
+
+def decode_varints(data):
+    """encode_varints로 압축한 바이트 배열을 정수 배열로 복원합니다."""
+    data = np.asarray(data, dtype=np.uint8)
+    if not len(data):
+        return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    position = np.arange(len(data)) - np.repeat(starts, ends - starts + 1)
+    return np.add.reduceat((data & 0x7F).astype(np.int64) << (7 * position), starts)
+
+
+class IndexSegment:
+    """
+    리뷰 역색인 세그먼트 하나입니다.
+
+    Args:
+        terms (list[str]): 검색어 ID 순서의 검색어
+        offsets (np.ndarray): 검색어별 posting 바이트 시작 위치 (len(terms) + 1)
+        doc_freq (np.ndarray): 검색어별 문서 빈도
+        postings (np.ndarray): (리뷰 id 간격, 빈도) varint 바이트 버퍼
+        doc_ids / doc_cafe_ids / doc_lengths (np.ndarray): 리뷰 id 순 문서 표
+    """
+
+    ARRAYS = ("offsets", "doc_freq", "postings", "doc_ids", "doc_cafe_ids", "doc_lengths")
+
+    def __init__(self, terms, offsets, doc_freq, postings, doc_ids, doc_cafe_ids, doc_lengths):
+        self.terms = terms
+        self.term_ids = {term: term_id for term_id, term in enumerate(terms)}
+        self.offsets = offsets
+        self.doc_freq = doc_freq
+        self.postings = postings
+        self.doc_ids = doc_ids
+        self.doc_cafe_ids = doc_cafe_ids
+        self.doc_lengths = doc_lengths
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    @property
+    def total_length(self):
+        return int(np.sum(self.doc_lengths, dtype=np.int64))
+
+    def term_postings(self, term):
+        """검색어의 (리뷰 id 배열, 빈도 배열)을 반환합니다. 없는 검색어는 빈 배열입니다."""
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        values = decode_varints(self.postings[self.offsets[term_id]:self.offsets[term_id + 1]])
+        return np.cumsum(values[0::2]), values[1::2]
+
+    def triples(self):
+        """모든 posting을 (검색어 ID, 리뷰 id, 빈도) 배열로 풀어 반환합니다. (세그먼트 병합용)"""
+        values = decode_varints(self.postings)
+        gaps, tfs = values[0::2], values[1::2]
+        doc_freq = np.asarray(self.doc_freq, dtype=np.int64)
+        starts = np.cumsum(doc_freq) - doc_freq
+        sums = np.cumsum(gaps)
+        base = np.zeros(len(doc_freq), dtype=np.int64)
+        present = doc_freq > 0
+        base[present] = sums[starts[present]] - gaps[starts[present]]
+        return np.repeat(np.arange(len(doc_freq)), doc_freq), sums - np.repeat(base, doc_freq), tfs
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(getattr(self, name)))
+        with open(os.path.join(directory, "terms.json"), "w", encoding="utf-8") as f:
+            json.dump(self.terms, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory):
+        with open(os.path.join(directory, "terms.json"), encoding="utf-8") as f:
+            terms = json.load(f)
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in cls.ARRAYS}
+        return cls(terms, **arrays)
+
+
+def build_segment(terms, term_index, review_ids, tfs, doc_ids, doc_cafe_ids, doc_lengths):
+    """
+    (검색어 ID, 리뷰 id, 빈도) posting 배열과 문서 표로 세그먼트를 만듭니다.
+    posting은 검색어 ID, 리뷰 id 순으로 정렬해 검색어마다 리뷰 id 간격과 빈도를 번갈아 varint로 압축합니다.
+    """
+    term_index = np.asarray(term_index, dtype=np.int64)
+    review_ids = np.asarray(review_ids, dtype=np.int64)
+    tfs = np.asarray(tfs, dtype=np.int64)
+    order = np.lexsort((review_ids, term_index))
+    term_index, review_ids, tfs = term_index[order], review_ids[order], tfs[order]
+
+    doc_freq = np.bincount(term_index, minlength=len(terms)).astype(np.int32)
+    starts = np.cumsum(doc_freq, dtype=np.int64) - doc_freq
+    gaps = np.diff(review_ids, prepend=0)
+    present = doc_freq > 0
+    gaps[starts[present]] = review_ids[starts[present]]
+
+    values = np.empty(2 * len(review_ids), dtype=np.int64)
+    values[0::2] = gaps
+    values[1::2] = tfs
+    pair_bytes = varint_sizes(values).reshape(-1, 2).sum(axis=1)
+    term_bytes = np.bincount(term_index, weights=pair_bytes, minlength=len(terms)).astype(np.int64)
+    offsets = np.concatenate([[0], np.cumsum(term_bytes)]).astype(np.int64)
+
+    doc_ids = np.asarray(doc_ids, dtype=np.int64)
+    doc_order = np.argsort(doc_ids, kind="stable")
+    return IndexSegment(
+        list(terms), offsets, doc_freq, encode_varints(values), doc_ids[doc_order],
+        np.asarray(doc_cafe_ids, dtype=np.int64)[doc_order], np.asarray(doc_lengths, dtype=np.int32)[doc_order],
+    )
+
+
+class SegmentBuilder:
+    """리뷰를 하나씩 받아 posting과 문서 표를 압축 배열(array)에 모았다가 세그먼트로 만듭니다."""
+
+    def __init__(self):
+        self.term_ids = {}
+        self.term_index = array("i")
+        self.review_ids = array("q")
+        self.tfs = array("i")
+        self.doc_ids = array("q")
+        self.doc_cafe_ids = array("q")
+        self.doc_lengths = array("i")
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def add(self, review_id, cafe_id, terms):
+        for term, tf in terms.items():
+            self.term_index.append(self.term_ids.setdefault(term, len(self.term_ids)))
+            self.review_ids.append(review_id)
+            self.tfs.append(tf)
+        self.doc_ids.append(review_id)
+        self.doc_cafe_ids.append(cafe_id)
+        self.doc_lengths.append(sum(terms.values()))
+
+    def build(self):
+        return build_segment(list(self.term_ids), self.term_index, self.review_ids, self.tfs,
+                             self.doc_ids, self.doc_cafe_ids, self.doc_lengths)
+
+
+def merge_segments(segments):
+    """여러 세그먼트의 검색어 사전을 합치고 posting과 문서 표를 이어 붙여 세그먼트 하나로 만듭니다."""
+    term_ids = {}
+    parts = []
+    for segment in segments:
+        remap = np.array([term_ids.setdefault(term, len(term_ids)) for term in segment.terms], dtype=np.int64)
+        term_index, review_ids, tfs = segment.triples()
+        parts.append((remap[term_index] if len(remap) else term_index, review_ids, tfs))
+    return build_segment(
+        list(term_ids),
+        np.concatenate([part[0] for part in parts]),
+        np.concatenate([part[1] for part in parts]),
+        np.concatenate([part[2] for part in parts]),
+        np.concatenate([segment.doc_ids for segment in segments]),
+        np.concatenate([segment.doc_cafe_ids for segment in segments]),
+        np.concatenate([segment.doc_lengths for segment in segments]),
+    )
+
+
+class ReviewIndex:
+    """
+    세그먼트들을 묶어 BM25로 검색하는 리뷰 역색인입니다. 문서 수·평균 길이·문서 빈도는 모든 세그먼트를 합산합니다.
+
+    Args:
+        segments (list[IndexSegment]): 세그먼트 목록
+        watermark (int): 색인한 마지막 리뷰 id
+        version (int): 색인을 연 시점의 카페 데이터 버전
+    """
+
+    def __init__(self, segments, watermark=0, version=0):
+        self.segments = segments
+        self.watermark = watermark
+        self.version = version
+        self.doc_count = sum(len(segment) for segment in segments)
+        self.average_length = sum(segment.total_length for segment in segments) / max(self.doc_count, 1)
+
+    def __len__(self):
+        return self.doc_count
+
+    def search(self, terms, cafe_id=None, limit=20, k1=BM25_K1, b=BM25_B):
+        """
+        검색어들로 BM25 점수를 계산해 상위 limit개 리뷰를 반환합니다. cafe_id를 주면 그 카페의 리뷰만 반환합니다.
+
+        반환값:
+            점수 내림차순 [{"review_id", "cafe_id", "score"}, ...]
+        """
+        found_ids, found_cafes, found_scores = [], [], []
+        for term in dict.fromkeys(terms):
+            postings = [(segment, *segment.term_postings(term)) for segment in self.segments]
+            doc_freq = sum(len(review_ids) for _, review_ids, _ in postings)
+            if not doc_freq:
+                continue
+            idf = math.log(1 + (self.doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+            for segment, review_ids, tfs in postings:
+                positions = np.searchsorted(segment.doc_ids, review_ids)
+                cafes = segment.doc_cafe_ids[positions]
+                if cafe_id is not None:
+                    keep = cafes == cafe_id
+                    review_ids, tfs, positions, cafes = review_ids[keep], tfs[keep], positions[keep], cafes[keep]
+                norm = k1 * (1 - b + b * segment.doc_lengths[positions] / max(self.average_length, 1e-9))
+                found_ids.append(review_ids)
+                found_cafes.append(cafes)
+                found_scores.append(idf * tfs * (k1 + 1) / (tfs + norm))
+        if not found_ids:
+            return []
+        review_ids, first, inverse = np.unique(np.concatenate(found_ids), return_index=True, return_inverse=True)
+        if not len(review_ids):
+            return []
+        scores = np.bincount(inverse, weights=np.concatenate(found_scores))
+        cafes = np.concatenate(found_cafes)[first]
+        top = np.arange(len(scores))
+        if len(top) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [{"review_id": int(review_ids[i]), "cafe_id": int(cafes[i]), "score": round(float(scores[i]), 6)}
+                for i in top]
+
+
+def empty_manifest(next_segment=1):
+    return {"segments": [], "watermark": 0, "next_segment": next_segment, "table_created": None, "indexed_reviews": 0}
+
+
+def load_manifest(root=REVIEW_INDEX_DIR):
+    path = os.path.join(root, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return empty_manifest()
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@contextmanager
+def index_lock(root=REVIEW_INDEX_DIR):
+    # 색인 구축 작업이 동시에 같은 디렉터리의 세그먼트·매니페스트를 쓰지 않도록 파일 잠금
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, ".lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def review_table_created(cursor):
+    # 현재 kakao_reviews 테이블의 생성 시각 (문자열, 알 수 없으면 None)
+    cursor.execute(REVIEW_TABLE_CREATED_QUERY)
+    row = cursor.fetchone()
+    return str(row["created"]) if row and row["created"] is not None else None
+
+
+def manifest_matches_reviews(cursor, manifest):
+    """
+    색인이 현재 kakao_reviews에 그대로 이어 붙일 수 있는 상태인지 확인합니다.
+    테이블 생성 시각이 다르면(크롤링 섀도 교체로 리뷰 id 재부여) 또는 watermark 이하 리뷰 수가 색인한 리뷰 수와 다르면
+    (카페 단위 교체·삭제, 늦게 커밋된 리뷰) False를 반환합니다. 빈 색인은 항상 True입니다.
+    """
+    if not manifest["segments"]:
+        return True
+    if manifest.get("table_created") != review_table_created(cursor):
+        return False
+    cursor.execute(INDEXED_COUNT_QUERY, (manifest["watermark"],))
+    return cursor.fetchone()["total"] == manifest.get("indexed_reviews")
+
+
+def save_manifest(manifest, root=REVIEW_INDEX_DIR):
+    # 세그먼트를 모두 쓴 뒤 매니페스트를 원자적으로 교체 (읽는 쪽은 항상 완성된 세그먼트 목록을 봄)
+    tmp_path = os.path.join(root, MANIFEST_NAME + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, os.path.join(root, MANIFEST_NAME))
+
+
+def load_review_index(root=REVIEW_INDEX_DIR, version=0):
+    """매니페스트의 세그먼트들을 메모리 맵으로 열어 색인을 반환합니다. 색인이 없으면 None입니다."""
+    manifest = load_manifest(root)
+    if not manifest["segments"]:
+        return None
+    segments = [IndexSegment.load(os.path.join(root, name)) for name in manifest["segments"]]
+    return ReviewIndex(segments, manifest["watermark"], version)
+
+
+class ElasticsearchSink:
+    """
+    색인하는 리뷰를 Elasticsearch _bulk API로 보내는 선택적 출력입니다. (docker-compose의 elasticsearch 서비스)
+    문서는 리뷰 id를 _id로 쓰므로 다시 보내도 덮어씁니다. terms 필드에는 Kiwi 검색어를 공백으로 이어 넣습니다.
+    """
+
+    def __init__(self, url=REVIEW_SEARCH_ES_URL, index=REVIEW_SEARCH_ES_INDEX, batch_size=ES_BULK_DOCS, session=None):
+        self.url = url.rstrip("/")
+        self.index = index
+        self.batch_size = batch_size
+        self.session = session or requests.Session()
+        self.buffer = []
+        self.sent = 0
+
+    def ensure_index(self, reset=False):
+        """색인이 없으면 매핑과 함께 만듭니다. reset이면 기존 색인을 지우고 새로 만듭니다."""
+        index_url = f"{self.url}/{self.index}"
+        if reset:
+            response = self.session.delete(index_url)
+            if response.status_code not in (200, 404):
+                response.raise_for_status()
+        if self.session.head(index_url).status_code == 404:
+            self.session.put(index_url, json={"mappings": {"properties": {
+                "cafe_id": {"type": "long"},
+                "content": {"type": "text"},
+                "terms": {"type": "text", "analyzer": "whitespace"},
+            }}}).raise_for_status()
+
+    def add(self, review_id, cafe_id, content, terms):
+        self.buffer.append((review_id, {"cafe_id": cafe_id, "content": content, "terms": " ".join(terms)}))
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """버퍼의 문서를 NDJSON 한 번의 _bulk 요청으로 보냅니다. 실패한 문서가 있으면 예외를 발생시킵니다."""
+        if not self.buffer:
+            return
+        lines = []
+        for review_id, document in self.buffer:
+            lines.append(json.dumps({"index": {"_index": self.index, "_id": str(review_id)}}))
+            lines.append(json.dumps(document, ensure_ascii=False))
+        response = self.session.post(f"{self.url}/_bulk", data=("\n".join(lines) + "\n").encode("utf-8"),
+                                     headers={"Content-Type": "application/x-ndjson"})
+        response.raise_for_status()
+        result = response.json()
+        if result.get("errors"):
+            failed = [item for item in result.get("items", []) if next(iter(item.values())).get("error")]
+            raise RuntimeError(f"Elasticsearch bulk 색인 실패 {len(failed)}건: {failed[:3]}")
+        self.sent += len(self.buffer)
+        self.buffer = []
+
+
+def iter_review_chunks(watermark, chunk_size=REVIEW_INDEX_CHUNK):
+    """watermark 이후의 리뷰를 id 순으로 서버 측 커서로 읽어 chunk_size개씩 묶어 반환하는 제너레이터입니다."""
+    conn = get_connection()
+    try:
+        with conn.cursor(SSDictCursor) as cursor:
+            cursor.execute(REVIEWS_QUERY, (watermark,))
+            chunk = []
+            for row in cursor:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+    finally:
+        conn.close()
+
+
+def tokenize_chunk(cursor, chunk, kiwi_factory):
+    """
+    리뷰 묶음의 토큰 목록을 review_token_cache에서 찾고, 없는 리뷰만 Kiwi로 분석해 캐시에 저장합니다.
+
+    반환값:
+        (리뷰 행, 토큰 목록) 리스트 (내용이 없는 리뷰는 빈 토큰), 새로 분석한 리뷰 수
+    """
+    from app.service.keyword_extractor import (
+        analyze_texts,
+        content_hash,
+        load_cached_tokens,
+        normalize_content,
+        save_cached_tokens,
+    )
+
+    hashes = []
+    texts = {}
+    for row in chunk:
+        normalized = normalize_content(row["content"]) if row["content"] else ""
+        digest = content_hash(normalized) if normalized else None
+        hashes.append(digest)
+        if digest:
+            texts[digest] = normalized
+    cached = load_cached_tokens(cursor, texts.keys())
+    misses = [digest for digest in texts if digest not in cached]
+    analyzed = dict(zip(misses, analyze_texts(kiwi_factory(), [texts[digest] for digest in misses]))) if misses else {}
+    save_cached_tokens(cursor, analyzed)
+    tokens = {**cached, **analyzed}
+    return [(row, tokens.get(digest, [])) for row, digest in zip(chunk, hashes)], len(analyzed)
+
+
+def build_review_index(update_progress_callback=None, incremental=False, sink=None, root=REVIEW_INDEX_DIR):
+    """
+    리뷰 역색인을 구축하거나(전체) 마지막으로 색인한 리뷰 id 이후의 리뷰만 새 세그먼트로 덧붙입니다(증분).
+
+    Args:
+        update_progress_callback (callable): 진행 상황 업데이트 콜백 함수
+        incremental (bool): True이면 새 리뷰만 색인 (이미 색인한 리뷰가 바뀌었으면 전체 재구축)
+        sink (ElasticsearchSink): 색인하는 리뷰를 함께 보낼 Elasticsearch 출력 (선택)
+        root (str): 색인 디렉터리
+
+    Returns:
+        dict: 새로 색인한 리뷰 수, 전체 리뷰 수, 세그먼트 수, 전체 재구축 여부, 새로 형태소 분석한 리뷰 수, 소요 시간(초)
+    """
+    with index_lock(root):
+        return _build_review_index(update_progress_callback, incremental, sink, root)
+
+
+def _build_review_index(update_progress_callback, incremental, sink, root):
+    # build_review_index 본문 (색인 디렉터리 잠금을 잡은 상태에서 실행)
+    from app.service.keyword_extractor import Kiwi
+
+    start_time = time.time()
+    manifest = load_manifest(root)
+    previous = set(manifest["segments"])
+
+    conn = get_connection()
+    kiwi = None
+
+    def kiwi_factory():
+        nonlocal kiwi
+        if kiwi is None:
+            kiwi = Kiwi()
+        return kiwi
+
+    builder = SegmentBuilder()
+    analyzed_reviews = 0
+    try:
+        with conn.cursor() as cursor:
+            if incremental and not manifest_matches_reviews(cursor, manifest):
+                print("⚠️ 색인 이후 리뷰가 재적재·교체·삭제되어 증분 갱신 대신 전체 재구축합니다")
+                incremental = False
+            if not incremental:
+                manifest = empty_manifest(manifest["next_segment"])
+            manifest["table_created"] = review_table_created(cursor)
+            if sink is not None:
+                sink.ensure_index(reset=not incremental)
+
+            cursor.execute(REVIEW_COUNT_QUERY, (manifest["watermark"],))
+            total = cursor.fetchone()["total"]
+            print(f"✅ 리뷰 검색 색인 {'증분' if incremental else '전체'} 구축 시작 - 대상 리뷰 {total}건")
+            for chunk in iter_review_chunks(manifest["watermark"]):
+                tokenized, analyzed = tokenize_chunk(cursor, chunk, kiwi_factory)
+                conn.commit()
+                analyzed_reviews += analyzed
+                for row, tokens in tokenized:
+                    terms = review_terms(tokens)
+                    builder.add(row["id"], row["cafe_id"], terms)
+                    if sink is not None:
+                        sink.add(row["id"], row["cafe_id"], row["content"], list(terms))
+                if update_progress_callback:
+                    update_progress_callback(min(int(len(builder) / max(total, 1) * 90), 90),
+                                             f"indexing_review_{len(builder)}")
+        if sink is not None:
+            sink.flush()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    if len(builder):
+        name = f"seg_{manifest['next_segment']:06d}"
+        builder.build().save(os.path.join(root, name))
+        manifest["segments"].append(name)
+        previous.add(name)
+        manifest["next_segment"] += 1
+        manifest["watermark"] = max(manifest["watermark"], int(max(builder.doc_ids)))
+        manifest["indexed_reviews"] = manifest.get("indexed_reviews", 0) + len(builder)
+    if len(manifest["segments"]) > REVIEW_INDEX_MAX_SEGMENTS:
+        name = f"seg_{manifest['next_segment']:06d}"
+        merge_segments([IndexSegment.load(os.path.join(root, segment)) for segment in manifest["segments"]]).save(
+            os.path.join(root, name))
+        manifest["segments"] = [name]
+        manifest["next_segment"] += 1
+    save_manifest(manifest, root)
+
+    # 매니페스트에서 빠진 세그먼트(병합 전 세그먼트 포함) 삭제 (열려 있는 메모리 맵은 닫힐 때까지 그대로 읽힘)
+    for name in previous - set(manifest["segments"]):
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+    index = load_review_index(root)
+    elapsed = round(time.time() - start_time, 2)
+    print(f"✅ 리뷰 검색 색인 완료 - 신규 {len(builder)}건, 전체 {len(index) if index else 0}건, "
+          f"세그먼트 {len(manifest['segments'])}개, 신규 분석 {analyzed_reviews}건, 소요 시간: {elapsed}초")
+    if update_progress_callback:
+        update_progress_callback(100, "completed")
+    return {
+        "indexed_reviews": len(builder),
+        "total_reviews": len(index) if index else 0,
+        "segments": len(manifest["segments"]),
+        "rebuilt": not incremental,
+        "analyzed_reviews": analyzed_reviews,
+        "elasticsearch_sent": sink.sent if sink is not None else 0,
+        "elapsed_seconds": elapsed,
+    }
+
+
+def fetch_reviews(review_ids, conn=None):
+    """리뷰 id들의 내용을 kakao_reviews에서 조회해 {id: 리뷰 dict}로 반환합니다. (삭제된 리뷰는 빠짐)"""
+    if not review_ids:
+        return {}
+    conn = conn or get_connection()
+    try:
+        with conn.cursor() as cursor:
+            placeholders = ", ".join(["%s"] * len(review_ids))
+            cursor.execute(
+                f"SELECT id, cafe_id, content, rating, created_at FROM kakao_reviews WHERE id IN ({placeholders})",
+                list(review_ids)
+            )
+            return {row["id"]: row for row in cursor.fetchall()}
+    finally:
+        conn.close()
+
+
+# API 프로세스의 색인과 질의 분석용 Kiwi (Kiwi 분석은 잠금으로 한 번에 하나씩)
+_index = None
+_loaded = False
+_load_lock = threading.Lock()
+_query_kiwi = None
+_kiwi_lock = threading.Lock()
+
+
+def query_terms(text):
+    """검색어 문장을 색인과 같은 방식으로 형태소 분석해 검색어 리스트로 반환합니다."""
+    global _query_kiwi
+    # 형태소 분석 모듈(kiwipiepy)은 API 프로세스 import 시간을 늘리지 않도록 첫 질의에서 로딩
+    from app.service.keyword_extractor import Kiwi, analyze_texts, normalize_content
+
+    normalized = normalize_content(text)
+    if not normalized:
+        return []
+    with _kiwi_lock:
+        if _query_kiwi is None:
+            _query_kiwi = Kiwi()
+        tokens = analyze_texts(_query_kiwi, [normalized])[0]
+    return list(review_terms(tokens))
+
+
+def open_review_index(root=REVIEW_INDEX_DIR, version=0):
+    """
+    API 프로세스용: 디스크의 색인을 엽니다. 색인한 뒤 kakao_reviews가 섀도 교체되었으면(리뷰 id 재부여)
+    posting의 리뷰 id가 다른 리뷰를 가리키므로, 다음 색인 구축 전까지 색인을 쓰지 않고 None을 반환합니다.
+    """
+    index = load_review_index(root, version)
+    if index is None:
+        return None
+    conn = get_connection()
+    try:
+        with conn.cursor() as cursor:
+            created = review_table_created(cursor)
+    finally:
+        conn.close()
+    if created != load_manifest(root).get("table_created"):
+        print("⚠️ 리뷰 테이블이 색인 이후 다시 만들어져 리뷰 검색 색인을 사용하지 않습니다 (색인 재구축 필요)")
+        return None
+    return index
+
+
+def get_review_index():
+    """현재 리뷰 색인을 반환합니다. 아직 열지 않았으면 디스크에서 엽니다. (색인이 없거나 쓸 수 없으면 None)"""
+    global _index, _loaded
+    if not _loaded:
+        with _load_lock:
+            if not _loaded:
+                _index = open_review_index()
+                _loaded = True
+    return _index
+
+
+def refresh_review_index(version=0):
+    """디스크의 매니페스트를 다시 읽어 현재 리뷰 색인을 교체합니다. (카페 데이터 버전이 바뀔 때 호출)"""
+    global _index, _loaded
+    with _load_lock:
+        _index = open_review_index(version=version)
+        _loaded = True
+    return _index
+
+
+def search_reviews(text, cafe_id=None, limit=20):
+    """
+    검색어 문장으로 리뷰를 BM25 검색하고, 결과 리뷰의 내용을 DB에서 채워 반환합니다.
+
+    반환값:
+        dict: 검색어(terms), 색인 리뷰 수, 결과 리뷰 리스트 (점수 내림차순)
+    """
+    index = get_review_index()
+    terms = query_terms(text)
+    if index is None or not terms:
+        return {"terms": terms, "indexed_reviews": len(index) if index else 0, "reviews": []}
+    hits = index.search(terms, cafe_id, limit)
+    reviews = fetch_reviews([hit["review_id"] for hit in hits])
+    return {
+        "terms": terms,
+        "indexed_reviews": len(index),
+        "reviews": [{**reviews[hit["review_id"]], "score": hit["score"]} for hit in hits if hit["review_id"] in reviews],
+    }
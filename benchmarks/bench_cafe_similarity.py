@@ -0,0 +1,60 @@
+"""
+카페 유사도 top-K 계산 벤치마크 스크립트입니다.
+무작위 카페 × 키워드 빈도(지프 분포 어휘)로 CSR 프로필 생성, TF-IDF 가중, 묶음 행렬 곱 top-K 계산 시간과
+추천 스냅샷의 키워드 질의 지연(p50/p99)을 측정합니다. DB 없이 실행됩니다.
+
+실행:
+    python benchmarks/bench_cafe_similarity.py --cafes 5000 20000 --keywords 300 --vocabulary 30000 --top-k 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.service.cafe_similarity import SimilarityIndex, build_keyword_profiles, fit_tfidf, similarity_rows, top_k_similar
+
+
+def make_rows(rng, cafes, keywords_per_cafe, vocabulary):
+    # 카페마다 지프 분포로 키워드를 뽑아 (cafe_id, keyword, count) 행을 cafe_id 순으로 생성
+    for cafe_id in range(cafes):
+        ids, counts = np.unique(np.minimum(rng.zipf(1.3, keywords_per_cafe), vocabulary) - 1, return_counts=True)
+        for keyword_id, count in zip(ids, counts):
+            yield cafe_id, f"kw{keyword_id}", int(count)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cafes", type=int, nargs="+", default=[5000, 20000])
+    parser.add_argument("--keywords", type=int, default=300)
+    parser.add_argument("--vocabulary", type=int, default=30000)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(0)
+    for cafes in args.cafes:
+        start = time.perf_counter()
+        profiles = build_keyword_profiles(make_rows(rng, cafes, args.keywords, args.vocabulary))
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        weights, _ = fit_tfidf(profiles.counts)
+        neighbors, scores = top_k_similar(weights, args.top_k)
+        rows = similarity_rows(profiles.cafe_ids, neighbors, scores)
+        top_k_seconds = time.perf_counter() - start
+        print(f"[카페 {cafes}] 어휘 {len(profiles.vocabulary)}개, 비영 원소 {weights.nnz}개 - "
+              f"프로필 {build_seconds:.2f}초, TF-IDF+top-{args.top_k} {top_k_seconds:.2f}초, 저장 행 {len(rows)}개")
+
+        index = SimilarityIndex(profiles, {})
+        latencies = []
+        for _ in range(args.queries):
+            keywords = [f"kw{keyword_id}" for keyword_id in rng.randint(0, 200, size=3)]
+            start = time.perf_counter()
+            index.query(keywords)
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(f"  키워드 질의 p50 {np.percentile(latencies, 50):.2f}ms, p99 {np.percentile(latencies, 99):.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
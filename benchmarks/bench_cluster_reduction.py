@@ -0,0 +1,71 @@
+"""
+HDBSCAN 전 차원 축소(PCA, 희소 랜덤 투영) 벤치마크 스크립트입니다.
+실제 카페별 키워드로 기존 방식(정규화·축소 없는 원본 임베딩)과 각 설정의 클러스터링 시간,
+그리고 기존 라벨과의 일치도(ARI)를 비교합니다.
+
+실행:
+    python benchmarks/bench_cluster_reduction.py --cafes 500 --dims 16 32 48 64
+"""
+
+import argparse
+import time
+
+import numpy as np
+from hdbscan import HDBSCAN
+from sklearn.metrics import adjusted_rand_score
+
+from app.core.model_registry import model_key
+from app.service.embedding_store import get_embedding_store
+from app.service.keyword_clustering import (
+    MODEL_NAME,
+    ensure_keyword_embeddings,
+    fetch_keywords_grouped_by_cafe,
+    fit_embedding_reducer,
+    project_embeddings,
+)
+
+
+def cluster_all(cafe_embeddings):
+    # 모든 카페를 클러스터링하고 (라벨 리스트, 걸린 시간)을 반환
+    start = time.perf_counter()
+    labels = [
+        HDBSCAN(min_cluster_size=2, min_samples=1, cluster_selection_epsilon=0.1).fit_predict(embeddings)
+        for embeddings in cafe_embeddings
+    ]
+    return labels, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cafes", type=int, default=500, help="비교할 카페 수 (키워드 3개 이상인 카페)")
+    parser.add_argument("--dims", type=int, nargs="+", default=[16, 32, 48, 64])
+    args = parser.parse_args()
+
+    cafe_keywords = []
+    for _, keywords in fetch_keywords_grouped_by_cafe():
+        if len(keywords) > 2:
+            cafe_keywords.append(keywords)
+        if len(cafe_keywords) >= args.cafes:
+            break
+    vocabulary = {kw for keywords in cafe_keywords for kw in keywords}
+    print(f"카페 수: {len(cafe_keywords)}, 어휘 수: {len(vocabulary)}")
+
+    store = get_embedding_store(model_key(MODEL_NAME))
+    ensure_keyword_embeddings(store, vocabulary)
+    raw = [store.vectors(store.lookup(keywords)) for keywords in cafe_keywords]
+
+    baseline, baseline_time = cluster_all(raw)
+    print(f"[기존] {baseline_time:.2f}초")
+
+    configs = [("none", None)] + [(method, dim) for method in ("pca", "random") for dim in args.dims]
+    for method, dim in configs:
+        reducer = fit_embedding_reducer(store, vocabulary, method, dim) if dim else None
+        projected = [project_embeddings(embeddings, reducer) for embeddings in raw]
+        labels, elapsed = cluster_all(projected)
+        scores = [adjusted_rand_score(a, b) for a, b in zip(baseline, labels)]
+        name = f"{method}-{dim}" if dim else "정규화만"
+        print(f"[{name}] {elapsed:.2f}초 (x{baseline_time / elapsed:.1f}), ARI 평균 {np.mean(scores):.4f}, 최소 {np.min(scores):.4f}")
+
+
+if __name__ == "__main__":
+    main()
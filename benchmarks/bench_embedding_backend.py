@@ -0,0 +1,89 @@
+"""
+키워드 임베딩 백엔드(PyTorch vs ONNX int8) 벤치마크 스크립트입니다.
+extracted_keywords의 키워드 어휘(또는 --vocab-file)로 두 백엔드의 처리량(keywords/sec),
+벡터 코사인 일치도, 카페별 HDBSCAN 클러스터 결과 일치도(ARI)를 비교합니다.
+
+실행:
+    python benchmarks/bench_embedding_backend.py --cafes 200
+"""
+
+import argparse
+import time
+from collections import defaultdict
+
+import numpy as np
+from hdbscan import HDBSCAN
+from sklearn.metrics import adjusted_rand_score
+
+from app.core.db import get_connection
+from app.core.model_registry import DEFAULT_MODEL_NAME, get_model
+
+
+def load_cafe_keywords(limit_cafes):
+    # 카페별 키워드 조회 (최대 limit_cafes개 카페)
+    conn = get_connection()
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT cafe_id, keyword FROM extracted_keywords ORDER BY cafe_id")
+        rows = cursor.fetchall()
+    conn.close()
+    cafe_keywords = defaultdict(list)
+    for row in rows:
+        if row["cafe_id"] not in cafe_keywords and len(cafe_keywords) >= limit_cafes:
+            continue
+        cafe_keywords[row["cafe_id"]].append(row["keyword"])
+    return cafe_keywords
+
+
+def timed_encode(model, keywords, batch_size):
+    start = time.perf_counter()
+    embeddings = np.asarray(model.encode(keywords, batch_size=batch_size, show_progress_bar=False), dtype=np.float32)
+    return embeddings, time.perf_counter() - start
+
+
+def cluster_labels(embeddings):
+    return HDBSCAN(min_cluster_size=2, min_samples=1, cluster_selection_epsilon=0.1).fit_predict(embeddings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--cafes", type=int, default=200, help="클러스터 일치도를 비교할 카페 수")
+    parser.add_argument("--vocab-file", help="DB 대신 사용할 키워드 목록 파일 (한 줄에 하나)")
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    cafe_keywords = {} if args.vocab_file else load_cafe_keywords(args.cafes)
+    if args.vocab_file:
+        with open(args.vocab_file, encoding="utf-8") as f:
+            vocabulary = sorted({line.strip() for line in f if line.strip()})
+    else:
+        vocabulary = sorted({kw for keywords in cafe_keywords.values() for kw in keywords})
+    print(f"어휘 수: {len(vocabulary)}")
+
+    results = {}
+    for backend in ("torch", "onnx"):
+        model = get_model(args.model, backend)
+        model.encode(vocabulary[:args.batch_size], batch_size=args.batch_size)  # 워밍업
+        embeddings, elapsed = timed_encode(model, vocabulary, args.batch_size)
+        results[backend] = embeddings
+        print(f"[{backend}] {elapsed:.2f}초, {len(vocabulary) / elapsed:.1f} keywords/sec")
+
+    torch_vectors, onnx_vectors = results["torch"], results["onnx"]
+    cosine = (torch_vectors * onnx_vectors).sum(axis=1) / (
+        np.linalg.norm(torch_vectors, axis=1) * np.linalg.norm(onnx_vectors, axis=1)
+    )
+    print(f"코사인 일치도: 평균 {cosine.mean():.4f}, 최소 {cosine.min():.4f}")
+
+    row_of = {keyword: row for row, keyword in enumerate(vocabulary)}
+    scores = []
+    for keywords in cafe_keywords.values():
+        if len(keywords) <= 2:
+            continue
+        rows = [row_of[kw] for kw in keywords]
+        scores.append(adjusted_rand_score(cluster_labels(torch_vectors[rows]), cluster_labels(onnx_vectors[rows])))
+    if scores:
+        print(f"카페별 클러스터 일치도(ARI): 평균 {np.mean(scores):.4f}, 최소 {np.min(scores):.4f} ({len(scores)}개 카페)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+키워드 벡터 인덱스(IVF) 검색 벤치마크 스크립트입니다.
+무작위 군집 임베딩으로 만든 임시 임베딩 저장소에서 IVF 검색과 전체 탐색의 지연(p50/p99)과 recall@k를 nprobe별로 비교합니다.
+모델이나 DB 없이 실행됩니다.
+
+실행:
+    python benchmarks/bench_keyword_index.py --keywords 50000 --dim 768 --nprobe 4 8 16 --queries 500
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from app.service.embedding_store import KeywordEmbeddingStore
+from app.service.keyword_index import normalize_rows, train_keyword_index
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keywords", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(0)
+    centers = rng.randn(500, args.dim).astype(np.float32)
+    with tempfile.TemporaryDirectory() as root:
+        store = KeywordEmbeddingStore("bench/model", root=root)
+        store.ensure([f"kw{i}" for i in range(args.keywords)],
+                     lambda batch: centers[rng.randint(0, len(centers), len(batch))] + 0.5 * rng.randn(len(batch), args.dim))
+
+        start = time.perf_counter()
+        index = train_keyword_index(store)
+        print(f"[키워드 {args.keywords}, dim {args.dim}] 학습·배정 {time.perf_counter() - start:.2f}초, 리스트 {index.nlist}개")
+
+        queries = store.vectors(rng.randint(0, args.keywords, args.queries)) + 0.3 * rng.randn(args.queries, args.dim)
+        vectors = normalize_rows(store.vectors(np.arange(args.keywords)))
+        latencies, exact = [], []
+        for query in queries:
+            start = time.perf_counter()
+            scores = vectors @ normalize_rows(query.reshape(1, -1))[0]
+            exact.append({store.keywords[row] for row in np.argsort(-scores)[:args.k]})
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(f"  전체 탐색: p50 {np.percentile(latencies, 50):.2f}ms, p99 {np.percentile(latencies, 99):.2f}ms")
+
+        for nprobe in args.nprobe:
+            latencies, recall = [], []
+            for query, expected in zip(queries, exact):
+                start = time.perf_counter()
+                found = index.search(query, args.k, nprobe, min_similarity=-1)
+                latencies.append((time.perf_counter() - start) * 1000)
+                recall.append(len(expected & {keyword for keyword, _ in found}) / args.k)
+            print(f"  IVF nprobe={nprobe}: p50 {np.percentile(latencies, 50):.2f}ms, "
+                  f"p99 {np.percentile(latencies, 99):.2f}ms, recall@{args.k} {np.mean(recall):.3f}")
+
+
+if __name__ == "__main__":
+    main()
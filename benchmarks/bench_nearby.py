@@ -0,0 +1,57 @@
+"""
+주변 카페 조회 지연 벤치마크 스크립트입니다.
+제주도 범위에 무작위로 배치한 카페로 격자 해시 인덱스(CafeIndex.nearby)와 전체 카페 거리 계산(전체 스캔)의 p50/p99 지연을 비교합니다.
+DB나 Redis 없이 실행됩니다.
+
+실행:
+    python benchmarks/bench_nearby.py --cafes 5000 50000 --radius 500 1000 3000 --requests 2000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.service.cafe_index import CafeIndex, haversine_m
+
+
+def full_scan(index, lat, lon, radius_m, limit=50):
+    # 비교 기준: 모든 카페와의 거리를 계산한 뒤 반경 안의 카페를 정렬
+    distances = haversine_m(lat, lon, index.lats, index.lons)
+    inside = np.flatnonzero(distances <= radius_m)
+    return inside[np.argsort(distances[inside], kind="stable")][:limit]
+
+
+def measure(fn, points):
+    latencies = []
+    for lat, lon in points:
+        start = time.perf_counter()
+        fn(lat, lon)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cafes", type=int, nargs="+", default=[5000, 50000])
+    parser.add_argument("--radius", type=float, nargs="+", default=[500, 1000, 3000])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(0)
+    for count in args.cafes:
+        cafes = [{"id": i, "lat": 33.2 + rng.rand() * 0.35, "lon": 126.15 + rng.rand() * 0.8, "keywords": []} for i in range(count)]
+        start = time.perf_counter()
+        index = CafeIndex(cafes)
+        print(f"[카페 {count}] 인덱스 생성 {time.perf_counter() - start:.2f}초, 격자 칸 {len(index.cells)}개")
+        points = np.column_stack([33.2 + rng.rand(args.requests) * 0.35, 126.15 + rng.rand(args.requests) * 0.8])
+        for radius in args.radius:
+            for name, fn in (("grid", lambda lat, lon: index.nearby(lat, lon, radius)),
+                             ("scan", lambda lat, lon: full_scan(index, lat, lon, radius))):
+                latencies = measure(fn, points)
+                print(f"  반경 {radius:>6.0f}m / {name}: p50 {np.percentile(latencies, 50):.3f}ms "
+                      f"p99 {np.percentile(latencies, 99):.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+대표 키워드 선택 마이크로벤치마크 스크립트입니다.
+클러스터마다 dict와 cosine_distances를 쓰던 기존 구현과, 라벨 인덱스 누적 연산 기반의 현재 구현의
+실행 시간과 선택 결과 일치 여부를 임의 데이터로 비교합니다.
+
+실행:
+    python benchmarks/bench_representative_keywords.py --cafes 2000
+"""
+
+import argparse
+import time
+from collections import defaultdict
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_distances
+
+from app.service.keyword_clustering import extract_representative_keywords, keyword_tfidf_scores
+
+
+def extract_representative_keywords_loop(cafe_id, cluster_labels, keywords, embeddings, tfidf_scores_per_cafe):
+    # 기존 구현 (클러스터별 파이썬 루프)
+    cluster_to_keywords = defaultdict(list)
+    cluster_to_vectors = defaultdict(list)
+    for keyword, label, vector in zip(keywords, cluster_labels, embeddings):
+        if label == -1:
+            continue
+        cluster_to_keywords[label].append(keyword)
+        cluster_to_vectors[label].append(vector)
+
+    representative_data = []
+    for cluster_id, vectors in cluster_to_vectors.items():
+        center = np.mean(vectors, axis=0).reshape(1, -1)
+        distances = cosine_distances(vectors, center).flatten()
+        cluster_keywords = cluster_to_keywords[cluster_id]
+        cluster_tfidf = np.array([tfidf_scores_per_cafe.get(kw, 0) for kw in cluster_keywords])
+        if len(distances) > 1 and distances.max() != distances.min():
+            norm_distances = (distances - distances.min()) / (distances.max() - distances.min())
+        else:
+            norm_distances = np.zeros_like(distances)
+        if len(cluster_tfidf) > 1 and cluster_tfidf.max() != cluster_tfidf.min():
+            norm_tfidf = (cluster_tfidf - cluster_tfidf.min()) / (cluster_tfidf.max() - cluster_tfidf.min())
+        else:
+            norm_tfidf = np.zeros_like(cluster_tfidf)
+        combined_score = 0.5 * norm_tfidf + 0.5 * (1 - norm_distances)
+        representative_data.append((cafe_id, cluster_id, cluster_keywords[np.argmax(combined_score)], len(cluster_keywords)))
+    return representative_data
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cafes", type=int, default=2000)
+    parser.add_argument("--dim", type=int, default=768)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(0)
+    vocabulary = [f"키워드{i} 표현{i % 97}" for i in range(5000)]
+    tfidf_vectorizer = TfidfVectorizer().fit(vocabulary)
+    cafes = []
+    for cafe_id in range(args.cafes):
+        size = rng.randint(3, 200)
+        keywords = [vocabulary[i] for i in rng.choice(len(vocabulary), size, replace=False)]
+        labels = rng.randint(-1, max(2, size // 4), size=size)
+        cafes.append((cafe_id, keywords, labels, rng.rand(size, args.dim).astype(np.float32)))
+
+    # 기존: 카페마다 transform 후 행 단위 합산 + 클러스터별 루프
+    start = time.perf_counter()
+    before = []
+    for cafe_id, keywords, labels, embeddings in cafes:
+        tfidf_matrix = tfidf_vectorizer.transform(keywords)
+        scores = {kw: tfidf_matrix[idx].sum() for idx, kw in enumerate(keywords)}
+        before.append(extract_representative_keywords_loop(cafe_id, labels, keywords, embeddings, scores))
+    before_time = time.perf_counter() - start
+
+    # 현재: 어휘 전체 점수 벡터 한 번 계산 + 카페별 배열 연산
+    start = time.perf_counter()
+    rows = {keyword: row for row, keyword in enumerate(vocabulary)}
+    vocabulary_scores = keyword_tfidf_scores(tfidf_vectorizer, vocabulary)
+    after = []
+    for cafe_id, keywords, labels, embeddings in cafes:
+        scores = vocabulary_scores[[rows[kw] for kw in keywords]]
+        after.append(extract_representative_keywords(cafe_id, labels, keywords, embeddings, scores))
+    after_time = time.perf_counter() - start
+
+    mismatches = sum(a != b for a, b in zip(before, after))
+    print(f"기존 {before_time:.2f}초, 현재 {after_time:.2f}초 (x{before_time / after_time:.1f})")
+    print(f"선택 결과가 다른 카페: {mismatches}/{len(cafes)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+리뷰 역색인 벤치마크 스크립트입니다.
+무작위 리뷰(지프 분포 검색어)로 세그먼트 구축 시간과 압축 크기, 세그먼트 병합 시간,
+BM25 검색 지연(p50/p99, 전체·카페 필터)을 측정합니다. DB와 Kiwi 없이 실행됩니다.
+
+실행:
+    python benchmarks/bench_review_search.py --reviews 100000 500000 --vocabulary 50000 --cafes 5000
+"""
+
+import argparse
+import time
+from collections import Counter
+
+import numpy as np
+
+from app.service.review_search import ReviewIndex, SegmentBuilder, merge_segments
+
+
+def build_segments(rng, reviews, vocabulary, cafes, terms_per_review, segments):
+    # 리뷰를 id 순으로 segments개 구간에 나눠 세그먼트마다 따로 구축
+    built = []
+    bounds = np.linspace(0, reviews, segments + 1).astype(int)
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        builder = SegmentBuilder()
+        for review_id in range(begin + 1, end + 1):
+            words = np.minimum(rng.zipf(1.2, rng.randint(3, terms_per_review)), vocabulary)
+            builder.add(review_id, int(rng.randint(cafes)), Counter(f"t{word}" for word in words))
+        built.append(builder.build())
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, nargs="+", default=[100000, 500000])
+    parser.add_argument("--vocabulary", type=int, default=50000)
+    parser.add_argument("--cafes", type=int, default=5000)
+    parser.add_argument("--terms", type=int, default=30)
+    parser.add_argument("--segments", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(0)
+    for reviews in args.reviews:
+        start = time.perf_counter()
+        segments = build_segments(rng, reviews, args.vocabulary, args.cafes, args.terms, args.segments)
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        merged = merge_segments(segments)
+        merge_seconds = time.perf_counter() - start
+        postings = int(np.sum(merged.doc_freq, dtype=np.int64))
+        print(f"[리뷰 {reviews}] 검색어 {len(merged.terms)}개, posting {postings}개, "
+              f"압축 {len(merged.postings) / 1e6:.1f}MB ({len(merged.postings) / max(postings, 1):.2f}바이트/posting) - "
+              f"구축 {build_seconds:.2f}초, 세그먼트 {args.segments}개 병합 {merge_seconds:.2f}초")
+
+        for name, index in (("세그먼트 1개", ReviewIndex([merged])), (f"세그먼트 {args.segments}개", ReviewIndex(segments))):
+            for cafe_filter in (False, True):
+                latencies = []
+                for _ in range(args.queries):
+                    terms = [f"t{word}" for word in rng.randint(1, 500, size=2)]
+                    cafe_id = int(rng.randint(args.cafes)) if cafe_filter else None
+                    start = time.perf_counter()
+                    index.search(terms, cafe_id)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                print(f"  {name}{' 카페 필터' if cafe_filter else ''} 검색 p50 {np.percentile(latencies, 50):.2f}ms, "
+                      f"p99 {np.percentile(latencies, 99):.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+스키마 마이그레이션 전후의 주요 조회 쿼리 실행 계획과 시간을 비교하는 벤치마크 스크립트입니다.
+별도 데이터베이스에 sql/init.sql 스키마를 만들고 합성 데이터(기본 리뷰 100만 건)를 넣은 뒤,
+마이그레이션 적용 전과 후에 같은 쿼리의 EXPLAIN 결과(type, key, rows, Extra)와 평균 실행 시간을 출력합니다.
+
+실행 (DB_* 환경 변수의 서버에 --database 데이터베이스를 새로 만들어 사용):
+    python benchmarks/bench_schema_queries.py --reviews 1000000 --cafes 20000
+    python benchmarks/bench_schema_queries.py --partition   # kakao_reviews 파티셔닝까지 적용
+"""
+
+import argparse
+import random
+import time
+
+from app.core.db import get_connection
+from app.core.migrations import apply_migrations, split_statements
+
+INSERT_BATCH_ROWS = 5000
+SYLLABLES = "가나다라마바사아자차카타파하커피뷰맛집디저트분위기친절"
+
+QUERIES = [
+    ("카페별 리뷰 스캔", "SELECT id, content FROM kakao_reviews WHERE cafe_id = %s ORDER BY id", lambda cafe_id: (cafe_id,)),
+    ("워터마크 이후 리뷰", "SELECT id, content FROM kakao_reviews WHERE cafe_id = %s AND id > %s", lambda cafe_id: (cafe_id, 0)),
+    ("키워드 조회 (cafe_id, keyword)", "SELECT count FROM extracted_keywords WHERE cafe_id = %s AND keyword = %s", lambda cafe_id: (cafe_id, "커피")),
+    ("클러스터 키워드 조회", "SELECT keyword, count FROM clustered_keywords WHERE cafe_id = %s AND cluster_id = %s", lambda cafe_id: (cafe_id, 0)),
+    ("카페별 클러스터 결과 삭제 대상", "SELECT COUNT(*) AS c FROM clustered_keywords WHERE cafe_id IN (%s, %s)", lambda cafe_id: (cafe_id, cafe_id + 1)),
+]
+# 한 번만 실행하는 전체 스캔 쿼리 (클러스터링 입력 스트리밍)
+FULL_SCAN_QUERIES = [
+    ("카페별 키워드 스트리밍", "SELECT cafe_id, keyword, count FROM extracted_keywords ORDER BY cafe_id"),
+]
+
+
+def random_word(rng, length):
+    return "".join(rng.choice(SYLLABLES) for _ in range(length))
+
+
+def insert_rows(conn, sql, rows):
+    with conn.cursor() as cursor:
+        for start in range(0, len(rows), INSERT_BATCH_ROWS):
+            cursor.executemany(sql, rows[start:start + INSERT_BATCH_ROWS])
+    conn.commit()
+
+
+def create_dataset(conn, database, num_cafes, num_reviews, keywords_per_cafe, seed=0):
+    # 벤치마크 전용 데이터베이스에 기준 스키마를 만들고 합성 데이터를 채움
+    rng = random.Random(seed)
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS {database}")
+        cursor.execute(f"CREATE DATABASE {database} DEFAULT CHARACTER SET utf8mb4")
+        cursor.execute(f"USE {database}")
+        with open("sql/init.sql", encoding="utf-8") as f:
+            for statement in split_statements(f.read()):
+                cursor.execute(statement)
+    conn.commit()
+
+    cafe_ids = [1000000 + i for i in range(num_cafes)]
+    insert_rows(conn, "INSERT INTO cafes (id, title) VALUES (%s, %s)", [(cafe_id, f"카페{cafe_id}") for cafe_id in cafe_ids])
+
+    start = time.perf_counter()
+    reviews = [(rng.choice(cafe_ids), random_word(rng, rng.randint(10, 60)), rng.randint(1, 5)) for _ in range(num_reviews)]
+    # 크롤링처럼 카페 순서가 섞인 채로 삽입
+    insert_rows(conn, "INSERT INTO kakao_reviews (cafe_id, content, rating) VALUES (%s, %s, %s)", reviews)
+    print(f"리뷰 {num_reviews}건 삽입: {time.perf_counter() - start:.1f}초")
+
+    vocabulary = ["커피"] + [random_word(rng, 2) for _ in range(5000)]
+    extracted, clustered = [], []
+    for cafe_id in cafe_ids:
+        for keyword in set(rng.sample(vocabulary, keywords_per_cafe)) | {"커피"}:
+            count = rng.randint(1, 50)
+            extracted.append((cafe_id, keyword, count))
+            clustered.append((str(cafe_id), rng.randint(0, 5), keyword, count))
+    insert_rows(conn, "INSERT INTO extracted_keywords (cafe_id, keyword, count) VALUES (%s, %s, %s)", extracted)
+    insert_rows(conn, "INSERT INTO clustered_keywords (cafe_id, cluster_id, keyword, count) VALUES (%s, %s, %s, %s)", clustered)
+    with conn.cursor() as cursor:
+        for table in ("kakao_reviews", "extracted_keywords", "clustered_keywords"):
+            cursor.execute(f"ANALYZE TABLE {table}")
+            cursor.fetchall()
+    conn.commit()
+    return cafe_ids
+
+
+def explain(cursor, sql, args=None):
+    # EXPLAIN 결과를 "table:type key=... rows=... Extra" 형태로 요약
+    cursor.execute(f"EXPLAIN {sql}", args)
+    return "; ".join(
+        f"{row['table']}:{row['type']} key={row['key']} rows={row['rows']} {row['Extra'] or ''}".strip()
+        for row in cursor.fetchall()
+    )
+
+
+def run_queries(conn, cafe_ids, repeats, seed=1):
+    # 쿼리별 (이름, 실행 계획, 평균 ms) 리스트를 반환
+    rng = random.Random(seed)
+    sample = [rng.choice(cafe_ids[:-1]) for _ in range(repeats)]
+    results = []
+    with conn.cursor() as cursor:
+        for name, sql, make_args in QUERIES:
+            plan = explain(cursor, sql, make_args(sample[0]))
+            start = time.perf_counter()
+            for cafe_id in sample:
+                cursor.execute(sql, make_args(cafe_id))
+                cursor.fetchall()
+            results.append((name, plan, (time.perf_counter() - start) / repeats * 1000))
+        for name, sql in FULL_SCAN_QUERIES:
+            plan = explain(cursor, sql)
+            start = time.perf_counter()
+            cursor.execute(sql)
+            cursor.fetchall()
+            results.append((name, plan, (time.perf_counter() - start) * 1000))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database", default="bench_schema")
+    parser.add_argument("--reviews", type=int, default=1000000)
+    parser.add_argument("--cafes", type=int, default=20000)
+    parser.add_argument("--keywords-per-cafe", type=int, default=30)
+    parser.add_argument("--repeats", type=int, default=200, help="카페 단위 쿼리 반복 횟수")
+    parser.add_argument("--partition", action="store_true", help="선택 마이그레이션 partition_kakao_reviews도 적용")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        cafe_ids = create_dataset(conn, args.database, args.cafes, args.reviews, args.keywords_per_cafe)
+        before = run_queries(conn, cafe_ids, args.repeats)
+        start = time.perf_counter()
+        apply_migrations(conn, optional=["partition_kakao_reviews"] if args.partition else ())
+        print(f"마이그레이션 적용: {time.perf_counter() - start:.1f}초")
+        with conn.cursor() as cursor:
+            for table in ("kakao_reviews", "extracted_keywords", "clustered_keywords"):
+                cursor.execute(f"ANALYZE TABLE {table}")
+                cursor.fetchall()
+        after = run_queries(conn, cafe_ids, args.repeats)
+    finally:
+        conn.close()
+
+    for (name, plan_before, ms_before), (_, plan_after, ms_after) in zip(before, after):
+        print(f"\n[{name}] {ms_before:.2f}ms -> {ms_after:.2f}ms")
+        print(f"  전: {plan_before}")
+        print(f"  후: {plan_after}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+작업 상태 조회(HGETALL) 지연 벤치마크 스크립트입니다.
+이벤트 루프 하나에서 동시 요청 수를 늘려 가며 기존 방식(async 엔드포인트에서 동기 Redis 호출)과
+공유 연결 풀을 쓰는 비동기 Redis 호출의 p50/p99 지연과, 같은 루프에서 측정한 이벤트 루프 지연을 비교합니다.
+REDIS_HOST/REDIS_PORT의 Redis 서버가 필요합니다.
+
+실행:
+    python benchmarks/bench_status_polling.py --concurrency 1 10 50 200 --requests 2000
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+import redis
+
+from app.core.redis_client import REDIS_HOST, REDIS_PORT, close_async_redis, get_async_redis
+
+JOB_KEY = "keyword_extract_job:bench"
+
+
+async def measure_loop_lag(stop, lags, interval=0.005):
+    # 짧은 sleep이 예정보다 얼마나 늦게 깨어나는지로 이벤트 루프가 막힌 시간을 측정
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def run(poll, concurrency, total):
+    # concurrency개 코루틴이 total번 상태를 조회하고 (요청별 지연 ms, 루프 지연 ms)를 반환
+    latencies, lags = [], []
+    remaining = total
+    stop = asyncio.Event()
+
+    async def client():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            await poll()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    lag_task = asyncio.create_task(measure_loop_lag(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await lag_task
+    return np.array(latencies), np.array(lags or [0.0]), elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    # 기존 방식: 요청마다 공유 동기 클라이언트로 이벤트 루프 안에서 직접 호출
+    sync_client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=0, decode_responses=True)
+    async_client = get_async_redis()
+    sync_client.hset(JOB_KEY, mapping={"status": "in_progress", "progress": "42", "stage": "bench", "error": ""})
+
+    async def poll_sync():
+        sync_client.hgetall(JOB_KEY)
+
+    async def poll_async():
+        await async_client.hgetall(JOB_KEY)
+
+    try:
+        for concurrency in args.concurrency:
+            for name, poll in (("sync", poll_sync), ("async", poll_async)):
+                latencies, lags, elapsed = await run(poll, concurrency, args.requests)
+                print(f"[동시 {concurrency:>4} / {name:>5}] p50 {np.percentile(latencies, 50):.2f}ms "
+                      f"p99 {np.percentile(latencies, 99):.2f}ms, 처리량 {len(latencies) / elapsed:.0f}/s, "
+                      f"루프 지연 p99 {np.percentile(lags, 99):.2f}ms")
+    finally:
+        sync_client.delete(JOB_KEY)
+        sync_client.close()
+        await close_async_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
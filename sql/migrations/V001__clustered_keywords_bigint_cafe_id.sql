@@ -0,0 +1,5 @@
+-- clustered_keywords.cafe_id를 다른 테이블과 같은 BIGINT로 변경 (조인·IN 조회 시 암묵적 형변환 제거)
+-- 카페별 결과 삭제(delete_cluster_results)와 카페·클러스터 단위 조회를 위한 인덱스 추가
+ALTER TABLE clustered_keywords
+    MODIFY cafe_id BIGINT NOT NULL,
+    ADD INDEX idx_clustered_keywords_cafe_cluster (cafe_id, cluster_id);
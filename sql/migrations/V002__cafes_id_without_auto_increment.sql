@@ -0,0 +1,5 @@
+-- cafes.id는 크롤러가 카카오 장소 id를 그대로 넣으므로 AUTO_INCREMENT를 제거
+-- menus, keywords가 외래 키로 참조하는 컬럼이므로 외래 키 검사를 잠시 끄고 변경
+SET FOREIGN_KEY_CHECKS = 0;
+ALTER TABLE cafes MODIFY id BIGINT NOT NULL;
+SET FOREIGN_KEY_CHECKS = 1;
@@ -0,0 +1,4 @@
+-- 클러스터링 입력 스트리밍(SELECT cafe_id, keyword, count ... ORDER BY cafe_id)을 인덱스만으로 읽는 커버링 인덱스
+-- (uq_cafe_keyword_extract에는 count가 없어 행마다 클러스터 인덱스를 다시 읽음)
+ALTER TABLE extracted_keywords
+    ADD INDEX idx_extracted_keywords_cafe_cover (cafe_id, keyword, count);
@@ -0,0 +1,9 @@
+-- 카페별 유사 카페 top-K (카페 추천 작업이 섀도 테이블로 통째로 교체)
+CREATE TABLE IF NOT EXISTS cafe_similarities (
+    cafe_id BIGINT NOT NULL,
+    similar_rank SMALLINT NOT NULL,
+    similar_cafe_id BIGINT NOT NULL,
+    score FLOAT NOT NULL,
+    created_at DATETIME(6) DEFAULT CURRENT_TIMESTAMP(6),
+    PRIMARY KEY (cafe_id, similar_rank)
+);
@@ -0,0 +1,9 @@
+-- 카페별 리뷰 스캔(크롤링 교체 삭제, 키워드 추출, 워터마크 이후 리뷰 조회)을 위한 cafe_id 인덱스
+-- (InnoDB 보조 인덱스에는 기본 키 id가 포함되어 WHERE cafe_id = ? ORDER BY id도 인덱스 순서로 읽음)
+-- 개발 중 init.sql로 이미 인덱스를 만든 데이터베이스에서도 실패하지 않도록 없을 때만 추가
+SET @has_index = (SELECT COUNT(*) FROM information_schema.statistics
+                  WHERE table_schema = DATABASE() AND table_name = 'kakao_reviews' AND index_name = 'idx_kakao_reviews_cafe_id');
+SET @ddl = IF(@has_index, 'DO 0', 'ALTER TABLE kakao_reviews ADD INDEX idx_kakao_reviews_cafe_id (cafe_id)');
+PREPARE add_index FROM @ddl;
+EXECUTE add_index;
+DEALLOCATE PREPARE add_index;
@@ -0,0 +1,6 @@
+-- 정규화한 리뷰 내용의 SHA-1 해시별 Kiwi 토큰 캐시 (같은 내용의 리뷰는 한 번만 형태소 분석)
+CREATE TABLE IF NOT EXISTS review_token_cache (
+    content_hash CHAR(40) PRIMARY KEY,
+    tokens MEDIUMTEXT NOT NULL,
+    created_at DATETIME(6) DEFAULT CURRENT_TIMESTAMP(6)
+);
@@ -0,0 +1,7 @@
+-- 카페별 증분 키워드 추출 워터마크 (마지막으로 반영한 리뷰 id와 반영한 리뷰 수)
+CREATE TABLE IF NOT EXISTS keyword_extract_watermarks (
+    cafe_id BIGINT PRIMARY KEY,
+    last_review_id INT NOT NULL,
+    review_count INT NOT NULL DEFAULT 0,
+    modified_at DATETIME(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+);
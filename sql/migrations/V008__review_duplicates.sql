@@ -0,0 +1,12 @@
+-- 카페별 중복 리뷰 표시 (리뷰 id가 아니라 정규화한 내용 해시로 기록해 크롤링 재적재 후에도 유지)
+-- 표시는 중복 탐지 작업이 다시 계산하는 파생 데이터이므로, 리뷰 id 기준의 이전 형식 테이블이 있으면 지우고 새로 만듦
+DROP TABLE IF EXISTS review_duplicates;
+CREATE TABLE review_duplicates (
+    cafe_id BIGINT NOT NULL,
+    content_hash CHAR(40) NOT NULL,
+    duplicate_of CHAR(40) NOT NULL,
+    similarity FLOAT NOT NULL,
+    scope VARCHAR(16) NOT NULL,
+    created_at DATETIME(6) DEFAULT CURRENT_TIMESTAMP(6),
+    PRIMARY KEY (cafe_id, content_hash)
+);
@@ -0,0 +1,8 @@
+-- 전역 어휘 클러스터링 모드의 모델별 키워드 → 클러스터 배정
+CREATE TABLE IF NOT EXISTS keyword_clusters (
+    model VARCHAR(255) NOT NULL,
+    keyword VARCHAR(255) NOT NULL,
+    cluster_id INT NOT NULL,
+    modified_at DATETIME(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    PRIMARY KEY (model, keyword)
+);
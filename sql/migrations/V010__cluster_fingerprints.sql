@@ -0,0 +1,6 @@
+-- 카페별 마지막 클러스터링 입력 지문 (키워드·빈도·설정이 같으면 다시 클러스터링하지 않음)
+CREATE TABLE IF NOT EXISTS cluster_fingerprints (
+    cafe_id BIGINT PRIMARY KEY,
+    fingerprint CHAR(40) NOT NULL,
+    modified_at DATETIME(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+);
@@ -0,0 +1,9 @@
+-- kakao_reviews를 cafe_id 해시로 파티셔닝 (선택 적용: python -m app.core.migrations --optional partition_kakao_reviews)
+-- 파티션 키는 모든 유니크 키에 포함되어야 하므로 기본 키를 (id, cafe_id)로 바꿈
+-- 카페 단위 조회는 파티션 하나만 읽고, 파티션별 인덱스가 작아져 크롤링 중 삽입 비용이 줄어듦
+ALTER TABLE kakao_reviews
+    MODIFY cafe_id BIGINT NOT NULL,
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (id, cafe_id);
+ALTER TABLE kakao_reviews
+    PARTITION BY HASH (cafe_id) PARTITIONS 16;
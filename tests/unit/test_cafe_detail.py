@@ -3,6 +3,8 @@ import pytest
 from unittest.mock import patch, MagicMock
 import app.service.cafe_detail as service_module
 
+SHADOWS = {table: f"{table}__shadow" for table in service_module.CRAWL_TABLES}
+
 """
 crawl_all_cafes 성공 시 전체 카페 크롤링 결과 반환
 """
@@ -13,18 +15,26 @@ def test_crawl_all_cafes_success_default(mock_db_connection):
     mock_cafe_ids = ["cafe123", "cafe456"]
     mock_cursor.fetchall.return_value = [{"id": cid} for cid in mock_cafe_ids]
 
-    with patch.object(service_module, "get_connection", return_value=mock_conn):
+    with patch.object(service_module, "get_connection", return_value=mock_conn), \
+            patch.object(service_module, "create_shadow_tables", return_value=SHADOWS) as mock_create, \
+            patch.object(service_module, "publish_shadow_tables") as mock_publish:
         mock_conn.cursor.return_value = mock_cursor
         with patch.object(service_module, "crawl_and_save_single_cafe", return_value=True) as mock_crawl_single:
-            result = service_module.crawl_all_cafes()
+            result = service_module.crawl_all_cafes("job", MagicMock())
+            # 카페 데이터는 섀도 테이블에 저장
             for cid in mock_cafe_ids:
-                mock_crawl_single.assert_any_call(cid)
+                mock_crawl_single.assert_any_call(cid, SHADOWS)
 
     # Assert
     assert isinstance(result, dict)
     assert result["crawled_cafes"] == len(mock_cafe_ids)
     assert result["failed_ids"] == []
     assert mock_cursor.execute.called
+    # 라이브 테이블은 비우지 않고, 크롤링이 끝난 뒤 섀도 테이블과 교체
+    executed = [c[0][0] for c in mock_cursor.execute.call_args_list]
+    assert not any(sql.startswith("DELETE FROM") for sql in executed)
+    mock_create.assert_called_once_with(mock_cursor, service_module.CRAWL_TABLES)
+    mock_publish.assert_called_once()
 
 
 """
@@ -37,7 +47,9 @@ def test_crawl_all_cafes_failure_with_retry(mock_db_connection):
     mock_cursor.fetchall.return_value = [{"id": cid} for cid in mock_cafe_ids]
 
     # Patch get_connection to return mock connection
-    with patch.object(service_module, "get_connection", return_value=mock_conn):
+    with patch.object(service_module, "get_connection", return_value=mock_conn), \
+            patch.object(service_module, "create_shadow_tables", return_value=SHADOWS), \
+            patch.object(service_module, "publish_shadow_tables"):
         mock_conn.cursor.return_value = mock_cursor
 
         # crawl_and_save_single_cafe: 첫 두 개는 True, 마지막은 False, 재시도는 True로 모킹
@@ -46,11 +58,11 @@ def test_crawl_all_cafes_failure_with_retry(mock_db_connection):
             "crawl_and_save_single_cafe",
             side_effect=[True, True, False, True]
         ) as mock_crawl_single:
-            result = service_module.crawl_all_cafes()
+            result = service_module.crawl_all_cafes("job", MagicMock())
 
             # 모든 ID로 호출이 발생했는지 검증
             for cid in mock_cafe_ids:
-                mock_crawl_single.assert_any_call(cid)
+                mock_crawl_single.assert_any_call(cid, SHADOWS)
 
     # 반환값 검증
     assert isinstance(result, dict)
@@ -59,3 +71,20 @@ def test_crawl_all_cafes_failure_with_retry(mock_db_connection):
 
     # DB 쿼리 호출 여부 확인
     assert mock_cursor.execute.called
+
+
+"""
+clear_cafe_rows: 카페 단위 재크롤링 시 메뉴·리뷰와 리뷰 id에 묶인 키워드 추출 결과·워터마크를 함께 삭제
+"""
+def test_clear_cafe_rows():
+    cursor = MagicMock()
+    service_module.clear_cafe_rows(cursor, 7, {"menus": "menus__shadow"})
+    executed = [c[0] for c in cursor.execute.call_args_list]
+    assert executed == [
+        ("DELETE FROM menus__shadow WHERE cafe_id = %s", (7,)),
+        ("DELETE FROM kakao_reviews WHERE cafe_id = %s", (7,)),
+        ("DELETE FROM extracted_keywords WHERE cafe_id = %s", (7,)),
+        ("DELETE FROM keyword_extract_watermarks WHERE cafe_id = %s", (7,)),
+    ]
+    # 전체 크롤링은 워터마크와 키워드 추출 결과를 빈 테이블로 교체
+    assert {"kakao_reviews", "extracted_keywords", "keyword_extract_watermarks"} <= set(service_module.CRAWL_TABLES)
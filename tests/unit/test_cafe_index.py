@@ -0,0 +1,71 @@
+import asyncio
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+import numpy as np
+import app.service.cafe_index as ci
+
+
+def make_cafes():
+    # 기준점 (33.5, 126.5) 근처 카페: 1은 약 111m, 2는 약 1.1km, 3은 약 11km 떨어짐
+    return [
+        {"id": 1, "lat": 33.501, "lon": 126.5, "keywords": ["오션뷰", "디저트"]},
+        {"id": 2, "lat": 33.51, "lon": 126.5, "keywords": ["라떼"]},
+        {"id": 3, "lat": 33.6, "lon": 126.5, "keywords": ["오션뷰"]},
+    ]
+
+"""
+CafeIndex.nearby: 격자 칸 경계와 관계없이 반경 안의 카페만 가까운 순으로 반환하고 키워드로 거름
+"""
+def test_cafe_index_nearby():
+    index = ci.CafeIndex(make_cafes(), version=3, cell_deg=0.005)
+    assert [cafe["id"] for cafe in index.nearby(33.5, 126.5, 2000)] == [1, 2]
+    assert index.nearby(33.5, 126.5, 2000)[0]["distance_m"] == round(float(ci.haversine_m(33.5, 126.5, np.array([33.501]), np.array([126.5]))[0]), 1)
+    assert [cafe["id"] for cafe in index.nearby(33.5, 126.5, 20000, keyword="오션")] == [1, 3]
+    assert [cafe["id"] for cafe in index.nearby(33.5, 126.5, 20000, limit=1)] == [1]
+    assert index.nearby(35.0, 129.0, 1000) == []
+    assert index.get(2)["keywords"] == ["라떼"] and index.get(99) is None
+
+    # 격자 크기와 무관하게 전체 탐색과 같은 결과
+    rng = np.random.RandomState(0)
+    cafes = [{"id": i, "lat": 33.3 + rng.rand() * 0.3, "lon": 126.3 + rng.rand() * 0.5, "keywords": []} for i in range(500)]
+    index = ci.CafeIndex(cafes, cell_deg=0.01)
+    distances = ci.haversine_m(33.45, 126.55, index.lats, index.lons)
+    expected = [cafes[i]["id"] for i in np.argsort(distances, kind="stable") if distances[i] <= 3000]
+    assert [cafe["id"] for cafe in index.nearby(33.45, 126.55, 3000, limit=500)] == expected
+
+"""
+load_cafes: Decimal 좌표·평점을 float로 바꾸고 대표 키워드를 count 순으로 붙임
+"""
+def test_load_cafes(mock_db_connection):
+    mock_conn, mock_cursor = mock_db_connection
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    mock_cursor.fetchall.side_effect = [
+        [{"id": 1, "title": "카페", "address": None, "lat": Decimal("33.5"), "lon": Decimal("126.5"), "rate": Decimal("4.50"),
+          "rate_count": 3, "image_url": None, "phone_number": None, "open_time": None}],
+        [{"cafe_id": 1, "keyword": "라떼", "count": 5}, {"cafe_id": 1, "keyword": "뷰", "count": 2}, {"cafe_id": 2, "keyword": "x", "count": 1}],
+    ]
+    cafes = ci.load_cafes(mock_conn)
+    assert cafes[0]["lat"] == 33.5 and cafes[0]["rate"] == 4.5
+    assert cafes[0]["keywords"] == ["라떼", "뷰"]
+    mock_conn.close.assert_called_once()
+
+"""
+cached_response: 인덱스 버전별 캐시 키로 Redis 캐시를 먼저 읽고, 없으면 계산 후 TTL과 함께 저장
+"""
+def test_cached_response_uses_versioned_key():
+    store = {}
+    redis = MagicMock()
+
+    async def get(key):
+        return store.get(key)
+
+    async def set(key, value, ex=None):
+        store[key] = value
+
+    redis.get, redis.set = get, set
+    compute = MagicMock(side_effect=lambda index: {"version": index.version})
+    with patch.object(ci, "_index", ci.CafeIndex([], version=7)):
+        assert asyncio.run(ci.cached_response(redis, "nearby", {"lat": 1}, compute)) == {"version": 7}
+        assert asyncio.run(ci.cached_response(redis, "nearby", {"lat": 1}, compute)) == {"version": 7}
+    compute.assert_called_once()
+    assert list(store) == [ci.cache_key(7, "nearby", {"lat": 1})]
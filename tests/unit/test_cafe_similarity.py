@@ -0,0 +1,140 @@
+import subprocess
+import sys
+from unittest.mock import MagicMock, patch
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfTransformer
+import app.service.cafe_similarity as cs
+
+
+def make_rows():
+    # 카페 1·2는 "오션뷰" 중심, 카페 3은 "라떼" 중심, 카페 1의 "디저트"는 두 행으로 나뉘어 있음
+    return [
+        (1, "오션뷰", 5), (1, "디저트", 1), (1, "디저트", 1),
+        (2, "오션뷰", 4), (2, "디저트", 1),
+        (3, "라떼", 7), (3, "디저트", 1),
+    ]
+
+"""
+build_keyword_profiles: 키워드를 정수 어휘 ID로 바꾼 CSR 빈도 행렬을 만들고 중복 행의 빈도를 합침
+"""
+def test_build_keyword_profiles():
+    profiles = cs.build_keyword_profiles(make_rows())
+    assert profiles.cafe_ids.tolist() == [1, 2, 3]
+    assert profiles.vocabulary == ["오션뷰", "디저트", "라떼"]
+    assert profiles.counts.toarray().tolist() == [[5, 2, 0], [4, 1, 0], [0, 1, 7]]
+
+    empty = cs.build_keyword_profiles([])
+    assert len(empty) == 0 and empty.counts.shape == (0, 0)
+
+"""
+fit_tfidf: sklearn TfidfTransformer(sublinear_tf=True)와 같은 가중 행렬·IDF, 빈 행은 0으로 유지
+"""
+def test_fit_tfidf_matches_sklearn():
+    rng = np.random.RandomState(3)
+    counts = (rng.rand(30, 20) < 0.2) * rng.randint(1, 9, size=(30, 20))
+    counts[4] = 0
+    matrix = sparse.csr_matrix(counts.astype(np.float32))
+    weights, idf = cs.fit_tfidf(matrix)
+    transformer = TfidfTransformer(sublinear_tf=True)
+    expected = transformer.fit_transform(matrix).toarray()
+    assert np.allclose(weights.toarray(), expected, atol=1e-6)
+    assert np.allclose(idf, transformer.idf_, atol=1e-6)
+    assert cs.fit_tfidf(sparse.csr_matrix((0, 3), dtype=np.float32))[1].tolist() == [0, 0, 0]
+
+"""
+cafe_similarity import: API 프로세스 import 시간을 늘리는 scipy·sklearn을 모듈 로딩 시점에 불러오지 않음
+"""
+def test_module_import_is_lightweight():
+    code = ("import sys, app.service.cafe_similarity; "
+            "print(any(name.split('.')[0] in ('scipy', 'sklearn') for name in sys.modules))")
+    assert subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.strip() == "False"
+
+"""
+top_k_similar: 묶음 크기와 관계없이 전체 유사도 행렬에서 자기 자신을 뺀 상위 k개와 같은 결과
+"""
+def test_top_k_similar_matches_dense():
+    rng = np.random.RandomState(0)
+    counts = (rng.rand(60, 40) < 0.15) * rng.randint(1, 5, size=(60, 40))
+    weights, _ = cs.fit_tfidf(sparse.csr_matrix(counts.astype(np.float32)))
+    dense = (weights @ weights.T).toarray()
+    np.fill_diagonal(dense, -np.inf)
+
+    neighbors, scores = cs.top_k_similar(weights, k=5, batch_size=7)
+    assert neighbors.shape == (60, 5)
+    assert np.allclose(scores, -np.sort(-dense, axis=1)[:, :5], atol=1e-6)
+    assert np.allclose(np.take_along_axis(dense, neighbors, axis=1), scores, atol=1e-6)
+    assert not (neighbors == np.arange(60)[:, None]).any()
+
+    # 흔한 키워드를 밀집 행렬로 나누는 기준과 관계없이 같은 결과 (0: 모두 밀집, 1.1: 모두 희소)
+    for min_df_ratio in (0.0, 1.1):
+        _, split_scores = cs.top_k_similar(weights, k=5, batch_size=7, min_df_ratio=min_df_ratio)
+        assert np.allclose(split_scores, scores, atol=1e-6)
+    dense_part, rare_part = cs.split_frequent_keywords(weights, 0.0, max_columns=10)
+    assert dense_part.shape == (60, 10) and rare_part.shape == (60, 30)
+
+    # 카페가 하나뿐이면 이웃이 없음
+    assert cs.top_k_similar(weights[:1], k=5)[0].shape == (1, 0)
+
+"""
+top_k_similar: 임베딩 중심 유사도를 embedding_weight 비율로 섞음
+"""
+def test_top_k_similar_with_centroids():
+    weights, _ = cs.fit_tfidf(cs.build_keyword_profiles(make_rows()).counts)
+    store = MagicMock(dim=2)
+    store.lookup.return_value = np.array([0, -1, 1])
+    store.vectors.return_value = np.array([[1, 0], [0, 1]], dtype=np.float32)
+    centroids = cs.cafe_centroids(weights, ["오션뷰", "디저트", "라떼"], store)
+    assert np.allclose(np.linalg.norm(centroids, axis=1), 1)
+
+    _, tfidf_scores = cs.top_k_similar(weights, k=1)
+    _, mixed_scores = cs.top_k_similar(weights, k=1, centroids=centroids, embedding_weight=0.5)
+    # 카페 1·2는 임베딩 중심이 같은 방향이라 섞은 점수가 더 높아짐
+    assert mixed_scores[0, 0] > tfidf_scores[0, 0]
+
+"""
+similarity_rows: 카페 ID로 바꾼 순위 행을 만들고 점수 0 이하의 이웃은 저장하지 않음
+"""
+def test_similarity_rows():
+    rows = cs.similarity_rows(np.array([10, 20, 30]), np.array([[1, 2], [0, 2], [0, 1]]),
+                              np.array([[0.9, 0.0], [0.9, 0.1], [0.0, 0.0]], dtype=np.float32))
+    assert [row[:3] for row in rows] == [(10, 1, 20), (20, 1, 10), (20, 2, 30)]
+
+"""
+rebuild_cafe_similarities: extracted_keywords 스트리밍 → top-K 계산 → 섀도 테이블 교체 저장
+"""
+def test_rebuild_cafe_similarities(mock_db_connection):
+    mock_conn, mock_cursor = mock_db_connection
+    saved = []
+    with patch.object(cs, "load_keyword_profiles", return_value=cs.build_keyword_profiles(make_rows())), \
+         patch.object(cs, "get_connection", return_value=mock_conn), \
+         patch.object(cs, "save_cafe_similarities", side_effect=lambda conn, rows: saved.extend(rows)):
+        callback = MagicMock()
+        result = cs.rebuild_cafe_similarities(callback, top_k=2, embedding_weight=0.0)
+    assert result["cafes"] == 3 and result["similarities"] == len(saved)
+    # 카페 1과 가장 비슷한 카페는 2
+    assert [row[2] for row in saved if row[0] == 1][0] == 2
+    callback.assert_called_with(100, "completed")
+
+"""
+SimilarityIndex: 저장된 top-K로 유사 카페를 응답하고, 키워드 질의는 IDF 가중 코사인 유사도 순으로 응답
+"""
+def test_similarity_index():
+    similar = {1: [(2, 0.9), (3, 0.1)], 2: [(1, 0.9)]}
+    index = cs.SimilarityIndex(cs.build_keyword_profiles(make_rows()), similar, version=4)
+    assert index.similar_cafes(1, limit=1) == [{"id": 2, "score": 0.9}]
+    assert index.similar_cafes(3) == []
+    assert index.similar_cafes(99) is None
+
+    assert [cafe["id"] for cafe in index.query(["라떼"])] == [3]
+    assert [cafe["id"] for cafe in index.query(["오션뷰", "디저트"])][:2] == [1, 2]
+    assert len(index.query(["디저트"], limit=2)) == 2
+    assert index.query(["없는키워드"]) == []
+
+    # 키워드 가중치 × 빈도: 카페 1은 오션뷰 5, 디저트 2
+    ranked = index.rank_by_keyword_counts([("오션뷰", 1.0), ("디저트", 0.5), ("없는키워드", 1.0)])
+    assert ranked == [{"id": 1, "score": 6.0}, {"id": 2, "score": 4.5}, {"id": 3, "score": 0.5}]
+    assert index.rank_by_keyword_counts([("없는키워드", 1.0)]) == []
+
+    empty = cs.SimilarityIndex(cs.build_keyword_profiles([]), {})
+    assert empty.query(["라떼"]) == [] and empty.similar_cafes(1) is None
@@ -0,0 +1,65 @@
+import threading
+import pytest
+from unittest.mock import MagicMock
+from app.core.db import ConnectionPool
+
+
+def make_pool(**kwargs):
+    created = []
+
+    def connect():
+        conn = MagicMock()
+        created.append(conn)
+        return conn
+    return ConnectionPool(connect_fn=connect, **kwargs), created
+
+"""
+ConnectionPool: close()한 연결은 롤백 후 풀에 반납되어 다음 대여에 재사용
+"""
+def test_pool_reuses_released_connection():
+    pool, created = make_pool(max_size=2, ping_interval=60)
+    conn = pool.acquire()
+    conn.cursor()
+    conn.close()
+    conn.close()
+    created[0].rollback.assert_called_once()
+    with pool.connection() as again:
+        again.commit()
+    assert len(created) == 1
+    created[0].commit.assert_called_once()
+    stats = pool.stats()
+    assert stats["checkouts"] == 2 and stats["created"] == 1 and stats["in_use"] == 0 and stats["idle"] == 1
+
+"""
+ConnectionPool: 최대 크기만큼 빌려 간 상태에서는 반납될 때까지 기다리고, 시간을 넘기면 TimeoutError
+"""
+def test_pool_is_bounded():
+    pool, created = make_pool(max_size=1, timeout=0.05)
+    conn = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+
+    pool.timeout = 5
+    threading.Timer(0.05, conn.close).start()
+    waited = pool.acquire()
+    assert waited._raw is created[0]
+    stats = pool.stats()
+    assert stats["timeouts"] == 1 and stats["waits"] == 1 and stats["max_wait_ms"] > 0
+    assert stats["utilization"] == 1.0
+
+"""
+ConnectionPool: 수명이 지난 연결과 ping에 실패한 연결은 닫고 새로 연결
+"""
+def test_pool_discards_expired_and_broken_connections():
+    pool, created = make_pool(max_size=2, ping_interval=0)
+    pool.acquire().close()
+    created[0].ping.side_effect = Exception("gone away")
+    conn = pool.acquire()
+    created[0].close.assert_called_once()
+    assert conn._raw is created[1]
+    conn.close()
+
+    pool.max_lifetime = 1e-9
+    conn = pool.acquire()
+    assert conn._raw is created[2]
+    assert pool.stats()["discarded"] == 2
@@ -0,0 +1,34 @@
+import numpy as np
+from unittest.mock import MagicMock
+from app.service.embedding_store import KeywordEmbeddingStore
+
+def fake_encode(batch):
+    # 키워드 길이로 만든 결정적 임베딩
+    return np.array([[len(kw), 1.0, 0.0] for kw in batch])
+
+"""
+ensure: 없는 키워드만 인코딩하고 행 번호로 조회
+"""
+def test_ensure_encodes_only_missing(tmp_path):
+    store = KeywordEmbeddingStore("test/model", root=str(tmp_path))
+    encode = MagicMock(side_effect=fake_encode)
+    assert store.ensure(["커피", "바다", "커피"], encode) == 2
+    assert store.ensure(["커피", "오션뷰"], encode) == 1
+    assert encode.call_count == 2
+    assert encode.call_args[0][0] == ["오션뷰"]
+
+    rows = store.lookup(["오션뷰", "커피", "없음"])
+    assert rows[2] == -1
+    vectors = store.vectors(rows[:2])
+    assert vectors.dtype == np.float32
+    assert vectors[0][0] == 3.0
+
+"""
+재시작 후에도 디스크의 인덱스와 메모리 맵 행렬을 그대로 사용
+"""
+def test_store_persists_across_instances(tmp_path):
+    KeywordEmbeddingStore("test/model", root=str(tmp_path)).ensure(["커피", "디저트"], fake_encode, batch_size=1)
+    reopened = KeywordEmbeddingStore("test/model", root=str(tmp_path))
+    assert len(reopened) == 2
+    assert reopened.ensure(["디저트"], MagicMock(side_effect=AssertionError("should not encode"))) == 0
+    np.testing.assert_array_equal(reopened.vectors(reopened.lookup(["디저트"])), [[3.0, 1.0, 0.0]])
@@ -0,0 +1,448 @@
+import asyncio
+import json
+import time
+from unittest.mock import MagicMock
+import app.core.job_queue as jq
+import app.service.job_runner as jr
+from app.service.cafe_index import CAFE_DATA_VERSION_KEY
+
+
+class FakeRedis:
+    # 작업 큐·실행기 테스트에 필요한 명령만 구현한 인메모리 Redis 대역
+    def __init__(self):
+        self.hashes, self.lists, self.sets, self.strings = {}, {}, {}, {}
+        self.ttls, self.streams = {}, {}
+        self.pipelines = 0
+
+    def pipeline(self, transaction=True):
+        redis = self
+        redis.pipelines += 1
+
+        class Pipeline:
+            def __init__(self):
+                self.calls = []
+
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+            def execute(self):
+                return [getattr(redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+        return Pipeline()
+
+    def xadd(self, key, fields, maxlen=None, approximate=True):
+        entries = self.streams.setdefault(key, [])
+        event_id = f"{len(entries) + 1}-0"
+        entries.append((event_id, dict(fields)))
+        return event_id
+
+    def xrevrange(self, key, count=None):
+        return list(reversed(self.streams.get(key, [])))[:count]
+
+    def xread(self, streams, block=None, count=None):
+        result = []
+        for key, last_id in streams.items():
+            entries = [e for e in self.streams.get(key, []) if int(e[0].split("-")[0]) > int(last_id.split("-")[0])]
+            if entries:
+                result.append((key, entries[:count]))
+        return result
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = value
+        self.ttls[key] = ex
+        return True
+
+    def get(self, key):
+        return self.strings.get(key)
+
+    def incr(self, key):
+        self.strings[key] = str(int(self.strings.get(key, 0)) + 1)
+        return int(self.strings[key])
+
+    def delete(self, key):
+        self.ttls.pop(key, None)
+        return 1 if self.strings.pop(key, None) is not None else 0
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    def eval(self, script, numkeys, *args):
+        # Lua 스크립트 대역
+        keys, argv = args[:numkeys], args[numkeys:]
+        if script == jq.POP_EXCLUSIVE_JOB_SCRIPT:
+            # 묶음 락이 비어 있을 때만 작업을 꺼내고 그 job_id로 락을 잡음
+            queue, lock = keys
+            if lock in self.strings or not self.lists.get(queue):
+                return None
+            message = self.lists[queue].pop()
+            self.set(lock, json.loads(message)["job_id"], ex=int(argv[0]) // 1000)
+            return message
+        # 락 스크립트: 값이 owner와 같을 때만 삭제하거나 임대(ms)를 연장
+        key, owner = keys[0], argv[0]
+        if self.strings.get(key) != owner:
+            return 0
+        if script == jq.RELEASE_LOCK_SCRIPT:
+            return self.delete(key)
+        self.ttls[key] = int(argv[1]) // 1000
+        return 1
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        target = self.hashes.setdefault(key, {})
+        if field is not None:
+            target[field] = value
+        target.update(mapping or {})
+
+    def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    def hmget(self, key, *fields):
+        return [self.hget(key, field) for field in fields]
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value)
+
+    def brpop(self, keys, timeout=0):
+        for key in keys:
+            if self.lists.get(key):
+                return key, self.lists[key].pop()
+        return None
+
+    def lrange(self, key, start, end):
+        return list(self.lists.get(key, []))
+
+    def lrem(self, key, count, value):
+        if value in self.lists.get(key, []):
+            self.lists[key].remove(value)
+            return 1
+        return 0
+
+    def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    def sadd(self, key, value):
+        self.sets.setdefault(key, set()).add(value)
+
+    def srem(self, key, value):
+        self.sets.get(key, set()).discard(value)
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+
+class AsyncFakeRedis:
+    # FakeRedis를 redis.asyncio 클라이언트처럼 await로 호출할 수 있게 감싼 대역
+    def __init__(self, redis):
+        self.redis = redis
+
+    def __getattr__(self, name):
+        method = getattr(self.redis, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+    def pipeline(self, transaction=True):
+        redis = self.redis
+
+        class Pipeline:
+            def __init__(self):
+                self.calls = []
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *args):
+                return False
+
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+            async def execute(self):
+                return [getattr(redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+        return Pipeline()
+
+"""
+enqueue_job → JobRunner: 큐에서 꺼낸 작업을 실행하고 결과 필드와 함께 completed로 기록
+"""
+def test_runner_executes_enqueued_job():
+    redis = FakeRedis()
+    job_id = asyncio.run(jq.enqueue_job("keyword_extract", {"workers": 2}, redis=AsyncFakeRedis(redis)))
+    assert redis.hget(jq.job_key("keyword_extract", job_id), "status") == "queued"
+
+    calls = []
+
+    def target(job_id, params, update_progress_callback):
+        update_progress_callback(50, "half")
+        calls.append(params)
+        return {"dedup_removed": 3, "failed_ids": [1]}
+
+    runner = jr.JobRunner(redis=redis, targets={"keyword_extract": target}, concurrency={"keyword_extract": 1})
+    assert runner.poll_once()
+    # 작업이 이미 끝났으면 running에서 빠져 있음
+    entry = runner.running.get(job_id)
+    if entry:
+        entry[1].join(5)
+
+    job = redis.hgetall(jq.job_key("keyword_extract", job_id))
+    assert calls == [{"workers": 2}]
+    assert job["status"] == "completed" and job["progress"] == "50" and job["stage"] == "half"
+    assert job["dedup_removed"] == "3" and json.loads(job["failed_ids"]) == [1]
+    assert redis.smembers(jq.RUNNING_KEY) == set()
+
+"""
+JobRunner: 작업 종류별 동시 실행 수에 도달하면 그 종류의 큐는 읽지 않음
+"""
+def test_runner_respects_concurrency_limit(monkeypatch):
+    redis = FakeRedis()
+    for i in range(2):
+        asyncio.run(jq.enqueue_job("cafe_detail", {"part": i}, redis=AsyncFakeRedis(redis), lock_params=("part",)))
+    release = MagicMock()
+    runner = jr.JobRunner(redis=redis, targets={"cafe_detail": lambda *args: release()}, concurrency={"cafe_detail": 1})
+    runner.running["other"] = ("cafe_detail", None)
+    monkeypatch.setattr(jr, "QUEUE_POLL_TIMEOUT", 0)
+    assert not runner.poll_once()
+    assert redis.llen(jq.queue_key("cafe_detail")) == 2
+    release.assert_not_called()
+
+"""
+cancel_job: 대기 중인 작업은 큐에서 빼고 cancelled, 실행 중인 작업은 진행률 보고 시점에 JobCancelled로 중단
+"""
+def test_cancel_queued_and_running_jobs():
+    redis = FakeRedis()
+    async_redis = AsyncFakeRedis(redis)
+    queued = asyncio.run(jq.enqueue_job("cafe_search", redis=async_redis))
+    assert asyncio.run(jq.cancel_job(queued, redis=async_redis)) == "cancelled"
+    assert redis.llen(jq.queue_key("cafe_search")) == 0
+
+    running = asyncio.run(jq.enqueue_job("cafe_search", redis=async_redis))
+    redis.lists[jq.queue_key("cafe_search")].clear()
+    redis.hset(jq.job_key("cafe_search", running), "status", "in_progress")
+    assert asyncio.run(jq.cancel_job(running, redis=async_redis)) == "cancelling"
+
+    def target(job_id, params, update_progress_callback):
+        update_progress_callback(10, "step")
+        raise AssertionError("cancelled job kept running")
+
+    runner = jr.JobRunner(redis=redis, targets={"cafe_search": target})
+    # 큐에서 꺼내기 직전에 취소된 작업은 시작하지 않고, 시작 후 취소된 작업은 진행률 보고 시점에 중단
+    runner.run_job("cafe_search", running, {})
+    assert redis.hget(jq.job_key("cafe_search", running), "status") == "cancelled"
+    redis.hset(jq.job_key("cafe_search", running), mapping={"status": "queued", "cancel_requested": "0"})
+    runner.cancel_all.set()
+    runner.run_job("cafe_search", running, {})
+    assert redis.hget(jq.job_key("cafe_search", running), "status") == "cancelled"
+    assert asyncio.run(jq.cancel_job("missing", redis=async_redis)) is None
+
+"""
+mark_orphaned_jobs: 하트비트가 끊긴 다른 실행기의 작업은 failed로 표시하고, 자기 작업은 건드리지 않음
+"""
+def test_mark_orphaned_jobs():
+    redis = FakeRedis()
+    async_redis = AsyncFakeRedis(redis)
+    stale = asyncio.run(jq.enqueue_job("cafe_detail", {"part": 0}, redis=async_redis, lock_params=("part",)))
+    fresh = asyncio.run(jq.enqueue_job("cafe_detail", {"part": 1}, redis=async_redis, lock_params=("part",)))
+    now = time.time()
+    redis.hset(jq.job_key("cafe_detail", stale), mapping={"status": "in_progress", "heartbeat": str(now - jr.JOB_ORPHAN_TIMEOUT - 1)})
+    redis.hset(jq.job_key("cafe_detail", fresh), mapping={"status": "in_progress", "heartbeat": str(now)})
+    redis.sadd(jq.RUNNING_KEY, stale)
+    redis.sadd(jq.RUNNING_KEY, fresh)
+
+    runner = jr.JobRunner(redis=redis, targets={})
+    assert runner.mark_orphaned_jobs(now) == [stale]
+    assert redis.hget(jq.job_key("cafe_detail", stale), "status") == "failed"
+    assert redis.hget(jq.job_key("cafe_detail", fresh), "status") == "in_progress"
+    assert redis.smembers(jq.RUNNING_KEY) == {fresh}
+    assert redis.get(jq.lock_key("cafe_detail", {"part": 0}, ("part",))) is None
+
+"""
+enqueue_job: 같은 종류의 작업이 대기 중·실행 중이면 새 작업 대신 기존 job_id를 반환하고, 작업이 끝나면 락이 해제됨
+"""
+def test_enqueue_job_single_flight():
+    redis = FakeRedis()
+    async_redis = AsyncFakeRedis(redis)
+    first = asyncio.run(jq.enqueue_job("cafe_detail", redis=async_redis))
+    assert asyncio.run(jq.enqueue_job("cafe_detail", redis=async_redis)) == first
+    assert redis.llen(jq.queue_key("cafe_detail")) == 1
+    assert redis.ttls[jq.lock_key("cafe_detail")] == jq.JOB_LOCK_LEASE
+
+    # 다른 작업 종류는 서로 막지 않음
+    assert asyncio.run(jq.enqueue_job("cafe_search", redis=async_redis)) != first
+
+    runner = jr.JobRunner(redis=redis, targets={"cafe_detail": lambda *args: {}})
+    runner.run_job("cafe_detail", first, {})
+    assert redis.get(jq.lock_key("cafe_detail")) is None
+    # 카페 데이터를 바꾸는 작업이 끝나면 API의 공간 인덱스 갱신을 위해 데이터 버전을 올림
+    assert redis.get(CAFE_DATA_VERSION_KEY) == "1"
+    assert asyncio.run(jq.enqueue_job("cafe_detail", redis=async_redis)) != first
+
+"""
+enqueue_job: lock_params로 락 범위를 파라미터 값별로 나누고, 끝난 작업이 남긴 락은 다음 요청이 가져감
+"""
+def test_enqueue_job_lock_scope_and_stale_lock():
+    redis = FakeRedis()
+    async_redis = AsyncFakeRedis(redis)
+    a = asyncio.run(jq.enqueue_job("keyword_extract", {"cluster_mode": "cafe"}, redis=async_redis, lock_params=("cluster_mode",)))
+    b = asyncio.run(jq.enqueue_job("keyword_extract", {"cluster_mode": "global"}, redis=async_redis, lock_params=("cluster_mode",)))
+    assert a != b
+    assert asyncio.run(jq.enqueue_job("keyword_extract", {"cluster_mode": "cafe"}, redis=async_redis, lock_params=("cluster_mode",))) == a
+
+    # 실행기가 락을 해제하지 못하고 죽은 뒤 failed로 표시된 작업
+    redis.hset(jq.job_key("keyword_extract", a), "status", "failed")
+    c = asyncio.run(jq.enqueue_job("keyword_extract", {"cluster_mode": "cafe"}, redis=async_redis, lock_params=("cluster_mode",)))
+    assert c != a
+    assert redis.get(jq.lock_key("keyword_extract", {"cluster_mode": "cafe"}, ("cluster_mode",))) == c
+
+"""
+enqueue_job: Idempotency-Key가 같으면 작업이 끝난 뒤에도 처음 만든 job_id를 반환하고, 대기 작업 취소 시 락을 해제
+"""
+def test_enqueue_job_idempotency_key_and_cancel_releases_lock():
+    redis = FakeRedis()
+    async_redis = AsyncFakeRedis(redis)
+    first = asyncio.run(jq.enqueue_job("cafe_search", redis=async_redis, idempotency="req-1"))
+    redis.hset(jq.job_key("cafe_search", first), "status", "completed")
+    redis.delete(jq.lock_key("cafe_search"))
+    assert asyncio.run(jq.enqueue_job("cafe_search", redis=async_redis, idempotency="req-1")) == first
+
+    # 락에 막힌 요청의 키는 락을 가진 작업을 가리킴
+    second = asyncio.run(jq.enqueue_job("cafe_search", redis=async_redis, idempotency="req-2"))
+    assert asyncio.run(jq.enqueue_job("cafe_search", redis=async_redis, idempotency="req-3")) == second
+    assert redis.get(jq.idempotency_key("cafe_search", "req-3")) == second
+
+    assert asyncio.run(jq.cancel_job(second, redis=async_redis)) == "cancelled"
+    assert redis.get(jq.lock_key("cafe_search")) is None
+
+"""
+JobRunner: 같은 묶음(파이프라인·상세 크롤링 등)의 작업이 실행 중이면 큐에서 꺼내지 않고 기다리다가, 끝나면 락과 함께 꺼내 실행
+"""
+def test_runner_waits_for_exclusive_group(monkeypatch):
+    monkeypatch.setattr(jr, "QUEUE_POLL_TIMEOUT", 0)
+    redis = FakeRedis()
+    async_redis = AsyncFakeRedis(redis)
+    pipeline = asyncio.run(jq.enqueue_job("pipeline", redis=async_redis))
+    detail = asyncio.run(jq.enqueue_job("cafe_detail", redis=async_redis))
+    assert jq.pop_exclusive_job(redis, "pipeline") is not None
+    assert redis.get(jq.exclusive_lock_key("pipeline")) == pipeline
+    assert jq.exclusive_lock_key("cafe_search") is None
+
+    done = []
+    runner = jr.JobRunner(redis=redis, targets={"cafe_detail": lambda *args: done.append(args[0]) or {}})
+    assert runner.poll_once() is False
+    assert redis.lists[jq.queue_key("cafe_detail")] == [json.dumps({"job_id": detail, "params": {}})]
+    assert not runner.running
+
+    # 기다리는 동안 하트비트가 대기 작업의 단일 실행 락 임대를 연장
+    redis.ttls[jq.lock_key("cafe_detail")] = 5
+    runner.heartbeat()
+    assert redis.ttls[jq.lock_key("cafe_detail")] == jq.JOB_LOCK_LEASE
+
+    jq.release_job_lock(redis, jq.exclusive_lock_key("pipeline"), pipeline)
+    assert runner.poll_once() is True
+    while runner.running:
+        time.sleep(0.01)
+    assert done == [detail]
+    assert redis.get(jq.exclusive_lock_key("cafe_detail")) is None
+
+"""
+JobRunner.heartbeat: 실행 중인 작업의 락 임대를 연장
+"""
+def test_heartbeat_renews_job_lock():
+    redis = FakeRedis()
+    job_id = asyncio.run(jq.enqueue_job("cafe_detail", redis=AsyncFakeRedis(redis)))
+    lock = jq.lock_key("cafe_detail")
+    redis.ttls[lock] = 5
+    runner = jr.JobRunner(redis=redis, targets={})
+    runner.running[job_id] = ("cafe_detail", None)
+    runner.heartbeat()
+    assert redis.ttls[lock] == jq.JOB_LOCK_LEASE
+
+"""
+release_job_lock·renew_job_lock: 임대가 끝나 다른 작업이 잡은 락은 지우거나 연장하지 않음
+"""
+def test_job_lock_owner_checks():
+    redis = FakeRedis()
+    lock = jq.lock_key("cafe_detail")
+    redis.set(lock, "other", ex=5)
+    jq.release_job_lock(redis, lock, "mine")
+    assert not jq.renew_job_lock(redis, lock, "mine")
+    assert redis.get(lock) == "other" and redis.ttls[lock] == 5
+    assert jq.renew_job_lock(redis, lock, "other") and redis.ttls[lock] == jq.JOB_LOCK_LEASE
+    jq.release_job_lock(redis, lock, "other")
+    assert redis.get(lock) is None
+
+"""
+ProgressReporter: 기록 간격 안의 진행률 보고는 마지막 값만 한 번 기록하고, 처리량·ETA와 함께 이벤트 스트림에도 추가
+"""
+def test_progress_reporter_coalesces_updates():
+    redis = FakeRedis()
+    job_id = asyncio.run(jq.enqueue_job("cafe_search", redis=AsyncFakeRedis(redis)))
+    now = [0.0]
+    reporter = jr.ProgressReporter(redis, "cafe_search", job_id, flush_interval=1.0, clock=lambda: now[0])
+    for step in range(1, 1001):
+        now[0] = step * 0.002
+        reporter.update(step // 20, f"grid_step_{step}")
+    # 첫 보고는 바로 기록하고, 이후 2초 동안의 보고는 1초마다 한 번씩만 기록
+    assert reporter.flushes == 2 and reporter.pending is not None
+    reporter.publish({"status": "completed"})
+
+    events = [fields for _, fields in redis.streams[jq.events_key(job_id)]]
+    assert len(events) == 4 and events[-1] == {"status": "completed"}
+    assert events[-2]["stage"] == "grid_step_1000" and events[-2]["progress"] == "50"
+    assert float(events[-2]["throughput"]) == 500.0 and events[-2]["eta"] == "2"
+    job = redis.hgetall(jq.job_key("cafe_search", job_id))
+    assert job["status"] == "completed" and job["stage"] == "grid_step_1000"
+
+"""
+job_events: 현재 상태를 먼저 보내고 이후 이벤트를 작업이 끝날 때까지 전달, Last-Event-ID로 재연결 시 이어서 전달
+"""
+def test_job_events_stream():
+    redis = FakeRedis()
+    async_redis = AsyncFakeRedis(redis)
+    job_id = asyncio.run(jq.enqueue_job("cafe_detail", redis=async_redis))
+    reporter = jr.ProgressReporter(redis, "cafe_detail", job_id, flush_interval=0)
+    reporter.publish({"status": "in_progress"})
+    reporter.update(30, "detail_step_3")
+
+    async def collect(last_event_id=None):
+        return [item async for item in jq.job_events(job_id, last_event_id, redis=async_redis, block_ms=0)]
+
+    async def finish_later():
+        reporter.update(100, "completed")
+        reporter.publish({"status": "completed"})
+
+    async def first_two():
+        stream = jq.job_events(job_id, redis=async_redis, block_ms=0)
+        items = [await stream.__anext__(), await stream.__anext__()]
+        await stream.aclose()
+        return items
+
+    # 스냅샷 이후 새 이벤트가 없으면 연결 유지 신호 (None, None)을 보냄
+    snapshot, keep_alive = asyncio.run(first_two())
+    assert snapshot[0] is None and snapshot[1]["progress"] == "30"
+    assert keep_alive == (None, None)
+
+    asyncio.run(finish_later())
+    events = asyncio.run(collect("2-0"))
+    assert [fields.get("status") or fields["stage"] for _, fields in events] == ["completed", "completed"]
+    assert events[-1][0] == "4-0"
+
+    # 끝난 작업은 스냅샷만 보내고 종료
+    assert [data["status"] for _, data in asyncio.run(collect())] == ["completed"]
+
+"""
+job_events: redis를 넘기지 않으면 엔드포인트용 공유 풀이 아닌 SSE 구독 전용 풀로 대기
+"""
+def test_job_events_uses_stream_pool(monkeypatch):
+    redis = FakeRedis()
+    async_redis = AsyncFakeRedis(redis)
+    job_id = asyncio.run(jq.enqueue_job("cafe_detail", redis=async_redis))
+    jr.ProgressReporter(redis, "cafe_detail", job_id, flush_interval=0).publish({"status": "completed"})
+    monkeypatch.setattr(jq, "get_async_redis", lambda: (_ for _ in ()).throw(AssertionError("shared pool")))
+    monkeypatch.setattr(jq, "get_stream_redis", lambda: async_redis)
+
+    async def collect():
+        return [item async for item in jq.job_events(job_id)]
+    assert [data["status"] for _, data in asyncio.run(collect())] == ["completed"]
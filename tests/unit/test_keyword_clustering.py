@@ -5,23 +5,6 @@ from app.service.keyword_clustering import get_connection
 
 import app.service.keyword_clustering as kc
 
-"""
-reset_cluster_tables 성공: 테이블 초기화 및 커밋/닫기 호출
-"""
-def test_reset_cluster_tables_success(mock_db_connection):
-    mock_conn, mock_cursor = mock_db_connection
-    with patch.object(kc, "get_connection", return_value=mock_conn):
-        # 컨텍스트 매니저 모킹
-        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-        kc.reset_cluster_tables()
-    # DELETE 및 ALTER 쿼리가 실행되었는지 확인
-    assert mock_cursor.execute.call_args_list[0][0][0].startswith("DELETE FROM clustered_keywords")
-    assert mock_cursor.execute.call_args_list[1][0][0].startswith("DELETE FROM cluster_summaries")
-    assert "AUTO_INCREMENT = 1" in mock_cursor.execute.call_args_list[2][0][0]
-    assert "AUTO_INCREMENT = 1" in mock_cursor.execute.call_args_list[3][0][0]
-    mock_conn.commit.assert_called_once()
-    mock_conn.close.assert_called_once()
-
 """
 fetch_keywords_grouped_by_cafe 성공: 카페별 키워드 dict 반환
 """
@@ -32,12 +15,13 @@ def test_fetch_keywords_grouped_by_cafe_success(mock_db_connection):
         {"cafe_id": 1, "keyword": "b"},
         {"cafe_id": 2, "keyword": "x"}
     ]
-    mock_cursor.fetchall.return_value = rows
+    # 서버 측 커서는 행을 하나씩 순회
+    mock_cursor.__iter__.return_value = iter(rows)
     with patch.object(kc, "get_connection", return_value=mock_conn):
         # 컨텍스트 매니저 모킹
         mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-        result = kc.fetch_keywords_grouped_by_cafe()
-    assert isinstance(result, dict)
+        result = dict(kc.fetch_keywords_grouped_by_cafe())
+    assert "ORDER BY cafe_id" in mock_cursor.execute.call_args[0][0]
     assert result[1] == ["a", "b"]
     assert result[2] == ["x"]
     mock_conn.close.assert_called_once()
@@ -67,7 +51,7 @@ def test_extract_representative_keywords():
         [1.0, 1.0],
         [0.5, 0.5]
     ])
-    tfidf_scores = {"k1": 0.1, "k2": 0.9, "k3": 0.5}
+    tfidf_scores = np.array([0.1, 0.9, 0.5])
     rep = kc.extract_representative_keywords(cafe_id, cluster_labels, keywords, embeddings, tfidf_scores)
     # cluster 0: keywords [k1,k2], rep should be k2 (higher tfidf)
     # cluster 1: single k3, rep k3
@@ -75,25 +59,86 @@ def test_extract_representative_keywords():
     assert (1, 1, "k3", 1) in rep
 
 """
-save_clustered_keywords 성공: 올바른 INSERT 호출
+extract_representative_keywords: 정규화 임베딩의 두 키워드 클러스터는 거리가 동점이므로 TF-IDF로 선택하고, 노이즈만 있으면 빈 결과
+"""
+def test_extract_representative_keywords_tie_and_noise():
+    embeddings = kc.normalize_embeddings(np.array([[1.0, 0.2], [0.2, 1.0], [1.0, 1.0]]))
+    rep = kc.extract_representative_keywords(1, [5, 5, -1], ["k1", "k2", "k3"], embeddings, np.array([0.2, 0.7, 0.9]))
+    assert rep == [(1, 5, "k2", 2)]
+    assert kc.extract_representative_keywords(1, [-1, -1], ["k1", "k2"], embeddings[:2], np.zeros(2)) == []
+
 """
-def test_save_clustered_keywords_success(mock_db_connection):
+keyword_tfidf_scores: 키워드별 TF-IDF 행 합을 한 번에 계산
+"""
+def test_keyword_tfidf_scores():
+    vectorizer = kc.TfidfVectorizer().fit(["오션 뷰", "오션", "디저트 케이크"])
+    keywords = ["오션 뷰", "디저트", "없는단어"]
+    matrix = vectorizer.transform(keywords)
+    expected = [matrix[idx].sum() for idx in range(len(keywords))]
+    assert np.array_equal(kc.keyword_tfidf_scores(vectorizer, keywords), expected)
+
+"""
+ClusterResultWriter: 연결 하나로 flush_every개 카페마다 다중 행 INSERT 후 커밋, 노이즈는 제외
+"""
+def test_cluster_result_writer_batches(mock_db_connection):
     mock_conn, mock_cursor = mock_db_connection
-    cafe_id = 1
-    keywords = ["a", "b", "c"]
-    cluster_labels = [0, -1, 0]
-    # 첫번 a->0, b noise, c->0 => counts: (0,a):1, (0,c):1
-    with patch.object(kc, "get_connection", return_value=mock_conn):
-        # 컨텍스트 매니저 모킹
-        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
-        kc.save_clustered_keywords(cafe_id, cluster_labels, keywords)
-    # 두 번의 INSERT 호출이 있어야 함
-    insert_calls = [c for c in mock_cursor.execute.call_args_list if "INSERT INTO clustered_keywords" in c[0][0]]
-    assert len(insert_calls) == 2
-    # 파라미터 확인
-    args = insert_calls[0][0][1]
-    assert args[0] == cafe_id
-    assert args[1] == 0
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    with patch.object(kc, "get_connection", return_value=mock_conn) as mock_get_connection:
+        with kc.ClusterResultWriter(flush_every=2) as writer:
+            # a->0, b 노이즈, c->0
+            writer.add(1, [0, -1, 0], ["a", "b", "c"], [(1, 0, "a", 2)])
+            assert mock_cursor.executemany.call_count == 0
+            writer.add(2, [1, 1, 1], ["x", "y", "z"], [(2, 1, "y", 3)])
+            assert mock_conn.commit.call_count == 1
+            writer.add(3, [0, 0, 0], ["p", "q", "r"], [(3, 0, "p", 3)])
+    mock_get_connection.assert_called_once()
+    calls = mock_cursor.executemany.call_args_list
+    assert "INSERT INTO clustered_keywords" in calls[0][0][0]
+    assert calls[0][0][1] == [(1, 0, "a", 1), (1, 0, "c", 1), (2, 1, "x", 1), (2, 1, "y", 1), (2, 1, "z", 1)]
+    assert "INSERT INTO keywords" in calls[1][0][0]
+    assert calls[1][0][1] == [(1, "a", 2), (2, "y", 3)]
+    # 남은 카페는 종료 시 저장
+    assert calls[3][0][1] == [(3, "p", 3)]
+    assert mock_conn.commit.call_count == 2
+    mock_conn.close.assert_called_once()
+
+"""
+ClusterResultWriter.rebuild: 섀도 테이블에 쓰고 정상 종료 시 교체, 예외 시 섀도 테이블만 삭제
+"""
+def test_cluster_result_writer_rebuild_publishes_shadow(mock_db_connection):
+    mock_conn, mock_cursor = mock_db_connection
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    shadows = {table: f"{table}__shadow" for table in kc.CLUSTER_RESULT_TABLES}
+    with patch.object(kc, "create_shadow_tables", return_value=shadows), \
+            patch.object(kc, "publish_shadow_tables") as mock_publish, \
+            patch.object(kc, "discard_shadow_tables") as mock_discard:
+        with kc.ClusterResultWriter(conn=mock_conn) as writer:
+            writer.rebuild()
+            writer.add(1, [0, 0, 0], ["a", "b", "c"], [(1, 0, "a", 3)], "fp")
+        mock_publish.assert_called_once_with(mock_cursor, kc.CLUSTER_RESULT_TABLES)
+        sqls = [c[0][0] for c in mock_cursor.executemany.call_args_list]
+        assert [sql.split()[2] for sql in sqls] == ["clustered_keywords__shadow", "keywords__shadow", "cluster_fingerprints__shadow"]
+
+        with pytest.raises(RuntimeError):
+            with kc.ClusterResultWriter(conn=mock_conn) as writer:
+                writer.rebuild()
+                raise RuntimeError("clustering failed")
+        mock_publish.assert_called_once()
+        mock_discard.assert_called_once_with(mock_conn, kc.CLUSTER_RESULT_TABLES)
+
+"""
+ClusterResultWriter.add(replace=True): 저장하는 트랜잭션에서 카페의 기존 결과를 먼저 삭제
+"""
+def test_cluster_result_writer_replace(mock_db_connection):
+    mock_conn, mock_cursor = mock_db_connection
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    with kc.ClusterResultWriter(conn=mock_conn, flush_every=1) as writer:
+        writer.add(7, [0, 0, 0], ["a", "b", "c"], [(7, 0, "a", 3)], "fp", replace=True)
+        writer.add(8, [], [], [], replace=True)
+    deletes = [c[0] for c in mock_cursor.execute.call_args_list]
+    assert [sql.split()[2] for sql, _ in deletes] == list(kc.CLUSTER_RESULT_TABLES) * 2
+    assert [params for _, params in deletes] == [[7]] * 3 + [[8]] * 3
+    assert mock_conn.commit.call_count == 2
 
 """
 cluster_keywords_per_cafe()에서 키워드 수 부족(c <=2)이면 저장 함수가 호출되지 않는지 테스트합니다.
@@ -106,10 +151,235 @@ def test_cluster_keywords_per_cafe_failure_min_size(monkeypatch, mock_db_connect
     mock_conn, mock_cursor = mock_db_connection
     # fetch_keywords return one cafe with <=2 keywords
     data = {1: ["a", "b"]}
-    monkeypatch.setattr(kc, "reset_cluster_tables", lambda: None)
-    monkeypatch.setattr(kc, "fetch_keywords_grouped_by_cafe", lambda: data)
+    monkeypatch.setattr(kc, "load_cluster_fingerprints", lambda conn: {})
+    monkeypatch.setattr(kc, "delete_cluster_results", lambda conn, cafe_ids: None)
+    monkeypatch.setattr(kc, "fetch_keywords_grouped_by_cafe", fake_fetch(data))
     # 임베딩, clustering, save 함수 모킹
     monkeypatch.setattr(kc, "embed_keywords", lambda kws, model: np.zeros((2,2)))
-    monkeypatch.setattr(kc, "save_clustered_keywords", lambda *args, **kwargs: (_ for _ in ()).throw(Exception("should not call")))
+    writer = FakeWriter()
+    monkeypatch.setattr(kc, "ClusterResultWriter", lambda: writer)
     # 실행 시 예외가 발생하지 않아야 함
-    kc.cluster_keywords_per_cafe(min_cluster_size=3)
\ No newline at end of file
+    kc.cluster_keywords_per_cafe(min_cluster_size=3)
+    assert writer.added == []
+    # 저장된 지문이 없으면 섀도 테이블에 전체를 새로 만듦
+    assert writer.rebuilt
+
+
+def fake_fetch(data):
+    # fetch_keywords_grouped_by_cafe 대역 (빈도는 모두 1)
+    def fetch(with_counts=False):
+        for cafe_id, keywords in list(data.items()):
+            yield (cafe_id, keywords, [1] * len(keywords)) if with_counts else (cafe_id, keywords)
+    return fetch
+
+
+class FakeWriter:
+    # 저장 대신 카페별 결과를 기록하는 ClusterResultWriter 대역
+    def __init__(self):
+        self.conn = None
+        self.added = []
+        self.fingerprints = {}
+        self.replaced = []
+        self.rebuilt = False
+        self.clustered_rows = []
+        self.summary_rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def rebuild(self):
+        self.rebuilt = True
+
+    def add(self, cafe_id, cluster_labels, keywords, representative_data, fingerprint=None, replace=False):
+        self.added.append((cafe_id, list(cluster_labels), representative_data))
+        self.fingerprints[cafe_id] = fingerprint
+        if replace:
+            self.replaced.append(cafe_id)
+
+    def add_rows(self, clustered_rows, summary_rows, cafes):
+        self.clustered_rows.extend(clustered_rows)
+        self.summary_rows.extend(summary_rows)
+
+
+class FakeStore:
+    # 키워드마다 고정된 임베딩을 돌려주는 임베딩 저장소 대역
+    def __init__(self, vocabulary):
+        self.keywords = sorted(vocabulary)
+        rng = np.random.RandomState(0)
+        self.matrix = rng.rand(len(self.keywords), 8).astype(np.float32)
+        self.dim = 8
+        self.model_name = "test/model"
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def ensure(self, keywords, encode):
+        return 0
+
+    def lookup(self, keywords):
+        return np.array([self.keywords.index(kw) for kw in keywords], dtype=np.int64)
+
+    def vectors(self, rows):
+        return self.matrix[rows]
+
+"""
+cluster_keywords_per_cafe(workers=2): 프로세스 풀 결과가 단일 프로세스 결과와 같고, 저장과 진행률은 카페 순서대로
+"""
+def test_cluster_keywords_per_cafe_parallel_matches_serial(monkeypatch):
+    data = {cafe_id: [f"키워드{(cafe_id * 7 + i) % 30}" for i in range(12)] for cafe_id in range(1, 6)}
+    data[6] = ["a", "b"]
+    store = FakeStore({kw for kws in data.values() for kw in kws})
+    monkeypatch.setattr(kc, "load_cluster_fingerprints", lambda conn: {})
+    monkeypatch.setattr(kc, "delete_cluster_results", lambda conn, cafe_ids: None)
+    monkeypatch.setattr(kc, "fetch_keywords_grouped_by_cafe", fake_fetch(data))
+    monkeypatch.setattr(kc, "get_embedding_store", lambda name: store)
+
+    def run(workers):
+        writer, progress = FakeWriter(), []
+        monkeypatch.setattr(kc, "ClusterResultWriter", lambda: writer)
+        kc.cluster_keywords_per_cafe(lambda p, s: progress.append(p), workers=workers)
+        return writer.added, progress
+
+    serial_saved, serial_progress = run(1)
+    parallel_saved, parallel_progress = run(2)
+    assert parallel_saved == serial_saved
+    assert [entry[0] for entry in parallel_saved] == [1, 2, 3, 4, 5]
+    assert parallel_progress == serial_progress == sorted(serial_progress)
+    assert parallel_progress[-1] == 100
+
+"""
+fit_embedding_reducer / project_embeddings: 전역 어휘로 학습한 축소기로 차원을 줄이고 단위 벡터로 정규화
+"""
+def test_project_embeddings_with_reduction():
+    vocabulary = {f"키워드{i}" for i in range(20)}
+    store = FakeStore(vocabulary)
+    assert kc.fit_embedding_reducer(store, vocabulary, "none", 4) is None
+    for method in ("pca", "random"):
+        reducer = kc.fit_embedding_reducer(store, vocabulary, method, 4)
+        projected = kc.project_embeddings(store.vectors(np.arange(5)), reducer)
+        assert projected.shape == (5, 4)
+        assert np.allclose(np.linalg.norm(projected, axis=1), 1.0)
+    with pytest.raises(ValueError):
+        kc.fit_embedding_reducer(store, vocabulary, "umap", 4)
+
+"""
+assign_to_nearest_cluster: 새 키워드를 가장 가까운 클러스터 중심에 배정하고, 멀면 노이즈(-1)
+"""
+def test_assign_to_nearest_cluster():
+    embeddings = kc.normalize_embeddings(np.array([[1.0, 0.0], [0.9, 0.1], [0.0, 1.0], [0.1, 0.9], [1.0, 1.0]]))
+    labels = np.array([3, 3, 7, 7, -1])
+    new = kc.normalize_embeddings(np.array([[1.0, 0.05], [0.05, 1.0], [-1.0, -1.0]]))
+    assert list(kc.assign_to_nearest_cluster(embeddings, labels, new, min_similarity=0.5)) == [3, 7, -1]
+
+"""
+cluster_keywords_global: 어휘를 한 번만 클러스터링해 저장하고, 다음 실행에서는 새 키워드만 배정
+"""
+def test_cluster_keywords_global_assigns_new_keywords(monkeypatch):
+    data = {1: ["aa", "bb", "cc"], 2: ["aa", "cc", "dd"]}
+    store = FakeStore({"aa", "bb", "cc", "dd", "ee"})
+    saved_assignments = {}
+    writer = FakeWriter()
+    monkeypatch.setattr(kc, "fetch_keywords_grouped_by_cafe", fake_fetch(data))
+    monkeypatch.setattr(kc, "get_embedding_store", lambda name: store)
+    monkeypatch.setattr(kc, "load_keyword_clusters", lambda model: dict(saved_assignments))
+    monkeypatch.setattr(kc, "save_keyword_clusters", lambda model, assignments, replace=False: saved_assignments.update(assignments))
+    monkeypatch.setattr(kc, "ClusterResultWriter", lambda: writer)
+    mock_hdbscan = MagicMock()
+    mock_hdbscan.return_value.fit_predict.side_effect = lambda x: np.array([0, 0, 1, 1])
+    monkeypatch.setattr(kc, "HDBSCAN", mock_hdbscan)
+
+    kc.cluster_keywords_global()
+    assert saved_assignments == {"aa": 0, "bb": 0, "cc": 1, "dd": 1}
+    assert sorted(row[:3] for row in writer.clustered_rows) == [
+        (1, 0, "aa"), (1, 0, "bb"), (1, 1, "cc"), (2, 0, "aa"), (2, 1, "cc"), (2, 1, "dd")]
+    assert sorted((row[0], row[2]) for row in writer.summary_rows) == [(1, 1), (1, 2), (2, 1), (2, 2)]
+
+    # 새 키워드 e만 배정하고 전체 재클러스터링은 하지 않음
+    data[2].append("ee")
+    kc.cluster_keywords_global()
+    assert mock_hdbscan.call_count == 1
+    assert set(saved_assignments) == {"aa", "bb", "cc", "dd", "ee"}
+
+"""
+cafe_cluster_frame_rows: 여러 카페 프레임에서 카페별 모드(extract_representative_keywords, clustered_keyword_rows,
+cluster_summary_rows)와 같은 행을 도출
+"""
+def test_cafe_cluster_frame_rows_matches_per_cafe():
+    rng = np.random.RandomState(1)
+    cafes = {10: ["a", "b", "c", "d", "e"], 3: ["b", "c", "f", "g"]}
+    labels = {10: [4, 4, -1, 2, 2], 3: [2, 2, 2, -1]}
+    embeddings = {cafe_id: kc.normalize_embeddings(rng.rand(len(kws), 6)) for cafe_id, kws in cafes.items()}
+    scores = {cafe_id: rng.rand(len(kws)) for cafe_id, kws in cafes.items()}
+
+    clustered_rows, summary_rows = kc.cafe_cluster_frame_rows(
+        [cafe_id for cafe_id in cafes for _ in cafes[cafe_id]],
+        [kw for kws in cafes.values() for kw in kws],
+        np.concatenate([labels[cafe_id] for cafe_id in cafes]),
+        np.vstack([embeddings[cafe_id] for cafe_id in cafes]),
+        np.concatenate([scores[cafe_id] for cafe_id in cafes]),
+    )
+    expected_clustered, expected_summary = [], []
+    for cafe_id in cafes:
+        representative_data = kc.extract_representative_keywords(
+            cafe_id, labels[cafe_id], cafes[cafe_id], embeddings[cafe_id], scores[cafe_id])
+        expected_clustered += kc.clustered_keyword_rows(cafe_id, labels[cafe_id], cafes[cafe_id])
+        expected_summary += kc.cluster_summary_rows(representative_data, cafe_id, labels[cafe_id], cafes[cafe_id])
+    assert sorted(clustered_rows) == sorted(expected_clustered)
+    assert sorted(summary_rows) == sorted(expected_summary)
+    assert kc.cafe_cluster_frame_rows([1], ["a"], [-1], np.zeros((1, 2)), np.zeros(1)) == ([], [])
+
+"""
+cafe_fingerprint: 키워드 순서와 무관하고, 빈도나 설정이 바뀌면 달라짐
+"""
+def test_cafe_fingerprint():
+    base = kc.cafe_fingerprint(["뷰", "커피"], [3, 1], "cfg")
+    assert base == kc.cafe_fingerprint(["커피", "뷰"], [1, 3], "cfg")
+    assert base != kc.cafe_fingerprint(["뷰", "커피"], [3, 2], "cfg")
+    assert base != kc.cafe_fingerprint(["뷰", "커피"], [3, 1], "other")
+
+"""
+cluster_keywords_per_cafe: 지문이 같은 카페는 건너뛰고, 사라진 카페의 결과만 먼저 지우며
+바뀐 카페는 새 결과를 저장할 때 교체
+"""
+def test_cluster_keywords_per_cafe_skips_unchanged(monkeypatch):
+    data = {1: ["aa", "bb", "cc", "dd"], 2: ["aa", "cc", "ee", "ff"], 4: ["aa", "bb"]}
+    store = FakeStore({"aa", "bb", "cc", "dd", "ee", "ff"})
+    config = kc.clustering_config(2)
+    stored = {
+        1: kc.cafe_fingerprint(data[1], [1] * 4, config),
+        2: "changed",
+        3: "removed",
+        4: "shrunk",
+    }
+    deleted = []
+    writer = FakeWriter()
+    monkeypatch.setattr(kc, "load_cluster_fingerprints", lambda conn: dict(stored))
+    monkeypatch.setattr(kc, "delete_cluster_results", lambda conn, cafe_ids: deleted.extend(cafe_ids))
+    monkeypatch.setattr(kc, "fetch_keywords_grouped_by_cafe", fake_fetch(data))
+    monkeypatch.setattr(kc, "get_embedding_store", lambda name: store)
+    monkeypatch.setattr(kc, "ClusterResultWriter", lambda: writer)
+    progress = []
+
+    kc.cluster_keywords_per_cafe(lambda p, s: progress.append(p))
+    assert deleted == [3]
+    assert not writer.rebuilt
+    assert [added[0] for added in writer.added] == [2, 4]
+    assert writer.replaced == [2, 4]
+    assert writer.added[1][1:] == ([], [])
+    assert writer.fingerprints[2] == kc.cafe_fingerprint(data[2], [1] * 4, config)
+    assert progress[-1] == 100
+
+"""
+cluster_and_save_cafe: 카페 키워드로 학습한 TF-IDF를 쓰므로, 저장한 지문은 일반 클러스터링 지문과 달라 다음 실행에서 다시 클러스터링
+"""
+def test_cluster_and_save_cafe_marks_stream_fingerprint(monkeypatch):
+    keywords = ["aa", "bb", "cc", "dd"]
+    store = FakeStore(set(keywords))
+    writer = FakeWriter()
+    monkeypatch.setattr(kc, "CLUSTER_REDUCTION", "none")
+    assert kc.cluster_and_save_cafe(writer, store, 7, keywords, [1, 2, 3, 4]) is None
+    assert writer.replaced == [7]
+    assert writer.fingerprints[7] != kc.cafe_fingerprint(keywords, [1, 2, 3, 4], kc.clustering_config(2))
@@ -3,6 +3,10 @@ from unittest.mock import patch, MagicMock
 import app.service.keyword_extractor as ke_module
 from app.service.keyword_extractor import get_connection
 
+def fake_create_shadow_tables(cursor, tables):
+    return {table: f"{table}__shadow" for table in tables}
+
+
 def make_mock_token(form, tag, lemma=None):
     token = MagicMock()
     token.form = form
@@ -16,42 +20,50 @@ extract_all_keywords 실패: 카페 없음
 def test_extract_all_keywords_failure_no_cafes(mock_db_connection):
     mock_conn, mock_cursor = mock_db_connection
     # No cafes returned
-    mock_cursor.fetchall.return_value = []
+    mock_cursor.fetchone.return_value = {"total": 0}
+    mock_cursor.__iter__.return_value = iter([])
     # Run
-    with patch.object(ke_module, "get_connection", return_value=mock_conn):
+    with patch.object(ke_module, "create_shadow_tables", side_effect=fake_create_shadow_tables) as mock_create, \
+            patch.object(ke_module, "publish_shadow_tables") as mock_publish, \
+            patch.object(ke_module, "get_connection", return_value=mock_conn):
         mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
         count = ke_module.extract_all_keywords()
     # Assertions
     assert count == 0
-    # Ensure DELETE and SELECT id from cafes ran
-    mock_cursor.execute.assert_any_call("DELETE FROM keywords")
-    mock_cursor.execute.assert_any_call("ALTER TABLE keywords AUTO_INCREMENT = 1")
-    mock_cursor.execute.assert_any_call("SELECT id FROM cafes")
+    # 라이브 테이블을 비우지 않고 섀도 테이블을 만든 뒤 교체
+    mock_create.assert_called_once_with(mock_cursor, ke_module.EXTRACT_TABLES)
+    mock_publish.assert_called_once_with(mock_cursor, ke_module.EXTRACT_TABLES)
+    executed = [c[0][0] for c in mock_cursor.execute.call_args_list]
+    assert "DELETE FROM extracted_keywords" not in executed
+    mock_cursor.execute.assert_any_call(ke_module.FULL_REVIEWS_QUERY)
 
 """
 extract_all_keywords 성공: 리뷰가 있을 때 1개 키워드 반환
 """
 def test_extract_all_keywords_success_with_reviews(mock_db_connection):
     mock_conn, mock_cursor = mock_db_connection
-    # Setup cafes: one cafe with id 1
-    mock_cursor.fetchall.side_effect = [
-        [{"id": 1}],                   # for SELECT id FROM cafes
-        [{"content": "테스트 리뷰"}],   # for SELECT content FROM reviews
-    ]
-    # Mock Kiwi.analyze to return a list of (list of tokens, score)
+    # Setup reviews: one cafe with id 1 (cafe_id 순 스트리밍)
+    mock_cursor.fetchone.return_value = {"total": 1}
+    mock_cursor.__iter__.return_value = iter([{"id": 10, "cafe_id": 1, "content": "테스트 리뷰"}])
+    # Mock Kiwi.analyze(배치) to return [(list of tokens, score)] per text
     mock_token1 = make_mock_token("맛있다", "VA", lemma="맛있다")
     mock_token2 = make_mock_token("커피", "NNG")
-    fake_tokens = [[mock_token1, mock_token2]]
-    with patch.object(ke_module, "Kiwi", return_value=MagicMock(analyze=lambda text: fake_tokens)):
+    fake_result = [([mock_token1, mock_token2], 0.0)]
+    with patch.object(ke_module, "Kiwi", return_value=MagicMock(analyze=lambda texts: [fake_result for _ in texts])), \
+            patch.object(ke_module, "create_shadow_tables", side_effect=fake_create_shadow_tables), \
+            patch.object(ke_module, "publish_shadow_tables") as mock_publish:
         with patch.object(ke_module, "get_connection", return_value=mock_conn):
             mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
             count = ke_module.extract_all_keywords()
     # Assertions
     assert count == 1
-    # Ensure keywords table reset
-    mock_cursor.execute.assert_any_call("DELETE FROM keywords")
-    # 적어도 DELETE, ALTER, SELECT id, SELECT content 외에 추가 쿼리가 실행되었는지 확인
-    assert mock_cursor.execute.call_count > 3
+    mock_publish.assert_called_once()
+    # 분석 결과가 캐시에 저장되고, 카페별 키워드 빈도가 섀도 테이블에 한 번의 다중 행 INSERT로 저장되었는지 확인
+    executemany_sqls = [c[0][0] for c in mock_cursor.executemany.call_args_list]
+    assert any("review_token_cache" in sql for sql in executemany_sqls)
+    keyword_call = next(c for c in mock_cursor.executemany.call_args_list if "extracted_keywords" in c[0][0])
+    assert "INSERT INTO extracted_keywords__shadow" in keyword_call[0][0]
+    assert sorted(keyword_call[0][1]) == [(1, "맛있다", 1), (1, "커피", 1)]
 
 
 """
@@ -59,13 +71,14 @@ extract_all_keywords 실패: 형태소 분석 예외 처리
 """
 def test_extract_all_keywords_failure_analysis_error(mock_db_connection):
     mock_conn, mock_cursor = mock_db_connection
-    # 한 개의 카페 ID만 반환 및 리뷰 데이터도 반환
-    mock_cursor.fetchall.side_effect = [
-        [{"id": 42}],                # 첫 번째 fetchall: cafes 리스트
-        [{"content": "테스트"}]      # 두 번째 fetchall: reviews 리스트
-    ]
+    # 한 개의 카페와 리뷰 데이터 반환
+    mock_cursor.fetchone.return_value = {"total": 1}
+    mock_cursor.__iter__.return_value = iter([{"id": 11, "cafe_id": 42, "content": "테스트"}])
     # Patch Kiwi so that instantiation succeeds but analyze raises an exception
-    with patch.object(ke_module, "Kiwi") as mock_Kiwi:
+    with patch.object(ke_module, "Kiwi") as mock_Kiwi, \
+            patch.object(ke_module, "create_shadow_tables", side_effect=fake_create_shadow_tables), \
+            patch.object(ke_module, "publish_shadow_tables") as mock_publish, \
+            patch.object(ke_module, "discard_shadow_tables") as mock_discard:
         mock_instance = MagicMock()
         mock_instance.analyze.side_effect = Exception("분석 실패")
         mock_Kiwi.return_value = mock_instance
@@ -74,4 +87,175 @@ def test_extract_all_keywords_failure_analysis_error(mock_db_connection):
             # 함수가 예외를 다시 발생시키는지 확인합니다.
             with pytest.raises(Exception) as excinfo:
                 ke_module.extract_all_keywords()
-            assert "분석 실패" in str(excinfo.value)
\ No newline at end of file
+            assert "분석 실패" in str(excinfo.value)
+    # 실패하면 교체하지 않고 섀도 테이블만 버림
+    mock_publish.assert_not_called()
+    mock_discard.assert_called_once_with(mock_conn, ke_module.EXTRACT_TABLES)
+
+
+"""
+filter_tokens: 불용어·한 글자 단어 제외, 용언은 원형으로 수집
+"""
+def test_filter_tokens():
+    tokens = [
+        ("커피", "NNG", "커피"),
+        ("카페", "NNG", "카페"),      # 불용어
+        ("뷰", "NNG", "뷰"),          # 한 글자
+        ("맛있", "VA", "맛있다"),
+        ("좋", "VA", "좋다"),         # 원형이 불용어
+        ("가", "JKS", "가"),
+    ]
+    assert ke_module.filter_tokens(tokens) == {"커피", "맛있다"}
+
+
+"""
+extract_all_keywords 캐시 적중: 캐시된 토큰만으로 집계하고 Kiwi는 분석하지 않음
+"""
+def test_extract_all_keywords_uses_token_cache(mock_db_connection):
+    mock_conn, mock_cursor = mock_db_connection
+    content = "  바다   뷰 최고 "
+    digest = ke_module.content_hash(ke_module.normalize_content(content))
+    mock_cursor.fetchone.return_value = {"total": 1}
+    mock_cursor.__iter__.return_value = iter([{"id": 12, "cafe_id": 7, "content": content}])
+    # 중복 표시 조회(없음) → 캐시 조회
+    mock_cursor.fetchall.side_effect = [[], [
+        {"content_hash": digest, "tokens": ke_module.encode_tokens([("바다", "NNG", "바다"), ("예쁘", "VA", "예쁘다")])}
+    ]]
+    with patch.object(ke_module, "Kiwi") as mock_Kiwi, \
+            patch.object(ke_module, "create_shadow_tables", side_effect=fake_create_shadow_tables), \
+            patch.object(ke_module, "publish_shadow_tables"):
+        with patch.object(ke_module, "get_connection", return_value=mock_conn):
+            mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+            count = ke_module.extract_all_keywords()
+    assert count == 1
+    mock_Kiwi.assert_not_called()
+    keyword_call = next(c for c in mock_cursor.executemany.call_args_list if "extracted_keywords" in c[0][0])
+    assert sorted(keyword_call[0][1]) == [(7, "바다", 1), (7, "예쁘다", 1)]
+
+
+"""
+encode_tokens/decode_tokens: 원형 생략 후에도 원래 토큰으로 복원
+"""
+def test_encode_decode_tokens_roundtrip():
+    tokens = [("커피", "NNG", "커피"), ("맛있", "VA", "맛있다")]
+    assert ke_module.decode_tokens(ke_module.encode_tokens(tokens)) == tokens
+
+
+
+"""
+extract_all_keywords 증분 모드: 테이블을 비우지 않고 워터마크 이후 리뷰만 조회하여 count에 합산
+"""
+def test_extract_all_keywords_incremental(mock_db_connection):
+    mock_conn, mock_cursor = mock_db_connection
+    mock_cursor.fetchone.return_value = {"total": 1}
+    mock_cursor.__iter__.return_value = iter([
+        {"id": 21, "cafe_id": 3, "content": "커피"},
+        {"id": 25, "cafe_id": 3, "content": ""},
+    ])
+    fake_kiwi = MagicMock(analyze=lambda texts: [[([make_mock_token("커피", "NNG")], 0.0)] for _ in texts])
+    with patch.object(ke_module, "reconcile_keyword_watermarks") as mock_reconcile, \
+            patch.object(ke_module, "Kiwi", return_value=fake_kiwi), \
+            patch.object(ke_module, "get_connection", return_value=mock_conn):
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        count = ke_module.extract_all_keywords(incremental=True)
+    assert count == 1
+    mock_reconcile.assert_called_once()
+    executed = [c[0][0] for c in mock_cursor.execute.call_args_list]
+    assert "DELETE FROM extracted_keywords" not in executed
+    assert ke_module.INCREMENTAL_REVIEWS_QUERY in executed
+    keyword_call = next(c for c in mock_cursor.executemany.call_args_list if "extracted_keywords" in c[0][0])
+    assert "count = count + VALUES(count)" in keyword_call[0][0]
+    # 워터마크는 빈 리뷰까지 포함한 마지막 리뷰 id와 리뷰 수로 갱신
+    watermark_call = next(c for c in mock_cursor.execute.call_args_list if "keyword_extract_watermarks" in c[0][0] and "INSERT" in c[0][0])
+    assert watermark_call[0][1] == (3, 25, 2)
+
+
+"""
+reconcile_keyword_watermarks: 리뷰 수가 달라진 카페의 키워드와 워터마크 삭제
+"""
+def test_reconcile_keyword_watermarks(mock_db_connection):
+    mock_conn, mock_cursor = mock_db_connection
+    mock_cursor.fetchall.return_value = [{"cafe_id": 5}, {"cafe_id": 9}]
+    with patch.object(ke_module, "get_connection", return_value=mock_conn):
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        count = ke_module.reconcile_keyword_watermarks()
+    assert count == 2
+    mock_cursor.execute.assert_any_call("DELETE FROM extracted_keywords WHERE cafe_id IN (%s, %s)", [5, 9])
+    mock_cursor.execute.assert_any_call("DELETE FROM keyword_extract_watermarks WHERE cafe_id IN (%s, %s)", [5, 9])
+    mock_conn.commit.assert_called_once()
+
+"""
+extract_cafe_keywords: 캐시에 없는 리뷰만 분석하고, 카페의 키워드와 워터마크를 새로 씀
+"""
+def test_extract_cafe_keywords_replaces_cafe_rows(mock_db_connection):
+    _, mock_cursor = mock_db_connection
+    cached_digest = ke_module.content_hash("라떼가 맛있어요")
+    mock_cursor.fetchall.side_effect = [
+        [{"id": 3, "content": "라떼가 맛있어요"}, {"id": 9, "content": "디저트 맛집"}],
+        [],
+        [{"content_hash": cached_digest, "tokens": ke_module.encode_tokens([("라떼", "NNG", "라떼")])}],
+    ]
+    kiwi = MagicMock()
+    kiwi.analyze.return_value = [[[[make_mock_token("디저트", "NNG"), make_mock_token("맛집", "NNG")]]]]
+
+    counter = ke_module.extract_cafe_keywords(mock_cursor, 42, kiwi)
+
+    assert counter == {"라떼": 1, "디저트": 1, "맛집": 1}
+    kiwi.analyze.assert_called_once_with(["디저트 맛집"])
+    mock_cursor.execute.assert_any_call("DELETE FROM extracted_keywords WHERE cafe_id = %s", (42,))
+    watermark = mock_cursor.execute.call_args_list[-1][0]
+    assert "keyword_extract_watermarks" in watermark[0] and watermark[1] == (42, 9, 2)
+
+
+"""
+prepare_shard: review_duplicates에 기록된 내용 해시의 리뷰는 제외하고, 카페 안에서 반복된 내용은 첫 리뷰만 남김
+"""
+def test_prepare_shard_skips_duplicates():
+    cursor = MagicMock()
+    repeated, near, other = "같은 이벤트 리뷰", "거의 같은 이벤트 리뷰", "디저트 맛집"
+    cursor.fetchall.side_effect = [
+        [
+            {"cafe_id": 1, "content_hash": ke_module.content_hash(repeated),
+             "duplicate_of": ke_module.content_hash(repeated), "scope": "cafe"},
+            {"cafe_id": 1, "content_hash": ke_module.content_hash(near),
+             "duplicate_of": ke_module.content_hash(repeated), "scope": "cafe"},
+            # 다른 카페의 같은 내용(카페 간 중복)은 모두 제외
+            {"cafe_id": 2, "content_hash": ke_module.content_hash(repeated),
+             "duplicate_of": ke_module.content_hash(repeated), "scope": "global"},
+        ],
+        [],
+    ]
+    cafe_hashes, cached, misses = ke_module.prepare_shard(cursor, [
+        (1, [repeated, near, repeated, other], 4),
+        (2, [repeated, other], 6),
+    ])
+    assert cafe_hashes == [
+        (1, [ke_module.content_hash(repeated), ke_module.content_hash(other)]),
+        (2, [ke_module.content_hash(other)]),
+    ]
+    assert sorted(text for _, text in misses) == sorted([repeated, other])
+
+"""
+prepare_shard(incremental): 반복된 내용의 첫 리뷰가 워터마크 이하에서 이미 집계되었으면 새 반복도 제외
+"""
+def test_prepare_shard_incremental_skips_counted_repeats():
+    cursor = MagicMock()
+    repeated, other = "같은 이벤트 리뷰", "디저트 맛집"
+    digest = ke_module.content_hash(repeated)
+    cursor.fetchall.side_effect = [
+        [
+            {"cafe_id": 1, "content_hash": digest, "duplicate_of": digest, "scope": "cafe"},
+            {"cafe_id": 2, "content_hash": digest, "duplicate_of": digest, "scope": "cafe"},
+        ],
+        # 카페 1은 워터마크 이하에 같은 내용이 있음 (카페 2는 첫 리뷰가 이번 배치에 처음 들어옴)
+        [{"content": "  " + repeated}, {"content": other}],
+        [],
+        [],
+    ]
+    cafe_hashes, _, _ = ke_module.prepare_shard(cursor, [
+        (1, [repeated, other], 8),
+        (2, [repeated, repeated], 9),
+    ], incremental=True)
+    assert cafe_hashes == [(1, [ke_module.content_hash(other)]), (2, [digest])]
+    counted_queries = [c for c in cursor.execute.call_args_list if c[0][0] == ke_module.COUNTED_REVIEWS_QUERY]
+    assert [c[0][1] for c in counted_queries] == [(1,), (2,)]
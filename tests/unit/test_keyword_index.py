@@ -0,0 +1,85 @@
+import shutil
+from unittest.mock import patch
+import numpy as np
+from app.service.embedding_store import KeywordEmbeddingStore
+import app.service.keyword_index as ki
+
+
+def make_store(tmp_path, count, dim=16, seed=0):
+    # 중심 8개 주변에 모인 결정적 임베딩을 가진 저장소
+    rng = np.random.RandomState(seed)
+    centers = rng.randn(8, dim)
+    vectors = {f"kw{i}": centers[i % 8] + 0.1 * rng.randn(dim) for i in range(count)}
+    store = KeywordEmbeddingStore("test/model", root=str(tmp_path))
+    store.ensure(list(vectors), lambda batch: np.array([vectors[kw] for kw in batch]))
+    return store
+
+"""
+search: 가까운 리스트만 탐색해도 전체 탐색과 같은 최근접 키워드를 유사도 순으로 반환
+"""
+def test_search_matches_exact(tmp_path):
+    store = make_store(tmp_path, 400)
+    index = ki.train_keyword_index(store, nlist=8)
+    assert len(index) == 400 and index.offsets[-1] == 400
+
+    vectors = ki.normalize_rows(store.vectors(np.arange(400)))
+    query = vectors[5] + 0.05
+    exact = np.argsort(-(vectors @ ki.normalize_rows(query.reshape(1, -1))[0]), kind="stable")[:10]
+    results = index.search(query, k=10, nprobe=3, min_similarity=-1)
+    assert [keyword for keyword, _ in results] == [store.keywords[row] for row in exact]
+    assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+    assert index.search(query, k=10, min_similarity=1.01) == []
+
+"""
+save/load: 메모리 맵으로 다시 열고, 저장소에 새로 덧붙은 키워드는 가장 가까운 중심에 배정해 검색됨
+"""
+def test_persist_and_incremental_insert(tmp_path):
+    store = make_store(tmp_path, 200)
+    ki.train_keyword_index(store, nlist=8).save()
+
+    reopened = ki.load_keyword_index(KeywordEmbeddingStore("test/model", root=str(tmp_path)))
+    assert isinstance(reopened.centroids, np.memmap) and len(reopened) == 200
+
+    vector = store.vectors(store.lookup(["kw3"]))[0]
+    reopened.store.ensure(["새키워드"], lambda batch: np.array([vector]))
+    assert reopened.add_missing() == 1 and len(reopened) == 201
+    assert reopened.add_missing() == 0
+    assert "새키워드" in [keyword for keyword, _ in reopened.search(vector, k=5)]
+
+    # 저장소가 인덱스보다 작으면(저장소 재생성) 인덱스를 쓰지 않음
+    assert ki.load_keyword_index(KeywordEmbeddingStore("other/model", root=str(tmp_path))) is None
+
+"""
+update_keyword_index: 인덱스가 없으면 학습, 새 키워드가 적으면 배정만 추가, 많아지면 다시 학습
+"""
+def test_update_keyword_index(tmp_path):
+    store = make_store(tmp_path, 100)
+    assert ki.update_keyword_index(store)["retrained"] is True
+
+    store.ensure(["추가1"], lambda batch: np.ones((1, 16)))
+    result = ki.update_keyword_index(store)
+    assert result == {"rows": 101, "nlist": ki.default_nlist(100), "retrained": False}
+
+    with patch.object(ki, "KEYWORD_INDEX_RETRAIN_RATIO", 0.2):
+        store.ensure([f"추가{i}" for i in range(2, 40)], lambda batch: np.ones((len(batch), 16)))
+        assert ki.update_keyword_index(store)["retrained"] is True
+    assert ki.load_keyword_index(store).trained_rows == 139
+
+"""
+load_keyword_index: 저장소를 지우고 같은 크기로 다시 만들면 generation이 달라 이전 인덱스를 쓰지 않고 다시 학습
+"""
+def test_index_rejected_after_store_recreated(tmp_path):
+    store = make_store(tmp_path, 100)
+    ki.update_keyword_index(store)
+    assert ki.load_keyword_index(KeywordEmbeddingStore("test/model", root=str(tmp_path))) is not None
+
+    index_files = {name: (tmp_path / "test__model" / name).read_bytes()
+                   for name in ("ivf_centroids.npy", "ivf_assignments.npy", "ivf_meta.json")}
+    shutil.rmtree(tmp_path / "test__model")
+    recreated = make_store(tmp_path, 100, seed=1)
+    for name, data in index_files.items():
+        (tmp_path / "test__model" / name).write_bytes(data)
+    assert recreated.generation != store.generation
+    assert ki.load_keyword_index(recreated) is None
+    assert ki.update_keyword_index(recreated)["retrained"] is True
+    assert ki.load_keyword_index(recreated) is not None
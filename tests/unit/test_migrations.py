@@ -0,0 +1,68 @@
+import pytest
+import app.core.migrations as migrations
+
+
+def write_migrations(tmp_path, files):
+    (tmp_path / "optional").mkdir()
+    for name, sql in files.items():
+        (tmp_path / name).write_text(sql, encoding="utf-8")
+
+"""
+split_statements: 주석 줄을 빼고 줄 끝의 ;로 문장을 나눔
+"""
+def test_split_statements():
+    sql = "-- 설명\nSET FOREIGN_KEY_CHECKS = 0;\nALTER TABLE cafes\n    MODIFY id BIGINT NOT NULL;\n\nSET FOREIGN_KEY_CHECKS = 1;\n"
+    assert migrations.split_statements(sql) == [
+        "SET FOREIGN_KEY_CHECKS = 0",
+        "ALTER TABLE cafes\n    MODIFY id BIGINT NOT NULL",
+        "SET FOREIGN_KEY_CHECKS = 1",
+    ]
+
+"""
+apply_migrations: 적용되지 않은 마이그레이션만 번호순으로 실행하고 파일마다 이력 기록 후 커밋
+"""
+def test_apply_migrations_applies_pending_in_order(tmp_path, mock_db_connection):
+    write_migrations(tmp_path, {
+        "V10__second.sql": "ALTER TABLE b ADD INDEX idx_b (x);",
+        "V2__first.sql": "ALTER TABLE a ADD INDEX idx_a (x);",
+        "V1__done.sql": "ALTER TABLE done ADD INDEX idx_done (x);",
+        "notes.txt": "무시",
+    })
+    mock_conn, mock_cursor = mock_db_connection
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    done = migrations.Migration("0001", "done", str(tmp_path / "V1__done.sql"))
+    mock_cursor.fetchall.return_value = [{"version": "0001", "checksum": done.checksum}]
+
+    applied = migrations.apply_migrations(mock_conn, directory=str(tmp_path))
+
+    assert applied == ["0002", "0010"]
+    executed = [c[0][0] for c in mock_cursor.execute.call_args_list]
+    ddl = [sql for sql in executed if sql.startswith("ALTER TABLE")]
+    assert ddl == ["ALTER TABLE a ADD INDEX idx_a (x)", "ALTER TABLE b ADD INDEX idx_b (x)"]
+    history = [c[0][1] for c in mock_cursor.execute.call_args_list if "INSERT INTO schema_migrations" in c[0][0]]
+    assert [row[:2] for row in history] == [("0002", "first"), ("0010", "second")]
+    assert mock_conn.commit.call_count == 2
+    mock_conn.close.assert_not_called()
+
+"""
+apply_migrations: 선택 마이그레이션은 이름을 지정했을 때만 적용하고, 없는 이름은 ValueError
+"""
+def test_apply_migrations_optional(tmp_path, mock_db_connection):
+    write_migrations(tmp_path, {"optional/partition_reviews.sql": "ALTER TABLE r PARTITION BY HASH (cafe_id) PARTITIONS 4;"})
+    mock_conn, mock_cursor = mock_db_connection
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    mock_cursor.fetchall.return_value = []
+
+    assert migrations.apply_migrations(mock_conn, directory=str(tmp_path)) == []
+    assert migrations.apply_migrations(mock_conn, optional=["partition_reviews"], directory=str(tmp_path)) == ["optional:partition_reviews"]
+    with pytest.raises(ValueError):
+        migrations.apply_migrations(mock_conn, optional=["missing"], directory=str(tmp_path))
+
+"""
+discover_migrations: 기본 경로는 실행 위치가 아니라 저장소의 sql/migrations
+"""
+def test_default_migrations_dir_is_independent_of_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    versions = [migration.version for migration in migrations.discover_migrations()]
+    assert versions and versions == sorted(versions)
+    assert versions[0] == "0001"
@@ -0,0 +1,32 @@
+from unittest.mock import patch
+import app.core.model_registry as registry
+
+"""
+get_model: 같은 모델은 한 번만 로딩하여 공유
+"""
+def test_get_model_loads_once(monkeypatch):
+    monkeypatch.setattr(registry, "_models", {})
+    with patch("sentence_transformers.SentenceTransformer") as mock_cls:
+        first = registry.get_model("test/model")
+        second = registry.get_model("test/model")
+    assert first is second
+    mock_cls.assert_called_once_with("test/model")
+    assert registry.loaded_models() == ["test/model"]
+
+"""
+model_key / get_model: 백엔드별로 다른 식별자와 인스턴스 사용, 지원하지 않는 백엔드는 오류
+"""
+def test_get_model_backend_selection(monkeypatch):
+    monkeypatch.setattr(registry, "_models", {})
+    assert registry.model_key("test/model", "torch") == "test/model"
+    assert registry.model_key("test/model", "onnx") == "test/model@onnx"
+    with patch("app.core.onnx_encoder.load_onnx_encoder") as mock_load:
+        model = registry.get_model("test/model", "onnx")
+    assert model is mock_load.return_value
+    mock_load.assert_called_once_with("test/model")
+    assert registry.loaded_models() == ["test/model@onnx"]
+    try:
+        registry.model_key("test/model", "tensorrt")
+        assert False
+    except ValueError:
+        pass
@@ -0,0 +1,98 @@
+import threading
+import time
+from unittest.mock import patch
+import pandas as pd
+import pytest
+import app.service.pipeline as pipeline_module
+from app.core.job_queue import JobCancelled
+
+
+def grid(rows):
+    return pd.DataFrame([{"min_lat": i, "min_lng": i, "max_lat": i + 1, "max_lng": i + 1} for i in range(rows)])
+
+
+def patch_stages(search_results, crawl=lambda cafe_id, replace: True, cluster_error=None):
+    # 파이프라인 단계에서 호출하는 외부 의존(카카오 API, 크롤링, DB, 분석)을 모킹
+    results = iter(search_results)
+    return [
+        patch.object(pipeline_module, "create_session"),
+        patch.object(pipeline_module, "search_cafes", side_effect=lambda *args: next(results)),
+        patch.object(pipeline_module, "save_cafe_ids"),
+        patch.object(pipeline_module, "crawl_and_save_single_cafe", side_effect=crawl),
+        patch.object(pipeline_module, "Kiwi"),
+        patch.object(pipeline_module, "get_embedding_store"),
+        patch.object(pipeline_module, "get_connection"),
+        patch.object(pipeline_module, "ClusterResultWriter"),
+        patch.object(pipeline_module, "extract_cafe_keywords", side_effect=lambda cursor, cafe_id, kiwi: {f"kw{cafe_id}": 1}),
+        patch.object(pipeline_module, "cluster_and_save_cafe", return_value=cluster_error),
+    ]
+
+
+def run_with(patches, pipeline, callback):
+    for p in patches:
+        p.start()
+    try:
+        return pipeline.run(callback)
+    finally:
+        for p in patches:
+            p.stop()
+
+
+"""
+StreamingPipeline: 격자마다 발견한 카페가 중복 없이 크롤링 → 추출·클러스터링까지 흐르고, 실패한 크롤링은 한 번 재시도 후 기록
+"""
+def test_pipeline_streams_cafes_through_all_stages():
+    attempts = {}
+
+    def crawl(cafe_id, replace):
+        assert replace
+        attempts[cafe_id] = attempts.get(cafe_id, 0) + 1
+        return cafe_id != "3"
+
+    patches = patch_stages([[{"cafe_id": "1"}, {"cafe_id": "2"}], [{"cafe_id": "2"}, {"cafe_id": "3"}], []], crawl)
+    # 큐 크기 1: 뒤 단계가 밀리면 앞 단계가 기다려도 모든 카페가 끝까지 처리됨
+    pipeline = pipeline_module.StreamingPipeline(grid(3), "key", crawl_workers=2, queue_size=1)
+    progress = []
+    result = run_with(patches, pipeline, lambda percent, stage: progress.append((percent, stage)))
+
+    assert result["saved"] == 3 and result["crawled_cafes"] == 2 and result["analyzed_cafes"] == 2
+    assert result["failed_ids"] == ["3"] and attempts == {"1": 1, "2": 1, "3": 2}
+    assert isinstance(result["first_result_seconds"], float)
+    assert all(percent <= 99 for percent, _ in progress)
+    assert progress[-1][1].endswith("analyzed_2")
+
+"""
+StreamingPipeline: 크롤링 단계 오류는 모든 단계를 멈추고 작업 오류로 전파
+"""
+def test_pipeline_propagates_stage_error():
+    def crawl(cafe_id, replace):
+        raise RuntimeError("driver crashed")
+
+    patches = patch_stages([[{"cafe_id": "1"}, {"cafe_id": "2"}]] * 5, crawl)
+    pipeline = pipeline_module.StreamingPipeline(grid(5), "key", crawl_workers=1, queue_size=1)
+    with pytest.raises(RuntimeError, match="driver crashed"):
+        run_with(patches, pipeline, lambda *args: None)
+    assert pipeline.stop.is_set()
+
+"""
+StreamingPipeline: 진행률 보고에서 작업이 취소되면 검색·크롤링 단계도 멈춤
+"""
+def test_pipeline_cancel_stops_producers():
+    release = threading.Event()
+
+    def crawl(cafe_id, replace):
+        release.wait(5)
+        return True
+
+    patches = patch_stages(iter(lambda: [{"cafe_id": str(time.monotonic_ns())}], None), crawl)
+
+    def cancel(percent, stage):
+        raise JobCancelled("job")
+
+    pipeline = pipeline_module.StreamingPipeline(grid(1000), "key", crawl_workers=1, queue_size=2)
+    with pytest.raises(JobCancelled):
+        run_with(patches, pipeline, cancel)
+    release.set()
+    assert pipeline.stop.is_set()
+    # 큐가 가득 차 검색 단계가 멈춰 있었으므로 전체 격자를 돌지 않음
+    assert pipeline.stats["grid_done"] < 10
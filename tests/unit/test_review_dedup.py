@@ -0,0 +1,104 @@
+import os
+import pytest
+from unittest.mock import patch
+import app.service.review_dedup as rd
+
+TEMPLATE = "이벤트 참여 리뷰입니다. 오션뷰가 정말 멋지고 음료도 맛있어요. 다음에 또 방문할게요!"
+
+"""
+minhash_signature: 거의 같은 리뷰는 유사도가 높고, 다른 리뷰는 낮음
+"""
+def test_minhash_signature_similarity():
+    near = TEMPLATE.replace("방문할게요!", "방문할게요!!")
+    other = "주차장이 넓고 디저트 종류가 다양해서 아이들과 오기 좋은 곳이었습니다."
+    sig = rd.minhash_signature(TEMPLATE)
+    assert rd.signature_similarity(sig, rd.minhash_signature(near)) >= rd.SIMILARITY_THRESHOLD
+    assert rd.signature_similarity(sig, rd.minhash_signature(other)) < 0.3
+
+"""
+find_duplicates: 카페 내 중복만 찾아 내용 해시로 반환하고, 짧은 리뷰는 판정에서 제외
+"""
+def test_find_duplicates_within_cafe():
+    near = TEMPLATE.replace("방문할게요!", "방문할게요!!")
+    cafe_reviews = [
+        (1, [
+            {"id": 1, "content": TEMPLATE},
+            {"id": 2, "content": "좋아요"},
+            {"id": 3, "content": "좋아요"},
+            {"id": 4, "content": "  " + TEMPLATE},
+            {"id": 6, "content": TEMPLATE},
+            {"id": 7, "content": near},
+        ]),
+        (2, [{"id": 5, "content": TEMPLATE}]),
+    ]
+    original = rd.content_hash(TEMPLATE)
+    result = list(rd.find_duplicates(cafe_reviews))
+    # 같은 내용의 반복은 자기 해시를 가리키는 행 하나, 거의 같은 리뷰는 원본 해시를 가리킴
+    assert [(r[0], r[1], r[2], r[4]) for r in result] == [
+        (1, original, original, "cafe"),
+        (1, rd.content_hash(near), original, "cafe"),
+    ]
+    # 제외되는 리뷰 수: 세 번 나온 내용은 첫 리뷰를 빼고 2건, 거의 같은 리뷰는 1건
+    assert [r[5] for r in result] == [2, 1]
+
+"""
+find_duplicates(cross_cafe=True): 다른 카페에 올린 같은 리뷰도 중복으로 표시
+"""
+def test_find_duplicates_cross_cafe():
+    cafe_reviews = [
+        (1, [{"id": 1, "content": TEMPLATE}]),
+        (2, [{"id": 5, "content": TEMPLATE}]),
+    ]
+    original = rd.content_hash(TEMPLATE)
+    result = list(rd.find_duplicates(cafe_reviews, cross_cafe=True))
+    assert [(r[0], r[1], r[2], r[4], r[5]) for r in result] == [(2, original, original, "global", 1)]
+
+"""
+detect_duplicate_reviews: 테이블을 비우고 중복을 저장한 뒤 제외 건수 반환, 중복 표시가 바뀐 카페는 키워드 재집계 대상
+"""
+def test_detect_duplicate_reviews(mock_db_connection):
+    mock_conn, mock_cursor = mock_db_connection
+    rows = [
+        {"id": 1, "cafe_id": 1, "content": TEMPLATE},
+        {"id": 2, "cafe_id": 1, "content": TEMPLATE},
+        {"id": 3, "cafe_id": 1, "content": TEMPLATE},
+    ]
+    mock_cursor.__iter__.return_value = iter(rows)
+    # 판정 전에는 카페 9에만 중복 표시가 있었고, 판정 후에는 카페 1에만 있음
+    mock_cursor.fetchall.side_effect = [
+        [{"cafe_id": 9, "flagged": 1, "checksum": 7}],
+        [{"cafe_id": 1, "flagged": 1, "checksum": 3}],
+    ]
+    with patch.object(rd, "get_connection", return_value=mock_conn), \
+         patch.object(rd, "reset_keyword_counts") as mock_reset:
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        result = rd.detect_duplicate_reviews()
+    # 같은 내용 세 건 중 첫 리뷰만 집계하므로 제외되는 리뷰는 2건
+    assert result == {"within_cafe": 2, "cross_cafe": 0, "removed": 2}
+    mock_cursor.execute.assert_any_call("DELETE FROM review_duplicates")
+    saved = mock_cursor.executemany.call_args[0][1]
+    assert len(saved) == 1 and len(saved[0]) == 5
+    assert saved[0][:3] == (1, rd.content_hash(TEMPLATE), rd.content_hash(TEMPLATE))
+    assert sorted(mock_reset.call_args[0][1]) == [1, 9]
+    mock_conn.commit.assert_called_once()
+
+"""
+DiskLshIndex: 메모리 LshIndex와 같은 원본을 찾고, close 후 임시 파일을 삭제
+"""
+def test_disk_lsh_index_matches_memory_index():
+    texts = [f"{i}번째 지점 방문 리뷰입니다. 커피가 맛있고 직원분들이 친절해요. 재방문 의사 있습니다." for i in range(30)]
+    texts += [text.replace("친절해요", "친절해요!") for text in texts[:10]]
+    memory, disk = rd.LshIndex(), rd.DiskLshIndex()
+    try:
+        for text in texts:
+            signature = rd.minhash_signature(text)
+            expected = memory.find(signature)
+            assert disk.find(signature) == expected
+            if expected is None:
+                memory.add(rd.content_hash(text), signature)
+                disk.add(rd.content_hash(text), signature)
+        disk.flush()
+        assert len(disk) == len(memory.signatures)
+    finally:
+        disk.close()
+    assert not os.path.exists(disk._directory.name)
@@ -0,0 +1,284 @@
+import json
+import subprocess
+import sys
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import MagicMock, patch
+import numpy as np
+import app.service.review_search as rs
+
+
+def make_builder(reviews):
+    builder = rs.SegmentBuilder()
+    for review_id, cafe_id, terms in reviews:
+        builder.add(review_id, cafe_id, Counter(terms))
+    return builder
+
+REVIEWS = [
+    (3, 1, ["라떼", "라떼", "맛있다"]),
+    (10, 1, ["오션뷰", "디저트"]),
+    (300, 2, ["라떼", "오션뷰", "오션뷰", "조용하다"]),
+    (70000, 2, ["디저트"]),
+]
+
+"""
+varint: 7비트 경계 값을 포함한 정수 배열을 압축했다가 그대로 복원
+"""
+def test_varint_round_trip():
+    values = np.array([0, 1, 127, 128, 16383, 16384, 2 ** 40, 5], dtype=np.int64)
+    encoded = rs.encode_varints(values)
+    assert len(encoded) == int(rs.varint_sizes(values).sum()) == 1 + 1 + 1 + 2 + 2 + 3 + 6 + 1
+    assert rs.decode_varints(encoded).tolist() == values.tolist()
+    assert rs.decode_varints(rs.encode_varints([])).tolist() == []
+
+"""
+review_terms: 명사는 형태, 형용사·동사는 원형으로 세고 불용어·한 글자는 제외
+"""
+def test_review_terms():
+    tokens = [("라떼", "NNG", "라떼"), ("맛있", "VA", "맛있다"), ("라떼", "NNG", "라떼"), ("집", "NNG", "집")]
+    assert rs.review_terms(tokens) == Counter({"라떼": 2, "맛있다": 1})
+
+"""
+세그먼트: 검색어별 posting이 리뷰 id 순으로 복원되고, 저장 후 메모리 맵으로 다시 열림
+"""
+def test_segment_postings_and_persist(tmp_path):
+    segment = make_builder(REVIEWS).build()
+    assert segment.term_postings("라떼")[0].tolist() == [3, 300]
+    assert segment.term_postings("라떼")[1].tolist() == [2, 1]
+    assert segment.term_postings("디저트")[0].tolist() == [10, 70000]
+    assert segment.term_postings("없는검색어")[0].tolist() == []
+    assert segment.doc_lengths.tolist() == [3, 2, 4, 1]
+
+    segment.save(str(tmp_path / "seg"))
+    loaded = rs.IndexSegment.load(str(tmp_path / "seg"))
+    assert isinstance(loaded.postings, np.memmap)
+    assert loaded.term_postings("오션뷰")[0].tolist() == [10, 300]
+
+    empty = rs.SegmentBuilder().build()
+    assert len(empty) == 0 and empty.triples()[0].tolist() == []
+
+"""
+merge_segments: 검색어 사전이 다른 세그먼트를 합쳐도 posting과 문서 표가 한 세그먼트와 같음
+"""
+def test_merge_segments():
+    whole = make_builder(REVIEWS).build()
+    merged = rs.merge_segments([make_builder(REVIEWS[:2]).build(), make_builder(REVIEWS[2:]).build()])
+    assert merged.doc_ids.tolist() == whole.doc_ids.tolist()
+    for term in ("라떼", "오션뷰", "디저트", "맛있다", "조용하다"):
+        assert [array.tolist() for array in merged.term_postings(term)] == \
+               [array.tolist() for array in whole.term_postings(term)]
+
+"""
+ReviewIndex.search: BM25 점수 순으로 반환하고, 세그먼트가 나뉘어도 같은 점수, cafe_id로 카페 필터링
+"""
+def test_bm25_search():
+    index = rs.ReviewIndex([make_builder(REVIEWS).build()])
+    results = index.search(["오션뷰"])
+    assert [hit["review_id"] for hit in results] == [300, 10]
+    assert results[0]["cafe_id"] == 2 and results[0]["score"] > results[1]["score"] > 0
+
+    # 두 검색어를 모두 가진 리뷰가 먼저, limit 적용
+    assert index.search(["라떼", "조용하다"], limit=1)[0]["review_id"] == 300
+
+    split = rs.ReviewIndex([make_builder(REVIEWS[:2]).build(), make_builder(REVIEWS[2:]).build()])
+    assert split.search(["라떼", "오션뷰"]) == index.search(["라떼", "오션뷰"])
+
+    assert [hit["review_id"] for hit in index.search(["라떼"], cafe_id=1)] == [3]
+    assert index.search(["라떼"], cafe_id=99) == []
+    assert index.search(["없는검색어"]) == []
+
+
+def fake_chunks(rows):
+    def iter_chunks(watermark, chunk_size=rs.REVIEW_INDEX_CHUNK):
+        selected = [row for row in rows if row["id"] > watermark]
+        if selected:
+            yield selected
+    return iter_chunks
+
+
+def fake_tokenize(cursor, chunk, kiwi_factory):
+    # 리뷰 내용을 공백으로 나눈 명사 토큰으로 사용
+    return [(row, [(word, "NNG", word) for word in row["content"].split()]) for row in chunk], len(chunk)
+
+def fake_review_table(mock_cursor, rows, created):
+    # 마지막으로 실행한 쿼리에 따라 테이블 생성 시각·리뷰 수를 rows에서 계산해 돌려주는 fetchone 대역
+    def fetchone():
+        sql, args = (mock_cursor.execute.call_args[0] + (None,))[:2]
+        if "information_schema" in sql:
+            return {"created": created[0]}
+        if "<=" in sql:
+            return {"total": sum(row["id"] <= args[0] for row in rows)}
+        return {"total": sum(row["id"] > args[0] for row in rows)}
+    mock_cursor.fetchone.side_effect = fetchone
+
+"""
+build_review_index: 전체 구축 후 증분 갱신은 새 리뷰만 새 세그먼트로 덧붙이고, 세그먼트가 많아지면 하나로 병합
+"""
+def test_build_review_index(tmp_path, mock_db_connection):
+    mock_conn, mock_cursor = mock_db_connection
+    rows = [
+        {"id": 1, "cafe_id": 1, "content": "라떼 라떼 맛집"},
+        {"id": 2, "cafe_id": 2, "content": "오션뷰 디저트"},
+    ]
+    mock_cursor.__enter__.return_value = mock_cursor
+    fake_review_table(mock_cursor, rows, ["2026-01-01 00:00:00"])
+    root = str(tmp_path)
+    with patch.object(rs, "get_connection", return_value=mock_conn), \
+         patch.object(rs, "iter_review_chunks", side_effect=fake_chunks(rows)), \
+         patch.object(rs, "tokenize_chunk", side_effect=fake_tokenize):
+        callback = MagicMock()
+        result = rs.build_review_index(callback, root=root)
+        assert result["indexed_reviews"] == 2 and result["segments"] == 1
+        callback.assert_called_with(100, "completed")
+
+        # 새 리뷰 없음: 세그먼트 그대로
+        result = rs.build_review_index(incremental=True, root=root)
+        assert result["indexed_reviews"] == 0 and result["rebuilt"] is False
+
+        with patch.object(rs, "REVIEW_INDEX_MAX_SEGMENTS", 2):
+            rows.append({"id": 5, "cafe_id": 1, "content": "오션뷰 라떼"})
+            assert rs.build_review_index(incremental=True, root=root)["segments"] == 2
+            rows.append({"id": 9, "cafe_id": 2, "content": "조용한 라떼"})
+            result = rs.build_review_index(incremental=True, root=root)
+        assert result == {**result, "indexed_reviews": 1, "total_reviews": 4, "segments": 1}
+
+        index = rs.load_review_index(root)
+        assert index.watermark == 9
+        assert sorted(hit["review_id"] for hit in index.search(["라떼"])) == [1, 5, 9]
+        # 병합으로 빠진 세그먼트 디렉터리는 삭제됨
+        assert sorted(path.name for path in tmp_path.iterdir()) == [".lock", "manifest.json", "seg_000004"]
+
+        # 전체 구축은 처음부터 다시 색인
+        result = rs.build_review_index(root=root)
+        assert result["indexed_reviews"] == 4 and result["segments"] == 1
+
+"""
+build_review_index(incremental): 카페 단위 교체로 색인한 리뷰가 지워졌거나 테이블이 섀도 교체되었으면 전체 재구축
+"""
+def test_build_review_index_rebuilds_when_reviews_changed(tmp_path, mock_db_connection):
+    mock_conn, mock_cursor = mock_db_connection
+    rows = [
+        {"id": 1, "cafe_id": 1, "content": "라떼 맛집"},
+        {"id": 2, "cafe_id": 2, "content": "오션뷰 디저트"},
+    ]
+    created = ["2026-01-01 00:00:00"]
+    mock_cursor.__enter__.return_value = mock_cursor
+    fake_review_table(mock_cursor, rows, created)
+    root = str(tmp_path)
+    with patch.object(rs, "get_connection", return_value=mock_conn), \
+         patch.object(rs, "iter_review_chunks", side_effect=fake_chunks(rows)), \
+         patch.object(rs, "tokenize_chunk", side_effect=fake_tokenize):
+        rs.build_review_index(root=root)
+
+        # 카페 2의 리뷰를 교체: 이전 리뷰 2는 지워지고 새 id로 다시 들어옴
+        rows[1] = {"id": 3, "cafe_id": 2, "content": "조용한 디저트"}
+        result = rs.build_review_index(incremental=True, root=root)
+        assert result["rebuilt"] is True and result["total_reviews"] == 2
+        assert [hit["review_id"] for hit in rs.load_review_index(root).search(["오션뷰"])] == []
+
+        # 크롤링 섀도 교체: 같은 id가 다른 리뷰를 가리킴
+        rows[:] = [{"id": 1, "cafe_id": 7, "content": "오션뷰 카페"}, {"id": 2, "cafe_id": 8, "content": "라떼"},
+                   {"id": 3, "cafe_id": 9, "content": "디저트"}]
+        created[0] = "2026-02-01 00:00:00"
+        assert rs.open_review_index(root) is None
+        result = rs.build_review_index(incremental=True, root=root)
+        assert result["rebuilt"] is True and result["total_reviews"] == 3
+        index = rs.open_review_index(root)
+        assert index.search(["오션뷰"])[0]["cafe_id"] == 7
+
+"""
+review_search import: 형태소 분석 모듈(kiwipiepy)은 첫 질의·색인 구축 때 로딩
+"""
+def test_module_import_does_not_load_kiwi():
+    code = "import sys, app.service.review_search; print('kiwipiepy' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.strip() == "False"
+
+
+class FakeElasticsearch(BaseHTTPRequestHandler):
+    """_bulk 요청 본문과 색인 생성 요청을 기록하는 로컬 Elasticsearch 대역입니다."""
+    requests = []
+    indices = set()
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body=None):
+        data = json.dumps(body or {}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+
+    def do_HEAD(self):
+        self.reply(200 if self.path.strip("/") in self.indices else 404)
+
+    def do_PUT(self):
+        self.requests.append(("PUT", self.path, json.loads(self.read_body())))
+        self.indices.add(self.path.strip("/"))
+        self.reply(200, {"acknowledged": True})
+
+    def do_DELETE(self):
+        self.indices.discard(self.path.strip("/"))
+        self.reply(200, {"acknowledged": True})
+
+    def do_POST(self):
+        lines = self.read_body().splitlines()
+        self.requests.append(("POST", self.path, lines))
+        errors = any('"fail"' in line for line in lines[1::2])
+        self.reply(200, {"errors": errors, "items": [
+            {"index": {"_id": json.loads(action)["index"]["_id"], **({"error": {"type": "x"}} if errors else {})}}
+            for action in lines[0::2]
+        ]})
+
+"""
+ElasticsearchSink: 로컬 대역 서버에 색인을 만들고 batch_size마다 NDJSON _bulk로 보내며, 실패 문서가 있으면 예외
+"""
+def test_elasticsearch_sink():
+    server = HTTPServer(("127.0.0.1", 0), FakeElasticsearch)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        sink = rs.ElasticsearchSink(f"http://127.0.0.1:{server.server_port}/", index="reviews_test", batch_size=2)
+        sink.ensure_index()
+        sink.ensure_index()
+        assert [request[:2] for request in FakeElasticsearch.requests] == [("PUT", "/reviews_test")]
+
+        sink.add(1, 10, "라떼 맛집", ["라떼", "맛집"])
+        sink.add(2, 10, "오션뷰", ["오션뷰"])
+        sink.add(3, 20, "디저트", ["디저트"])
+        sink.flush()
+        bulks = [request[2] for request in FakeElasticsearch.requests if request[0] == "POST"]
+        assert [len(lines) for lines in bulks] == [4, 2] and sink.sent == 3
+        assert json.loads(bulks[0][0]) == {"index": {"_index": "reviews_test", "_id": "1"}}
+        assert json.loads(bulks[0][1]) == {"cafe_id": 10, "content": "라떼 맛집", "terms": "라떼 맛집"}
+
+        sink.add(4, 20, "fail", [])
+        try:
+            sink.flush()
+            assert False, "실패 문서가 있으면 예외가 발생해야 함"
+        except RuntimeError:
+            assert sink.sent == 3
+    finally:
+        server.shutdown()
+        server.server_close()
+
+"""
+search_reviews: 질의를 형태소 분석해 검색하고, DB에서 삭제된 리뷰는 결과에서 제외
+"""
+def test_search_reviews():
+    index = rs.ReviewIndex([make_builder(REVIEWS).build()])
+    with patch.object(rs, "get_review_index", return_value=index), \
+         patch.object(rs, "query_terms", return_value=["오션뷰"]), \
+         patch.object(rs, "fetch_reviews", return_value={300: {"id": 300, "cafe_id": 2, "content": "바다"}}):
+        result = rs.search_reviews("오션뷰 카페")
+    assert result["terms"] == ["오션뷰"] and result["indexed_reviews"] == 4
+    assert [review["id"] for review in result["reviews"]] == [300] and result["reviews"][0]["score"] > 0
+
+    with patch.object(rs, "get_review_index", return_value=None), patch.object(rs, "query_terms", return_value=["라떼"]):
+        assert rs.search_reviews("라떼")["reviews"] == []
@@ -0,0 +1,73 @@
+import pytest
+from unittest.mock import MagicMock
+import app.core.shadow_tables as st
+
+"""
+create_shadow_tables: 섀도 테이블을 새로 만들고, 같은 묶음을 참조하는 외래 키는 섀도 테이블을 참조하게 함
+"""
+def test_create_shadow_tables_repoints_foreign_keys():
+    cursor = MagicMock()
+    foreign_keys = {
+        "cafes": [],
+        "menus": [{"name": "fk_menus_cafe_id", "col": "cafe_id", "ref_table": "cafes", "ref_col": "id"}],
+        "keywords": [{"name": "fk_keywords_cafe_id__g1700000000", "col": "cafe_id", "ref_table": "cafe_ids", "ref_col": "id"}],
+    }
+    cursor.execute.side_effect = lambda sql, args=None: setattr(
+        cursor.fetchall, "return_value", foreign_keys[args[0]] if args else []
+    )
+    shadows = st.create_shadow_tables(cursor, ("cafes", "menus", "keywords"))
+
+    assert shadows == {"cafes": "cafes__shadow", "menus": "menus__shadow", "keywords": "keywords__shadow"}
+    executed = [c[0][0] for c in cursor.execute.call_args_list]
+    assert "CREATE TABLE menus__shadow LIKE menus" in executed
+    constraints = [sql for sql in executed if "ADD CONSTRAINT" in sql]
+    assert len(constraints) == 2
+    assert constraints[0].startswith("ALTER TABLE menus__shadow ADD CONSTRAINT fk_menus_cafe_id__g")
+    assert constraints[0].endswith("REFERENCES cafes__shadow (id)")
+    # 묶음 밖 테이블은 그대로 참조하고, 이전 세대 번호는 새 번호로 바뀜
+    assert "fk_keywords_cafe_id__g1700000000" not in constraints[1]
+    assert constraints[1].endswith("REFERENCES cafe_ids (id)")
+
+"""
+publish_shadow_tables: 가장 오래된 세대를 지우고, 세대 이동과 교체를 RENAME TABLE 한 문장으로 수행
+"""
+def test_publish_shadow_tables_rotates_generations():
+    cursor = MagicMock()
+    cursor.fetchall.return_value = [{"name": "cafes__old1"}]
+    st.publish_shadow_tables(cursor, ("cafes", "menus"), keep=2)
+
+    executed = [c[0][0] for c in cursor.execute.call_args_list]
+    assert "DROP TABLE IF EXISTS cafes__old2" in executed
+    assert "DROP TABLE IF EXISTS menus__old2" in executed
+    renames = [sql for sql in executed if sql.startswith("RENAME TABLE")]
+    assert renames == [
+        "RENAME TABLE cafes__old1 TO cafes__old2, cafes TO cafes__old1, cafes__shadow TO cafes, "
+        "menus TO menus__old1, menus__shadow TO menus"
+    ]
+
+"""
+restore_previous_generation: 이전 세대가 없으면 아무것도 바꾸지 않고 ValueError
+"""
+def test_restore_previous_generation_requires_old_tables():
+    cursor = MagicMock()
+    cursor.fetchall.return_value = [{"name": "cafes__old1"}]
+    with pytest.raises(ValueError) as excinfo:
+        st.restore_previous_generation(cursor, ("cafes", "menus"))
+    assert "menus" in str(excinfo.value)
+    executed = [c[0][0] for c in cursor.execute.call_args_list]
+    assert not any(sql.startswith("RENAME TABLE") for sql in executed)
+
+"""
+shadow_rebuild: 블록의 예외로 정리하다 연결이 끊겨 섀도 테이블 삭제가 실패해도 원래 예외를 전파
+"""
+def test_shadow_rebuild_cleanup_failure_keeps_original_error():
+    conn, cursor = MagicMock(), MagicMock()
+    conn.cursor.return_value.__enter__.return_value = cursor
+    cursor.fetchall.return_value = []
+    with pytest.raises(RuntimeError) as excinfo:
+        with st.shadow_rebuild(conn, ("cafes",)):
+            cursor.execute.side_effect = ConnectionError("Lost connection to MySQL server")
+            raise RuntimeError("rebuild failed")
+    assert str(excinfo.value) == "rebuild failed"
+    conn.rollback.assert_called_once()
+    assert cursor.execute.call_args[0][0] == "SET FOREIGN_KEY_CHECKS = 0"